@@ -0,0 +1,117 @@
+"""Benchmark the columnar scan snapshot against the SQL analytics path.
+
+Usage:
+    python -m benchmarks.analytics_columnar --scans 1000000 --days 30
+    python -m benchmarks.analytics_columnar --database-url postgresql://...
+
+Defaults to an in-memory SQLite database so it runs anywhere. Reports the
+initial snapshot build, an incremental refresh, and per-query latency for
+heatmap, trending and windowed counts on both paths.
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable
+from unittest.mock import patch
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.analytics import service as service_module
+from src.analytics.columnar import ScanSnapshot
+from src.analytics.models import Base, TicketScan
+
+
+def populate(engine: Any, scans: int, days: int, events: int, start_id: int = 0) -> None:
+    rng = random.Random(start_id)
+    now = datetime.utcnow()
+    chunk = []
+    for i in range(start_id, start_id + scans):
+        chunk.append({
+            "ticket_id": f"t{i}",
+            "event_id": f"event_{rng.randrange(events)}",
+            "scan_timestamp": now - timedelta(seconds=rng.randrange(days * 86400)),
+            "is_valid": rng.random() > 0.05,
+        })
+        if len(chunk) == 50_000:
+            with engine.begin() as conn:
+                conn.execute(TicketScan.__table__.insert(), chunk)
+            chunk = []
+    if chunk:
+        with engine.begin() as conn:
+            conn.execute(TicketScan.__table__.insert(), chunk)
+
+
+def timed(fn: Callable[[], Any], repeat: int) -> float:
+    """Best-of-*repeat* wall time in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scans", type=int, default=500_000)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--events", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--database-url", default="sqlite://")
+    args = parser.parse_args()
+
+    if args.database_url == "sqlite://":
+        engine = create_engine(args.database_url, poolclass=StaticPool,
+                               connect_args={"check_same_thread": False})
+    else:
+        engine = create_engine(args.database_url)
+    Base.metadata.create_all(engine)
+
+    print(f"populating {args.scans:,} scans over {args.days} days ...")
+    populate(engine, args.scans, args.days, args.events)
+
+    snapshot = ScanSnapshot(window_days=args.days + 1)
+    start = time.perf_counter()
+    snapshot.refresh(engine)
+    build = time.perf_counter() - start
+    built_rows = len(snapshot)
+    populate(engine, 1000, 1, args.events, start_id=args.scans)
+    start = time.perf_counter()
+    appended = snapshot.refresh(engine)
+    incremental = time.perf_counter() - start
+    print(f"snapshot build:       {build * 1000:9.1f} ms  ({built_rows:,} rows)")
+    print(f"incremental refresh:  {incremental * 1000:9.1f} ms  ({appended} new rows)")
+
+    today = datetime.utcnow().date()
+    queries = {
+        "heatmap (1 day)": lambda svc: svc.get_scan_heatmap.__wrapped__(svc, "event_1", today),
+        "trending (24h)": lambda svc: svc.get_trending_events(limit=10, hours=24),
+        "counts (7d, all)": lambda svc: svc.get_scan_counts.__wrapped__(svc, None, 7),
+        "counts (7d, event)": lambda svc: svc.get_scan_counts.__wrapped__(svc, "event_1", 7),
+    }
+
+    def run(query: Callable[[Any], Any], columnar: bool) -> float:
+        svc = service_module.AnalyticsService()
+
+        def call() -> Any:
+            # Bypass the trending TTL cache so every call does the work.
+            service_module._trending_cache = None
+            return query(svc)
+
+        with patch.object(service_module, "scan_snapshot", snapshot if columnar else None):
+            return timed(call, args.repeat)
+
+    print(f"\n{'query':<20}{'sql ms':>10}{'columnar ms':>14}{'speedup':>10}")
+    with patch.object(service_module, "get_session", sessionmaker(bind=engine)), \
+            patch.object(service_module._db, "get_engine", return_value=engine):
+        for name, query in queries.items():
+            sql_ms = run(query, columnar=False)
+            col_ms = run(query, columnar=True)
+            print(f"{name:<20}{sql_ms:>10.1f}{col_ms:>14.2f}{sql_ms / col_ms:>9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
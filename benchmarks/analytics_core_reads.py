@@ -0,0 +1,107 @@
+"""Benchmark ORM-entity vs Core column-projection reads for scan lists.
+
+Usage:
+    python -m benchmarks.analytics_core_reads --scans 50000 --limit 5000
+    python -m benchmarks.analytics_core_reads --database-url postgresql://...
+
+The ORM variant reproduces the previous ``get_recent_scans`` implementation
+(``session.query(TicketScan)`` then copying attributes into dicts); the Core
+variant is the current service method. Reports rows/sec and the peak
+memory traced by tracemalloc while building one page. Defaults to an
+in-memory SQLite database.
+"""
+import argparse
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Tuple
+from unittest.mock import patch
+
+from sqlalchemy import create_engine, desc
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.analytics import service as service_module
+from src.analytics.models import Base, TicketScan
+
+
+def orm_recent_scans(session_factory: Any, event_id: str, limit: int) -> Dict[str, Any]:
+    session = session_factory()
+    try:
+        query = session.query(TicketScan).filter(TicketScan.event_id == event_id)
+        total = query.count()
+        scans = query.order_by(desc(TicketScan.scan_timestamp)).limit(limit).all()
+        return {
+            "data": [{
+                "id": scan.id,
+                "ticket_id": scan.ticket_id,
+                "scanner_id": scan.scanner_id,
+                "scan_timestamp": scan.scan_timestamp.isoformat(),
+                "is_valid": scan.is_valid,
+                "location": scan.location,
+                "additional_metadata": scan.additional_metadata,
+            } for scan in scans],
+            "total": total,
+        }
+    finally:
+        session.close()
+
+
+def measure(fn: Callable[[], Dict[str, Any]], repeat: int) -> Tuple[float, int, int]:
+    """Return (best seconds, rows, peak traced bytes) for *fn*."""
+    best = float("inf")
+    rows = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = len(fn()["data"])
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, rows, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scans", type=int, default=50_000)
+    parser.add_argument("--limit", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--database-url", default="sqlite://")
+    args = parser.parse_args()
+
+    if args.database_url == "sqlite://":
+        engine = create_engine(args.database_url, poolclass=StaticPool,
+                               connect_args={"check_same_thread": False})
+    else:
+        engine = create_engine(args.database_url)
+    Base.metadata.create_all(engine)
+
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(TicketScan.__table__.insert(), [
+            {"ticket_id": f"t{i}", "event_id": "bench_event", "scanner_id": f"s{i % 20}",
+             "scan_timestamp": now - timedelta(seconds=i), "is_valid": i % 20 != 0,
+             "location": "Gate A", "additional_metadata": {"gate": "A"}}
+            for i in range(args.scans)
+        ])
+    factory = sessionmaker(bind=engine)
+    svc = service_module.AnalyticsService()
+    # Call the undecorated method so the result cache does not short-circuit.
+    core_recent_scans = service_module.AnalyticsService.get_recent_scans.__wrapped__
+
+    print(f"{args.scans:,} scans, page size {args.limit:,}")
+    print(f"{'variant':<8}{'ms/page':>10}{'rows/sec':>14}{'peak KB':>10}")
+    with patch.object(service_module, "get_session", factory):
+        variants = {
+            "orm": lambda: orm_recent_scans(factory, "bench_event", args.limit),
+            "core": lambda: core_recent_scans(svc, "bench_event", limit=args.limit),
+        }
+        for name, fn in variants.items():
+            seconds, rows, peak = measure(fn, args.repeat)
+            print(f"{name:<8}{seconds * 1000:>10.1f}{rows / seconds:>14,.0f}{peak / 1024:>10,.0f}")
+
+
+if __name__ == "__main__":
+    main()
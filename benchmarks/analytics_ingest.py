@@ -0,0 +1,69 @@
+"""Benchmark POST /analytics/ingest throughput without the HTTP layer.
+
+Usage:
+    python -m benchmarks.analytics_ingest --records 200000 --batch-size 5000
+    python -m benchmarks.analytics_ingest --database-url postgresql://...
+
+Defaults to an in-memory SQLite database so it runs anywhere.
+"""
+import argparse
+import gzip
+import json
+import random
+import time
+from unittest.mock import patch
+
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+from src.analytics import ingest
+from src.analytics.models import Base
+
+
+def build_payload(records: int, events: int = 50) -> bytes:
+    rng = random.Random(42)
+    lines = []
+    for i in range(records):
+        event_id = f"event_{rng.randrange(events)}"
+        kind = rng.random()
+        if kind < 0.8:
+            rec = {"type": "scan", "ticket_id": f"t{i}", "event_id": event_id,
+                   "scanner_id": f"s{rng.randrange(20)}", "is_valid": rng.random() > 0.05,
+                   "additional_metadata": {"gate": rng.choice("ABCD")}}
+        elif kind < 0.95:
+            rec = {"type": "transfer", "ticket_id": f"t{i}", "event_id": event_id,
+                   "from_user_id": f"u{i}", "to_user_id": f"u{i + 1}"}
+        else:
+            rec = {"type": "invalid", "attempt_type": "scan", "reason": "invalid_qr",
+                   "event_id": event_id}
+        lines.append(json.dumps(rec))
+    return gzip.compress(("\n".join(lines) + "\n").encode())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=200_000)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--database-url", default="sqlite://")
+    args = parser.parse_args()
+
+    if args.database_url == "sqlite://":
+        engine = create_engine(args.database_url, poolclass=StaticPool,
+                               connect_args={"check_same_thread": False})
+    else:
+        engine = create_engine(args.database_url)
+    Base.metadata.create_all(engine)
+
+    payload = build_payload(args.records)
+    with patch.object(ingest, "get_engine", return_value=engine):
+        start = time.perf_counter()
+        result = ingest.ingest_ndjson(ingest.iter_ndjson_lines(payload), batch_size=args.batch_size)
+        elapsed = time.perf_counter() - start
+
+    print(f"payload:  {len(payload) / 1e6:.1f} MB gzip, {args.records} records")
+    print(f"accepted: {result['accepted']}  rejected: {result['rejected']}  batches: {result['batches']}")
+    print(f"elapsed:  {elapsed:.2f}s  ->  {result['accepted'] / elapsed:,.0f} records/sec")
+
+
+if __name__ == "__main__":
+    main()
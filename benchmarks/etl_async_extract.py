@@ -0,0 +1,89 @@
+"""Benchmark sequential vs concurrent extraction of paginated /events.
+
+Usage:
+    python -m benchmarks.etl_async_extract --pages 50 --latency-ms 80
+    python -m benchmarks.etl_async_extract --pages 200 --concurrency 1 4 8 16
+
+Both variants talk to an in-process ``httpx.MockTransport`` stand-in for the
+Nest API that sleeps ``--latency-ms`` before answering each request, so the
+numbers reflect round-trip overlap rather than real network conditions. The
+sequential variant is ``extract_events_and_sales``; the concurrent one is
+``extract_events_and_sales_async`` at each ``--concurrency`` level.
+"""
+import argparse
+import asyncio
+import os
+import time
+from typing import Any, Callable
+from unittest.mock import patch
+
+import httpx
+
+from src.config import get_settings
+from src.etl import extract
+
+
+def _payload(request: httpx.Request, pages: int, per_page: int) -> Any:
+    if request.url.path == "/ticket-sales":
+        return {"data": [{"event_id": "E1", "quantity": 1, "price": 10.0}]}
+    page = int(request.url.params.get("page", 1))
+    return {
+        "data": [{"id": f"E{page}-{i}", "name": f"Event {page}-{i}"} for i in range(per_page)],
+        "pagination": {"page": page, "total_pages": pages},
+    }
+
+
+def sync_transport(pages: int, per_page: int, latency: float) -> httpx.MockTransport:
+    def handler(request: httpx.Request) -> httpx.Response:
+        time.sleep(latency)
+        return httpx.Response(200, json=_payload(request, pages, per_page))
+
+    return httpx.MockTransport(handler)
+
+
+def async_transport(pages: int, per_page: int, latency: float) -> httpx.MockTransport:
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(latency)
+        return httpx.Response(200, json=_payload(request, pages, per_page))
+
+    return httpx.MockTransport(handler)
+
+
+def timed(fn: Callable[[], Any]) -> float:
+    start = time.perf_counter()
+    events, _ = fn()
+    elapsed = time.perf_counter() - start
+    assert events, "extract returned no events"
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--per-page", type=int, default=100)
+    parser.add_argument("--latency-ms", type=float, default=80.0)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[2, 4, 8, 16])
+    args = parser.parse_args()
+
+    os.environ.setdefault("NEST_API_BASE_URL", "https://nest.bench.test")
+    get_settings.cache_clear()
+    latency = args.latency_ms / 1000
+
+    transport = sync_transport(args.pages, args.per_page, latency)
+    real_client = httpx.Client
+    with patch.object(extract.httpx, "Client", lambda timeout: real_client(timeout=timeout, transport=transport)):
+        baseline = timed(extract.extract_events_and_sales)
+
+    print(f"{args.pages} pages x {args.per_page} events, {args.latency_ms:.0f} ms latency")
+    print(f"{'variant':<14}{'seconds':>10}{'speedup':>10}")
+    print(f"{'sequential':<14}{baseline:>10.2f}{1.0:>10.1f}")
+    for level in args.concurrency:
+        transport = async_transport(args.pages, args.per_page, latency)
+        seconds = timed(lambda: asyncio.run(
+            extract.extract_events_and_sales_async(concurrency=level, transport=transport)
+        ))
+        print(f"{f'async x{level}':<14}{seconds:>10.2f}{baseline / seconds:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
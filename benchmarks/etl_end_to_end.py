@@ -0,0 +1,186 @@
+"""End-to-end ETL benchmark against an in-process mock Nest API.
+
+Usage:
+    python -m benchmarks.etl_end_to_end
+    python -m benchmarks.etl_end_to_end --sales 1000000 --latency-ms 20 --concurrency 8
+    python -m benchmarks.etl_end_to_end --database-url postgresql://... --json bench.ndjson
+
+An ``httpx.MockTransport`` stands in for the Nest API: ``/events`` serves
+``--events`` events and ``/ticket-sales`` serves ``--sales`` sales in pages
+of ``ETL_SALES_PAGE_SIZE`` (``--page-size``) across ``--days`` sale dates,
+with ``total_pages`` pagination and ``--latency-ms`` of delay per request.
+Sales are generated from their index, so the mock holds nothing in memory.
+``run_etl_once(full_refresh=True)`` then runs unmodified with
+``ETL_EXTRACT_CONCURRENCY=--concurrency`` against ``--database-url``
+(in-memory SQLite by default, tables dropped first).
+
+Reports wall time, the per-stage breakdown from ``etl_run_log.stages``,
+peak RSS and sales/sec. ``--json`` appends the same numbers and the
+parameters as one JSON line, so runs can be compared over time. ETL log
+output is silenced unless ``--verbose``; the mock's JSON encoding counts
+towards extract time.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import resource
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Dict
+from unittest.mock import patch
+
+import httpx
+from sqlalchemy import MetaData, create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import StaticPool
+
+import src.etl as etl
+from src.config import get_settings
+from src.etl import extract
+
+EVENTS_PER_PAGE = 100
+
+
+class MockNest:
+    """Deterministic paginated /events and /ticket-sales payloads."""
+
+    def __init__(self, events: int, sales: int, days: int, page_size: int):
+        self.events = events
+        self.sales = sales
+        self.page_size = page_size
+        start = date(2026, 1, 1)
+        self.dates = [(start + timedelta(days=d)).isoformat() for d in range(days)]
+
+    def payload(self, request: httpx.Request) -> Dict[str, Any]:
+        page = int(request.url.params.get("page", 1))
+        if request.url.path == "/events":
+            total, size = self.events, EVENTS_PER_PAGE
+            first = (page - 1) * size
+            data = [{"id": f"E{i}", "name": f"Event {i}"} for i in range(first, min(first + size, total))]
+        else:
+            total, size = self.sales, int(request.url.params.get("limit", self.page_size))
+            first = (page - 1) * size
+            data = [
+                {
+                    "id": f"S{i}",
+                    "event_id": f"E{i % self.events}",
+                    "quantity": 1 + i % 4,
+                    "price": 10.0 + i % 7 * 2.5,
+                    "sale_date": self.dates[i % len(self.dates)],
+                    "created_at": f"{self.dates[i % len(self.dates)]}T12:00:00",
+                }
+                for i in range(first, min(first + size, total))
+            ]
+        return {"data": data, "pagination": {"page": page, "total_pages": max(1, -(-total // size))}}
+
+    def sync_transport(self, latency: float) -> httpx.MockTransport:
+        def handler(request: httpx.Request) -> httpx.Response:
+            time.sleep(latency)
+            return httpx.Response(200, json=self.payload(request))
+
+        return httpx.MockTransport(handler)
+
+    def async_transport(self, latency: float) -> httpx.MockTransport:
+        async def handler(request: httpx.Request) -> httpx.Response:
+            await asyncio.sleep(latency)
+            return httpx.Response(200, json=self.payload(request))
+
+        return httpx.MockTransport(handler)
+
+
+def make_engine(url: str) -> Engine:
+    if url == "sqlite://":
+        return create_engine(url, poolclass=StaticPool, connect_args={"check_same_thread": False})
+    engine = create_engine(url)
+    metadata = MetaData()
+    metadata.reflect(engine, only=lambda name, _: name.startswith("etl_") or name in (
+        "event_sales_summary", "daily_ticket_sales"))
+    metadata.drop_all(engine)
+    return engine
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS, kilobytes on Linux.
+    return peak / (1024 * 1024) if platform.system() == "Darwin" else peak / 1024
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=500)
+    parser.add_argument("--sales", type=int, default=200_000)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--latency-ms", type=float, default=10.0)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--database-url", default="sqlite://")
+    parser.add_argument("--json", metavar="PATH", help="append the result as one JSON line to PATH")
+    parser.add_argument("--verbose", action="store_true", help="keep ETL log output")
+    args = parser.parse_args()
+
+    os.environ.setdefault("NEST_API_BASE_URL", "https://nest.bench.test")
+    os.environ["ETL_SALES_PAGE_SIZE"] = str(args.page_size)
+    os.environ["ETL_EXTRACT_CONCURRENCY"] = str(args.concurrency)
+    get_settings.cache_clear()
+    if not args.verbose:
+        logging.getLogger("veritix").setLevel(logging.WARNING)
+
+    engine = make_engine(args.database_url)
+    nest = MockNest(args.events, args.sales, args.days, args.page_size)
+    latency = args.latency_ms / 1000
+    real_client, real_async_client = httpx.Client, httpx.AsyncClient
+    sync_transport, async_transport = nest.sync_transport(latency), nest.async_transport(latency)
+    rss_before = peak_rss_mb()
+
+    with (
+        patch.object(etl, "_pg_engine", return_value=engine),
+        patch.object(extract.httpx, "Client", lambda timeout: real_client(timeout=timeout, transport=sync_transport)),
+        patch.object(
+            extract.httpx,
+            "AsyncClient",
+            lambda timeout, transport=None: real_async_client(timeout=timeout, transport=async_transport),
+        ),
+    ):
+        started = time.perf_counter()
+        etl.run_etl_once(full_refresh=True)
+        wall = time.perf_counter() - started
+        [run] = etl.recent_etl_runs(1)
+
+    if run["status"] != "success":
+        raise SystemExit(f"ETL run ended with status {run['status']!r}")
+    stages = run["stages"]
+    peak = peak_rss_mb()
+    sales_pages = -(-args.sales // args.page_size)
+    print(
+        f"{args.events:,} events, {args.sales:,} sales ({sales_pages:,} pages of {args.page_size}), "
+        f"{args.days} days, {args.latency_ms:.0f} ms latency, concurrency {args.concurrency}, "
+        f"{engine.dialect.name}"
+    )
+    print(f"{'stage':<12}{'seconds':>10}{'share':>8}{'rows in':>12}{'rows out':>12}")
+    for name, entry in stages.items():
+        print(
+            f"{name:<12}{entry['seconds']:>10.2f}{entry['seconds'] / wall:>8.0%}"
+            f"{entry.get('rows_in', ''):>12}{entry.get('rows_out', ''):>12}"
+        )
+    print(f"{'wall':<12}{wall:>10.2f}")
+    print(f"peak RSS {peak:,.0f} MB (before run {rss_before:,.0f} MB), {args.sales / wall:,.0f} sales/sec")
+
+    if args.json:
+        record = {
+            "timestamp": datetime.utcnow().isoformat(),
+            "params": {k: v for k, v in vars(args).items() if k not in ("json", "verbose")},
+            "database": engine.dialect.name,
+            "wall_seconds": round(wall, 4),
+            "stages": stages,
+            "peak_rss_mb": round(peak, 1),
+            "sales_per_second": round(args.sales / wall, 1),
+        }
+        with open(args.json, "a", encoding="utf-8") as fh:
+            fh.write(json.dumps(record) + "\n")
+
+
+if __name__ == "__main__":
+    main()
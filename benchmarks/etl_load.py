@@ -0,0 +1,102 @@
+"""Benchmark multi-VALUES upserts vs staged COPY + merge for the ETL load.
+
+Usage:
+    python -m benchmarks.etl_load
+    python -m benchmarks.etl_load --rows 100000 1000000 --database-url postgresql://...
+
+``multivalues`` reproduces the previous ``load_postgres`` (multi-row
+``INSERT ... VALUES ... ON CONFLICT`` statements); ``staged`` is the current
+implementation (``COPY`` into a temporary table on PostgreSQL, executemany
+elsewhere, then one ``INSERT ... SELECT ... ON CONFLICT`` per table). Each
+variant loads ``--rows`` event rows and as many daily rows into empty
+tables (insert path), then loads them again (update path). Defaults to an
+in-memory SQLite database, where there is no ``COPY``; pass a PostgreSQL URL
+for representative numbers. The target tables are dropped between runs.
+"""
+import argparse
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, Iterator, List
+from unittest.mock import patch
+
+from sqlalchemy import MetaData, create_engine
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import StaticPool
+
+import src.etl as etl
+
+
+def event_rows(n: int) -> Iterator[Dict[str, Any]]:
+    now = datetime.utcnow()
+    for i in range(n):
+        yield {"event_id": f"E{i}", "event_name": f"Event {i}", "total_tickets": i % 500,
+               "total_revenue": (i % 500) * 12.5, "last_updated": now}
+
+
+def daily_rows(n: int) -> Iterator[Dict[str, Any]]:
+    start = date(2026, 1, 1)
+    for i in range(n):
+        yield {"event_id": f"E{i // 30}", "sale_date": start + timedelta(days=i % 30),
+               "tickets_sold": i % 40, "revenue": (i % 40) * 12.5}
+
+
+def multivalues_load(engine: Engine, events: Iterator[Dict[str, Any]], daily: Iterator[Dict[str, Any]],
+                     chunk_size: int = 1000) -> None:
+    metadata = MetaData()
+    event_table, daily_table = etl._summary_tables(metadata)
+    insert = pg_insert if engine.dialect.name == "postgresql" else sqlite_insert
+    with engine.begin() as conn:
+        metadata.create_all(conn)
+        for chunk in etl._chunked(events, chunk_size):
+            stmt = insert(event_table).values(chunk)
+            conn.execute(stmt.on_conflict_do_update(index_elements=["event_id"], set_={
+                "event_name": stmt.excluded.event_name, "total_tickets": stmt.excluded.total_tickets,
+                "total_revenue": stmt.excluded.total_revenue, "last_updated": stmt.excluded.last_updated,
+            }))
+        for chunk in etl._chunked(daily, chunk_size):
+            stmt = insert(daily_table).values(chunk)
+            conn.execute(stmt.on_conflict_do_update(index_elements=["event_id", "sale_date"], set_={
+                "tickets_sold": stmt.excluded.tickets_sold, "revenue": stmt.excluded.revenue,
+            }))
+
+
+def staged_load(engine: Engine, events: Iterator[Dict[str, Any]], daily: Iterator[Dict[str, Any]]) -> None:
+    with patch.object(etl, "_pg_engine", return_value=engine):
+        etl.load_postgres(events, daily)
+
+
+def timed(fn: Callable[[], None]) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--database-url", default="sqlite://")
+    args = parser.parse_args()
+
+    if args.database_url == "sqlite://":
+        engine = create_engine(args.database_url, poolclass=StaticPool,
+                               connect_args={"check_same_thread": False})
+    else:
+        engine = create_engine(args.database_url)
+
+    variants: Dict[str, Callable[..., None]] = {"multivalues": multivalues_load, "staged": staged_load}
+    print(f"database: {engine.dialect.name}")
+    print(f"{'variant':<13}{'rows':>11}{'insert s':>10}{'update s':>10}{'rows/sec':>12}")
+    for n in args.rows:
+        for name, load in variants.items():
+            metadata = MetaData()
+            tables: List[Any] = list(etl._summary_tables(metadata))
+            metadata.drop_all(engine, tables=tables)
+            first = timed(lambda: load(engine, event_rows(n), daily_rows(n)))
+            second = timed(lambda: load(engine, event_rows(n), daily_rows(n)))
+            print(f"{name:<13}{n:>11,}{first:>10.2f}{second:>10.2f}{2 * n / first:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Peak RSS of the streaming ETL transform vs materialising every sale.
+
+Usage:
+    python -m benchmarks.etl_streaming
+    python -m benchmarks.etl_streaming --sales 1000000 5000000 --modes streaming
+
+A synthetic feed yields ``--page-size`` raw sale dicts per page across
+``--events`` events and ``--days`` sale dates. ``materialized`` reproduces the
+previous ``run_etl_once`` shape (every page collected into
+``TicketSaleRecord``s holding their raw dict, then ``transform_summary``);
+``streaming`` folds each page into a ``SummaryAccumulator`` and drops it.
+Every (mode, size) runs in a fresh interpreter so ``ru_maxrss`` is its own.
+"""
+import argparse
+import resource
+import subprocess
+import sys
+import time
+from datetime import date, timedelta
+from typing import Any, Dict, Iterator, List
+
+from src.etl import SummaryAccumulator, transform_summary
+from src.etl.extract import _to_ticket_sale_record
+
+
+def synthetic_pages(sales: int, page_size: int, events: int, days: int) -> Iterator[List[Dict[str, Any]]]:
+    start = date(2026, 1, 1)
+    for offset in range(0, sales, page_size):
+        yield [
+            {
+                "id": f"S{i}",
+                "event_id": f"E{i % events}",
+                "quantity": 1 + i % 4,
+                "price": 25.0,
+                "sale_date": (start + timedelta(days=i % days)).isoformat(),
+                "buyer": {"email": f"buyer{i}@example.test", "channel": "web"},
+            }
+            for i in range(offset, min(offset + page_size, sales))
+        ]
+
+
+def run_worker(mode: str, sales: int, page_size: int, events: int, days: int) -> None:
+    event_pages = [{"id": f"E{i}", "name": f"Event {i}"} for i in range(events)]
+    started = time.perf_counter()
+    if mode == "streaming":
+        acc = SummaryAccumulator()
+        acc.add_events(event_pages)
+        for page in synthetic_pages(sales, page_size, events, days):
+            acc.add_sales(page)
+        ev_rows, daily_rows = acc.rows()
+    else:
+        records = []
+        for page in synthetic_pages(sales, page_size, events, days):
+            records.extend(_to_ticket_sale_record(item) for item in page)
+        ev_rows, daily_rows = transform_summary(event_pages, [r.raw for r in records])
+    elapsed = time.perf_counter() - started
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{mode} {sales} {elapsed:.2f} {peak_mb:.0f} {len(ev_rows)} {len(daily_rows)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sales", type=int, nargs="+", default=[100_000, 1_000_000, 5_000_000])
+    parser.add_argument("--modes", nargs="+", default=["materialized", "streaming"],
+                        choices=["materialized", "streaming"])
+    parser.add_argument("--max-materialized", type=int, default=1_000_000,
+                        help="skip materialized runs above this size (they need several GB)")
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--events", type=int, default=200)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--worker", nargs=2, metavar=("MODE", "SALES"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker[0], int(args.worker[1]), args.page_size, args.events, args.days)
+        return
+
+    print(f"{args.events} events x {args.days} days, {args.page_size} sales/page")
+    print(f"{'mode':<14}{'sales':>12}{'seconds':>10}{'sales/sec':>12}{'peak RSS MB':>13}")
+    for sales in args.sales:
+        for mode in args.modes:
+            if mode == "materialized" and sales > args.max_materialized:
+                print(f"{mode:<14}{sales:>12,}{'skipped':>10}")
+                continue
+            out = subprocess.run(
+                [sys.executable, "-m", "benchmarks.etl_streaming", "--worker", mode, str(sales),
+                 "--page-size", str(args.page_size), "--events", str(args.events), "--days", str(args.days)],
+                check=True, capture_output=True, text=True,
+            ).stdout.strip().splitlines()[-1].split()
+            seconds, peak = float(out[2]), float(out[3])
+            print(f"{mode:<14}{sales:>12,}{seconds:>10.2f}{sales / seconds:>12,.0f}{peak:>13,.0f}")
+
+
+if __name__ == "__main__":
+    main()
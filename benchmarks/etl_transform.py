@@ -0,0 +1,67 @@
+"""Per-row transform_summary vs the NumPy column transform.
+
+Usage:
+    python -m benchmarks.etl_transform
+    python -m benchmarks.etl_transform --sales 100000 1000000 --events 500 --days 365
+
+Builds ``--sales`` raw sale dicts across ``--events`` events and ``--days``
+ISO sale dates, times ``transform_summary`` and
+``transform_summary_vectorized`` on the same list (best of ``--repeat``),
+checks both return the same rows, and reports sales/sec and the speedup.
+"""
+import argparse
+import random
+import time
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List
+
+from src.etl import transform_summary, transform_summary_vectorized
+
+
+def synthetic_sales(sales: int, events: int, days: int, seed: int = 0) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    dates = [(date(2026, 1, 1) + timedelta(days=d)).isoformat() for d in range(days)]
+    return [
+        {
+            "id": f"S{i}",
+            "event_id": f"E{rng.randrange(events)}",
+            "quantity": rng.randint(1, 4),
+            "price": round(rng.uniform(5, 250), 2),
+            "sale_date": rng.choice(dates),
+        }
+        for i in range(sales)
+    ]
+
+
+def best_of(repeat: int, fn: Callable[[], Any]) -> tuple:
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sales", type=int, nargs="+", default=[1_000_000])
+    parser.add_argument("--events", type=int, default=200)
+    parser.add_argument("--days", type=int, default=180)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    events = [{"id": f"E{i}", "name": f"Event {i}"} for i in range(args.events)]
+    print(f"{args.events} events x {args.days} days, best of {args.repeat}")
+    print(f"{'sales':>12}{'per-row s':>11}{'numpy s':>10}{'per-row/s':>13}{'numpy/s':>13}{'speedup':>9}")
+    for n in args.sales:
+        sales = synthetic_sales(n, args.events, args.days)
+        loop_s, expected = best_of(args.repeat, lambda: transform_summary(events, sales))
+        vec_s, got = best_of(args.repeat, lambda: transform_summary_vectorized(events, sales))
+        strip = lambda rows: [{k: v for k, v in r.items() if k != "last_updated"} for r in rows]  # noqa: E731
+        if strip(got[0]) != strip(expected[0]) or got[1] != expected[1]:
+            raise SystemExit("outputs differ")
+        print(f"{n:>12,}{loop_s:>11.2f}{vec_s:>10.2f}{n / loop_s:>13,.0f}{n / vec_s:>13,.0f}{loop_s / vec_s:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Benchmark the ETL warehouse batch load against the local sink.
+
+Usage:
+    python -m benchmarks.etl_warehouse --events 2000 --days 365
+    python -m benchmarks.etl_warehouse --sink-url sqlite:////tmp/warehouse.db
+
+Builds ``--events`` summary rows and ``--events * --days`` daily rows, then
+times ``load_bigquery`` through ``LocalSQLSink``: the NDJSON write and one
+truncating load per table. Reports rows/sec per stage. Defaults to an
+in-memory SQLite sink, with no PostgreSQL, so the given rows are loaded as is.
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from unittest.mock import patch
+
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+import src.etl as etl_mod
+from src.etl.warehouse import DAILY_SALES_SCHEMA, LocalSQLSink, write_ndjson
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--sink-url", default="sqlite://")
+    args = parser.parse_args()
+
+    if args.sink_url == "sqlite://":
+        engine = create_engine(args.sink_url, poolclass=StaticPool, connect_args={"check_same_thread": False})
+    else:
+        engine = create_engine(args.sink_url)
+    now = datetime.utcnow()
+    start = date(2025, 1, 1)
+    event_rows = [
+        {"event_id": f"E{i}", "event_name": f"Event {i}", "total_tickets": i, "total_revenue": i * 1.5,
+         "last_updated": now}
+        for i in range(args.events)
+    ]
+    daily_rows = [
+        {"event_id": f"E{i}", "sale_date": start + timedelta(days=d), "tickets_sold": d, "revenue": d * 2.5}
+        for i in range(args.events)
+        for d in range(args.days)
+    ]
+    total = len(event_rows) + len(daily_rows)
+    print(f"{len(event_rows):,} event rows, {len(daily_rows):,} daily rows")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        began = time.perf_counter()
+        write_ndjson(os.path.join(tmp, "daily.ndjson"), daily_rows, DAILY_SALES_SCHEMA)
+        write_s = time.perf_counter() - began
+    print(f"{'ndjson write (daily)':<24}{write_s:>8.2f}s{len(daily_rows) / write_s:>14,.0f} rows/s")
+
+    with patch.object(etl_mod, "_pg_engine", return_value=None):
+        began = time.perf_counter()
+        etl_mod.load_bigquery(event_rows, daily_rows, sink=LocalSQLSink(engine))
+        load_s = time.perf_counter() - began
+    print(f"{'load_bigquery (total)':<24}{load_s:>8.2f}s{total / load_s:>14,.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
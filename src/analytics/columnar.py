@@ -0,0 +1,273 @@
+"""In-process columnar snapshot of recent ticket scans.
+
+Heatmap, trending and windowed count queries otherwise aggregate raw
+``ticket_scans`` rows in SQL on every call. ``ScanSnapshot`` keeps the last
+``window_days`` of scans as parallel NumPy arrays (event code, epoch seconds,
+validity), sorted by timestamp, and answers those queries with
+``searchsorted`` + ``bincount``. It is refreshed incrementally by id.
+
+Ids are taken at insert but become visible at commit, so a lower id can
+appear after a higher one has been loaded. Each refresh therefore re-reads
+every id above the *settled* id (the newest row recorded more than
+``overlap_seconds`` before the refresh, by the database clock) and skips
+the ids it already holds.
+A transaction left open for longer than the overlap can still be missed.
+
+The snapshot is per process and opt-in (``ANALYTICS_COLUMNAR_ENABLED``).
+Rows updated or deleted in place after they were loaded are not reflected,
+and queries reaching back past the window fall back to SQL.
+"""
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import func, or_, select
+from sqlalchemy.engine import Engine
+
+import src.db as _db
+from src.analytics.models import ANALYTICS_SCHEMA, TicketScan
+from src.config import get_settings
+from src.logging_config import log_info
+
+logger = logging.getLogger("veritix.analytics.columnar")
+
+# Rows fetched per round trip during a refresh.
+_FETCH_SIZE = 50_000
+
+_SECONDS_PER_HOUR = 3600
+_SECONDS_PER_DAY = 86400
+
+
+def _settle_cutoff(dialect: str, seconds: float) -> Any:
+    """Database-clock time *seconds* ago, comparable with the database-set ``recorded_at``.
+
+    ``recorded_at`` holds the server's local time, so the cutoff must come
+    from the same clock rather than from Python's UTC now.
+    """
+    if dialect == "postgresql":
+        return func.clock_timestamp() - func.make_interval(0, 0, 0, 0, 0, 0, seconds)
+    return func.datetime("now", f"-{seconds} seconds")
+
+
+def _epoch_seconds(value: datetime) -> int:
+    """Naive UTC datetime -> integer epoch seconds."""
+    return int(np.datetime64(value, "s").astype(np.int64))
+
+
+@dataclass(frozen=True)
+class _Columns:
+    """Immutable column set; refreshes build a new one and swap the reference."""
+
+    event_codes: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int32))
+    timestamps: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int64))
+    valid: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=bool))
+    ids: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int64))
+    watermark: int = 0
+    # Every id at or below this was committed (or rolled back) when it was read.
+    settled: int = 0
+    # Epoch second of the window start at the last refresh; older rows are dropped.
+    window_start: Optional[int] = None
+
+
+class ScanSnapshot:
+    """Columnar copy of the last ``window_days`` of ``ticket_scans``."""
+
+    def __init__(self, window_days: int = 30, overlap_seconds: float = 300.0):
+        self.window_days = window_days
+        self.overlap_seconds = overlap_seconds
+        self._columns = _Columns()
+        self._event_ids: List[str] = []
+        self._event_codes: Dict[str, int] = {}
+        self._refresh_lock = threading.Lock()
+        self._refreshed_at: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self._columns.timestamps)
+
+    @property
+    def watermark(self) -> int:
+        return self._columns.watermark
+
+    # ------------------------------------------------------------------
+    # Refresh
+    # ------------------------------------------------------------------
+
+    def _code_for(self, event_id: str) -> int:
+        code = self._event_codes.get(event_id)
+        if code is None:
+            code = len(self._event_ids)
+            self._event_ids.append(event_id)
+            self._event_codes[event_id] = code
+        return code
+
+    def refresh(self, engine: Engine, now: Optional[datetime] = None) -> int:
+        """Append scans not yet held, re-reading ids above the settled id, and trim expired rows.
+
+        Returns the number of rows appended.
+        """
+        now = now or datetime.utcnow()
+        _db.ensure_schema(engine, ANALYTICS_SCHEMA)  # adds recorded_at to pre-existing tables
+        with self._refresh_lock:
+            cols = self._columns
+            scans = TicketScan.__table__
+            recorded = scans.c.recorded_at
+            is_settled = or_(recorded.is_(None), recorded < _settle_cutoff(engine.dialect.name, self.overlap_seconds))
+            query = (
+                select(scans.c.id, scans.c.event_id, scans.c.scan_timestamp, scans.c.is_valid, is_settled)
+                .where(scans.c.id > cols.settled)
+                .order_by(scans.c.id)
+            )
+            window_from = now - timedelta(days=self.window_days)
+            held = set(cols.ids[cols.ids > cols.settled].tolist())
+            settled = cols.settled
+            ids: List[int] = []
+            codes: List[int] = []
+            stamps: List[datetime] = []
+            flags: List[bool] = []
+            with engine.connect() as conn:
+                result = conn.execution_options(yield_per=_FETCH_SIZE).execute(query)
+                for row_id, event_id, scanned_at, is_valid, row_settled in result:
+                    if row_settled:
+                        settled = row_id
+                    if row_id <= cols.watermark and (row_id in held or scanned_at < window_from):
+                        continue  # re-read: already held, or committed late but outside the window
+                    ids.append(row_id)
+                    codes.append(self._code_for(event_id))
+                    stamps.append(scanned_at)
+                    flags.append(bool(is_valid))
+
+            cutoff = _epoch_seconds(window_from)
+            event_codes = cols.event_codes
+            timestamps = cols.timestamps
+            valid = cols.valid
+            row_ids = cols.ids
+            if ids:
+                new_ts = np.array(stamps, dtype="datetime64[s]").astype(np.int64)
+                event_codes = np.concatenate([event_codes, np.array(codes, dtype=np.int32)])
+                timestamps = np.concatenate([timestamps, new_ts])
+                valid = np.concatenate([valid, np.array(flags, dtype=bool)])
+                row_ids = np.concatenate([row_ids, np.array(ids, dtype=np.int64)])
+                # Ids are mostly time ordered; only re-sort when a batch is not.
+                if (len(cols.timestamps) and new_ts.min() < cols.timestamps[-1]) or np.any(np.diff(new_ts) < 0):
+                    order = np.argsort(timestamps, kind="stable")
+                    event_codes, timestamps, valid, row_ids = (
+                        event_codes[order], timestamps[order], valid[order], row_ids[order]
+                    )
+
+            start = int(np.searchsorted(timestamps, cutoff, side="left"))
+            if start:
+                event_codes, timestamps, valid, row_ids = (
+                    event_codes[start:], timestamps[start:], valid[start:], row_ids[start:]
+                )
+
+            self._columns = _Columns(
+                event_codes=event_codes,
+                timestamps=timestamps,
+                valid=valid,
+                ids=row_ids,
+                watermark=max([cols.watermark, *ids]),
+                settled=settled,
+                window_start=cutoff,
+            )
+            self._refreshed_at = time.monotonic()
+        if ids:
+            log_info("Scan snapshot refreshed", {"appended": len(ids), "rows": len(timestamps), "watermark": self.watermark})
+        return len(ids)
+
+    def refresh_if_stale(self, engine: Engine, max_age_seconds: float) -> None:
+        """Refresh when the last refresh is older than *max_age_seconds*."""
+        if self._refreshed_at is None or time.monotonic() - self._refreshed_at >= max_age_seconds:
+            self.refresh(engine)
+
+    def covers(self, since: datetime) -> bool:
+        """True when every scan at or after *since* is held in the snapshot."""
+        window_start = self._columns.window_start
+        return window_start is not None and _epoch_seconds(since) >= window_start
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def _window(self, cols: _Columns, since: Optional[datetime], until: Optional[datetime]) -> slice:
+        lo = 0 if since is None else int(np.searchsorted(cols.timestamps, _epoch_seconds(since), side="left"))
+        hi = len(cols.timestamps) if until is None else int(np.searchsorted(cols.timestamps, _epoch_seconds(until), side="left"))
+        return slice(lo, hi)
+
+    def _event_mask(self, cols: _Columns, window: slice, event_id: Optional[str]) -> Optional[np.ndarray]:
+        if event_id is None:
+            return None
+        code = self._event_codes.get(event_id, -1)
+        return cols.event_codes[window] == code
+
+    def hourly_counts(self, event_id: str, day: date) -> List[int]:
+        """Scans per hour (24 buckets) for an event on one calendar day."""
+        cols = self._columns
+        since = datetime(day.year, day.month, day.day)
+        window = self._window(cols, since, since + timedelta(days=1))
+        mask = self._event_mask(cols, window, event_id)
+        hours = (cols.timestamps[window][mask] % _SECONDS_PER_DAY) // _SECONDS_PER_HOUR
+        return np.bincount(hours, minlength=24).tolist()
+
+    def top_events(self, since: datetime, limit: int) -> List[Dict[str, Any]]:
+        """Events with the most scans since *since*, highest first."""
+        cols = self._columns
+        window = self._window(cols, since, None)
+        counts = np.bincount(cols.event_codes[window], minlength=len(self._event_ids))
+        nonzero = np.flatnonzero(counts)
+        # Sort by count descending, then event id for stable ties.
+        order = sorted(nonzero.tolist(), key=lambda code: (-counts[code], self._event_ids[code]))
+        return [
+            {"event_id": self._event_ids[code], "scan_count": int(counts[code])}
+            for code in order[:limit]
+        ]
+
+    def counts(self, since: datetime, until: Optional[datetime] = None, event_id: Optional[str] = None) -> Dict[str, Any]:
+        """Total/valid/invalid scans and per-day totals over a time window."""
+        cols = self._columns
+        window = self._window(cols, since, until)
+        mask = self._event_mask(cols, window, event_id)
+        timestamps = cols.timestamps[window]
+        valid = cols.valid[window]
+        if mask is not None:
+            timestamps, valid = timestamps[mask], valid[mask]
+        total = int(len(timestamps))
+        valid_count = int(np.count_nonzero(valid))
+
+        first_day = _epoch_seconds(datetime(since.year, since.month, since.day)) // _SECONDS_PER_DAY
+        end = until or datetime.utcnow()
+        days = int(_epoch_seconds(end) // _SECONDS_PER_DAY - first_day + 1)
+        day_index = timestamps // _SECONDS_PER_DAY - first_day
+        per_day = np.bincount(day_index, minlength=days)[:days]
+        valid_per_day = np.bincount(day_index[valid], minlength=days)[:days]
+        return {
+            "total": total,
+            "valid": valid_count,
+            "invalid": total - valid_count,
+            "valid_ratio": round(valid_count / total, 4) if total else None,
+            "daily": [
+                {
+                    "date": (since.date() + timedelta(days=i)).isoformat(),
+                    "scans": int(per_day[i]),
+                    "valid_scans": int(valid_per_day[i]),
+                }
+                for i in range(days)
+            ],
+        }
+
+
+def _build_snapshot() -> Optional[ScanSnapshot]:
+    settings = get_settings()
+    if not settings.ANALYTICS_COLUMNAR_ENABLED:
+        return None
+    return ScanSnapshot(
+        window_days=settings.ANALYTICS_COLUMNAR_WINDOW_DAYS,
+        overlap_seconds=settings.ANALYTICS_COLUMNAR_OVERLAP_SECONDS,
+    )
+
+
+# Shared snapshot, or None when the columnar path is disabled.
+scan_snapshot = _build_snapshot()
@@ -0,0 +1,304 @@
+"""Bulk NDJSON ingestion of scan, transfer and invalid-attempt events.
+
+Upstream systems post a (optionally gzip-compressed) NDJSON stream where each
+line is one record tagged with ``"type": "scan" | "transfer" | "invalid"``.
+The whole body is decompressed before the first batch is written, so a
+corrupt stream is rejected without committing any of it.
+Records are validated with plain dict checks, written with Core
+``executemany`` inserts in batches (one transaction per batch) and the
+per-event ``analytics_stats`` counters, distinct-count sketches and
+per-scanner minute rollups are updated once per batch.
+"""
+import gzip
+import io
+import json
+import logging
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import bindparam, func, select
+from sqlalchemy.engine import Connection, Engine
+
+import src.db as _db
+from src.analytics.models import (
+    ANALYTICS_SCHEMA,
+    AnalyticsStats,
+    InvalidAttempt,
+    TicketScan,
+    TicketTransfer,
+    get_engine,
+)
+from src.analytics.scanner_rollups import apply_scanner_rollups
+from src.analytics.service import analytics_service
+from src.analytics.sketches import apply_sketch_updates
+from src.logging_config import TICKET_SCANS_TOTAL, log_error, log_info, sanitize_ip_address
+
+logger = logging.getLogger("veritix.analytics.ingest")
+
+# Upper bound on per-row errors echoed back to the caller.
+MAX_REPORTED_ERRORS = 1000
+
+_GZIP_MAGIC = b"\x1f\x8b"
+
+# type -> (table, timestamp column, required str fields, optional str fields, bool fields)
+_RECORD_SPECS: Dict[str, Tuple[Any, str, Tuple[str, ...], Tuple[str, ...], Tuple[str, ...]]] = {
+    "scan": (
+        TicketScan.__table__,
+        "scan_timestamp",
+        ("ticket_id", "event_id"),
+        ("scanner_id", "location", "device_info"),
+        ("is_valid",),
+    ),
+    "transfer": (
+        TicketTransfer.__table__,
+        "transfer_timestamp",
+        ("ticket_id", "event_id", "from_user_id", "to_user_id"),
+        ("transfer_reason", "ip_address", "user_agent"),
+        ("is_successful",),
+    ),
+    "invalid": (
+        InvalidAttempt.__table__,
+        "attempt_timestamp",
+        ("attempt_type", "reason"),
+        ("ticket_id", "event_id", "ip_address", "user_agent"),
+        (),
+    ),
+}
+
+_STAT_COLUMNS = (
+    "scan_count",
+    "valid_scan_count",
+    "invalid_scan_count",
+    "transfer_count",
+    "successful_transfer_count",
+    "failed_transfer_count",
+    "invalid_attempt_count",
+)
+
+
+class IngestPayloadError(ValueError):
+    """Raised when the request body cannot be decoded as (gzip) NDJSON."""
+
+
+class IngestPayloadTooLarge(IngestPayloadError):
+    """Raised when the (decompressed) request body exceeds the size limit."""
+
+
+def iter_ndjson_lines(body: bytes, gzipped: Optional[bool] = None, max_bytes: Optional[int] = None) -> Iterator[bytes]:
+    """Return an iterator over the raw lines of an NDJSON body, gunzipping it first.
+
+    When *gzipped* is None the gzip magic number decides. The body is fully
+    decompressed here, so a corrupt gzip stream raises IngestPayloadError
+    before any line is consumed; IngestPayloadTooLarge is raised when the
+    decompressed body exceeds *max_bytes*.
+    """
+    if gzipped is None:
+        gzipped = body[:2] == _GZIP_MAGIC
+    if gzipped:
+        try:
+            with gzip.GzipFile(fileobj=io.BytesIO(body)) as stream:
+                body = stream.read(-1 if max_bytes is None else max_bytes + 1)
+        except (OSError, EOFError) as exc:
+            raise IngestPayloadError(f"Invalid gzip payload: {exc}") from exc
+    if max_bytes is not None and len(body) > max_bytes:
+        raise IngestPayloadTooLarge(f"Payload exceeds {max_bytes} bytes")
+    return iter(io.BytesIO(body))
+
+
+def _parse_timestamp(value: Any, now: datetime) -> datetime:
+    if value is None:
+        return now
+    if not isinstance(value, str):
+        raise ValueError("timestamp must be an ISO-8601 string")
+    ts = datetime.fromisoformat(value)
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return ts
+
+
+def parse_record(raw: Any, now: datetime) -> Tuple[str, Dict[str, Any]]:
+    """Validate one decoded NDJSON object and return ``(type, insert_row)``.
+
+    Raises ValueError with a short reason when the record is rejected.
+    """
+    if not isinstance(raw, dict):
+        raise ValueError("record must be a JSON object")
+    kind = raw.get("type")
+    spec = _RECORD_SPECS.get(kind)  # type: ignore[arg-type]
+    if spec is None:
+        raise ValueError(f"unknown record type: {kind!r}")
+    _, ts_field, required, optional, flags = spec
+
+    row: Dict[str, Any] = {}
+    for field in required:
+        value = raw.get(field)
+        if not isinstance(value, str) or not value:
+            raise ValueError(f"{field} is required")
+        row[field] = value
+    for field in optional:
+        value = raw.get(field)
+        if value is not None and not isinstance(value, str):
+            raise ValueError(f"{field} must be a string")
+        row[field] = value
+    for field in flags:
+        value = raw.get(field, True)
+        if not isinstance(value, bool):
+            raise ValueError(f"{field} must be a boolean")
+        row[field] = value
+
+    metadata = raw.get("additional_metadata")
+    if metadata is not None and not isinstance(metadata, dict):
+        raise ValueError("additional_metadata must be an object")
+    row["additional_metadata"] = metadata or None
+    row[ts_field] = _parse_timestamp(raw.get(ts_field, raw.get("timestamp")), now)
+    if "ip_address" in row:
+        row["ip_address"] = sanitize_ip_address(row["ip_address"])
+    return kind, row  # type: ignore[return-value]
+
+
+def _stats_deltas(batch: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Counter]:
+    """Aggregate per-event counter increments for one batch."""
+    deltas: Dict[str, Counter] = defaultdict(Counter)
+    for row in batch["scan"]:
+        d = deltas[row["event_id"]]
+        d["scan_count"] += 1
+        d["valid_scan_count" if row["is_valid"] else "invalid_scan_count"] += 1
+    for row in batch["transfer"]:
+        d = deltas[row["event_id"]]
+        d["transfer_count"] += 1
+        d["successful_transfer_count" if row["is_successful"] else "failed_transfer_count"] += 1
+    for row in batch["invalid"]:
+        if row["event_id"]:
+            deltas[row["event_id"]]["invalid_attempt_count"] += 1
+    return deltas
+
+
+def apply_stats_deltas(conn: Connection, deltas: Dict[str, Counter], now: datetime) -> None:
+    """Add counter deltas to today's analytics_stats rows with set-wise statements.
+
+    One SELECT finds today's row per event, one executemany UPDATE increments
+    the existing rows and one executemany INSERT creates the missing ones.
+    """
+    if not deltas:
+        return
+    stats = AnalyticsStats.__table__
+    day_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    existing = dict(
+        conn.execute(
+            select(stats.c.event_id, func.max(stats.c.id))
+            .where(stats.c.event_id.in_(list(deltas)), stats.c.stat_date >= day_start)
+            .group_by(stats.c.event_id)
+        ).all()
+    )
+
+    updates = []
+    inserts = []
+    for event_id, delta in deltas.items():
+        values = {col: delta.get(col, 0) for col in _STAT_COLUMNS}
+        if event_id in existing:
+            updates.append({"b_id": existing[event_id], **{f"d_{col}": v for col, v in values.items()}})
+        else:
+            inserts.append({"event_id": event_id, "stat_date": now, **values})
+
+    if updates:
+        conn.execute(
+            stats.update()
+            .where(stats.c.id == bindparam("b_id"))
+            .values({col: func.coalesce(stats.c[col], 0) + bindparam(f"d_{col}") for col in _STAT_COLUMNS}),
+            updates,
+        )
+    if inserts:
+        conn.execute(stats.insert(), inserts)
+
+
+def _write_batch(engine: Engine, batch: Dict[str, List[Dict[str, Any]]], now: datetime) -> None:
+    # Sketch and rollup tables are written in the batch's transaction.
+    _db.ensure_schema(engine, ANALYTICS_SCHEMA)
+    with engine.begin() as conn:
+        for kind, rows in batch.items():
+            if rows:
+                conn.execute(_RECORD_SPECS[kind][0].insert(), rows)
+        apply_stats_deltas(conn, _stats_deltas(batch), now)
+        apply_sketch_updates(conn, batch["scan"], batch["transfer"], now)
+        apply_scanner_rollups(conn, batch["scan"])
+
+
+def ingest_ndjson(lines: Iterable[bytes], batch_size: int = 5000) -> Dict[str, Any]:
+    """Validate and bulk-insert NDJSON records, one transaction per batch.
+
+    Returns accepted/rejected counts, per-type accepted counts and up to
+    ``MAX_REPORTED_ERRORS`` rejected rows as ``{"line": n, "error": reason}``
+    using 1-based line offsets into the stream.
+
+    Raises RuntimeError if the database is not configured.
+    """
+    engine = get_engine()
+    if engine is None:
+        raise RuntimeError("Database engine is not initialised")
+    accepted: Counter = Counter()
+    rejected = 0
+    errors: List[Dict[str, Any]] = []
+    batches = 0
+
+    def _reject(line_no: int, reason: str) -> None:
+        nonlocal rejected
+        rejected += 1
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append({"line": line_no, "error": reason})
+
+    batch: Dict[str, List[Dict[str, Any]]] = {kind: [] for kind in _RECORD_SPECS}
+    batch_lines: List[int] = []
+    now = datetime.utcnow()
+
+    def _flush() -> None:
+        nonlocal batches, batch, batch_lines
+        if not batch_lines:
+            return
+        batches += 1
+        try:
+            _write_batch(engine, batch, now)
+        except Exception as exc:
+            log_error("Analytics ingest batch failed", {"batch": batches, "rows": len(batch_lines), "error": str(exc)})
+            for line_no in batch_lines:
+                _reject(line_no, f"batch write failed: {exc}")
+        else:
+            analytics_service.invalidate(
+                row["event_id"] for rows in batch.values() for row in rows
+            )
+            for kind, rows in batch.items():
+                accepted[kind] += len(rows)
+            valid_scans = sum(1 for row in batch["scan"] if row["is_valid"])
+            if valid_scans:
+                TICKET_SCANS_TOTAL.labels(result="valid").inc(valid_scans)
+            if len(batch["scan"]) - valid_scans:
+                TICKET_SCANS_TOTAL.labels(result="invalid").inc(len(batch["scan"]) - valid_scans)
+        batch = {kind: [] for kind in _RECORD_SPECS}
+        batch_lines = []
+
+    line_no = 0
+    for line in lines:
+        line_no += 1
+        if not line.strip():
+            continue
+        try:
+            kind, row = parse_record(json.loads(line), now)
+        except ValueError as exc:  # json.JSONDecodeError is a ValueError
+            _reject(line_no, str(exc))
+            continue
+        batch[kind].append(row)
+        batch_lines.append(line_no)
+        if len(batch_lines) >= batch_size:
+            _flush()
+    _flush()
+
+    result = {
+        "accepted": sum(accepted.values()),
+        "rejected": rejected,
+        "accepted_by_type": {kind: accepted[kind] for kind in _RECORD_SPECS},
+        "batches": batches,
+        "errors": errors,
+        "errors_truncated": rejected > len(errors),
+    }
+    log_info("Analytics ingest completed", {k: v for k, v in result.items() if k != "errors"})
+    return result
@@ -1,6 +1,9 @@
 """Analytics models for tracking ticket scans, transfers, and invalid attempts."""
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, Index
+from sqlalchemy import JSON, Column, Integer, String, DateTime, Boolean, Text, Index, LargeBinary, UniqueConstraint, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.sql.expression import FunctionElement
 from sqlalchemy.orm import sessionmaker
 from datetime import datetime
 
@@ -9,6 +12,33 @@ import src.db as _db
 
 Base = declarative_base()
 
+# JSONB on PostgreSQL (GIN-indexable, supports @> containment); plain JSON on SQLite.
+MetadataJSON = JSONB().with_variant(JSON(), "sqlite")
+
+# Tables carrying an additional_metadata column, in creation order.
+_METADATA_TABLES = ("ticket_scans", "ticket_transfers", "invalid_attempts")
+
+
+class insert_clock(FunctionElement):
+    """Database wall-clock time when a row is inserted.
+
+    ``clock_timestamp()`` on PostgreSQL, where ``now()`` would be the start
+    of the inserting transaction instead.
+    """
+    type = DateTime()
+    name = "insert_clock"
+    inherit_cache = True
+
+
+@compiles(insert_clock)
+def _compile_insert_clock(element, compiler, **kw):
+    return "CURRENT_TIMESTAMP"
+
+
+@compiles(insert_clock, "postgresql")
+def _compile_insert_clock_postgresql(element, compiler, **kw):
+    return "clock_timestamp()"
+
 
 class TicketScan(Base):
     """Model for tracking ticket scans."""
@@ -22,12 +52,16 @@ class TicketScan(Base):
     is_valid = Column(Boolean, nullable=False, default=True)
     location = Column(String(200), nullable=True)
     device_info = Column(Text, nullable=True)
-    additional_metadata = Column(Text, nullable=True)  # JSON string for flexible metadata
+    additional_metadata = Column(MetadataJSON, nullable=True)  # Flexible metadata (gate, device id, ...)
+    # Set by the database, never by the caller; NULL on rows older than the column.
+    recorded_at = Column(DateTime, nullable=True, server_default=insert_clock())
     
     # Indexes for common queries
     __table_args__ = (
         Index('idx_ticket_scans_event_timestamp', 'event_id', 'scan_timestamp'),
         Index('idx_ticket_scans_valid', 'is_valid'),
+        Index('idx_ticket_scans_metadata', 'additional_metadata',
+              postgresql_using='gin', postgresql_ops={'additional_metadata': 'jsonb_path_ops'}),
     )
 
 
@@ -45,12 +79,16 @@ class TicketTransfer(Base):
     ip_address = Column(String(45), nullable=True)  # Support IPv6
     user_agent = Column(Text, nullable=True)
     is_successful = Column(Boolean, nullable=False, default=True)
-    additional_metadata = Column(Text, nullable=True)  # JSON string for flexible metadata
+    additional_metadata = Column(MetadataJSON, nullable=True)  # Flexible metadata (gate, device id, ...)
+    # Set by the database, never by the caller; NULL on rows older than the column.
+    recorded_at = Column(DateTime, nullable=True, server_default=insert_clock())
     
     # Indexes for common queries
     __table_args__ = (
         Index('idx_ticket_transfers_event_timestamp', 'event_id', 'transfer_timestamp'),
         Index('idx_ticket_transfers_successful', 'is_successful'),
+        Index('idx_ticket_transfers_metadata', 'additional_metadata',
+              postgresql_using='gin', postgresql_ops={'additional_metadata': 'jsonb_path_ops'}),
     )
 
 
@@ -66,12 +104,16 @@ class InvalidAttempt(Base):
     reason = Column(String(200), nullable=False)  # 'invalid_qr', 'expired_ticket', 'unauthorized_transfer', etc.
     ip_address = Column(String(45), nullable=True)  # Support IPv6
     user_agent = Column(Text, nullable=True)
-    additional_metadata = Column(Text, nullable=True)  # JSON string for flexible metadata
+    additional_metadata = Column(MetadataJSON, nullable=True)  # Flexible metadata (gate, device id, ...)
+    # Set by the database, never by the caller; NULL on rows older than the column.
+    recorded_at = Column(DateTime, nullable=True, server_default=insert_clock())
     
     # Indexes for common queries
     __table_args__ = (
         Index('idx_invalid_attempts_type_timestamp', 'attempt_type', 'attempt_timestamp'),
         Index('idx_invalid_attempts_event', 'event_id'),
+        Index('idx_invalid_attempts_metadata', 'additional_metadata',
+              postgresql_using='gin', postgresql_ops={'additional_metadata': 'jsonb_path_ops'}),
     )
 
 
@@ -96,6 +138,40 @@ class AnalyticsStats(Base):
     )
 
 
+class AnalyticsSketch(Base):
+    """Model for storing HyperLogLog distinct-count sketches per event and hour."""
+    __tablename__ = 'analytics_sketches'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    event_id = Column(String(100), nullable=False)
+    metric = Column(String(50), nullable=False)  # 'scanned_tickets', 'transferred_tickets', 'transfer_users'
+    granularity = Column(String(10), nullable=False)  # 'hour' or 'all'
+    bucket_start = Column(DateTime, nullable=False)  # hour start; epoch for 'all'
+    registers = Column(LargeBinary, nullable=False)  # zlib-compressed HLL registers
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint('event_id', 'metric', 'granularity', 'bucket_start', name='uq_analytics_sketches_key'),
+    )
+
+
+class ScannerMinuteStats(Base):
+    """Model for per-scanner, per-minute scan rollups maintained at write time."""
+    __tablename__ = 'scanner_minute_stats'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    event_id = Column(String(100), nullable=False)
+    scanner_id = Column(String(100), nullable=False)
+    minute_start = Column(DateTime, nullable=False)
+    scan_count = Column(Integer, nullable=False, default=0)
+    invalid_count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint('event_id', 'scanner_id', 'minute_start', name='uq_scanner_minute_stats_key'),
+        Index('idx_scanner_minute_stats_event_minute', 'event_id', 'minute_start'),
+    )
+
+
 def get_engine():
     """Return the shared database engine from src.db."""
     return _db.get_engine()
@@ -106,8 +182,63 @@ def get_session():
     return _db.get_session()
 
 
+def migrate_metadata_to_jsonb(engine):
+    """Convert legacy Text additional_metadata columns to JSONB and add GIN indexes.
+
+    Idempotent and PostgreSQL-only: tables created by ``create_all`` already
+    have the JSONB column and index, so this only rewrites pre-existing tables.
+    """
+    if engine.dialect.name != "postgresql":
+        return
+    with engine.begin() as conn:
+        for table in _METADATA_TABLES:
+            data_type = conn.execute(
+                text(
+                    "SELECT data_type FROM information_schema.columns "
+                    "WHERE table_name = :table AND column_name = 'additional_metadata'"
+                ),
+                {"table": table},
+            ).scalar()
+            if data_type is not None and data_type != "jsonb":
+                conn.execute(text(
+                    f"ALTER TABLE {table} ALTER COLUMN additional_metadata "  # noqa: S608
+                    "TYPE JSONB USING NULLIF(additional_metadata, '')::jsonb"
+                ))
+            conn.execute(text(
+                f"CREATE INDEX IF NOT EXISTS idx_{table}_metadata "
+                f"ON {table} USING GIN (additional_metadata jsonb_path_ops)"
+            ))
+
+
+def add_recorded_at_columns(engine):
+    """Add the ``recorded_at`` insert-time column to pre-existing analytics tables.
+
+    Idempotent and PostgreSQL-only. Existing rows keep NULL (they are long
+    committed), so adding the column does not rewrite the table.
+    """
+    if engine.dialect.name != "postgresql":
+        return
+    with engine.begin() as conn:
+        for table in _METADATA_TABLES:
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS recorded_at TIMESTAMP"))
+            conn.execute(text(f"ALTER TABLE {table} ALTER COLUMN recorded_at SET DEFAULT clock_timestamp()"))
+
+
+# Schema registry name for every table on Base (see src.db.bootstrap_schema).
+ANALYTICS_SCHEMA = "analytics"
+
+
+def _create_analytics_schema(engine):
+    Base.metadata.create_all(bind=engine)
+    migrate_metadata_to_jsonb(engine)
+    add_recorded_at_columns(engine)
+
+
+_db.register_schema(ANALYTICS_SCHEMA, _create_analytics_schema)
+
+
 def init_db():
     """Initialize the database tables."""
     engine = get_engine()
     if engine is not None:
-        Base.metadata.create_all(bind=engine)
+        _db.ensure_schema(engine, ANALYTICS_SCHEMA)
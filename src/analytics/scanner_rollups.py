@@ -0,0 +1,135 @@
+"""Per-scanner, per-minute scan rollups.
+
+Every scan carrying a ``scanner_id`` adds to one ``scanner_minute_stats`` row
+(event, scanner, minute) in the same transaction as the scan insert, using an
+additive ``ON CONFLICT DO UPDATE``. Throughput and invalid-ratio queries then
+read at most one row per scanner-minute instead of grouping raw scans.
+"""
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Connection
+
+from src.analytics.models import ScannerMinuteStats
+
+
+def _minute(ts: datetime) -> datetime:
+    return ts.replace(second=0, microsecond=0)
+
+
+def apply_scanner_rollups(conn: Connection, scans: Iterable[Dict[str, Any]]) -> None:
+    """Add scans to their (event, scanner, minute) rollup rows."""
+    totals: Counter = Counter()
+    invalid: Counter = Counter()
+    for row in scans:
+        if not row.get("scanner_id"):
+            continue
+        key = (row["event_id"], row["scanner_id"], _minute(row["scan_timestamp"]))
+        totals[key] += 1
+        if not row["is_valid"]:
+            invalid[key] += 1
+    if not totals:
+        return
+
+    table = ScannerMinuteStats.__table__
+    insert = (pg_insert if conn.dialect.name == "postgresql" else sqlite_insert)(table)
+    stmt = insert.on_conflict_do_update(
+        index_elements=["event_id", "scanner_id", "minute_start"],
+        set_={
+            "scan_count": table.c.scan_count + insert.excluded.scan_count,
+            "invalid_count": table.c.invalid_count + insert.excluded.invalid_count,
+        },
+    )
+    # Sorted so concurrent batches lock rows in the same order.
+    conn.execute(stmt, [
+        {"event_id": e, "scanner_id": s, "minute_start": m, "scan_count": count, "invalid_count": invalid[(e, s, m)]}
+        for (e, s, m), count in sorted(totals.items())
+    ])
+
+
+def top_scanners(
+    conn: Connection,
+    event_id: str,
+    from_ts: datetime,
+    to_ts: datetime,
+    rank_by: str = "hot",
+    limit: int = 10,
+) -> List[Dict[str, Any]]:
+    """Rank an event's scanners over ``[from_ts, to_ts)``.
+
+    *rank_by* is ``hot`` (most scans), ``slow`` (lowest scans per minute) or
+    ``invalid`` (highest invalid ratio). ``scans_per_minute`` is the rate
+    over minutes in which the scanner was active, so an idle gate is not
+    mistaken for a slow one.
+    """
+    table = ScannerMinuteStats.__table__
+    scans = func.sum(table.c.scan_count)
+    invalid = func.sum(table.c.invalid_count)
+    active = func.count()
+    rate = scans * 1.0 / active
+    ratio = invalid * 1.0 / scans
+    order = {
+        "hot": (scans.desc(),),
+        "slow": (rate.asc(),),
+        "invalid": (ratio.desc(), scans.desc()),
+    }[rank_by]
+    rows = conn.execute(
+        select(table.c.scanner_id, scans, invalid, active, func.max(table.c.scan_count))
+        .where(
+            table.c.event_id == event_id,
+            table.c.minute_start >= _minute(from_ts),
+            table.c.minute_start < to_ts,
+        )
+        .group_by(table.c.scanner_id)
+        .order_by(*order, table.c.scanner_id)
+        .limit(limit)
+    ).all()
+    return [
+        {
+            "scanner_id": scanner_id,
+            "scans": int(total),
+            "invalid": int(bad),
+            "invalid_ratio": round(bad / total, 4) if total else 0.0,
+            "active_minutes": int(minutes),
+            "scans_per_minute": round(total / minutes, 2),
+            "peak_scans_per_minute": int(peak),
+        }
+        for scanner_id, total, bad, minutes, peak in rows
+    ]
+
+
+def scanner_series(
+    conn: Connection,
+    event_id: str,
+    scanner_id: str,
+    from_ts: datetime,
+    to_ts: datetime,
+) -> List[Dict[str, Any]]:
+    """Per-minute scans and invalid ratio for one scanner, zero-filled."""
+    table = ScannerMinuteStats.__table__
+    rows = conn.execute(
+        select(table.c.minute_start, table.c.scan_count, table.c.invalid_count).where(
+            table.c.event_id == event_id,
+            table.c.scanner_id == scanner_id,
+            table.c.minute_start >= _minute(from_ts),
+            table.c.minute_start < to_ts,
+        )
+    ).all()
+    by_minute: Dict[datetime, Tuple[int, int]] = {minute: (count, bad) for minute, count, bad in rows}
+
+    series = []
+    minute = _minute(from_ts)
+    while minute < to_ts:
+        count, bad = by_minute.get(minute, (0, 0))
+        series.append({
+            "minute": minute.isoformat(),
+            "scans": count,
+            "invalid": bad,
+            "invalid_ratio": round(bad / count, 4) if count else 0.0,
+        })
+        minute += timedelta(minutes=1)
+    return series
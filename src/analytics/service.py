@@ -1,22 +1,227 @@
 """Analytics service for tracking ticket scans, transfers, and invalid attempts."""
+import copy
+import functools
+import inspect
 import json
 import logging
+import threading
 import time
+from collections import defaultdict
 from datetime import date, datetime, timedelta
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple, TypeVar
 
-from sqlalchemy import asc, desc, extract, func, text
+from cachetools import TTLCache  # type: ignore[import-untyped]
+from sqlalchemy import and_, asc, bindparam, desc, extract, func, select, text
 from sqlalchemy.orm import Session
 
+from src.analytics.columnar import ScanSnapshot, scan_snapshot
 from src.analytics.models import (
+    ANALYTICS_SCHEMA,
     AnalyticsStats,
     InvalidAttempt,
     TicketScan,
     TicketTransfer,
     get_session,
 )
+from src.analytics.scanner_rollups import apply_scanner_rollups, scanner_series, top_scanners
+from src.analytics.sketches import STANDARD_ERROR, SketchBuffer, apply_sketch_updates, distinct_estimates
 import src.db as _db
-from src.logging_config import log_error, log_info, sanitize_ip_address
+from src.config import get_settings
+from src.logging_config import ANALYTICS_CACHE_REQUESTS, log_error, log_info, sanitize_ip_address
+
+_F = TypeVar("_F", bound=Callable[..., Any])
+
+# Maximum number of cached read results per service instance.
+_RESULT_CACHE_MAXSIZE = 2048
+# Upper bound on entry age; covers relative time windows and writes made by
+# other processes, which do not bump this process's versions.
+_RESULT_CACHE_TTL = 300
+
+
+def _metadata_filter(session: Session, column: Any, metadata: Dict[str, Any]) -> Any:
+    """Build a containment filter on a JSON ``additional_metadata`` column.
+
+    PostgreSQL uses ``@>`` so the GIN index is used; other backends (SQLite)
+    fall back to top-level key equality via JSON extraction.
+    """
+    if session.get_bind().dialect.name == "postgresql":
+        return column.contains(metadata)
+    clauses = []
+    for key, value in metadata.items():
+        element = column[key]
+        if isinstance(value, bool):
+            clauses.append(element.as_boolean() == value)
+        elif isinstance(value, int):
+            clauses.append(element.as_integer() == value)
+        elif isinstance(value, float):
+            clauses.append(element.as_float() == value)
+        else:
+            clauses.append(element.as_string() == str(value))
+    return and_(*clauses)
+
+
+# Columns projected by the list endpoints, in response order.
+_SCAN_COLUMNS = tuple(TicketScan.__table__.c[name] for name in (
+    "id", "ticket_id", "scanner_id", "scan_timestamp", "is_valid", "location", "additional_metadata",
+))
+_SCAN_BY_TICKET_COLUMNS = tuple(TicketScan.__table__.c[name] for name in (
+    "id", "ticket_id", "event_id", "scan_timestamp", "is_valid", "location",
+))
+_TRANSFER_COLUMNS = tuple(TicketTransfer.__table__.c[name] for name in (
+    "id", "ticket_id", "from_user_id", "to_user_id", "transfer_timestamp", "is_successful",
+    "transfer_reason", "additional_metadata",
+))
+_INVALID_ATTEMPT_COLUMNS = tuple(InvalidAttempt.__table__.c[name] for name in (
+    "id", "attempt_type", "ticket_id", "attempt_timestamp", "reason", "ip_address", "additional_metadata",
+))
+
+
+def _rows_as_dicts(result: Any, columns: Tuple[Any, ...], timestamp_key: str) -> List[Dict[str, Any]]:
+    """Map Core result tuples to response dicts, ISO-formatting the timestamp."""
+    keys = [column.key for column in columns]
+    rows = []
+    for values in result:
+        row = dict(zip(keys, values))
+        row[timestamp_key] = row[timestamp_key].isoformat()
+        rows.append(row)
+    return rows
+
+
+def _select_page(
+    session: Session,
+    columns: Tuple[Any, ...],
+    timestamp: Any,
+    event_id: str,
+    from_ts: Optional[datetime],
+    to_ts: Optional[datetime],
+    page: int,
+    limit: int,
+    metadata: Optional[Dict[str, Any]],
+) -> Tuple[List[Dict[str, Any]], int]:
+    """Run the filtered count and page queries for one analytics table.
+
+    Uses Core ``select()`` of explicit columns so rows come back as plain
+    tuples instead of ORM instances.
+    """
+    table = timestamp.table
+    conditions = [table.c.event_id == event_id]
+    if from_ts:
+        conditions.append(timestamp >= from_ts)
+    if to_ts:
+        conditions.append(timestamp <= to_ts)
+    if metadata:
+        conditions.append(_metadata_filter(session, table.c.additional_metadata, metadata))
+
+    total = session.execute(select(func.count()).select_from(table).where(*conditions)).scalar_one()
+    result = session.execute(
+        select(*columns)
+        .where(*conditions)
+        .order_by(desc(timestamp))
+        .offset((page - 1) * limit)
+        .limit(limit)
+    )
+    return _rows_as_dicts(result, columns, timestamp.key), total
+
+
+def _freeze(value: Any) -> Hashable:
+    """Turn a call argument into a hashable cache-key component."""
+    if isinstance(value, dict):
+        return json.dumps(value, sort_keys=True, default=str)
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+class _VersionedResultCache:
+    """Cache of read results keyed by (method, args, event version).
+
+    Every write for an event bumps that event's version (and the global
+    version used by cross-event reads), so stale entries are never hit again
+    and simply age out. Versions are per process: writes made by other
+    workers are only picked up once entries expire after ``ttl`` seconds.
+    """
+
+    def __init__(self, maxsize: int = _RESULT_CACHE_MAXSIZE, ttl: float = _RESULT_CACHE_TTL):
+        self._lock = threading.Lock()
+        self._entries: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._versions: Dict[Optional[str], int] = defaultdict(int)
+
+    def version(self, event_id: Optional[str]) -> int:
+        with self._lock:
+            return self._versions[event_id]
+
+    def bump(self, event_ids: Iterable[Optional[str]]) -> None:
+        with self._lock:
+            for event_id in set(event_ids):
+                if event_id is not None:
+                    self._versions[event_id] += 1
+            # None is the global version consulted by cross-event reads.
+            self._versions[None] += 1
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        with self._lock:
+            try:
+                return True, self._entries[key]
+            except KeyError:
+                return False, None
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def _versioned(method: _F) -> _F:
+    """Cache an AnalyticsService read method until its event is written to.
+
+    The ``event_id`` argument selects the version; methods without one are
+    keyed on the global version and invalidated by any write. Callers get
+    their own copy of the result, so mutating it cannot corrupt the cache.
+    """
+    signature = inspect.signature(method)
+    name = method.__name__
+
+    @functools.wraps(method)
+    def wrapper(self: "AnalyticsService", *args: Any, **kwargs: Any) -> Any:
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        arguments = [(k, _freeze(v)) for k, v in bound.arguments.items() if k != "self"]
+        event_id = bound.arguments.get("event_id")
+        key = (name, tuple(arguments), self._result_cache.version(event_id))
+
+        hit, value = self._result_cache.get(key)
+        if hit:
+            ANALYTICS_CACHE_REQUESTS.labels(method=name, result="hit").inc()
+            return copy.deepcopy(value)
+        ANALYTICS_CACHE_REQUESTS.labels(method=name, result="miss").inc()
+        value = method(self, *args, **kwargs)
+        self._result_cache.set(key, copy.deepcopy(value))
+        return value
+
+    return wrapper  # type: ignore[return-value]
+
+
+def _columnar_snapshot(since: datetime) -> Optional[ScanSnapshot]:
+    """Return the columnar scan snapshot if enabled and it covers *since*.
+
+    Refreshes it incrementally when older than
+    ``ANALYTICS_COLUMNAR_REFRESH_SECONDS``; callers fall back to SQL on None.
+    """
+    if scan_snapshot is None:
+        return None
+    engine = _db.get_engine()
+    if engine is None:
+        return None
+    try:
+        scan_snapshot.refresh_if_stale(engine, get_settings().ANALYTICS_COLUMNAR_REFRESH_SECONDS)
+    except Exception as exc:
+        log_error("Failed to refresh scan snapshot", {"error": str(exc)})
+        return None
+    return scan_snapshot if scan_snapshot.covers(since) else None
+
 
 # Simple in-memory cache: (result, expiry_timestamp)
 _trending_cache: Optional[Tuple[List[Dict[str, Any]], float]] = None
@@ -28,6 +233,37 @@ class AnalyticsService:
     
     def __init__(self):
         self.logger = logging.getLogger("veritix.analytics")
+        self._result_cache = _VersionedResultCache()
+        settings = get_settings()
+        self._sketches = SketchBuffer(
+            self._apply_sketches,
+            flush_seconds=settings.ANALYTICS_SKETCH_FLUSH_SECONDS,
+            max_rows=settings.ANALYTICS_SKETCH_BUFFER_ROWS,
+        )
+
+    def invalidate(self, event_ids: Iterable[Optional[str]]) -> None:
+        """Invalidate cached reads for *event_ids* after out-of-band writes."""
+        self._result_cache.bump(event_ids)
+
+    def shutdown(self) -> None:
+        """Merge sketch updates still buffered by ``log_*`` calls."""
+        self._sketches.shutdown()
+
+    def _apply_sketches(self, scans: List[Dict[str, Any]], transfers: List[Dict[str, Any]]) -> None:
+        session = get_session()
+        try:
+            apply_sketch_updates(session.connection(), scans, transfers)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def _buffer_sketches(self, scans: List[Dict[str, Any]], transfers: List[Dict[str, Any]]) -> None:
+        """Queue committed rows for the next sketch merge, merging now if the buffer is full."""
+        if not self._sketches.add(scans, transfers):
+            self._apply_sketches(scans, transfers)
     
     def log_ticket_scan(
         self, 
@@ -43,18 +279,29 @@ class AnalyticsService:
         session = None
         try:
             session = get_session()
+            # The rollup is written in the scan's transaction; make sure its table exists.
+            _db.ensure_schema(session.get_bind(), ANALYTICS_SCHEMA)
+            now = datetime.utcnow()
             scan_record = TicketScan(
                 ticket_id=ticket_id,
                 event_id=event_id,
                 scanner_id=scanner_id,
+                scan_timestamp=now,
                 is_valid=is_valid,
                 location=location,
                 device_info=device_info,
-                additional_metadata=json.dumps(additional_metadata) if additional_metadata else None
+                additional_metadata=additional_metadata or None
             )
             
             session.add(scan_record)
+            apply_scanner_rollups(session.connection(), [{
+                "event_id": event_id,
+                "scanner_id": scanner_id,
+                "scan_timestamp": now,
+                "is_valid": is_valid,
+            }])
             session.commit()
+            self._buffer_sketches([{"event_id": event_id, "ticket_id": ticket_id, "scan_timestamp": now}], [])
             
             log_info("Ticket scan logged", {
                 "ticket_id": ticket_id,
@@ -65,6 +312,7 @@ class AnalyticsService:
             
             # Update stats
             self._update_analytics_stats(event_id, increment_scan=True, is_valid=is_valid)
+            self.invalidate([event_id])
             
         except Exception as e:
             log_error("Failed to log ticket scan", {
@@ -95,20 +343,29 @@ class AnalyticsService:
         session = None
         try:
             session = get_session()
+            now = datetime.utcnow()
             transfer_record = TicketTransfer(
                 ticket_id=ticket_id,
                 event_id=event_id,
                 from_user_id=from_user_id,
                 to_user_id=to_user_id,
+                transfer_timestamp=now,
                 transfer_reason=transfer_reason,
                 ip_address=sanitize_ip_address(ip_address),
                 user_agent=user_agent,
                 is_successful=is_successful,
-                additional_metadata=json.dumps(additional_metadata) if additional_metadata else None
+                additional_metadata=additional_metadata or None
             )
             
             session.add(transfer_record)
             session.commit()
+            self._buffer_sketches([], [{
+                "event_id": event_id,
+                "ticket_id": ticket_id,
+                "from_user_id": from_user_id,
+                "to_user_id": to_user_id,
+                "transfer_timestamp": now,
+            }])
             
             log_info("Ticket transfer logged", {
                 "ticket_id": ticket_id,
@@ -120,6 +377,7 @@ class AnalyticsService:
             
             # Update stats
             self._update_analytics_stats(event_id, increment_transfer=True, is_successful=is_successful)
+            self.invalidate([event_id])
             
         except Exception as e:
             log_error("Failed to log ticket transfer", {
@@ -157,7 +415,7 @@ class AnalyticsService:
                 reason=reason,
                 ip_address=sanitize_ip_address(ip_address),
                 user_agent=user_agent,
-                additional_metadata=json.dumps(additional_metadata) if additional_metadata else None
+                additional_metadata=additional_metadata or None
             )
             
             session.add(invalid_record)
@@ -172,6 +430,7 @@ class AnalyticsService:
             
             # Update stats
             self._update_analytics_stats(event_id, increment_invalid=True)
+            self.invalidate([event_id])
             
         except Exception as e:
             log_error("Failed to log invalid attempt", {
@@ -188,6 +447,7 @@ class AnalyticsService:
             if session:
                 session.close()
     
+    @_versioned
     def get_stats_for_event(self, event_id: str) -> Dict[str, int]:
         """Get analytics stats for a specific event."""
         session = None
@@ -265,6 +525,7 @@ class AnalyticsService:
             if session:
                 session.close()
     
+    @_versioned
     def get_stats_for_all_events(self) -> Dict[str, Dict[str, int]]:
         """Get analytics stats for all events."""
         session = None
@@ -292,37 +553,19 @@ class AnalyticsService:
             if session:
                 session.close()
     
-    def get_recent_scans(self, event_id: str, from_ts: Optional[datetime] = None, to_ts: Optional[datetime] = None, page: int = 1, limit: int = 100) -> Dict[str, Any]:
-        """Get recent scan records for an event with date filtering and pagination."""
+    @_versioned
+    def get_recent_scans(self, event_id: str, from_ts: Optional[datetime] = None, to_ts: Optional[datetime] = None, page: int = 1, limit: int = 100, metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Get recent scan records for an event with date, metadata filtering and pagination."""
         session = None
         try:
             session = get_session()
             
-            # Build base query
-            query = session.query(TicketScan).filter(TicketScan.event_id == event_id)
-            
-            # Apply time filters
-            if from_ts:
-                query = query.filter(TicketScan.scan_timestamp >= from_ts)
-            if to_ts:
-                query = query.filter(TicketScan.scan_timestamp <= to_ts)
-            
-            # Get total count for pagination
-            total = query.count()
-            
-            # Apply pagination
-            offset = (page - 1) * limit
-            scans = query.order_by(desc(TicketScan.scan_timestamp)).offset(offset).limit(limit).all()
-            
+            data, total = _select_page(
+                session, _SCAN_COLUMNS, TicketScan.__table__.c.scan_timestamp,
+                event_id, from_ts, to_ts, page, limit, metadata,
+            )
             return {
-                "data": [{
-                    "id": scan.id,
-                    "ticket_id": scan.ticket_id,
-                    "scanner_id": scan.scanner_id,
-                    "scan_timestamp": scan.scan_timestamp.isoformat(),
-                    "is_valid": scan.is_valid,
-                    "location": scan.location
-                } for scan in scans],
+                "data": data,
                 "total": total,
                 "page": page,
                 "limit": limit,
@@ -345,17 +588,14 @@ class AnalyticsService:
         session = None
         try:
             session = get_session()
-            scans = session.query(TicketScan).filter(
-                TicketScan.ticket_id == ticket_id
-            ).order_by(desc(TicketScan.scan_timestamp)).limit(limit).all()
-            return [{
-                "id": scan.id,
-                "ticket_id": scan.ticket_id,
-                "event_id": scan.event_id,
-                "scan_timestamp": scan.scan_timestamp.isoformat(),
-                "is_valid": scan.is_valid,
-                "location": scan.location
-            } for scan in scans]
+            scans = TicketScan.__table__
+            result = session.execute(
+                select(*_SCAN_BY_TICKET_COLUMNS)
+                .where(scans.c.ticket_id == ticket_id)
+                .order_by(desc(scans.c.scan_timestamp))
+                .limit(limit)
+            )
+            return _rows_as_dicts(result, _SCAN_BY_TICKET_COLUMNS, "scan_timestamp")
         except Exception as e:
             log_error("Failed to get scans by ticket_id", {
                 "ticket_id": ticket_id,
@@ -366,38 +606,19 @@ class AnalyticsService:
             if session:
                 session.close()
     
-    def get_recent_transfers(self, event_id: str, from_ts: Optional[datetime] = None, to_ts: Optional[datetime] = None, page: int = 1, limit: int = 100) -> Dict[str, Any]:
-        """Get recent transfer records for an event with date filtering and pagination."""
+    @_versioned
+    def get_recent_transfers(self, event_id: str, from_ts: Optional[datetime] = None, to_ts: Optional[datetime] = None, page: int = 1, limit: int = 100, metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Get recent transfer records for an event with date, metadata filtering and pagination."""
         session = None
         try:
             session = get_session()
             
-            # Build base query
-            query = session.query(TicketTransfer).filter(TicketTransfer.event_id == event_id)
-            
-            # Apply time filters
-            if from_ts:
-                query = query.filter(TicketTransfer.transfer_timestamp >= from_ts)
-            if to_ts:
-                query = query.filter(TicketTransfer.transfer_timestamp <= to_ts)
-            
-            # Get total count for pagination
-            total = query.count()
-            
-            # Apply pagination
-            offset = (page - 1) * limit
-            transfers = query.order_by(desc(TicketTransfer.transfer_timestamp)).offset(offset).limit(limit).all()
-            
+            data, total = _select_page(
+                session, _TRANSFER_COLUMNS, TicketTransfer.__table__.c.transfer_timestamp,
+                event_id, from_ts, to_ts, page, limit, metadata,
+            )
             return {
-                "data": [{
-                    "id": transfer.id,
-                    "ticket_id": transfer.ticket_id,
-                    "from_user_id": transfer.from_user_id,
-                    "to_user_id": transfer.to_user_id,
-                    "transfer_timestamp": transfer.transfer_timestamp.isoformat(),
-                    "is_successful": transfer.is_successful,
-                    "transfer_reason": transfer.transfer_reason
-                } for transfer in transfers],
+                "data": data,
                 "total": total,
                 "page": page,
                 "limit": limit,
@@ -415,37 +636,19 @@ class AnalyticsService:
             if session:
                 session.close()
     
-    def get_invalid_attempts(self, event_id: str, from_ts: Optional[datetime] = None, to_ts: Optional[datetime] = None, page: int = 1, limit: int = 100) -> Dict[str, Any]:
-        """Get recent invalid attempt records for an event with date filtering and pagination."""
+    @_versioned
+    def get_invalid_attempts(self, event_id: str, from_ts: Optional[datetime] = None, to_ts: Optional[datetime] = None, page: int = 1, limit: int = 100, metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Get recent invalid attempt records for an event with date, metadata filtering and pagination."""
         session = None
         try:
             session = get_session()
             
-            # Build base query
-            query = session.query(InvalidAttempt).filter(InvalidAttempt.event_id == event_id)
-            
-            # Apply time filters
-            if from_ts:
-                query = query.filter(InvalidAttempt.attempt_timestamp >= from_ts)
-            if to_ts:
-                query = query.filter(InvalidAttempt.attempt_timestamp <= to_ts)
-            
-            # Get total count for pagination
-            total = query.count()
-            
-            # Apply pagination
-            offset = (page - 1) * limit
-            invalid_attempts = query.order_by(desc(InvalidAttempt.attempt_timestamp)).offset(offset).limit(limit).all()
-            
+            data, total = _select_page(
+                session, _INVALID_ATTEMPT_COLUMNS, InvalidAttempt.__table__.c.attempt_timestamp,
+                event_id, from_ts, to_ts, page, limit, metadata,
+            )
             return {
-                "data": [{
-                    "id": attempt.id,
-                    "attempt_type": attempt.attempt_type,
-                    "ticket_id": attempt.ticket_id,
-                    "attempt_timestamp": attempt.attempt_timestamp.isoformat(),
-                    "reason": attempt.reason,
-                    "ip_address": attempt.ip_address
-                } for attempt in invalid_attempts],
+                "data": data,
                 "total": total,
                 "page": page,
                 "limit": limit,
@@ -482,6 +685,11 @@ class AnalyticsService:
             return []
 
         cutoff = datetime.utcnow() - timedelta(hours=hours)
+        snapshot = _columnar_snapshot(cutoff)
+        if snapshot is not None:
+            rows = self._name_trending_rows(engine, snapshot.top_events(cutoff, limit), hours)
+            _trending_cache = (rows, time.monotonic() + _TRENDING_CACHE_TTL)
+            return rows
         try:
             with engine.connect() as conn:
                 # Attempt join with event_sales_summary for event names
@@ -540,6 +748,145 @@ class AnalyticsService:
         _trending_cache = (rows, time.monotonic() + _TRENDING_CACHE_TTL)
         return rows[:limit]
 
+    def _name_trending_rows(self, engine: Any, top: List[Dict[str, Any]], hours: int) -> List[Dict[str, Any]]:
+        """Attach event names from event_sales_summary to columnar trending rows."""
+        names: Dict[str, str] = {}
+        if top:
+            try:
+                with engine.connect() as conn:
+                    result = conn.execute(
+                        text("SELECT event_id, event_name FROM event_sales_summary WHERE event_id IN :ids")
+                        .bindparams(bindparam("ids", expanding=True)),
+                        {"ids": [row["event_id"] for row in top]},
+                    )
+                    names = {row[0]: row[1] for row in result if row[1]}
+            except Exception:
+                # event_sales_summary may not exist
+                pass
+        return [
+            {
+                "event_id": row["event_id"],
+                "event_name": names.get(row["event_id"], row["event_id"]),
+                "scan_count": row["scan_count"],
+                "window_hours": hours,
+            }
+            for row in top
+        ]
+
+    @_versioned
+    def get_scan_counts(self, event_id: Optional[str] = None, days: int = 7) -> Dict[str, Any]:
+        """Return total/valid/invalid scan counts and a per-day breakdown.
+
+        Covers the last *days* calendar days including today, for one event
+        or all events.
+        """
+        today = datetime.utcnow().date()
+        since = datetime.combine(today - timedelta(days=days - 1), datetime.min.time())
+        snapshot = _columnar_snapshot(since)
+        if snapshot is not None:
+            counts = snapshot.counts(since, event_id=event_id)
+        else:
+            counts = self._scan_counts_sql(since, today, event_id)
+        return {"event_id": event_id, "days": days, **counts}
+
+    def _scan_counts_sql(self, since: datetime, today: date, event_id: Optional[str]) -> Dict[str, Any]:
+        session = None
+        try:
+            session = get_session()
+            day_expr = func.date(TicketScan.scan_timestamp)
+            query = (
+                session.query(day_expr.label("day"), TicketScan.is_valid, func.count(TicketScan.id))
+                .filter(TicketScan.scan_timestamp >= since)
+            )
+            if event_id is not None:
+                query = query.filter(TicketScan.event_id == event_id)
+            per_day: Dict[str, List[int]] = defaultdict(lambda: [0, 0])
+            for day, is_valid, count in query.group_by(day_expr, TicketScan.is_valid).all():
+                bucket = per_day[str(day)]
+                bucket[0] += count
+                if is_valid:
+                    bucket[1] += count
+
+            total = sum(bucket[0] for bucket in per_day.values())
+            valid = sum(bucket[1] for bucket in per_day.values())
+            day_count = (today - since.date()).days + 1
+            return {
+                "total": total,
+                "valid": valid,
+                "invalid": total - valid,
+                "valid_ratio": round(valid / total, 4) if total else None,
+                "daily": [
+                    {
+                        "date": day.isoformat(),
+                        "scans": per_day[day.isoformat()][0],
+                        "valid_scans": per_day[day.isoformat()][1],
+                    }
+                    for day in (since.date() + timedelta(days=i) for i in range(day_count))
+                ],
+            }
+        except Exception as e:
+            log_error("Failed to get scan counts", {"event_id": event_id, "error": str(e)})
+            raise
+        finally:
+            if session:
+                session.close()
+
+    @_versioned
+    def get_distinct_counts(self, event_id: str, from_ts: Optional[datetime] = None, to_ts: Optional[datetime] = None) -> Dict[str, Any]:
+        """Return HyperLogLog estimates of distinct scanned/transferred tickets and transfer users.
+
+        Without a time range the all-time sketches are read (one row per
+        metric); with one, the hourly sketches in range are merged. Sketch
+        updates buffered by this process are merged first.
+        """
+        self._sketches.drain()
+        session = None
+        try:
+            session = get_session()
+            estimates = distinct_estimates(session.connection(), event_id, from_ts, to_ts)
+            return {
+                "event_id": event_id,
+                "from_ts": from_ts.isoformat() if from_ts else None,
+                "to_ts": to_ts.isoformat() if to_ts else None,
+                **estimates,
+                "standard_error": round(STANDARD_ERROR, 4),
+            }
+        except Exception as e:
+            log_error("Failed to get distinct counts", {"event_id": event_id, "error": str(e)})
+            raise
+        finally:
+            if session:
+                session.close()
+
+    @_versioned
+    def get_top_scanners(self, event_id: str, from_ts: datetime, to_ts: datetime, rank_by: str = "hot", limit: int = 10) -> List[Dict[str, Any]]:
+        """Rank an event's scanners by throughput or invalid ratio from minute rollups."""
+        session = None
+        try:
+            session = get_session()
+            return top_scanners(session.connection(), event_id, from_ts, to_ts, rank_by, limit)
+        except Exception as e:
+            log_error("Failed to get top scanners", {"event_id": event_id, "error": str(e)})
+            raise
+        finally:
+            if session:
+                session.close()
+
+    @_versioned
+    def get_scanner_series(self, event_id: str, scanner_id: str, from_ts: datetime, to_ts: datetime) -> List[Dict[str, Any]]:
+        """Return a zero-filled per-minute time series for one scanner."""
+        session = None
+        try:
+            session = get_session()
+            return scanner_series(session.connection(), event_id, scanner_id, from_ts, to_ts)
+        except Exception as e:
+            log_error("Failed to get scanner series", {"event_id": event_id, "scanner_id": scanner_id, "error": str(e)})
+            raise
+        finally:
+            if session:
+                session.close()
+
+    @_versioned
     def get_scan_heatmap(
         self,
         event_id: str,
@@ -551,6 +898,14 @@ class AnalyticsService:
         Hours with no scans are filled with a count of 0 so the response
         always contains exactly 24 entries.
         """
+        if filter_date is not None:
+            snapshot = _columnar_snapshot(datetime.combine(filter_date, datetime.min.time()))
+            if snapshot is not None:
+                counts = snapshot.hourly_counts(event_id, filter_date)
+                data = [{"hour": h, "scan_count": counts[h]} for h in range(24)]
+                peak_hour = max(range(24), key=lambda h: counts[h])
+                return {"event_id": event_id, "data": data, "peak_hour": peak_hour}
+
         session = None
         try:
             session = get_session()
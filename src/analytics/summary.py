@@ -0,0 +1,221 @@
+"""Precomputed platform-wide analytics summary served by /analytics/summary.
+
+The aggregation queries scan the sales and analytics tables, so they never run
+on the request path. ``SummaryRefresher`` keeps the last computed snapshot in
+memory; readers get it in O(1) and, when it is older than the TTL, a refresh
+is started on a background thread (stale-while-revalidate). Only one refresh
+runs at a time.
+"""
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from sqlalchemy import DateTime, column, desc, func, select, table, text
+from sqlalchemy.engine import Engine
+
+from src.analytics.models import InvalidAttempt, TicketScan, TicketTransfer, get_engine
+from src.config import get_settings
+from src.logging_config import log_error, log_info
+
+logger = logging.getLogger("veritix.analytics.summary")
+
+
+def _sales_totals(engine: Engine, since: datetime, top_n: int) -> Dict[str, Any]:
+    """Totals and top events from the ETL-maintained sales tables.
+
+    ``daily_ticket_sales`` is keyed by date only, so ``tickets_sold_last_24h``
+    counts sales dated on or after the day 24 hours ago (today and yesterday),
+    not a rolling 24-hour window.
+    """
+    with engine.connect() as conn:
+        totals = conn.execute(text("""
+            SELECT COUNT(*) AS total_events,
+                   COALESCE(SUM(total_tickets), 0) AS total_tickets,
+                   COALESCE(SUM(total_revenue), 0) AS total_revenue
+            FROM event_sales_summary
+        """)).mappings().one()
+        top = conn.execute(
+            text("""
+                SELECT event_id, event_name, total_tickets, total_revenue
+                FROM event_sales_summary
+                ORDER BY total_tickets DESC, event_id
+                LIMIT :top_n
+            """),
+            {"top_n": top_n},
+        ).mappings().all()
+        recent = conn.execute(
+            text("""
+                SELECT COALESCE(SUM(tickets_sold), 0) AS tickets_sold
+                FROM daily_ticket_sales
+                WHERE sale_date >= :since_date
+            """),
+            {"since_date": since.date()},
+        ).mappings().one()
+    return {
+        "total_events": int(totals["total_events"]),
+        "total_tickets_sold": int(totals["total_tickets"]),
+        "total_revenue": str(Decimal(str(totals["total_revenue"])).quantize(Decimal("0.01"))),
+        "top_events_by_sales": [
+            {
+                "event_id": row["event_id"],
+                "event_name": row["event_name"],
+                "tickets_sold": int(row["total_tickets"] or 0),
+                "revenue": str(Decimal(str(row["total_revenue"] or 0)).quantize(Decimal("0.01"))),
+            }
+            for row in top
+        ],
+        "tickets_sold_last_24h": int(recent["tickets_sold"]),
+    }
+
+
+def _last_etl_at(engine: Engine) -> Optional[datetime]:
+    finished_at = column("finished_at", DateTime)
+    run_log = table("etl_run_log", finished_at, column("status"))
+    with engine.connect() as conn:
+        return conn.execute(
+            select(func.max(finished_at)).where(run_log.c.status == "success")
+        ).scalar()
+
+
+def _activity_totals(engine: Engine, since: datetime, top_n: int) -> Dict[str, Any]:
+    """All-time and last-24h counts from the scan analytics tables."""
+    scans = TicketScan.__table__
+    transfers = TicketTransfer.__table__
+    attempts = InvalidAttempt.__table__
+    recent_scan = scans.c.scan_timestamp >= since
+    with engine.connect() as conn:
+        scan_row = conn.execute(
+            select(
+                func.count(),
+                func.count().filter(scans.c.is_valid.is_(True)),
+                func.count().filter(recent_scan),
+                func.count().filter(recent_scan & scans.c.is_valid.is_(True)),
+            ).select_from(scans)
+        ).one()
+        transfer_row = conn.execute(
+            select(func.count(), func.count().filter(transfers.c.transfer_timestamp >= since)).select_from(transfers)
+        ).one()
+        attempt_row = conn.execute(
+            select(func.count(), func.count().filter(attempts.c.attempt_timestamp >= since)).select_from(attempts)
+        ).one()
+        scan_count = func.count().label("scan_count")
+        top = conn.execute(
+            select(scans.c.event_id, scan_count)
+            .where(recent_scan)
+            .group_by(scans.c.event_id)
+            .order_by(desc(scan_count), scans.c.event_id)
+            .limit(top_n)
+        ).all()
+    return {
+        "total_scans": scan_row[0],
+        "total_valid_scans": scan_row[1],
+        "total_transfers": transfer_row[0],
+        "total_invalid_attempts": attempt_row[0],
+        "last_24h": {
+            "scans": scan_row[2],
+            "valid_scans": scan_row[3],
+            "transfers": transfer_row[1],
+            "invalid_attempts": attempt_row[1],
+        },
+        "top_events_by_scans_24h": [{"event_id": event_id, "scan_count": count} for event_id, count in top],
+    }
+
+
+def compute_summary(engine: Engine, top_n: int = 10, now: Optional[datetime] = None) -> Dict[str, Any]:
+    """Run the aggregation queries and return a summary snapshot.
+
+    Each source is queried on its own connection; a source whose tables are
+    missing (e.g. the ETL has never run) contributes zeros instead of failing
+    the whole snapshot.
+    """
+    now = now or datetime.utcnow()
+    since = now - timedelta(hours=24)
+    summary: Dict[str, Any] = {
+        "total_events": 0,
+        "total_tickets_sold": 0,
+        "total_revenue": "0.00",
+        "top_events_by_sales": [],
+        "tickets_sold_last_24h": 0,
+        "last_etl_at": None,
+        "total_scans": 0,
+        "total_valid_scans": 0,
+        "total_transfers": 0,
+        "total_invalid_attempts": 0,
+        "last_24h": {"scans": 0, "valid_scans": 0, "transfers": 0, "invalid_attempts": 0},
+        "top_events_by_scans_24h": [],
+    }
+    try:
+        summary.update(_sales_totals(engine, since, top_n))
+        summary["last_etl_at"] = _last_etl_at(engine)
+    except Exception as exc:
+        logger.warning("Sales aggregates unavailable for analytics summary: %s", exc)
+    try:
+        summary.update(_activity_totals(engine, since, top_n))
+    except Exception as exc:
+        logger.warning("Scan aggregates unavailable for analytics summary: %s", exc)
+    summary["last_24h"]["tickets_sold"] = summary.pop("tickets_sold_last_24h")
+    summary["generated_at"] = now
+    return summary
+
+
+class SummaryRefresher:
+    """Holds the latest summary snapshot and refreshes it in the background."""
+
+    def __init__(self, ttl_seconds: float, compute: Callable[[], Optional[Dict[str, Any]]]):
+        self.ttl_seconds = ttl_seconds
+        self._compute = compute
+        # (snapshot, monotonic time computed), replaced as a single reference.
+        self._state: Tuple[Optional[Dict[str, Any]], Optional[float]] = (None, None)
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    def get(self) -> Optional[Dict[str, Any]]:
+        """Return the last snapshot without blocking, refreshing it if stale.
+
+        Returns None until the first refresh has completed.
+        """
+        snapshot, computed_at = self._state
+        if computed_at is None or time.monotonic() - computed_at >= self.ttl_seconds:
+            self.trigger_refresh()
+        return snapshot
+
+    def trigger_refresh(self) -> bool:
+        """Start a background refresh unless one is already running."""
+        with self._lock:
+            if self._refreshing:
+                return False
+            self._refreshing = True
+        threading.Thread(target=self._run, name="analytics-summary-refresh", daemon=True).start()
+        return True
+
+    def refresh(self) -> None:
+        """Recompute the snapshot on the calling thread."""
+        started = time.monotonic()
+        snapshot = self._compute()
+        if snapshot is None:
+            return
+        self._state = (snapshot, time.monotonic())
+        log_info("Analytics summary refreshed", {"duration_ms": round((time.monotonic() - started) * 1000, 1)})
+
+    def _run(self) -> None:
+        try:
+            self.refresh()
+        except Exception as exc:
+            log_error("Analytics summary refresh failed", {"error": str(exc)})
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+
+def _compute_from_db() -> Optional[Dict[str, Any]]:
+    engine = get_engine()
+    if engine is None:
+        logger.info("Skipping analytics summary refresh — no DB engine")
+        return None
+    return compute_summary(engine, top_n=get_settings().ANALYTICS_SUMMARY_TOP_N)
+
+
+summary_refresher = SummaryRefresher(get_settings().ANALYTICS_SUMMARY_TTL_SECONDS, _compute_from_db)
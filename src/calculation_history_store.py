@@ -3,18 +3,13 @@ import logging
 import uuid
 from typing import Any, Dict, List, Optional
 from sqlalchemy import text
+import src.db as _db
 from src.db import get_engine
 from src.revenue_sharing_models import RevenueCalculationResult, PayoutDistribution
 
 logger = logging.getLogger("veritix.calculation_history_store")
 
-def create_revenue_calculations_table() -> None:
-    """Create the revenue_calculations table if it does not yet exist."""
-    engine = get_engine()
-    if engine is None:
-        logger.info("Skipping revenue_calculations table creation — no DB engine")
-        return
-    
+def _create_revenue_calculations_table(engine) -> None:
     with engine.connect() as conn:
         # Use FLOAT and TEXT for cross-DB compatibility (SQLite/Postgres)
         conn.execute(text("""
@@ -34,6 +29,16 @@ def create_revenue_calculations_table() -> None:
         conn.commit()
     logger.info("revenue_calculations table ready")
 
+_db.register_schema("revenue_calculations", _create_revenue_calculations_table)
+
+def create_revenue_calculations_table() -> None:
+    """Create the revenue_calculations table if this process has not already."""
+    engine = get_engine()
+    if engine is None:
+        logger.info("Skipping revenue_calculations table creation — no DB engine")
+        return
+    _db.ensure_schema(engine, "revenue_calculations")
+
 def save_calculation(result: RevenueCalculationResult) -> str:
     """Persist a revenue calculation result to the database."""
     engine = get_engine()
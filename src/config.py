@@ -1,5 +1,5 @@
 from functools import lru_cache
-from typing import Optional
+from typing import Literal, Optional
 
 from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -14,17 +14,45 @@ class Settings(BaseSettings):
     ENABLE_ETL_SCHEDULER: bool = False
     ETL_CRON: Optional[str] = None
     ETL_INTERVAL_MINUTES: int = 15
+    ETL_EXTRACT_CONCURRENCY: int = Field(default=1, ge=1)
+    ETL_LOAD_CHUNK_SIZE: int = Field(default=10000, ge=1)
+    ETL_SALES_PAGE_SIZE: int = Field(default=500, ge=1)
+    ETL_CHECKPOINT_EVERY_PAGES: int = Field(default=10, ge=1)
+    ETL_CONDITIONAL_EXTRACT: bool = True
+    ETL_REJECT_LOG_FIRST: int = Field(default=5, ge=0)
+    ETL_REJECT_LOG_SAMPLE_EVERY: int = Field(default=1000, ge=1)
+    ETL_REJECT_LOG_RATE_PER_SECOND: float = Field(default=5.0, gt=0)
+    ETL_DIFF_SAMPLE_LIMIT: int = Field(default=20, ge=0)
+    ETL_DIFF_MAX_CONCURRENCY: int = Field(default=1, ge=1)
+    ETL_DIFF_MAX_PENDING: int = Field(default=4, ge=1)
+    ETL_DIFF_JOB_TTL_SECONDS: int = Field(default=900, ge=1)
+    ETL_DIFF_SYNC_SECONDS: float = Field(default=5.0, ge=0)
+    ETL_LOCK_WAIT_SECONDS: float = Field(default=0.0, ge=0)
+    ETL_LOCK_HEARTBEAT_SECONDS: float = Field(default=30.0, gt=0)
+    ETL_RUN_MIN_GAP_SECONDS: Optional[float] = Field(default=None, ge=0)
+    ETL_WEBHOOK_SECRET: Optional[str] = None
+    ETL_WEBHOOK_TOLERANCE_SECONDS: int = Field(default=300, ge=1)
+    ETL_WEBHOOK_FLUSH_SECONDS: float = Field(default=2.0, gt=0)
+    ETL_WEBHOOK_BATCH_SIZE: int = Field(default=5000, ge=1)
+    ETL_WEBHOOK_MAX_BUFFER: int = Field(default=50000, ge=1)
+    ETL_WEBHOOK_RETENTION_HOURS: int = Field(default=72, ge=1)
+    ETL_SCAN_EXPORT_ENABLED: bool = False
+    ETL_SCAN_EXPORT_INTERVAL_MINUTES: int = Field(default=15, ge=1)
+    ETL_SCAN_EXPORT_CHUNK_SIZE: int = Field(default=50000, ge=1)
+    ETL_SCAN_EXPORT_SETTLE_SECONDS: float = Field(default=60.0, ge=0)
     DEBUG: bool = False
     BQ_ENABLED: bool = False
     BQ_PROJECT_ID: Optional[str] = None
     BQ_DATASET: Optional[str] = None
     BQ_LOCATION: Optional[str] = None
+    BQ_SINK: Literal["bigquery", "local"] = "bigquery"
+    BQ_LOCAL_SINK_URL: str = "sqlite:///etl_warehouse.db"
 
     # Existing project configuration values kept centralized.
     PRIVATE_KEY_PEM: Optional[str] = None
     PUBLIC_KEY_PEM: Optional[str] = None
     LOG_LEVEL: str = "INFO"
-    TRUSTED_PROXY_COUNT: int = Field(0, ge=0)
+    TRUSTED_PROXY_COUNT: int = Field(default=0, ge=0)
     SESSION_TIMEOUT_MINUTES: int = 30
     SKIP_MODEL_TRAINING: bool = False
     BQ_TABLE_EVENT_SUMMARY: str = "event_sales_summary"
@@ -34,6 +62,16 @@ class Settings(BaseSettings):
     POOL_SIZE: int = 5
     POOL_MAX_OVERFLOW: int = 10
     REPORT_CACHE_MINUTES: int = 60
+    ANALYTICS_INGEST_BATCH_SIZE: int = Field(default=5000, ge=1)
+    ANALYTICS_INGEST_MAX_BYTES: int = Field(default=64 * 1024 * 1024, ge=1)
+    ANALYTICS_SKETCH_FLUSH_SECONDS: float = Field(default=1.0, gt=0)
+    ANALYTICS_SKETCH_BUFFER_ROWS: int = Field(default=50000, ge=1)
+    ANALYTICS_SUMMARY_TTL_SECONDS: int = Field(default=60, ge=1)
+    ANALYTICS_SUMMARY_TOP_N: int = Field(default=10, ge=1, le=100)
+    ANALYTICS_COLUMNAR_ENABLED: bool = False
+    ANALYTICS_COLUMNAR_WINDOW_DAYS: int = Field(default=30, ge=1)
+    ANALYTICS_COLUMNAR_REFRESH_SECONDS: float = Field(default=5.0, ge=0)
+    ANALYTICS_COLUMNAR_OVERLAP_SECONDS: float = Field(default=300.0, ge=0)
     SHUTDOWN_TIMEOUT_SECONDS: int = 30
 
     SERVICE_API_KEY: str = Field(...)
@@ -2,11 +2,20 @@
 
 All modules that need a database engine should import get_engine() and
 get_session() from here rather than creating engines themselves.
+
+Table creation goes through the schema registry. Modules that own tables
+call register_schema() at import time, and bootstrap_schema() runs every
+registered creator once at startup. Code paths that need a table call
+ensure_schema(). After the first call for an engine it is a set lookup,
+so requests and scheduled jobs never issue DDL in steady state.
 """
 from __future__ import annotations
 
+import importlib
 import logging
-from typing import Any, Dict, Optional
+import threading
+import weakref
+from typing import Any, Callable, Dict, Optional, Set
 
 from sqlalchemy import create_engine, text
 from sqlalchemy.engine import Engine
@@ -18,6 +27,22 @@ logger = logging.getLogger("veritix.db")
 
 _engine: Optional[Engine] = None
 
+# Modules that register schema creators, imported by bootstrap_schema() so
+# it covers every table even when the caller has not imported them.
+_SCHEMA_MODULES = (
+    "src.report_service",
+    "src.stakeholder_store",
+    "src.calculation_history_store",
+    "src.fraud_events_store",
+    "src.analytics.models",
+    "src.etl",
+    "src.etl.scan_export",
+)
+
+_schema_creators: Dict[str, Callable[[Engine], None]] = {}
+_schema_ensured: "weakref.WeakKeyDictionary[Engine, Set[str]]" = weakref.WeakKeyDictionary()
+_schema_lock = threading.Lock()
+
 
 def get_engine() -> Optional[Engine]:
     """Return the shared SQLAlchemy engine, creating it once on first call.
@@ -73,3 +98,51 @@ def get_pool_status() -> Dict[str, Any]:
         "overflow": pool.overflow(),
         "invalid": pool.invalid(),
     }
+
+
+def register_schema(name: str, create: Callable[[Engine], None]) -> None:
+    """Register *create* as the idempotent DDL for the tables called *name*."""
+    _schema_creators[name] = create
+
+
+def ensure_schema(engine: Engine, name: str, create: Optional[Callable[[Engine], None]] = None) -> None:
+    """Run the creator for *name* on *engine* unless it already ran in this process.
+
+    *create* overrides the registered creator (for tables whose name is
+    only known at run time).
+    """
+    ensured = _schema_ensured.get(engine)
+    if ensured is not None and name in ensured:
+        return
+    with _schema_lock:
+        ensured = _schema_ensured.setdefault(engine, set())
+        if name in ensured:
+            return
+        (create or _schema_creators[name])(engine)
+        ensured.add(name)
+
+
+def bootstrap_schema(engine: Optional[Engine] = None) -> None:
+    """Create every registered table on *engine* (default: the shared engine).
+
+    Called once at startup, or from a migration script. A failing creator is
+    logged and retried on its first ensure_schema() call.
+    """
+    engine = engine if engine is not None else get_engine()
+    if engine is None:
+        logger.info("Skipping schema bootstrap — no DB engine")
+        return
+    for module in _SCHEMA_MODULES:
+        importlib.import_module(module)
+    for name in list(_schema_creators):
+        try:
+            ensure_schema(engine, name)
+        except Exception as exc:
+            logger.error("Schema bootstrap failed for %s: %s", name, exc)
+    logger.info("Schema bootstrap complete (%d table groups)", len(_schema_creators))
+
+
+def forget_schema(engine: Engine) -> None:
+    """Forget what was ensured on *engine*, e.g. after its tables were dropped."""
+    with _schema_lock:
+        _schema_ensured.pop(engine, None)
@@ -1,20 +1,45 @@
+import asyncio
+import io
+import json
 import logging
-from datetime import date, datetime, timezone
-from typing import Any, Dict, List, Optional, Tuple
-
+import os
+import tempfile
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any, Callable, Collection, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
 from sqlalchemy import (
+    Boolean,
     Column,
     Date,
+    Index,
     Integer,
     MetaData,
     Numeric,
     String,
     Table,
     TIMESTAMP,
+    Text,
+    and_,
+    case,
+    cast,
     create_engine,
+    false,
+    inspect,
+    func,
+    not_,
+    null,
+    or_,
+    select,
     text,
+    true,
+    update,
 )
 from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.engine import Engine
 
 try:
@@ -22,10 +47,28 @@ try:
 except Exception:
     bigquery = None  # Optional dependency
 
-from src.logging_config import ETL_JOBS_TOTAL, log_error, log_info, log_warning
+from src.logging_config import ETL_JOBS_TOTAL, ETL_LAST_RUN_CACHE_HIT_RATIO, log_error, log_info, log_warning
 from src.config import get_settings
 import src.db as _db
-from .extract import extract_events_and_sales
+from .extract import (
+    Page,
+    collect_extract_stats,
+    extract_events_and_sales,
+    extract_events_and_sales_async,
+    stream_pages,
+    stream_pages_async,
+)
+from .page_cache import PageCache
+from .rejects import (
+    EMPTY_EVENT_ID,
+    FUTURE_SALE_DATE,
+    NEGATIVE_TOTAL_REVENUE,
+    NEGATIVE_TOTAL_TICKETS,
+    RejectCollector,
+    rejected_rows_page,
+)
+from .stages import StageTimings
+from .warehouse import DAILY_SALES_SCHEMA, EVENT_SUMMARY_SCHEMA, BigQuerySink, LocalSQLSink, write_ndjson
 
 logger = logging.getLogger("veritix.etl")
 
@@ -52,9 +95,39 @@ def _safe_float(x: Any) -> float:
 # Validation  (issue #162)
 # ---------------------------------------------------------------------------
 
+def _event_row_reject(row: Dict[str, Any]) -> Optional[str]:
+    """Reason code an ``event_sales_summary`` row is rejected for, or None if it is valid."""
+    if not row.get("event_id"):
+        return EMPTY_EVENT_ID
+    if _safe_int(row.get("total_tickets", 0)) < 0:
+        return NEGATIVE_TOTAL_TICKETS
+    if _safe_float(row.get("total_revenue", 0.0)) < 0:
+        return NEGATIVE_TOTAL_REVENUE
+    return None
+
+
+def _daily_row_reject(row: Dict[str, Any], today: date) -> Optional[str]:
+    """Reason code a ``daily_ticket_sales`` row is rejected for, or None if it is valid."""
+    if not row.get("event_id"):
+        return EMPTY_EVENT_ID
+    sale_date = row.get("sale_date")
+    if sale_date is not None:
+        if isinstance(sale_date, str):
+            try:
+                sale_date = datetime.fromisoformat(sale_date).date()
+            except Exception:
+                sale_date = None
+        if isinstance(sale_date, datetime):
+            sale_date = sale_date.date()
+        if isinstance(sale_date, date) and sale_date > today + timedelta(days=1):
+            return FUTURE_SALE_DATE
+    return None
+
+
 def validate_rows(
     event_summary_rows: List[Dict[str, Any]],
     daily_rows: List[Dict[str, Any]],
+    rejects: Optional[RejectCollector] = None,
 ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], int]:
     """Reject malformed rows before they reach the database.
 
@@ -64,60 +137,34 @@ def validate_rows(
     - daily row: ``event_id`` must be non-empty.
     - daily row: ``sale_date`` must not be more than 1 day in the future.
 
-    Every rejected row is logged as a warning so it remains traceable.
+    Rejected rows are added to *rejects* (a fresh :class:`RejectCollector`
+    if omitted), which counts them per reason, logs a rate-limited sample
+    and buffers them for the ``etl_rejected_rows`` quarantine table.
 
     Returns:
         (valid_event_rows, valid_daily_rows, rejected_count)
     """
+    if rejects is None:
+        rejects = RejectCollector()
     rejected_count = 0
     valid_event_rows: List[Dict[str, Any]] = []
     today = datetime.now(tz=timezone.utc).date()
 
     for row in event_summary_rows:
-        event_id = row.get("event_id")
-        if not event_id:
-            log_warning("ETL validate: rejected event row — empty event_id", {"row": row})
-            rejected_count += 1
-            continue
-        if _safe_int(row.get("total_tickets", 0)) < 0:
-            log_warning(
-                "ETL validate: rejected event row — negative total_tickets",
-                {"row": row},
-            )
-            rejected_count += 1
-            continue
-        if _safe_float(row.get("total_revenue", 0.0)) < 0:
-            log_warning(
-                "ETL validate: rejected event row — negative total_revenue",
-                {"row": row},
-            )
+        reason = _event_row_reject(row)
+        if reason is not None:
+            rejects.add("event_sales_summary", reason, row)
             rejected_count += 1
             continue
         valid_event_rows.append(row)
 
     valid_daily_rows: List[Dict[str, Any]] = []
     for row in daily_rows:
-        event_id = row.get("event_id")
-        if not event_id:
-            log_warning("ETL validate: rejected daily row — empty event_id", {"row": row})
+        reason = _daily_row_reject(row, today)
+        if reason is not None:
+            rejects.add("daily_ticket_sales", reason, row)
             rejected_count += 1
             continue
-        sale_date = row.get("sale_date")
-        if sale_date is not None:
-            if isinstance(sale_date, str):
-                try:
-                    sale_date = datetime.fromisoformat(sale_date).date()
-                except Exception:
-                    sale_date = None
-            if isinstance(sale_date, datetime):
-                sale_date = sale_date.date()
-            if isinstance(sale_date, date) and sale_date > today + __import__("datetime").timedelta(days=1):
-                log_warning(
-                    "ETL validate: rejected daily row — sale_date is in the future",
-                    {"row": row},
-                )
-                rejected_count += 1
-                continue
         valid_daily_rows.append(row)
 
     return valid_event_rows, valid_daily_rows, rejected_count
@@ -130,22 +177,54 @@ def validate_rows(
 _ETL_RUN_LOG_TABLE = "etl_run_log"
 
 
-def _ensure_run_log_table(engine: Engine) -> Table:
-    """Create etl_run_log table if it does not exist and return the Table object."""
-    metadata = MetaData()
-    run_log = Table(
+def _run_log_table(metadata: MetaData) -> Table:
+    return Table(
         _ETL_RUN_LOG_TABLE,
         metadata,
         Column("id", Integer, primary_key=True, autoincrement=True),
         Column("started_at", TIMESTAMP(timezone=False)),
         Column("finished_at", TIMESTAMP(timezone=False)),
-        Column("status", String),        # 'success' | 'failed'
+        Column("status", String),        # 'running' | 'success' | 'failed'
         Column("last_run_at", TIMESTAMP(timezone=False)),
         Column("rejected_count", Integer),
+        # Resume checkpoint: the window the run extracted, the last
+        # /ticket-sales page folded into ``checkpoint`` and the aggregates
+        # accumulated up to that page (JSON, see SummaryAccumulator.to_state).
+        Column("since_cursor", String),
+        Column("until_cursor", String),
+        Column("sales_page", Integer),
+        Column("checkpoint", Text),
+        # Per-stage timings and counts (JSON, see StageTimings.to_dict).
+        Column("stages", Text),
     )
+
+
+def _create_run_log_table(engine: Engine) -> None:
+    """Create etl_run_log if it does not exist.
+
+    Columns added since the table was first introduced are added in place to
+    pre-existing tables.
+    """
+    metadata = MetaData()
+    run_log = _run_log_table(metadata)
     with engine.begin() as conn:
         metadata.create_all(conn)  # type: ignore[arg-type]
-    return run_log
+        existing = {col["name"] for col in inspect(conn).get_columns(_ETL_RUN_LOG_TABLE)}
+        for col in run_log.columns:
+            if col.name not in existing:
+                conn.execute(text(
+                    f"ALTER TABLE {_ETL_RUN_LOG_TABLE} "  # noqa: S608
+                    f"ADD COLUMN {col.name} {col.type.compile(conn.dialect)}"
+                ))
+
+
+def _ensure_run_log_table(engine: Engine) -> Table:
+    """Return the etl_run_log Table, creating it on first use in this process."""
+    _db.ensure_schema(engine, _ETL_RUN_LOG_TABLE)
+    return _run_log_table(MetaData())
+
+
+_db.register_schema(_ETL_RUN_LOG_TABLE, _create_run_log_table)
 
 
 def _load_last_successful_cursor(engine: Engine) -> Optional[str]:
@@ -170,6 +249,179 @@ def _load_last_successful_cursor(engine: Engine) -> Optional[str]:
     return None
 
 
+_ETL_LOAD_LEDGER_TABLE = "etl_load_ledger"
+
+
+def _load_ledger_table(metadata: MetaData) -> Table:
+    """One row per applied load, keyed by its extraction window.
+
+    Written in the same transaction as the summary merge, so a window's
+    deltas are applied at most once and the next cursor advances with them.
+    """
+    return Table(
+        _ETL_LOAD_LEDGER_TABLE,
+        metadata,
+        Column("load_key", String, primary_key=True),
+        Column("since_cursor", String),
+        Column("until_cursor", String),
+        Column("mode", String),          # 'full' | 'incremental'
+        Column("applied_at", TIMESTAMP(timezone=False)),
+    )
+
+
+def _load_key(since: Optional[str], until: str) -> str:
+    return f"{since or ''}/{until}"
+
+
+def _applied_cursor(conn: Any, ledger: Table) -> Optional[str]:
+    return conn.execute(
+        select(ledger.c.until_cursor).order_by(ledger.c.applied_at.desc()).limit(1)
+    ).scalar()
+
+
+def _load_applied_cursor(engine: Engine) -> Optional[str]:
+    """Return the ``until`` cursor of the latest applied load, or None."""
+    ledger = _load_ledger_table(MetaData())
+    try:
+        with engine.connect() as conn:
+            return _applied_cursor(conn, ledger)
+    except Exception as exc:
+        logger.warning("Could not read ETL load ledger cursor: %s", exc)
+        return None
+
+
+_ETL_WEBHOOK_SALES_TABLE = "etl_webhook_sales"
+
+
+def _webhook_sales_table(metadata: MetaData) -> Table:
+    """One row per sale received on ``POST /etl/webhook/sales``.
+
+    ``applied`` sales were added to the summary tables by the webhook
+    batcher and not yet counted by a load. A load that counts one of them
+    absorbs it: the webhook's copy is taken out and ``applied`` cleared.
+    """
+    table = Table(
+        _ETL_WEBHOOK_SALES_TABLE,
+        metadata,
+        Column("sale_id", String, primary_key=True),
+        Column("event_id", String, nullable=False),
+        Column("sale_date", Date, nullable=False),
+        Column("tickets", Integer, nullable=False),
+        Column("revenue", Numeric(18, 2), nullable=False),
+        Column("created_at", TIMESTAMP(timezone=False), nullable=False),
+        Column("received_at", TIMESTAMP(timezone=False), nullable=False),
+        Column("applied", Boolean, nullable=False),
+    )
+    Index("ix_etl_webhook_sales_created_at", table.c.created_at)
+    return table
+
+
+def _create_load_tables(engine: Engine) -> None:
+    """Create the summary tables and the ledgers written by the load."""
+    metadata = MetaData()
+    _summary_tables(metadata)
+    _load_ledger_table(metadata)
+    _webhook_sales_table(metadata)
+    metadata.create_all(engine)  # type: ignore[arg-type]
+
+
+_LOAD_SCHEMA = "etl_load"
+_db.register_schema(_LOAD_SCHEMA, _create_load_tables)
+
+
+# Serialises summary writes between a load and webhook micro-batches, so a
+# batch cannot apply a sale to a window whose load is being committed.
+_SUMMARY_LOCK_KEY = int.from_bytes(b"etl-sum", "big")
+
+
+def _lock_summaries(conn: Any) -> None:
+    """Hold the summary write lock until *conn*'s transaction ends (PostgreSQL)."""
+    if conn.dialect.name == "postgresql":
+        conn.execute(select(func.pg_advisory_xact_lock(_SUMMARY_LOCK_KEY)))
+
+
+def _load_resume_checkpoint(engine: Engine, run_log_table: Table) -> Optional[Dict[str, Any]]:
+    """Return the checkpoint of the latest run if it did not succeed.
+
+    A run that failed (or died while ``running``) after checkpointing part of
+    ``/ticket-sales`` is resumed from that page with the same ``since`` /
+    ``until`` window. Only the latest run is considered: once a run succeeds,
+    older checkpoints are obsolete.
+    """
+    try:
+        with engine.connect() as conn:
+            row = conn.execute(
+                select(
+                    run_log_table.c.status,
+                    run_log_table.c.since_cursor,
+                    run_log_table.c.until_cursor,
+                    run_log_table.c.sales_page,
+                    run_log_table.c.checkpoint,
+                )
+                .order_by(run_log_table.c.id.desc())
+                .limit(1)
+            ).fetchone()
+    except Exception as exc:
+        logger.warning("Could not read ETL resume checkpoint: %s", exc)
+        return None
+    if row is None or row.status == "success" or not row.sales_page or not row.checkpoint:
+        return None
+    return {
+        "since": row.since_cursor,
+        "until": row.until_cursor,
+        "sales_page": row.sales_page,
+        "state": json.loads(row.checkpoint),
+    }
+
+
+def _start_run_log(
+    engine: Engine,
+    run_log_table: Table,
+    started_at: datetime,
+    since: Optional[str],
+    until: Optional[str],
+    resume: Optional[Dict[str, Any]] = None,
+) -> Optional[int]:
+    """Insert a ``running`` row into etl_run_log and return its id.
+
+    A resumed run starts with the checkpoint it resumed from, so that
+    failing again before its own first checkpoint does not lose it.
+    """
+    try:
+        with engine.begin() as conn:
+            result = conn.execute(
+                run_log_table.insert().values(
+                    started_at=started_at,
+                    status="running",
+                    rejected_count=0,
+                    since_cursor=since,
+                    until_cursor=until,
+                    sales_page=resume["sales_page"] if resume else None,
+                    checkpoint=json.dumps(resume["state"]) if resume else None,
+                )
+            )
+            return result.inserted_primary_key[0]
+    except Exception as exc:
+        logger.error("Failed to write ETL run log: %s", exc)
+        return None
+
+
+def _save_checkpoint(
+    engine: Engine,
+    run_log_table: Table,
+    run_id: int,
+    sales_page: int,
+    state: Dict[str, Any],
+) -> None:
+    """Record that ``/ticket-sales`` pages up to *sales_page* are folded into *state*."""
+    with engine.begin() as conn:
+        conn.execute(
+            run_log_table.update()
+            .where(run_log_table.c.id == run_id)
+            .values(sales_page=sales_page, checkpoint=json.dumps(state))
+        )
+
+
 def _save_run_log(
     engine: Engine,
     run_log_table: Table,
@@ -177,23 +429,231 @@ def _save_run_log(
     finished_at: datetime,
     status: str,
     rejected_count: int = 0,
+    run_id: Optional[int] = None,
+    stages: Optional[Dict[str, Any]] = None,
 ) -> None:
-    """Insert a row into etl_run_log."""
+    """Finalise the run's etl_run_log row (or insert one if *run_id* is None).
+
+    A successful run clears its checkpoint.
+    """
+    values: Dict[str, Any] = {
+        "started_at": started_at,
+        "finished_at": finished_at,
+        "status": status,
+        "last_run_at": finished_at if status == "success" else None,
+        "rejected_count": rejected_count,
+        "stages": json.dumps(stages) if stages is not None else None,
+    }
+    if status == "success":
+        values["checkpoint"] = None
     try:
         with engine.begin() as conn:
-            conn.execute(
-                run_log_table.insert().values(
-                    started_at=started_at,
-                    finished_at=finished_at,
-                    status=status,
-                    last_run_at=finished_at if status == "success" else None,
-                    rejected_count=rejected_count,
+            if run_id is None:
+                conn.execute(run_log_table.insert().values(**values))
+            else:
+                conn.execute(
+                    run_log_table.update().where(run_log_table.c.id == run_id).values(**values)
                 )
-            )
     except Exception as exc:
         logger.error("Failed to write ETL run log: %s", exc)
 
 
+def run_rejects(
+    run_id: int,
+    limit: int = 100,
+    after_id: int = 0,
+    reason: Optional[str] = None,
+) -> Optional[Dict[str, Any]]:
+    """A page of *run_id*'s quarantined rows, or None without a database."""
+    engine = _pg_engine()
+    if engine is None:
+        return None
+    return rejected_rows_page(engine, run_id, limit=limit, after_id=after_id, reason=reason)
+
+
+def recent_etl_runs(limit: int = 20) -> List[Dict[str, Any]]:
+    """Return the newest *limit* etl_run_log rows with their stage breakdown."""
+    engine = _pg_engine()
+    if engine is None:
+        return []
+    run_log = _ensure_run_log_table(engine)
+    c = run_log.c
+    with engine.connect() as conn:
+        rows = conn.execute(
+            select(c.id, c.started_at, c.finished_at, c.status, c.rejected_count, c.stages)
+            .order_by(c.id.desc())
+            .limit(limit)
+        ).mappings().all()
+    return [
+        {
+            "id": row["id"],
+            "status": row["status"],
+            "started_at": row["started_at"].isoformat() if row["started_at"] else None,
+            "finished_at": row["finished_at"].isoformat() if row["finished_at"] else None,
+            "duration_seconds": (
+                round((row["finished_at"] - row["started_at"]).total_seconds(), 3)
+                if row["started_at"] and row["finished_at"]
+                else None
+            ),
+            "rejected_count": row["rejected_count"],
+            "stages": json.loads(row["stages"]) if row["stages"] else None,
+        }
+        for row in rows
+    ]
+
+
+def _created_at(sale: Dict[str, Any]) -> Optional[datetime]:
+    """Creation time of a sale as naive UTC, or None if absent/unparseable."""
+    raw = sale.get("created_at") or sale.get("timestamp")
+    if not raw:
+        return None
+    try:
+        ts = datetime.fromisoformat(str(raw))
+    except ValueError:
+        return None
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return ts
+
+
+class EtlLeaseLost(RuntimeError):
+    """Raised when the scheduled run's ETL lease is lost before it finishes."""
+
+
+def _check_lease(lease_lost: Optional[threading.Event], stage: str) -> None:
+    if lease_lost is not None and lease_lost.is_set():
+        raise EtlLeaseLost(f"ETL lease lost before {stage}")
+
+
+class SummaryAccumulator:
+    """Running aggregates for ``event_sales_summary`` and ``daily_ticket_sales``.
+
+    Raw event and sale dicts are folded in page by page and then discarded,
+    so memory grows with the number of events and event-days rather than the
+    number of sales.
+
+    With *until*, sales whose ``created_at``/``timestamp`` is at or after it
+    are counted in ``sales_deferred`` and left for the next extraction
+    window, so consecutive incremental runs never count a sale twice.
+
+    With *track_from*, the ids of counted sales created at or after it (or
+    without a creation time) are kept in ``sale_keys`` with their summary
+    keys, so the load can tell which webhook sales the pull counted.
+    """
+
+    def __init__(self, until: Optional[datetime] = None, track_from: Optional[datetime] = None) -> None:
+        self.until = until
+        self.track_from = track_from
+        self.event_names: Dict[str, str] = {}
+        self.totals: Dict[str, List[float]] = {}
+        self.daily: Dict[Tuple[str, date], List[float]] = {}
+        self.sale_keys: Dict[str, Tuple[str, date]] = {}
+        self.sales_seen = 0
+        self.sales_deferred = 0
+
+    def add_events(self, events: Iterable[Dict[str, Any]]) -> None:
+        for e in events:
+            eid = str(e.get("id") or e.get("event_id") or "")
+            if not eid:
+                continue
+            self.event_names[eid] = str(e.get("name") or e.get("title") or "")
+
+    def add_sales(self, sales: Iterable[Dict[str, Any]]) -> None:
+        totals, daily, until, track_from = self.totals, self.daily, self.until, self.track_from
+        for s in sales:
+            self.sales_seen += 1
+            created = _created_at(s) if until is not None or track_from is not None else None
+            if until is not None and created is not None and created >= until:
+                self.sales_deferred += 1
+                continue
+            eid = str(s.get("event_id") or s.get("eventId") or s.get("event") or "")
+            if not eid:
+                continue
+            qty = _safe_int(s.get("quantity") or s.get("qty") or 1)
+            price = _safe_float(s.get("price") or s.get("unit_price") or s.get("amount") or 0)
+            total_amount = _safe_float(s.get("total_amount") or (qty * price))
+            sd_raw = s.get("sale_date") or s.get("created_at") or s.get("timestamp")
+            try:
+                sd: date = datetime.fromisoformat(str(sd_raw)).date() if sd_raw else date.today()
+            except Exception:
+                sd = date.today()
+
+            t = totals.get(eid)
+            if t is None:
+                t = totals[eid] = [0, 0.0]
+            t[0] += qty
+            t[1] += total_amount
+
+            d = daily.get((eid, sd))
+            if d is None:
+                d = daily[(eid, sd)] = [0, 0.0]
+            d[0] += qty
+            d[1] += total_amount
+
+            if track_from is not None and (created is None or created >= track_from):
+                sale_id = s.get("id") or s.get("sale_id")
+                if sale_id:
+                    self.sale_keys[str(sale_id)] = (eid, sd)
+
+    def counted_sales(self, event_rows: Iterable[Dict[str, Any]], daily_rows: Iterable[Dict[str, Any]]) -> Set[str]:
+        """Ids in ``sale_keys`` whose event and daily rows are both among the (validated) rows given."""
+        events = {row["event_id"] for row in event_rows}
+        days = {(row["event_id"], row["sale_date"]) for row in daily_rows}
+        return {sale_id for sale_id, (eid, sd) in self.sale_keys.items() if eid in events and (eid, sd) in days}
+
+    def to_state(self) -> Dict[str, Any]:
+        """JSON-serialisable sales aggregates, used as the resume checkpoint.
+
+        Event names are not included; a resumed run re-reads ``/events``.
+        """
+        return {
+            "sales_seen": self.sales_seen,
+            "sales_deferred": self.sales_deferred,
+            "totals": self.totals,
+            "daily": [[eid, sd.isoformat(), tickets, revenue] for (eid, sd), (tickets, revenue) in self.daily.items()],
+            "sale_keys": [[sale_id, eid, sd.isoformat()] for sale_id, (eid, sd) in self.sale_keys.items()],
+        }
+
+    @classmethod
+    def from_state(
+        cls,
+        state: Dict[str, Any],
+        until: Optional[datetime] = None,
+        track_from: Optional[datetime] = None,
+    ) -> "SummaryAccumulator":
+        acc = cls(until, track_from)
+        acc.sales_seen = state.get("sales_seen", 0)
+        acc.sales_deferred = state.get("sales_deferred", 0)
+        acc.totals = {eid: list(agg) for eid, agg in state.get("totals", {}).items()}
+        acc.daily = {
+            (eid, date.fromisoformat(sd)): [tickets, revenue]
+            for eid, sd, tickets, revenue in state.get("daily", [])
+        }
+        acc.sale_keys = {
+            sale_id: (eid, date.fromisoformat(sd)) for sale_id, eid, sd in state.get("sale_keys", [])
+        }
+        return acc
+
+    def rows(self) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Return ``(event_summary_rows, daily_rows)`` for everything added so far."""
+        now = datetime.utcnow()
+        event_summary_rows = [
+            {
+                "event_id": eid,
+                "event_name": self.event_names.get(eid, ""),
+                "total_tickets": tickets,
+                "total_revenue": float(revenue),
+                "last_updated": now,
+            }
+            for eid, (tickets, revenue) in self.totals.items()
+        ]
+        daily_rows = [
+            {"event_id": eid, "sale_date": sd, "tickets_sold": tickets, "revenue": float(revenue)}
+            for (eid, sd), (tickets, revenue) in self.daily.items()
+        ]
+        return event_summary_rows, daily_rows
+
+
 def transform_summary(
     events: List[Dict[str, Any]],
     sales: List[Dict[str, Any]],
@@ -203,53 +663,132 @@ def transform_summary(
     Returns:
         (event_summary_rows, daily_rows)
     """
-    event_name_by_id: Dict[str, str] = {}
-    for e in events:
-        eid = str(e.get("id") or e.get("event_id") or "")
-        if not eid:
-            continue
-        event_name_by_id[eid] = str(e.get("name") or e.get("title") or "")
+    acc = SummaryAccumulator()
+    acc.add_events(events)
+    acc.add_sales(sales)
+    return acc.rows()
 
-    totals: Dict[str, Dict[str, Any]] = {}
-    daily: Dict[Tuple[str, date], Dict[str, Any]] = {}
 
-    for s in sales:
-        eid = str(s.get("event_id") or s.get("eventId") or s.get("event") or "")
-        if not eid:
-            continue
-        qty = _safe_int(s.get("quantity") or s.get("qty") or 1)
-        price = _safe_float(s.get("price") or s.get("unit_price") or s.get("amount") or 0)
-        total_amount = _safe_float(s.get("total_amount") or (qty * price))
-        sd_raw = s.get("sale_date") or s.get("created_at") or s.get("timestamp")
-        try:
-            sd: date = datetime.fromisoformat(str(sd_raw)).date() if sd_raw else date.today()
-        except Exception:
-            sd = date.today()
+def _as_ints(raw: List[Any]) -> np.ndarray:
+    """``_safe_int`` over *raw*, skipping the per-value calls when all are ints."""
+    if all(type(v) is int for v in raw):
+        return np.array(raw, dtype=np.int64)
+    return np.fromiter((_safe_int(v) for v in raw), dtype=np.int64, count=len(raw))
+
+
+def _as_floats(raw: List[Any]) -> np.ndarray:
+    """``_safe_float`` over *raw*, skipping the per-value calls when all are numbers."""
+    if all(type(v) is float or type(v) is int for v in raw):
+        return np.array(raw, dtype=np.float64)
+    return np.fromiter((_safe_float(v) for v in raw), dtype=np.float64, count=len(raw))
 
-        t = totals.setdefault(eid, {"event_id": eid, "total_tickets": 0, "total_revenue": 0.0})
-        t["total_tickets"] += qty
-        t["total_revenue"] += total_amount
 
-        dkey = (eid, sd)
-        d = daily.setdefault(dkey, {"event_id": eid, "sale_date": sd, "tickets_sold": 0, "revenue": 0.0})
-        d["tickets_sold"] += qty
-        d["revenue"] += total_amount
+def _first_seen_codes(keys: List[Any]) -> Tuple[List[Any], np.ndarray]:
+    """Number *keys* by first appearance: ``(unique keys, code per key)``."""
+    index = {key: code for code, key in enumerate(dict.fromkeys(keys))}
+    codes = np.fromiter(map(index.__getitem__, keys), dtype=np.intp, count=len(keys))
+    return list(index), codes
+
+
+def _parse_sale_date(raw: Any, today: date) -> date:
+    if not raw:
+        return today
+    try:
+        return datetime.fromisoformat(str(raw)).date()
+    except Exception:
+        return today
+
+
+def transform_summary_vectorized(
+    events: List[Dict[str, Any]],
+    sales: List[Dict[str, Any]],
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Column-wise equivalent of :func:`transform_summary` for large batches.
+
+    Field extraction still touches each sale once, but quantities, prices
+    and amounts become NumPy columns, each distinct date string is parsed
+    once, and the per-event and per-day totals are ``np.bincount`` group-bys.
+    ``bincount`` adds weights in input order, exactly like the per-row loop,
+    so revenues are bit-for-bit identical and rows come out in the same
+    (first-seen) order. Falls back to :func:`transform_summary` when ticket
+    counts do not fit the columns exactly (beyond 2**53).
+    """
+    try:
+        return _transform_columns(events, sales)
+    except OverflowError:
+        return transform_summary(events, sales)
+
+
+def _transform_columns(
+    events: List[Dict[str, Any]],
+    sales: List[Dict[str, Any]],
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    acc = SummaryAccumulator()
+    acc.add_events(events)
+
+    eids = [str(s.get("event_id") or s.get("eventId") or s.get("event") or "") for s in sales]
+    if "" in eids:
+        sales = [s for s, eid in zip(sales, eids) if eid]
+        eids = [eid for eid in eids if eid]
+    if not sales:
+        return [], []
+    n = len(sales)
+
+    qty = _as_ints([s.get("quantity") or s.get("qty") or 1 for s in sales])
+    price = _as_floats([s.get("price") or s.get("unit_price") or s.get("amount") or 0 for s in sales])
+    amount = qty * price
+    raw_totals = [s.get("total_amount") for s in sales]
+    given = np.fromiter(map(bool, raw_totals), dtype=bool, count=n)
+    if given.any():
+        amount[given] = _as_floats([t for t in raw_totals if t])
+
+    # Group rows by event, then by (event, parsed date); each distinct raw
+    # date value is parsed once.
+    event_keys, event_codes = _first_seen_codes(eids)
+    raw = [s.get("sale_date") or s.get("created_at") or s.get("timestamp") for s in sales]
+    if not all(type(v) is str for v in raw):
+        # Key on the string that gets parsed: 20260101 and 20260101.0 are
+        # equal dict keys but only one of them is an ISO date.
+        raw = [str(v) if v else "" for v in raw]
+    raw_dates, raw_date_codes = _first_seen_codes(raw)
+    today = date.today()
+    date_keys, date_of_raw = _first_seen_codes([_parse_sale_date(raw, today) for raw in raw_dates])
+    combined = event_codes.astype(np.int64) * len(date_keys) + date_of_raw[raw_date_codes]
+    unique_days, first_seen, inverse = np.unique(combined, return_index=True, return_inverse=True)
+    order = np.argsort(first_seen, kind="stable")
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    day_codes = rank[inverse]
+    unique_days = unique_days[order]
+
+    if np.abs(qty).sum(dtype=np.float64) >= 2**53:
+        raise OverflowError("ticket totals exceed exact float64 range")
+    tickets = np.bincount(event_codes, weights=qty, minlength=len(event_keys))
+    revenue = np.bincount(event_codes, weights=amount, minlength=len(event_keys))
+    day_tickets = np.bincount(day_codes, weights=qty, minlength=len(unique_days))
+    day_revenue = np.bincount(day_codes, weights=amount, minlength=len(unique_days))
 
     now = datetime.utcnow()
-    event_summary_rows: List[Dict[str, Any]] = []
-    for eid, agg in totals.items():
-        event_summary_rows.append({
+    event_summary_rows = [
+        {
             "event_id": eid,
-            "event_name": event_name_by_id.get(eid, ""),
-            "total_tickets": agg["total_tickets"],
-            "total_revenue": float(agg["total_revenue"]),
+            "event_name": acc.event_names.get(eid, ""),
+            "total_tickets": int(t),
+            "total_revenue": float(r),
             "last_updated": now,
-        })
-
-    daily_rows: List[Dict[str, Any]] = list(daily.values())
-    for r in daily_rows:
-        r["revenue"] = float(r["revenue"])
-
+        }
+        for eid, t, r in zip(event_keys, tickets.tolist(), revenue.tolist())
+    ]
+    n_dates = len(date_keys)
+    daily_rows = [
+        {
+            "event_id": event_keys[key // n_dates],
+            "sale_date": date_keys[key % n_dates],
+            "tickets_sold": int(t),
+            "revenue": float(r),
+        }
+        for key, t, r in zip(unique_days.tolist(), day_tickets.tolist(), day_revenue.tolist())
+    ]
     return event_summary_rows, daily_rows
 
 
@@ -261,17 +800,19 @@ def _pg_engine() -> Optional[Engine]:
     return _db.get_engine()
 
 
-def load_postgres(
-    event_summary_rows: List[Dict[str, Any]],
-    daily_rows: List[Dict[str, Any]],
-) -> None:
-    """Upsert event_summary and daily_ticket_sales rows into PostgreSQL."""
-    engine = _pg_engine()
-    if engine is None:
-        logger.info("DATABASE_URL not set; skipping Postgres load")
-        return
+def _chunked(rows: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    chunk: List[Dict[str, Any]] = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
 
-    metadata = MetaData()
+
+def _summary_tables(metadata: MetaData) -> Tuple[Table, Table]:
+    """Define ``event_sales_summary`` and ``daily_ticket_sales`` on *metadata*."""
     event_sales_summary = Table(
         "event_sales_summary",
         metadata,
@@ -289,292 +830,782 @@ def load_postgres(
         Column("tickets_sold", Integer),
         Column("revenue", Numeric(18, 2)),
     )
+    return event_sales_summary, daily_ticket_sales
 
-    with engine.begin() as conn:
-        metadata.create_all(conn)  # type: ignore[arg-type]
 
-        if event_summary_rows:
-            stmt = pg_insert(event_sales_summary).values(event_summary_rows)
-            stmt = stmt.on_conflict_do_update(
-                index_elements=[event_sales_summary.c.event_id],
-                set_={
-                    "event_name": stmt.excluded.event_name,
-                    "total_tickets": stmt.excluded.total_tickets,
-                    "total_revenue": stmt.excluded.total_revenue,
-                    "last_updated": stmt.excluded.last_updated,
-                },
-            )
-            conn.execute(stmt)
-
-        if daily_rows:
-            stmt2 = pg_insert(daily_ticket_sales).values(daily_rows)
-            stmt2 = stmt2.on_conflict_do_update(
-                index_elements=[daily_ticket_sales.c.event_id, daily_ticket_sales.c.sale_date],
-                set_={
-                    "tickets_sold": stmt2.excluded.tickets_sold,
-                    "revenue": stmt2.excluded.revenue,
-                },
-            )
-            conn.execute(stmt2)
+def _stage_table(target: Table) -> Table:
+    """Session-local (TEMPORARY) copy of *target*'s columns, without keys."""
+    return Table(
+        f"etl_stage_{target.name}",
+        MetaData(),
+        *(Column(col.name, col.type) for col in target.columns),
+        prefixes=["TEMPORARY"],
+    )
+
+
+def _copy_value(value: Any) -> str:
+    """Encode one value for COPY's text format."""
+    if value is None:
+        return "\\N"
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def _copy_rows(conn: Any, table: Table, rows: List[Dict[str, Any]]) -> None:
+    """Stream *rows* into *table* with ``COPY ... FROM STDIN`` (PostgreSQL)."""
+    columns = [col.name for col in table.columns]
+    buf = io.StringIO()
+    for row in rows:
+        buf.write("\t".join(_copy_value(row.get(name)) for name in columns))
+        buf.write("\n")
+    buf.seek(0)
+    cursor = conn.connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {table.name} ({', '.join(columns)}) FROM STDIN", buf)
+    finally:
+        cursor.close()
+
+
+def _stage_rows(
+    conn: Any,
+    target: Table,
+    rows: Iterable[Dict[str, Any]],
+    chunk_size: int,
+) -> Tuple[Table, int]:
+    """(Re)create *target*'s temp staging table and load *rows* into it in chunks.
+
+    On PostgreSQL each chunk is sent with ``COPY``; other dialects (SQLite in
+    tests) use an executemany INSERT. Returns the stage and the rows staged.
+    """
+    postgres = conn.dialect.name == "postgresql"
+    columns = [col.name for col in target.columns]
+    stage = _stage_table(target)
+    stage.drop(conn, checkfirst=True)
+    stage.create(conn)
+    staged = 0
+    for chunk in _chunked(rows, chunk_size):
+        if postgres:
+            _copy_rows(conn, stage, chunk)
+        else:
+            conn.execute(stage.insert(), [{name: row.get(name) for name in columns} for row in chunk])
+        staged += len(chunk)
+    return stage, staged
+
+
+def _stage_and_merge(
+    conn: Any,
+    target: Table,
+    rows: Iterable[Dict[str, Any]],
+    chunk_size: int,
+    key_columns: List[str],
+    set_: Callable[[Any], Dict[str, Any]],
+) -> int:
+    """Load *rows* into a temp staging table in chunks, then merge into *target*.
+
+    Staging goes through :func:`_stage_rows`. The merge is one set-based
+    ``INSERT ... SELECT ... ON CONFLICT DO UPDATE`` whose assignments come
+    from ``set_(excluded)``. Returns the number of rows staged.
+    """
+    stage, staged = _stage_rows(conn, target, rows, chunk_size)
+    if staged:
+        columns = [col.name for col in stage.columns]
+        insert = (pg_insert if conn.dialect.name == "postgresql" else sqlite_insert)(target)
+        # WHERE true keeps SQLite from parsing ON CONFLICT as a join clause.
+        stmt = insert.from_select(columns, select(*stage.columns).where(true()))
+        stmt = stmt.on_conflict_do_update(index_elements=key_columns, set_=set_(stmt.excluded))
+        conn.execute(stmt)
+    stage.drop(conn)
+    return staged
+
+
+def _merge_summaries(
+    conn: Any,
+    event_summary_rows: Iterable[Dict[str, Any]],
+    daily_rows: Iterable[Dict[str, Any]],
+    additive: bool,
+    chunk_size: int,
+) -> Tuple[int, int]:
+    """Stage and merge rows into both summary tables; returns the row counts.
+
+    With *additive*, ticket and revenue columns are added to the stored
+    values and an empty ``event_name`` keeps the stored name; otherwise the
+    rows replace the stored ones.
+    """
+    event_sales_summary, daily_ticket_sales = _summary_tables(MetaData())
+
+    if additive:
+        def event_set(excluded: Any) -> Dict[str, Any]:
+            return {
+                "event_name": func.coalesce(
+                    func.nullif(excluded.event_name, ""), event_sales_summary.c.event_name
+                ),
+                "total_tickets": event_sales_summary.c.total_tickets + excluded.total_tickets,
+                "total_revenue": event_sales_summary.c.total_revenue + excluded.total_revenue,
+                "last_updated": excluded.last_updated,
+            }
+
+        def daily_set(excluded: Any) -> Dict[str, Any]:
+            return {
+                "tickets_sold": daily_ticket_sales.c.tickets_sold + excluded.tickets_sold,
+                "revenue": daily_ticket_sales.c.revenue + excluded.revenue,
+            }
+    else:
+        def event_set(excluded: Any) -> Dict[str, Any]:
+            return {
+                "event_name": excluded.event_name,
+                "total_tickets": excluded.total_tickets,
+                "total_revenue": excluded.total_revenue,
+                "last_updated": excluded.last_updated,
+            }
+
+        def daily_set(excluded: Any) -> Dict[str, Any]:
+            return {
+                "tickets_sold": excluded.tickets_sold,
+                "revenue": excluded.revenue,
+            }
+
+    event_count = _stage_and_merge(
+        conn,
+        event_sales_summary,
+        event_summary_rows,
+        chunk_size,
+        key_columns=["event_id"],
+        set_=event_set,
+    )
+    daily_count = _stage_and_merge(
+        conn,
+        daily_ticket_sales,
+        daily_rows,
+        chunk_size,
+        key_columns=["event_id", "sale_date"],
+        set_=daily_set,
+    )
+    return event_count, daily_count
+
+
+def _delta_rows(
+    daily: Dict[Tuple[str, date], List[float]],
+    sign: int = 1,
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Additive event and daily rows for ``{(event_id, sale_date): [tickets, revenue]}``, times *sign*."""
+    now = datetime.utcnow()
+    totals: Dict[str, List[float]] = {}
+    for (eid, _), (tickets, revenue) in daily.items():
+        t = totals.setdefault(eid, [0, 0.0])
+        t[0] += tickets
+        t[1] += revenue
+    event_rows = [
+        {
+            "event_id": eid,
+            "event_name": "",
+            "total_tickets": sign * tickets,
+            "total_revenue": sign * revenue,
+            "last_updated": now,
+        }
+        for eid, (tickets, revenue) in totals.items()
+    ]
+    daily_rows = [
+        {"event_id": eid, "sale_date": sd, "tickets_sold": sign * tickets, "revenue": sign * revenue}
+        for (eid, sd), (tickets, revenue) in daily.items()
+    ]
+    return event_rows, daily_rows
+
+
+def _applied_webhook_sales(
+    conn: Any,
+    webhook_sales: Table,
+    counted: Collection[str],
+) -> Tuple[Dict[Tuple[str, date], List[float]], Dict[Tuple[str, date], List[float]], List[str]]:
+    """Split the applied webhook sales by whether the pull *counted* them.
+
+    Returns ``(absorbed, held, absorbed_ids)``: summary totals per
+    ``(event_id, sale_date)`` of the counted and the other applied sales,
+    and the counted sale ids.
+    """
+    c = webhook_sales.c
+    absorbed: Dict[Tuple[str, date], List[float]] = {}
+    held: Dict[Tuple[str, date], List[float]] = {}
+    absorbed_ids: List[str] = []
+    query = select(c.sale_id, c.event_id, c.sale_date, c.tickets, c.revenue).where(c.applied.is_(True))
+    for sale_id, eid, sd, tickets, revenue in conn.execute(query):
+        if sale_id in counted:
+            absorbed_ids.append(sale_id)
+            d = absorbed.setdefault((eid, sd), [0, 0.0])
+        else:
+            d = held.setdefault((eid, sd), [0, 0.0])
+        d[0] += int(tickets)
+        d[1] += float(revenue)
+    return absorbed, held, absorbed_ids
+
+
+def _webhook_tracking_start(engine: Engine) -> Optional[datetime]:
+    """Earliest creation time of a sale the webhook may have applied, or None without webhook sales.
+
+    Applied sales were created at or after the load cursor of their time,
+    so a pulled sale created earlier cannot be one of them.
+    """
+    _db.ensure_schema(engine, _LOAD_SCHEMA)
+    metadata = MetaData()
+    ledger = _load_ledger_table(metadata)
+    c = _webhook_sales_table(metadata).c
+    with engine.connect() as conn:
+        oldest = conn.execute(select(func.min(c.created_at)).where(c.applied.is_(True))).scalar()
+        cursor = _applied_cursor(conn, ledger)
+    if oldest is None and not get_settings().ETL_WEBHOOK_SECRET:
+        return None
+    if cursor is None:
+        return datetime.min
+    start = datetime.fromisoformat(cursor)
+    return min(start, oldest) if oldest is not None else start
+
+
+def load_postgres(
+    event_summary_rows: Iterable[Dict[str, Any]],
+    daily_rows: Iterable[Dict[str, Any]],
+    additive: bool = False,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    counted_sales: Collection[str] = (),
+) -> bool:
+    """Upsert event_summary and daily_ticket_sales rows into PostgreSQL.
+
+    Rows are copied into temporary staging tables ``ETL_LOAD_CHUNK_SIZE`` at
+    a time and merged into the targets with one set-based upsert per table,
+    all in a single transaction. Statement size and client memory stay
+    bounded by the chunk size, and target rows are only locked during the
+    merge.
+
+    With *additive*, rows are deltas: ticket and revenue columns are added
+    to the existing values instead of replacing them, and an empty
+    ``event_name`` keeps the stored name.
+
+    When *until* is given the load is recorded in ``etl_load_ledger`` under
+    the key of the ``(since, until)`` window in the same transaction; if
+    that window was already applied nothing is written and False is
+    returned, so a retried run cannot double count. The window's load also
+    absorbs the applied webhook sales whose ids are in *counted_sales* (see
+    :mod:`src.etl.webhook`): an incremental load subtracts them, and a full
+    load replaces them. Applied sales the pull did not count stay in the
+    totals, and a full load keeps them on top of the new ones.
+    """
+    engine = _pg_engine()
+    if engine is None:
+        logger.info("DATABASE_URL not set; skipping Postgres load")
+        return False
+
+    _db.ensure_schema(engine, _LOAD_SCHEMA)
+    metadata = MetaData()
+    ledger = _load_ledger_table(metadata)
+    webhook_sales = _webhook_sales_table(metadata)
+
+    chunk_size = get_settings().ETL_LOAD_CHUNK_SIZE
+    with engine.begin() as conn:
+        if until is not None:
+            _lock_summaries(conn)
+            load_key = _load_key(since, until)
+            insert = pg_insert if conn.dialect.name == "postgresql" else sqlite_insert
+            # Claimed first: a concurrent load of the same window blocks on
+            # the primary key until this transaction ends.
+            claimed = conn.execute(
+                insert(ledger)
+                .values(
+                    load_key=load_key,
+                    since_cursor=since,
+                    until_cursor=until,
+                    mode="incremental" if additive else "full",
+                    applied_at=datetime.utcnow(),
+                )
+                .on_conflict_do_nothing()
+            ).rowcount
+            if not claimed:
+                log_warning("ETL load skipped: window already applied", {"load_key": load_key})
+                return False
+
+        if until is None:
+            event_count, daily_count = _merge_summaries(conn, event_summary_rows, daily_rows, additive, chunk_size)
+        else:
+            absorbed, held, absorbed_ids = _applied_webhook_sales(conn, webhook_sales, set(counted_sales))
+            if additive:
+                event_count, daily_count = _merge_summaries(conn, event_summary_rows, daily_rows, True, chunk_size)
+                # The pulled deltas count these sales again.
+                if absorbed:
+                    _merge_summaries(conn, *_delta_rows(absorbed, -1), True, chunk_size)
+            else:
+                # Replacing would drop the webhook sales the pull did not
+                # count; take them out first and add them back on top.
+                if held:
+                    _merge_summaries(conn, *_delta_rows(held, -1), True, chunk_size)
+                event_count, daily_count = _merge_summaries(conn, event_summary_rows, daily_rows, False, chunk_size)
+                if held:
+                    _merge_summaries(conn, *_delta_rows(held), True, chunk_size)
+            for start in range(0, len(absorbed_ids), chunk_size):
+                chunk = absorbed_ids[start:start + chunk_size]
+                conn.execute(
+                    update(webhook_sales).where(webhook_sales.c.sale_id.in_(chunk)).values(applied=False)
+                )
 
     log_info(
         "ETL load completed",
         {
             "database": "PostgreSQL",
-            "event_summary_count": len(event_summary_rows),
-            "daily_sales_count": len(daily_rows),
+            "mode": "incremental" if additive else "full",
+            "event_summary_count": event_count,
+            "daily_sales_count": daily_count,
         },
     )
+    return True
 
 
 # ---------------------------------------------------------------------------
 # Load — BigQuery (optional)
 # ---------------------------------------------------------------------------
 
-def load_bigquery(
-    event_summary_rows: List[Dict[str, Any]],
-    daily_rows: List[Dict[str, Any]],
-) -> None:
-    """Stream event_summary and daily_ticket_sales rows into BigQuery (optional)."""
-    settings = get_settings()
-    if not settings.BQ_ENABLED:
-        return
+@lru_cache(maxsize=None)
+def _local_sink_engine(url: str) -> Engine:
+    return create_engine(url)
+
+
+def _warehouse_sink(settings: Any) -> Optional[Any]:
+    """Build the sink selected by ``BQ_SINK``, or None if it cannot be used."""
+    if settings.BQ_SINK == "local":
+        return LocalSQLSink(_local_sink_engine(settings.BQ_LOCAL_SINK_URL))
     if bigquery is None:
         logger.warning("google-cloud-bigquery not available; skipping BigQuery load")
-        return
-
+        return None
     project_id = settings.BQ_PROJECT_ID
-    dataset_id = settings.BQ_DATASET or "veritix"
-    table_ev = settings.BQ_TABLE_EVENT_SUMMARY
-    table_daily = settings.BQ_TABLE_DAILY_SALES
-
     if not project_id:
         logger.warning("BQ_PROJECT_ID not set; skipping BigQuery load")
-        return
-
-    client = bigquery.Client(project=project_id)
+        return None
+    return BigQuerySink(
+        bigquery.Client(project=project_id), project_id, settings.BQ_DATASET or "veritix", settings.BQ_LOCATION
+    )
 
-    from google.cloud.exceptions import NotFound  # type: ignore[import-untyped]  # noqa: PLC0415
 
-    try:
-        client.get_dataset(bigquery.DatasetReference(project_id, dataset_id))
-    except NotFound:
-        ds = bigquery.Dataset(f"{project_id}.{dataset_id}")
-        ds.location = settings.BQ_LOCATION or "US"
-        client.create_dataset(ds, exists_ok=True)
-
-    def _ensure_table(table_name: str, schema: List[Any]) -> str:
-        table_id = f"{project_id}.{dataset_id}.{table_name}"
-        try:
-            client.get_table(table_id)
-        except NotFound:
-            tbl = bigquery.Table(table_id, schema=schema)
-            client.create_table(tbl)
-        return table_id
-
-    ev_schema = [
-        bigquery.SchemaField("event_id", "STRING"),
-        bigquery.SchemaField("event_name", "STRING"),
-        bigquery.SchemaField("total_tickets", "INTEGER"),
-        bigquery.SchemaField("total_revenue", "NUMERIC"),
-        bigquery.SchemaField("last_updated", "TIMESTAMP"),
-    ]
-    daily_schema = [
-        bigquery.SchemaField("event_id", "STRING"),
-        bigquery.SchemaField("sale_date", "DATE"),
-        bigquery.SchemaField("tickets_sold", "INTEGER"),
-        bigquery.SchemaField("revenue", "NUMERIC"),
-    ]
+def _table_rows(engine: Engine, table: Table) -> Iterator[Dict[str, Any]]:
+    """Stream every row of *table* without materialising the result."""
+    with engine.connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=10000).execute(select(table))
+        for row in result.mappings():
+            yield dict(row)
 
-    ev_table_id = _ensure_table(table_ev, ev_schema)
-    daily_table_id = _ensure_table(table_daily, daily_schema)
 
-    ev_rows: List[Dict[str, Any]] = [
-        {
-            **row,
-            "last_updated": (
-                row["last_updated"].isoformat()
-                if isinstance(row.get("last_updated"), datetime)
-                else row.get("last_updated")
-            ),
-        }
-        for row in event_summary_rows
-    ]
-    daily_rows_json: List[Dict[str, Any]] = [
-        {
-            **row,
-            "sale_date": (
-                row["sale_date"].isoformat()
-                if isinstance(row.get("sale_date"), date)
-                else row.get("sale_date")
-            ),
-        }
-        for row in daily_rows
-    ]
-
-    errors1 = client.insert_rows_json(ev_table_id, ev_rows)
-    errors2 = client.insert_rows_json(daily_table_id, daily_rows_json)
+def load_bigquery(
+    event_summary_rows: Iterable[Dict[str, Any]],
+    daily_rows: Iterable[Dict[str, Any]],
+    sink: Optional[Any] = None,
+) -> None:
+    """Replace the warehouse copies of the summary tables with batch loads (optional).
 
-    if errors1:
-        log_error("BigQuery load errors (event summary)", {"errors": errors1})
-    if errors2:
-        log_error("BigQuery load errors (daily sales)", {"errors": errors2})
+    Each table is written to a temporary NDJSON file and loaded with one
+    ``WRITE_TRUNCATE`` job through *sink* (default: the one selected by
+    ``BQ_SINK``). When PostgreSQL is configured the tables are re-read from
+    it, because incremental runs only hold deltas; otherwise the given rows
+    are a full refresh and are loaded as they are.
+    """
+    settings = get_settings()
+    if sink is None:
+        if not settings.BQ_ENABLED:
+            return
+        sink = _warehouse_sink(settings)
+        if sink is None:
+            return
 
-    log_info(
-        "ETL load completed",
-        {
-            "database": "BigQuery",
-            "event_summary_count": len(ev_rows),
-            "daily_sales_count": len(daily_rows_json),
-        },
-    )
+    engine = _pg_engine()
+    event_summary_table, daily_table = _summary_tables(MetaData())
+    counts: Dict[str, int] = {}
+    with tempfile.TemporaryDirectory(prefix="veritix-etl-") as tmp:
+        for key, table_name, target, rows, schema in (
+            ("event_summary_count", settings.BQ_TABLE_EVENT_SUMMARY, event_summary_table,
+             event_summary_rows, EVENT_SUMMARY_SCHEMA),
+            ("daily_sales_count", settings.BQ_TABLE_DAILY_SALES, daily_table, daily_rows, DAILY_SALES_SCHEMA),
+        ):
+            if engine is not None:
+                rows = _table_rows(engine, target)
+            path = os.path.join(tmp, f"{table_name}.ndjson")
+            counts[key] = write_ndjson(path, rows, schema)
+            sink.load_file(table_name, schema, path)
+
+    log_info("ETL load completed", {"database": sink.name, **counts})
 
 
 # ---------------------------------------------------------------------------
 # ETL Diff (dry-run)
 # ---------------------------------------------------------------------------
 
+_DIFF_REVENUE_TOLERANCE = 0.005
+
+# (key columns, exact count column, revenue column) per summary table.
+_DIFF_COLUMNS = {
+    "events": (("event_id",), "total_tickets", "total_revenue"),
+    "daily": (("event_id", "sale_date"), "tickets_sold", "revenue"),
+}
+
+
+def _empty_diff() -> Dict[str, Any]:
+    return {"would_insert": 0, "would_update": 0, "unchanged": 0, "only_in_table": 0, "sample": []}
+
+
+def _diff_staged(conn: Any, target: Table, stage: Table, name: str, sample_limit: int) -> Dict[str, Any]:
+    """Compare *stage* with *target* using one FULL OUTER JOIN for counts and one for the sample."""
+    keys, count_col, revenue_col = _DIFF_COLUMNS[name]
+    if inspect(conn).has_table(target.name):
+        current: Any = target
+    else:
+        # Nothing loaded yet: compare against an empty relation of the same shape.
+        current = select(
+            *(cast(null(), col.type).label(col.name) for col in target.columns)
+        ).where(false()).subquery(target.name)
+
+    cur, new = current.c, stage.c
+    joined = stage.join(current, and_(*(new[k] == cur[k] for k in keys)), full=True)
+    missing_cur, missing_new = cur[keys[0]].is_(None), new[keys[0]].is_(None)
+    both = and_(cur[keys[0]].isnot(None), new[keys[0]].isnot(None))
+    changed = or_(
+        func.coalesce(cur[count_col], 0) != func.coalesce(new[count_col], 0),
+        func.abs(func.coalesce(cur[revenue_col], 0) - func.coalesce(new[revenue_col], 0)) > _DIFF_REVENUE_TOLERANCE,
+    )
+    counts = conn.execute(
+        select(
+            func.count().filter(missing_cur),
+            func.count().filter(and_(both, changed)),
+            func.count().filter(and_(both, not_(changed))),
+            func.count().filter(missing_new),
+        ).select_from(joined)
+    ).one()
+    result = dict(zip(("would_insert", "would_update", "unchanged", "only_in_table"), map(int, counts)))
+
+    change = case((missing_cur, "insert"), (missing_new, "only_in_table"), else_="update")
+    key_exprs = [func.coalesce(new[k], cur[k]).label(k) for k in keys]
+    rows = conn.execute(
+        select(
+            change.label("change"),
+            *key_exprs,
+            cur[count_col].label("cur_count"),
+            cur[revenue_col].label("cur_revenue"),
+            new[count_col].label("new_count"),
+            new[revenue_col].label("new_revenue"),
+        )
+        .select_from(joined)
+        .where(or_(missing_cur, missing_new, changed))
+        .order_by(*key_exprs)
+        .limit(sample_limit)
+    ).mappings().all()
+
+    def _side(count: Any, revenue: Any) -> Optional[Dict[str, Any]]:
+        if count is None and revenue is None:
+            return None
+        return {count_col: count, revenue_col: float(revenue) if revenue is not None else None}
+
+    result["sample"] = [
+        {
+            "change": row["change"],
+            **{k: row[k].isoformat() if isinstance(row[k], date) else row[k] for k in keys},
+            "current": None if row["change"] == "insert" else _side(row["cur_count"], row["cur_revenue"]),
+            "incoming": None if row["change"] == "only_in_table" else _side(row["new_count"], row["new_revenue"]),
+        }
+        for row in rows
+    ]
+    return result
+
+
 def diff_etl_output(
-    event_rows: List[Dict[str, Any]],
-    daily_rows: List[Dict[str, Any]],
+    event_rows: Iterable[Dict[str, Any]],
+    daily_rows: Iterable[Dict[str, Any]],
+    sample_limit: Optional[int] = None,
 ) -> Dict[str, Any]:
     """Compare transformed rows against the current PostgreSQL data without loading.
 
-    Returns a summary of what the next real ETL run would insert, update, or leave
-    unchanged for both the event_sales_summary and daily_ticket_sales tables.
+    The fresh rows are bulk-loaded into session temp tables (the same staging
+    path as :func:`load_postgres`) and compared with the live tables by
+    ``FULL OUTER JOIN`` inside a transaction that is rolled back, so only
+    aggregate counts and at most *sample_limit* (default
+    ``ETL_DIFF_SAMPLE_LIMIT``) differing rows per table leave the database.
+
+    Per table the result holds ``would_insert``, ``would_update``,
+    ``unchanged``, ``only_in_table`` (rows a full refresh would not touch) and
+    ``sample``.
     """
     engine = _pg_engine()
     if engine is None:
         logger.info("DATABASE_URL not set; returning empty diff")
-        return {
-            "events": {"would_insert": 0, "would_update": 0, "unchanged": 0},
-            "daily": {"would_insert": 0, "would_update": 0, "unchanged": 0},
-        }
+        return {"events": _empty_diff(), "daily": _empty_diff()}
 
-    current_events: Dict[str, Dict[str, Any]] = {}
-    current_daily: Dict[tuple, Dict[str, Any]] = {}
+    settings = get_settings()
+    if sample_limit is None:
+        sample_limit = settings.ETL_DIFF_SAMPLE_LIMIT
+    event_summary_table, daily_table = _summary_tables(MetaData())
+    daily_rows = (
+        {**row, "sale_date": date.fromisoformat(row["sale_date"])} if isinstance(row.get("sale_date"), str) else row
+        for row in daily_rows
+    )
 
+    result: Dict[str, Any] = {}
     with engine.connect() as conn:
+        tx = conn.begin()
         try:
-            result = conn.execute(
-                text("SELECT event_id, total_tickets, total_revenue FROM event_sales_summary")
-            )
-            for row in result:
-                current_events[str(row[0])] = {
-                    "total_tickets": int(row[1]) if row[1] is not None else 0,
-                    "total_revenue": float(row[2]) if row[2] is not None else 0.0,
-                }
-        except Exception:
-            pass  # table may not exist yet
-
-        try:
-            result = conn.execute(
-                text("SELECT event_id, sale_date, tickets_sold, revenue FROM daily_ticket_sales")
-            )
-            for row in result:
-                current_daily[(str(row[0]), str(row[1]))] = {
-                    "tickets_sold": int(row[2]) if row[2] is not None else 0,
-                    "revenue": float(row[3]) if row[3] is not None else 0.0,
-                }
-        except Exception:
-            pass  # table may not exist yet
-
-    ev_insert = ev_update = ev_unchanged = 0
-    for row in event_rows:
-        eid = str(row.get("event_id", ""))
-        if eid not in current_events:
-            ev_insert += 1
-        else:
-            cur = current_events[eid]
-            if (
-                cur["total_tickets"] != int(row.get("total_tickets", 0))
-                or abs(cur["total_revenue"] - float(row.get("total_revenue", 0.0))) > 0.005
+            for name, target, rows in (
+                ("events", event_summary_table, event_rows),
+                ("daily", daily_table, daily_rows),
             ):
-                ev_update += 1
-            else:
-                ev_unchanged += 1
+                stage, _ = _stage_rows(conn, target, rows, settings.ETL_LOAD_CHUNK_SIZE)
+                result[name] = _diff_staged(conn, target, stage, name, sample_limit)
+        finally:
+            # A dry run never commits; rolling back also discards the temp tables.
+            tx.rollback()
+    return result
 
-    daily_insert = daily_update = daily_unchanged = 0
-    for row in daily_rows:
-        key = (str(row.get("event_id", "")), str(row.get("sale_date", "")))
-        if key not in current_daily:
-            daily_insert += 1
+
+# ---------------------------------------------------------------------------
+# Orchestration
+# ---------------------------------------------------------------------------
+
+def _extract_summary(
+    since: Optional[str],
+    until: Optional[datetime] = None,
+    resume: Optional[Dict[str, Any]] = None,
+    checkpoint: Optional[Callable[[int, Dict[str, Any]], None]] = None,
+    timings: Optional[StageTimings] = None,
+    page_cache: Optional[PageCache] = None,
+    track_from: Optional[datetime] = None,
+) -> SummaryAccumulator:
+    """Stream upstream pages into a :class:`SummaryAccumulator`.
+
+    With *resume*, aggregation restarts from the checkpointed state and
+    ``/ticket-sales`` from the page after the checkpoint. *checkpoint* is
+    called with ``(sales_page, state)`` every ``ETL_CHECKPOINT_EVERY_PAGES``
+    sales pages. Time spent folding pages is recorded in *timings* as the
+    ``transform`` stage and the rest as ``extract``.
+
+    With *page_cache*, requests are conditional. Pages answered ``304`` are
+    only folded once a changed page arrives (re-read from the cache, in
+    order); if none does, ``page_cache.unchanged`` is True and nothing is
+    folded.
+
+    *track_from* is passed to the accumulator (see
+    :class:`SummaryAccumulator`).
+    """
+    settings = get_settings()
+    if resume:
+        acc = SummaryAccumulator.from_state(resume["state"], until, track_from)
+    else:
+        acc = SummaryAccumulator(until, track_from)
+    start_page = resume["sales_page"] + 1 if resume else 1
+    every = settings.ETL_CHECKPOINT_EVERY_PAGES
+    sales_pages = 0
+    fold_seconds = 0.0
+    records = 0
+    # 304 pages seen before the first changed page, without their items.
+    deferred: List[Page] = []
+    changed = False
+
+    def consume(page: Page) -> None:
+        nonlocal changed, records
+        records += len(page.items)
+        if page.cache_url is not None and not changed:
+            deferred.append(page._replace(items=[]))
+            return
+        changed = True
+        for cached in deferred:
+            fold(cached._replace(items=page_cache.items(cached.cache_url)))
+        deferred.clear()
+        fold(page)
+
+    def fold(page: Page) -> None:
+        nonlocal sales_pages, fold_seconds
+        fold_started = time.perf_counter()
+        if page.dataset == "events":
+            acc.add_events(page.items)
+            fold_seconds += time.perf_counter() - fold_started
+            return
+        acc.add_sales(page.items)
+        fold_seconds += time.perf_counter() - fold_started
+        sales_pages += 1
+        if checkpoint is not None and sales_pages % every == 0:
+            checkpoint(page.number, acc.to_state())
+
+    started = time.perf_counter()
+    concurrency = settings.ETL_EXTRACT_CONCURRENCY
+    with collect_extract_stats() as stats:
+        if concurrency > 1:
+            async def _consume_async() -> None:
+                async for page in stream_pages_async(
+                    since=since, concurrency=concurrency, sales_start_page=start_page, cache=page_cache
+                ):
+                    consume(page)
+
+            asyncio.run(_consume_async())
         else:
-            cur = current_daily[key]
-            if (
-                cur["tickets_sold"] != int(row.get("tickets_sold", 0))
-                or abs(cur["revenue"] - float(row.get("revenue", 0.0))) > 0.005
-            ):
-                daily_update += 1
-            else:
-                daily_unchanged += 1
+            for page in stream_pages(since=since, sales_start_page=start_page, cache=page_cache):
+                consume(page)
+    if timings is not None:
+        timings.record(
+            "extract",
+            time.perf_counter() - started - fold_seconds,
+            rows_out=records,
+            pages=stats.pages,
+            bytes=stats.bytes,
+            retries=stats.retries,
+            not_modified=stats.not_modified,
+        )
+        if changed or page_cache is None:
+            timings.record("transform", fold_seconds, rows_in=records)
+    if page_cache is not None:
+        ETL_LAST_RUN_CACHE_HIT_RATIO.set(page_cache.hit_ratio)
 
-    return {
-        "events": {
-            "would_insert": ev_insert,
-            "would_update": ev_update,
-            "unchanged": ev_unchanged,
-        },
-        "daily": {
-            "would_insert": daily_insert,
-            "would_update": daily_update,
-            "unchanged": daily_unchanged,
+    log_info(
+        "ETL extract completed",
+        {
+            "events_count": len(acc.event_names),
+            "sales_count": acc.sales_seen,
+            "sales_deferred": acc.sales_deferred,
+            "sales_pages": sales_pages,
+            "since": since,
+            "resumed_from_page": start_page - 1 if resume else None,
+            "cache_hit_ratio": round(page_cache.hit_ratio, 4) if page_cache is not None else None,
         },
-    }
+    )
+    return acc
 
 
-# ---------------------------------------------------------------------------
-# Orchestration
-# ---------------------------------------------------------------------------
+def run_etl_diff(sample_limit: Optional[int] = None) -> Dict[str, Any]:
+    """Extract the full upstream dataset and diff it against the loaded tables."""
+    event_rows, daily_rows = _extract_summary(None).rows()
+    return diff_etl_output(event_rows, daily_rows, sample_limit=sample_limit)
+
+
+def run_etl_once(full_refresh: bool = False, lease_lost: Optional[threading.Event] = None) -> None:
+    """Run a single ETL cycle: extract → transform → validate → load.
 
-def run_etl_once() -> None:
-    """Run a single full ETL cycle: extract → transform → validate → load."""
+    Each run covers the window ``[since, until)``: ``since`` is the ``until``
+    of the last applied load (``None`` on the first run or with
+    *full_refresh*) and ``until`` is this run's start time. A full run
+    replaces the summary rows; an incremental run adds its deltas to them.
+
+    When *lease_lost* is set (see :mod:`src.etl.leader`), the run stops at
+    the next checkpoint or stage boundary with :class:`EtlLeaseLost` and is
+    logged as failed, so it never loads while another process may hold
+    the lease.
+    """
     started_at = datetime.utcnow()
-    log_info("ETL job started")
+    log_info("ETL job started", {"full_refresh": full_refresh})
 
-    # --- Cursor: load last successful run timestamp (issue #161) ---
+    # --- Cursor: end of the last applied window (issue #161) ---
     engine = _pg_engine()
     run_log_table: Optional[Table] = None
+    run_id: Optional[int] = None
     since: Optional[str] = None
+    until = started_at.isoformat()
+    resume: Optional[Dict[str, Any]] = None
     if engine is not None:
         try:
             run_log_table = _ensure_run_log_table(engine)
-            since = _load_last_successful_cursor(engine)
+            if not full_refresh:
+                resume = _load_resume_checkpoint(engine, run_log_table)
+            if resume:
+                since, until = resume["since"], resume["until"] or until
+            elif not full_refresh:
+                since = _load_applied_cursor(engine) or _load_last_successful_cursor(engine)
+            run_id = _start_run_log(engine, run_log_table, started_at, since, until, resume)
         except Exception as exc:
             log_error("Failed to initialise ETL run log", {"error": str(exc)})
 
-    log_info("ETL extract cursor", {"since": since})
+    log_info(
+        "ETL extract cursor",
+        {
+            "since": since,
+            "until": until,
+            "resume_sales_page": resume["sales_page"] if resume else None,
+        },
+    )
+
+    # Conditional requests only pay off when the same URLs are requested
+    # again, i.e. for full extractions; a resumed run must fold every page.
+    page_cache: Optional[PageCache] = None
+    if engine is not None and since is None and resume is None and get_settings().ETL_CONDITIONAL_EXTRACT:
+        try:
+            page_cache = PageCache(engine)
+        except Exception as exc:
+            log_error("Failed to open ETL page cache", {"error": str(exc)})
+
+    def checkpoint(sales_page: int, state: Dict[str, Any]) -> None:
+        _check_lease(lease_lost, "checkpoint")
+        if engine is not None and run_log_table is not None and run_id is not None:
+            _save_checkpoint(engine, run_log_table, run_id, sales_page, state)
 
     rejected_count = 0
     status = "failed"
+    timings = StageTimings()
     try:
-        events, sales = extract_events_and_sales(since=since)
-        ev_rows, daily_rows = transform_summary(
-            [event.raw for event in events],
-            [sale.raw for sale in sales],
+        # Extract and transform are fused: each page is folded into running
+        # aggregates and dropped, so memory does not grow with sales volume.
+        # Ids of pulled sales the webhook may already have applied.
+        track_from = _webhook_tracking_start(engine) if engine is not None else None
+        acc = _extract_summary(
+            since, datetime.fromisoformat(until), resume, checkpoint, timings, page_cache, track_from
         )
+        _check_lease(lease_lost, "transform")
+        if page_cache is not None and page_cache.unchanged:
+            # Every page is byte-for-byte what an earlier run already loaded.
+            log_info("ETL upstream unchanged; skipping transform and load", {"pages": page_cache.hits})
+            page_cache.commit()
+            status = "unchanged"
+            return
+        with timings.time("transform") as counts:
+            ev_rows, daily_rows = acc.rows()
+            counts["rows_out"] = len(ev_rows) + len(daily_rows)
 
         # --- Validation step (issue #162) ---
-        ev_rows, daily_rows, rejected_count = validate_rows(ev_rows, daily_rows)
+        rejects = RejectCollector()
+        with timings.time("validate", rows_in=len(ev_rows) + len(daily_rows)) as counts:
+            ev_rows, daily_rows, rejected_count = validate_rows(ev_rows, daily_rows, rejects)
+            counts["rows_out"] = len(ev_rows) + len(daily_rows)
+            if rejected_count and engine is not None:
+                # Quarantine rejects in bulk; a failure here must not block the load.
+                try:
+                    rejects.write(engine, run_id, get_settings().ETL_LOAD_CHUNK_SIZE)
+                except Exception as exc:
+                    log_error("Failed to quarantine rejected ETL rows", {"error": str(exc)})
         if rejected_count:
-            log_warning(
-                "ETL validation rejected rows",
-                {"rejected_count": rejected_count},
-            )
+            log_warning("ETL validation rejected rows", {"run_id": run_id, **rejects.summary()})
 
+        _check_lease(lease_lost, "load")
         try:
-            load_postgres(ev_rows, daily_rows)
+            with timings.time("load", rows_in=len(ev_rows) + len(daily_rows)):
+                applied = load_postgres(
+                    ev_rows,
+                    daily_rows,
+                    additive=since is not None,
+                    since=since,
+                    until=until,
+                    counted_sales=acc.counted_sales(ev_rows, daily_rows),
+                )
         except Exception as exc:
             log_error("Postgres load failed", {"error": str(exc)})
             raise
-        try:
-            load_bigquery(ev_rows, daily_rows)
-        except Exception as exc:
-            log_error("BigQuery load failed", {"error": str(exc)})
+        if applied or engine is None:
+            try:
+                with timings.time("warehouse"):
+                    load_bigquery(ev_rows, daily_rows)
+            except Exception as exc:
+                log_error("BigQuery load failed", {"error": str(exc)})
+        if page_cache is not None:
+            try:
+                page_cache.commit()
+            except Exception as exc:
+                log_warning("Failed to commit ETL page cache", {"error": str(exc)})
 
         status = "success"
     finally:
         finished_at = datetime.utcnow()
+        timings.observe()
+        stages = timings.to_dict()
         if engine is not None and run_log_table is not None:
             _save_run_log(
                 engine,
@@ -583,6 +1614,8 @@ def run_etl_once() -> None:
                 finished_at=finished_at,
                 status=status,
                 rejected_count=rejected_count,
+                run_id=run_id,
+                stages=stages,
             )
         ETL_JOBS_TOTAL.labels(status=status).inc()
-        log_info("ETL job completed", {"status": status, "rejected_count": rejected_count})
\ No newline at end of file
+        log_info("ETL job completed", {"status": status, "rejected_count": rejected_count, "stages": stages})
\ No newline at end of file
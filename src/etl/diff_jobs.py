@@ -0,0 +1,189 @@
+"""Background job manager for ``GET /etl/diff`` dry runs.
+
+Diffs run on a fixed-size worker pool, so at most ``max_workers`` extracts
+hit the upstream API at once, and at most ``max_pending`` jobs may be queued
+or running; further submissions are refused. Identical requests (same job
+key) share the job that is already in flight. Finished jobs are kept for
+``ttl_seconds`` so clients can poll them, then evicted.
+
+Whether a request is answered synchronously is decided before any work is
+done: it goes async when the previous diff took longer than
+``sync_seconds``, when every worker is busy, or when it joins a job that is
+already running.
+"""
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from src.config import get_settings
+from src.logging_config import ETL_DIFF_JOBS_RUNNING, ETL_DIFF_QUEUE_DEPTH, log_error, log_info
+
+from . import run_etl_diff
+
+PENDING = "pending"
+RUNNING = "running"
+COMPLETE = "complete"
+FAILED = "failed"
+
+
+class DiffQueueFull(Exception):
+    """Raised when ``max_pending`` diff jobs are already queued or running."""
+
+
+@dataclass
+class DiffJob:
+    job_id: str
+    key: Hashable
+    status: str = PENDING
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    finished_at: Optional[float] = None
+    future: Optional[Future] = field(default=None, repr=False)
+
+    def to_dict(self) -> Dict[str, Any]:
+        body: Dict[str, Any] = {"job_id": self.job_id, "status": self.status}
+        if self.status == COMPLETE:
+            body["result"] = self.result
+        elif self.status == FAILED:
+            body["error"] = self.error
+        return body
+
+
+class DiffJobManager:
+    """Runs diff jobs on a bounded pool and keeps their results for a while."""
+
+    def __init__(
+        self,
+        run: Callable[[Hashable], Dict[str, Any]],
+        max_workers: int,
+        max_pending: int,
+        ttl_seconds: float,
+        sync_seconds: float,
+        max_finished: int = 100,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._run_job = run
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.ttl_seconds = ttl_seconds
+        self.sync_seconds = sync_seconds
+        self.max_finished = max_finished
+        self._clock = clock
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._jobs: "OrderedDict[str, DiffJob]" = OrderedDict()
+        self._in_flight: Dict[Hashable, DiffJob] = {}
+        self._running = 0
+        self._last_duration: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def submit(self, key: Hashable) -> Tuple[DiffJob, bool]:
+        """Return ``(job, run_async)`` for a request identified by *key*.
+
+        Joins the in-flight job with the same key if there is one.
+        Raises :class:`DiffQueueFull` when the pool's backlog is full.
+        """
+        with self._lock:
+            self._evict()
+            job = self._in_flight.get(key)
+            if job is not None:
+                return job, True
+            if len(self._in_flight) >= self.max_pending:
+                raise DiffQueueFull(f"{len(self._in_flight)} ETL diff jobs already pending")
+            run_async = (
+                len(self._in_flight) >= self.max_workers
+                or (self._last_duration is not None and self._last_duration > self.sync_seconds)
+            )
+            job = DiffJob(job_id=str(uuid.uuid4()), key=key)
+            self._jobs[job.job_id] = job
+            self._in_flight[key] = job
+            self._update_gauges()
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="etl-diff")
+            job.future = self._executor.submit(self._execute, job)
+        return job, run_async
+
+    def wait(self, job: DiffJob, timeout: Optional[float] = None) -> DiffJob:
+        """Block until *job* has finished (or *timeout* elapses) and return it."""
+        if job.future is not None:
+            job.future.result(timeout=timeout)
+        return job
+
+    def get(self, job_id: str) -> Optional[DiffJob]:
+        """Return a job that is still in flight or not yet expired."""
+        with self._lock:
+            self._evict()
+            return self._jobs.get(job_id)
+
+    def queue_depth(self) -> int:
+        """Jobs accepted but not yet picked up by a worker."""
+        with self._lock:
+            return len(self._in_flight) - self._running
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+        with self._lock:
+            for key, job in list(self._in_flight.items()):
+                if job.future is not None and job.future.cancelled():
+                    job.status, job.error, job.finished_at = FAILED, "cancelled at shutdown", self._clock()
+                    del self._in_flight[key]
+            self._update_gauges()
+
+    def _execute(self, job: DiffJob) -> None:
+        with self._lock:
+            job.status = RUNNING
+            self._running += 1
+            self._update_gauges()
+        started = self._clock()
+        try:
+            result = self._run_job(job.key)
+        except Exception as exc:
+            log_error("ETL diff job failed", {"job_id": job.job_id, "error": str(exc)})
+            job.error = str(exc)
+            status = FAILED
+        else:
+            job.result = result
+            status = COMPLETE
+        duration = self._clock() - started
+        with self._lock:
+            job.status = status
+            job.finished_at = self._clock()
+            self._running -= 1
+            self._in_flight.pop(job.key, None)
+            self._last_duration = duration
+            self._update_gauges()
+        log_info("ETL diff job finished", {"job_id": job.job_id, "status": status, "duration_s": round(duration, 3)})
+
+    def _evict(self) -> None:
+        """Drop finished jobs past their TTL, and the oldest beyond ``max_finished``."""
+        now = self._clock()
+        finished = [job for job in self._jobs.values() if job.finished_at is not None]
+        excess = len(finished) - self.max_finished
+        for job in finished:
+            if excess > 0 or now - job.finished_at >= self.ttl_seconds:
+                del self._jobs[job.job_id]
+                excess -= 1
+
+    def _update_gauges(self) -> None:
+        ETL_DIFF_QUEUE_DEPTH.set(len(self._in_flight) - self._running)
+        ETL_DIFF_JOBS_RUNNING.set(self._running)
+
+
+def _build_manager() -> DiffJobManager:
+    settings = get_settings()
+    return DiffJobManager(
+        run=run_etl_diff,
+        max_workers=settings.ETL_DIFF_MAX_CONCURRENCY,
+        max_pending=settings.ETL_DIFF_MAX_PENDING,
+        ttl_seconds=settings.ETL_DIFF_JOB_TTL_SECONDS,
+        sync_seconds=settings.ETL_DIFF_SYNC_SECONDS,
+    )
+
+
+diff_jobs = _build_manager()
@@ -1,17 +1,30 @@
+import asyncio
 import logging
 import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, AsyncIterator, Deque, Dict, Iterator, List, NamedTuple, Optional, Tuple
 
 import httpx
 
 from src.config import get_settings
-from src.logging_config import log_info
+from src.logging_config import (
+    ETL_EXTRACT_BYTES_TOTAL,
+    ETL_EXTRACT_NOT_MODIFIED_TOTAL,
+    ETL_EXTRACT_PAGE_DURATION,
+    ETL_EXTRACT_PAGES_TOTAL,
+    ETL_EXTRACT_RECORDS_TOTAL,
+    ETL_EXTRACT_RETRIES_TOTAL,
+    log_info,
+)
 
 logger = logging.getLogger("veritix.etl.extract")
 
 REQUEST_TIMEOUT_SECONDS = 30.0
 MAX_RETRIES = 3
+DEFAULT_CONCURRENCY = 4
 
 
 @dataclass(frozen=True)
@@ -95,6 +108,54 @@ def _next_page(payload: Any, current_page: int) -> Optional[int]:
     return None
 
 
+def _total_pages(payload: Any) -> int:
+    """Return the advertised page count of a paginated envelope, or 0."""
+    if not isinstance(payload, dict):
+        return 0
+    pagination = payload.get("pagination")
+    source = pagination if isinstance(pagination, dict) else payload
+    return _to_int(source.get("total_pages") or source.get("totalPages"), 0)
+
+
+def _record_count(response: httpx.Response) -> int:
+    try:
+        payload: Any = response.json() if response.content else []
+    except ValueError:
+        payload = []
+    return len(_normalize_items(payload))
+
+
+class ExtractStats:
+    """Pages, records, bytes, retries and 304s counted by :func:`collect_extract_stats`."""
+
+    __slots__ = ("pages", "records", "bytes", "retries", "not_modified")
+
+    def __init__(self) -> None:
+        self.pages = self.records = self.bytes = self.retries = self.not_modified = 0
+
+
+# Set for the duration of collect_extract_stats(); asyncio tasks inherit it.
+_extract_stats: ContextVar[Optional[ExtractStats]] = ContextVar("etl_extract_stats", default=None)
+
+
+@contextmanager
+def collect_extract_stats() -> Iterator[ExtractStats]:
+    """Count the pages fetched in this context (thread or task) into one object."""
+    stats = ExtractStats()
+    token = _extract_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _extract_stats.reset(token)
+
+
+def _count_retry(dataset: str) -> None:
+    ETL_EXTRACT_RETRIES_TOTAL.labels(dataset=dataset).inc()
+    stats = _extract_stats.get()
+    if stats is not None:
+        stats.retries += 1
+
+
 def _request_with_retry(
     client: httpx.Client,
     url: str,
@@ -105,25 +166,23 @@ def _request_with_retry(
     for attempt in range(1, MAX_RETRIES + 1):
         try:
             response = client.get(url, headers=headers, params=params)
-            try:
-                payload: Any = response.json() if response.content else []
-            except ValueError:
-                payload = []
-            record_count = len(_normalize_items(payload))
             log_info(
                 "ETL extract attempt",
                 {
                     "dataset": dataset,
                     "attempt": attempt,
                     "status_code": response.status_code,
-                    "record_count": record_count,
+                    "record_count": _record_count(response),
                 },
             )
 
             if 500 <= response.status_code < 600 and attempt < MAX_RETRIES:
+                _count_retry(dataset)
                 time.sleep(2 ** (attempt - 1))
                 continue
 
+            if response.status_code == 304:
+                return response
             response.raise_for_status()
             return response
         except httpx.RequestError as exc:
@@ -139,11 +198,61 @@ def _request_with_retry(
             )
             if attempt >= MAX_RETRIES:
                 raise
+            _count_retry(dataset)
             time.sleep(2 ** (attempt - 1))
 
     raise RuntimeError("unreachable")
 
 
+async def _request_with_retry_async(
+    client: httpx.AsyncClient,
+    url: str,
+    headers: Dict[str, str],
+    dataset: str,
+    params: Optional[Dict[str, Any]] = None,
+) -> httpx.Response:
+    """Async twin of :func:`_request_with_retry` with the same retry policy."""
+    for attempt in range(1, MAX_RETRIES + 1):
+        try:
+            response = await client.get(url, headers=headers, params=params)
+            log_info(
+                "ETL extract attempt",
+                {
+                    "dataset": dataset,
+                    "attempt": attempt,
+                    "status_code": response.status_code,
+                    "record_count": _record_count(response),
+                },
+            )
+
+            if 500 <= response.status_code < 600 and attempt < MAX_RETRIES:
+                _count_retry(dataset)
+                await asyncio.sleep(2 ** (attempt - 1))
+                continue
+
+            if response.status_code == 304:
+                return response
+            response.raise_for_status()
+            return response
+        except httpx.RequestError as exc:
+            log_info(
+                "ETL extract attempt",
+                {
+                    "dataset": dataset,
+                    "attempt": attempt,
+                    "status_code": None,
+                    "record_count": 0,
+                    "error": str(exc),
+                },
+            )
+            if attempt >= MAX_RETRIES:
+                raise
+            _count_retry(dataset)
+            await asyncio.sleep(2 ** (attempt - 1))
+
+    raise RuntimeError("unreachable")
+
+
 def _to_event_record(item: Dict[str, Any]) -> EventRecord:
     event_id = str(item.get("id") or item.get("event_id") or "")
     event_name = str(item.get("name") or item.get("title") or "")
@@ -172,6 +281,123 @@ def _to_ticket_sale_record(item: Dict[str, Any]) -> TicketSaleRecord:
     )
 
 
+class Page(NamedTuple):
+    """One page of raw upstream records."""
+
+    dataset: str  # "events" | "ticket-sales"
+    number: int
+    items: List[Dict[str, Any]]
+    # Request URL when the page was served from the page cache (304).
+    cache_url: Optional[str] = None
+
+
+def _meter_page(dataset: str, response: httpx.Response, items: List[Dict[str, Any]], seconds: float) -> None:
+    not_modified = response.status_code == 304
+    ETL_EXTRACT_PAGES_TOTAL.labels(dataset=dataset).inc()
+    ETL_EXTRACT_RECORDS_TOTAL.labels(dataset=dataset).inc(len(items))
+    ETL_EXTRACT_BYTES_TOTAL.labels(dataset=dataset).inc(len(response.content))
+    ETL_EXTRACT_PAGE_DURATION.labels(dataset=dataset).observe(seconds)
+    if not_modified:
+        ETL_EXTRACT_NOT_MODIFIED_TOTAL.labels(dataset=dataset).inc()
+    stats = _extract_stats.get()
+    if stats is not None:
+        stats.pages += 1
+        stats.records += len(items)
+        stats.bytes += len(response.content)
+        stats.not_modified += not_modified
+
+
+def _request_url(url: str, params: Dict[str, Any]) -> str:
+    return str(httpx.URL(url, params=params))
+
+
+def _resolve_payload(response: httpx.Response, cache: Any, cache_url: Optional[str]) -> Any:
+    """Payload of *response*, read from *cache* on ``304 Not Modified``."""
+    if response.status_code == 304:
+        if cache_url is None:
+            response.raise_for_status()
+        return cache.hit(cache_url)
+    payload = response.json()
+    if cache_url is not None:
+        cache.miss(
+            cache_url, response.headers.get("ETag"), response.headers.get("Last-Modified"), response.content
+        )
+    return payload
+
+
+def _fetch_page(
+    client: httpx.Client,
+    url: str,
+    headers: Dict[str, str],
+    dataset: str,
+    params: Dict[str, Any],
+    cache: Any = None,
+) -> Tuple[Any, Page]:
+    """Fetch one page; returns the decoded payload and the :class:`Page`.
+
+    With *cache* (a :class:`~src.etl.page_cache.PageCache`) the request is
+    conditional and a ``304`` is answered from the cache.
+    """
+    started = time.perf_counter()
+    cache_url = _request_url(url, params) if cache is not None else None
+    if cache_url is not None:
+        headers = {**headers, **cache.validators(cache_url)}
+    response = _request_with_retry(client=client, url=url, headers=headers, dataset=dataset, params=params)
+    payload = _resolve_payload(response, cache, cache_url)
+    items = _normalize_items(payload)
+    _meter_page(dataset, response, items, time.perf_counter() - started)
+    return payload, Page(dataset, params["page"], items, cache_url if response.status_code == 304 else None)
+
+
+def _page_requests(
+    since: Optional[str],
+    sales_start_page: int,
+    sales_page_size: Optional[int],
+) -> List[Tuple[str, str, Dict[str, Any], int]]:
+    """(dataset, path, base params, first page) for each paginated endpoint."""
+    since_params: Dict[str, Any] = {"since": since} if since else {}
+    page_size = sales_page_size or get_settings().ETL_SALES_PAGE_SIZE
+    return [
+        ("events", "events", since_params, 1),
+        ("ticket-sales", "ticket-sales", {"limit": page_size, **since_params}, sales_start_page),
+    ]
+
+
+def stream_pages(
+    since: Optional[str] = None,
+    sales_start_page: int = 1,
+    sales_page_size: Optional[int] = None,
+    cache: Any = None,
+) -> Iterator[Page]:
+    """Yield raw ``/events`` pages, then ``/ticket-sales`` pages.
+
+    Each page is yielded as soon as it is fetched and is not retained, so a
+    consumer that aggregates as it goes holds at most one page in memory.
+    ``/ticket-sales`` is requested ``sales_page_size`` records at a time
+    (default ``ETL_SALES_PAGE_SIZE``) starting at *sales_start_page*, which
+    lets a failed run resume after its last checkpointed page. See
+    :func:`extract_events_and_sales` for the meaning of *since*.
+
+    With a page *cache*, requests carry the cached validators and pages
+    answered with ``304`` are yielded from the cache with ``cache_url`` set.
+    """
+    settings = get_settings()
+    base_url = settings.NEST_API_BASE_URL.rstrip("/")
+    headers = _auth_headers()
+
+    with httpx.Client(timeout=REQUEST_TIMEOUT_SECONDS) as client:
+        for dataset, path, base_params, page in _page_requests(since, sales_start_page, sales_page_size):
+            while True:
+                payload, fetched = _fetch_page(
+                    client, f"{base_url}/{path}", headers, dataset, {"page": page, **base_params}, cache
+                )
+                yield fetched
+                next_p = _next_page(payload, page)
+                if not next_p:
+                    break
+                page = next_p
+
+
 def extract_events_and_sales(
     since: Optional[str] = None,
 ) -> Tuple[List[EventRecord], List[TicketSaleRecord]]:
@@ -184,46 +410,125 @@ def extract_events_and_sales(
             that timestamp are returned (incremental extract).  On the very
             first run (no previous successful cursor) pass ``None`` to fetch
             all records.
+
+    Materialises every record; ``run_etl_once`` consumes :func:`stream_pages`
+    instead.
+    """
+    events: List[EventRecord] = []
+    sales: List[TicketSaleRecord] = []
+    for page in stream_pages(since):
+        if page.dataset == "events":
+            events.extend(_to_event_record(item) for item in page.items)
+        else:
+            sales.extend(_to_ticket_sale_record(item) for item in page.items)
+
+    log_info(
+        "ETL extract completed",
+        {"events_count": len(events), "sales_count": len(sales), "since": since},
+    )
+    return events, sales
+
+
+async def stream_pages_async(
+    since: Optional[str] = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    transport: Optional[httpx.AsyncBaseTransport] = None,
+    sales_start_page: int = 1,
+    sales_page_size: Optional[int] = None,
+    cache: Any = None,
+) -> AsyncIterator[Page]:
+    """Concurrent variant of :func:`stream_pages`.
+
+    For each endpoint the first page is fetched on its own to discover
+    ``total_pages``; later pages are fetched ahead with at most
+    *concurrency* requests in flight and yielded in page order. When the API
+    does not advertise a page count the extractor falls back to following
+    ``next_page``/``has_more`` one page at a time.
+
+    *transport* is passed to ``httpx.AsyncClient`` (tests and benchmarks use
+    ``httpx.MockTransport``). *cache* works as in :func:`stream_pages`; its
+    database reads and writes run in worker threads.
     """
     settings = get_settings()
     base_url = settings.NEST_API_BASE_URL.rstrip("/")
     headers = _auth_headers()
-    events: List[EventRecord] = []
+    concurrency = max(1, concurrency)
 
-    since_params: Dict[str, Any] = {"since": since} if since else {}
+    async with httpx.AsyncClient(timeout=REQUEST_TIMEOUT_SECONDS, transport=transport) as client:
 
-    with httpx.Client(timeout=REQUEST_TIMEOUT_SECONDS) as client:
-        page = 1
-        while True:
-            params: Dict[str, Any] = {"page": page, **since_params}
-            response = _request_with_retry(
-                client=client,
-                url=f"{base_url}/events",
-                headers=headers,
-                dataset="events",
-                params=params,
+        async def fetch(path: str, dataset: str, params: Dict[str, Any]) -> Tuple[Any, Page]:
+            started = time.perf_counter()
+            url = f"{base_url}/{path}"
+            cache_url = _request_url(url, params) if cache is not None else None
+            request_headers = {**headers, **cache.validators(cache_url)} if cache_url is not None else headers
+            response = await _request_with_retry_async(
+                client=client, url=url, headers=request_headers, dataset=dataset, params=params
             )
-            payload: Any = response.json()
+            if cache_url is not None:
+                payload: Any = await asyncio.to_thread(_resolve_payload, response, cache, cache_url)
+            else:
+                payload = _resolve_payload(response, None, None)
             items = _normalize_items(payload)
-            events.extend(_to_event_record(item) for item in items)
-            next_p = _next_page(payload, page)
-            if not next_p:
-                break
-            page = next_p
-
-        sales_response = _request_with_retry(
-            client=client,
-            url=f"{base_url}/ticket-sales",
-            headers=headers,
-            dataset="ticket-sales",
-            params=since_params if since_params else None,
-        )
-        sales_payload: Any = sales_response.json()
-        sales_items = _normalize_items(sales_payload)
-        sales = [_to_ticket_sale_record(item) for item in sales_items]
+            _meter_page(dataset, response, items, time.perf_counter() - started)
+            return payload, Page(dataset, params["page"], items, cache_url if response.status_code == 304 else None)
+
+        for dataset, path, base_params, first_page in _page_requests(since, sales_start_page, sales_page_size):
+            payload, fetched = await fetch(path, dataset, {"page": first_page, **base_params})
+            yield fetched
+            total_pages = _total_pages(payload)
+            if total_pages:
+                pending: Deque[Tuple[int, "asyncio.Future[Any]"]] = deque()
+                next_p = first_page + 1
+                try:
+                    while next_p <= total_pages or pending:
+                        # Keep a bounded window of pages in flight; awaiting the
+                        # oldest first preserves page order.
+                        while next_p <= total_pages and len(pending) < concurrency:
+                            task = asyncio.ensure_future(fetch(path, dataset, {"page": next_p, **base_params}))
+                            pending.append((next_p, task))
+                            next_p += 1
+                        _, task = pending.popleft()
+                        _, fetched = await task
+                        yield fetched
+                finally:
+                    for _, task in pending:
+                        task.cancel()
+                    await asyncio.gather(*(task for _, task in pending), return_exceptions=True)
+            else:
+                page = first_page
+                while True:
+                    next_p = _next_page(payload, page)
+                    if not next_p:
+                        break
+                    page = next_p
+                    payload, fetched = await fetch(path, dataset, {"page": page, **base_params})
+                    yield fetched
+
+
+async def extract_events_and_sales_async(
+    since: Optional[str] = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    transport: Optional[httpx.AsyncBaseTransport] = None,
+) -> Tuple[List[EventRecord], List[TicketSaleRecord]]:
+    """Collect :func:`stream_pages_async` into event and sale records."""
+    events: List[EventRecord] = []
+    sales: List[TicketSaleRecord] = []
+    pages = 0
+    async for page in stream_pages_async(since, concurrency, transport):
+        pages += 1
+        if page.dataset == "events":
+            events.extend(_to_event_record(item) for item in page.items)
+        else:
+            sales.extend(_to_ticket_sale_record(item) for item in page.items)
 
     log_info(
         "ETL extract completed",
-        {"events_count": len(events), "sales_count": len(sales), "since": since},
+        {
+            "events_count": len(events),
+            "sales_count": len(sales),
+            "since": since,
+            "pages": pages,
+            "concurrency": concurrency,
+        },
     )
-    return events, sales
\ No newline at end of file
+    return events, sales
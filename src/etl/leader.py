@@ -0,0 +1,177 @@
+"""Single-runner guard for the scheduled ETL job.
+
+Every API process (uvicorn worker or replica) starts its own scheduler, so
+the scheduled job is :func:`run_scheduled_etl`, which calls ``run_etl_once``
+only in the process that holds the ETL lease; the others skip.
+
+* On PostgreSQL the lease is a session-level advisory lock
+  (``pg_try_advisory_lock``) held on a dedicated autocommit connection.
+  A heartbeat thread pings that connection while the run is in progress, so
+  a dropped session (which releases the lock server-side) is logged and
+  counted, and the run aborts before its next stage or checkpoint instead
+  of loading alongside a new lease holder. Skipping costs one round trip.
+* The lock only serialises runs. Interval triggers on different replicas
+  fire minutes apart, so after taking the lock the job also skips when
+  ``etl_run_log`` shows a run that started less than the minimum gap ago.
+* Without PostgreSQL (no ``DATABASE_URL``, or SQLite) there is one process
+  per database, and a process-local lock is used instead.
+"""
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.engine import Connection, Engine
+
+from src.config import Settings, get_settings
+from src.logging_config import (
+    ETL_LOCK_LEASE_LOST_TOTAL,
+    ETL_LOCK_SKIPS_TOTAL,
+    ETL_LOCK_WAIT_SECONDS,
+    log_error,
+    log_info,
+    log_warning,
+)
+
+from . import _ensure_run_log_table, _pg_engine, run_etl_once
+
+# Advisory lock key shared by every process running the ETL scheduler.
+ETL_LOCK_KEY = int.from_bytes(b"etl-run", "big")
+
+# With ETL_CRON every replica fires at the same wall-clock time, so only
+# near-simultaneous triggers need to be absorbed.
+_CRON_MIN_GAP_SECONDS = 30.0
+
+_LOCK_POLL_SECONDS = 0.5
+
+_local_lock = threading.Lock()
+
+
+class EtlLease:
+    """The right to run the scheduled ETL, held from ``acquire`` to ``release``."""
+
+    def __init__(self, engine: Optional[Engine], heartbeat_seconds: float = 30.0):
+        self.engine = engine
+        self.heartbeat_seconds = heartbeat_seconds
+        self.lost = threading.Event()
+        self._conn: Optional[Connection] = None
+        self._local = False
+        self._stop = threading.Event()
+        self._heartbeat: Optional[threading.Thread] = None
+
+    @property
+    def advisory(self) -> bool:
+        return self.engine is not None and self.engine.dialect.name == "postgresql"
+
+    def acquire(self, wait_seconds: float = 0.0) -> bool:
+        """Take the lease, polling for up to *wait_seconds*; False if another holder has it."""
+        started = time.perf_counter()
+        try:
+            if not self.advisory:
+                self._local = _local_lock.acquire(timeout=wait_seconds) if wait_seconds else _local_lock.acquire(False)
+                return self._local
+            # Autocommit: the heartbeat must not leave the session idle in a
+            # transaction for the whole run.
+            conn = self.engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+            if not self._try_lock(conn, wait_seconds):
+                conn.close()
+                return False
+            self._conn = conn
+            self._heartbeat = threading.Thread(target=self._beat, name="etl-lock-heartbeat", daemon=True)
+            self._heartbeat.start()
+            return True
+        finally:
+            ETL_LOCK_WAIT_SECONDS.observe(time.perf_counter() - started)
+
+    def _try_lock(self, conn: Connection, wait_seconds: float) -> bool:
+        deadline = time.monotonic() + wait_seconds
+        while True:
+            if conn.execute(select(func.pg_try_advisory_lock(ETL_LOCK_KEY))).scalar():
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(_LOCK_POLL_SECONDS, remaining))
+
+    def _beat(self) -> None:
+        while not self._stop.wait(self.heartbeat_seconds):
+            try:
+                self._conn.execute(select(1))
+            except Exception as exc:
+                self.lost.set()
+                ETL_LOCK_LEASE_LOST_TOTAL.inc()
+                log_error("ETL lock lease lost", {"error": str(exc)})
+                return
+
+    def release(self) -> None:
+        if self._local:
+            self._local = False
+            _local_lock.release()
+        conn, self._conn = self._conn, None
+        if conn is None:
+            return
+        self._stop.set()
+        if self._heartbeat is not None:
+            self._heartbeat.join()
+        try:
+            if self.lost.is_set():
+                raise RuntimeError("lock session lost")
+            conn.execute(select(func.pg_advisory_unlock(ETL_LOCK_KEY)))
+        except Exception as exc:
+            # Never return a session that may still hold the lock to the pool.
+            log_warning("Discarding ETL lock connection", {"error": str(exc)})
+            conn.invalidate()
+        finally:
+            conn.close()
+
+
+def _min_gap_seconds(settings: Settings) -> float:
+    if settings.ETL_RUN_MIN_GAP_SECONDS is not None:
+        return settings.ETL_RUN_MIN_GAP_SECONDS
+    if settings.ETL_CRON:
+        return _CRON_MIN_GAP_SECONDS
+    return settings.ETL_INTERVAL_MINUTES * 60 * 0.9
+
+
+def _last_run_started_at(engine: Engine) -> Optional[datetime]:
+    run_log = _ensure_run_log_table(engine)
+    with engine.connect() as conn:
+        return conn.execute(select(func.max(run_log.c.started_at))).scalar()
+
+
+def _skip(reason: str, **fields: Any) -> bool:
+    ETL_LOCK_SKIPS_TOTAL.labels(reason=reason).inc()
+    log_info("Scheduled ETL run skipped", {"reason": reason, **fields})
+    return False
+
+
+def run_scheduled_etl() -> bool:
+    """Scheduler entry point: run one ETL cycle unless another process has it.
+
+    Returns True if this process ran the cycle.
+    """
+    settings = get_settings()
+    engine = _pg_engine()
+    lease = EtlLease(engine, settings.ETL_LOCK_HEARTBEAT_SECONDS)
+    try:
+        acquired = lease.acquire(settings.ETL_LOCK_WAIT_SECONDS)
+    except Exception as exc:
+        log_error("Could not acquire ETL lock", {"error": str(exc)})
+        return _skip("error")
+    if not acquired:
+        return _skip("locked")
+    try:
+        if engine is not None:
+            try:
+                last_started = _last_run_started_at(engine)
+            except Exception as exc:
+                log_warning("Could not read last ETL run start", {"error": str(exc)})
+                last_started = None
+            min_gap = _min_gap_seconds(settings)
+            if last_started is not None and datetime.utcnow() - last_started < timedelta(seconds=min_gap):
+                return _skip("recent", last_started_at=last_started.isoformat())
+        run_etl_once(lease_lost=lease.lost)
+        return True
+    finally:
+        lease.release()
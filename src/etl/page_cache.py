@@ -0,0 +1,136 @@
+"""Upstream page cache for conditional extraction.
+
+For every page fetched with an ``ETag`` or ``Last-Modified`` header, the
+validators and the compressed response body are kept in ``etl_page_cache``,
+keyed by the full request URL. The next extraction of the same URL sends
+``If-None-Match`` / ``If-Modified-Since``; on ``304 Not Modified`` the page
+is read back from the cache.
+
+Pages fetched during a run are only trusted once the run has loaded them:
+new bodies are written as pending and confirmed by :meth:`PageCache.commit`
+after a successful load. If the load fails, the next run requests those
+pages unconditionally instead of being told they did not change. ``commit``
+also drops cached pages the run did not request (the upstream now has fewer
+pages, or the page size changed).
+"""
+import json
+import threading
+import uuid
+import zlib
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import Boolean, Column, LargeBinary, MetaData, String, Table, TIMESTAMP, select, update
+from sqlalchemy.engine import Engine
+
+import src.db as _db
+
+from .extract import _normalize_items
+
+_PAGE_CACHE_TABLE = "etl_page_cache"
+
+_DELETE_CHUNK_SIZE = 500
+
+
+def _page_cache_table(metadata: MetaData) -> Table:
+    return Table(
+        _PAGE_CACHE_TABLE,
+        metadata,
+        Column("url", String, primary_key=True),
+        Column("etag", String),
+        Column("last_modified", String),
+        Column("body", LargeBinary),  # zlib-compressed response body
+        Column("fetched_at", TIMESTAMP(timezone=False)),
+        Column("confirmed", Boolean, nullable=False, default=False),
+        Column("run_token", String),
+    )
+
+
+_db.register_schema(_PAGE_CACHE_TABLE, lambda engine: _page_cache_table(MetaData()).create(engine, checkfirst=True))
+
+
+class PageCache:
+    """Validators and bodies of previously loaded pages, for one ETL run."""
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        _db.ensure_schema(engine, _PAGE_CACHE_TABLE)
+        self.table = _page_cache_table(MetaData())
+        self.token = uuid.uuid4().hex
+        self.hits = 0
+        self.misses = 0
+        self._requested: Set[str] = set()
+        # The async extractor calls in from worker threads; engines sharing
+        # one connection (SQLite StaticPool) must not interleave transactions.
+        self._lock = threading.Lock()
+        c = self.table.c
+        with engine.connect() as conn:
+            self._validators: Dict[str, Tuple[Optional[str], Optional[str]]] = {
+                row.url: (row.etag, row.last_modified)
+                for row in conn.execute(select(c.url, c.etag, c.last_modified).where(c.confirmed.is_(True)))
+            }
+
+    @property
+    def unchanged(self) -> bool:
+        """True if pages were requested and every one was ``304 Not Modified``."""
+        return self.hits > 0 and self.misses == 0
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def validators(self, url: str) -> Dict[str, str]:
+        """Conditional request headers for *url* (empty if it is not cached)."""
+        self._requested.add(url)
+        etag, last_modified = self._validators.get(url, (None, None))
+        headers: Dict[str, str] = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        return headers
+
+    def payload(self, url: str) -> Any:
+        """Decoded body of the confirmed cached page for *url*."""
+        with self._lock, self.engine.connect() as conn:
+            body = conn.execute(select(self.table.c.body).where(self.table.c.url == url)).scalar_one()
+        return json.loads(zlib.decompress(body))
+
+    def items(self, url: str) -> List[Dict[str, Any]]:
+        return _normalize_items(self.payload(url))
+
+    def hit(self, url: str) -> Any:
+        """Record a ``304`` for *url* and return the cached payload."""
+        self.hits += 1
+        return self.payload(url)
+
+    def miss(self, url: str, etag: Optional[str], last_modified: Optional[str], body: bytes) -> None:
+        """Record a full response; store it (pending) if it carries validators."""
+        self.misses += 1
+        if not (etag or last_modified or url in self._validators):
+            return
+        t = self.table
+        with self._lock, self.engine.begin() as conn:
+            conn.execute(t.delete().where(t.c.url == url))
+            if etag or last_modified:
+                conn.execute(
+                    t.insert().values(
+                        url=url,
+                        etag=etag,
+                        last_modified=last_modified,
+                        body=zlib.compress(body),
+                        fetched_at=datetime.utcnow(),
+                        confirmed=False,
+                        run_token=self.token,
+                    )
+                )
+
+    def commit(self) -> None:
+        """Trust this run's pages and forget pages it did not request."""
+        t = self.table
+        with self._lock, self.engine.begin() as conn:
+            conn.execute(update(t).where(t.c.run_token == self.token).values(confirmed=True))
+            stale = [url for url in conn.execute(select(t.c.url)).scalars() if url not in self._requested]
+            for start in range(0, len(stale), _DELETE_CHUNK_SIZE):
+                conn.execute(t.delete().where(t.c.url.in_(stale[start:start + _DELETE_CHUNK_SIZE])))
@@ -0,0 +1,196 @@
+"""Quarantine and sampled logging for rows rejected by ``validate_rows``.
+
+A malformed upstream batch can reject hundreds of thousands of rows, so
+rejects are not logged one by one. A :class:`RejectCollector` per run:
+
+* counts every reject per ``(table, reason)`` in ``etl_rejected_rows_total``;
+* logs only a sample: the first ``ETL_REJECT_LOG_FIRST`` rejects of each
+  reason, then every ``ETL_REJECT_LOG_SAMPLE_EVERY``-th, and never more than
+  ``ETL_REJECT_LOG_RATE_PER_SECOND`` lines per second per process;
+* buffers the rows and writes them in bulk to ``etl_rejected_rows`` with the
+  run id, reason code and JSON payload, where ``GET /etl/runs/{id}/rejects``
+  pages through them.
+"""
+import json
+import threading
+import time
+from collections import Counter
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import Column, Index, Integer, MetaData, String, Table, Text, TIMESTAMP, select
+from sqlalchemy.engine import Engine
+
+import src.db as _db
+from src.config import get_settings
+from src.logging_config import ETL_REJECTED_ROWS_TOTAL, log_warning
+
+# Reason codes stored in etl_rejected_rows.reason.
+EMPTY_EVENT_ID = "empty_event_id"
+NEGATIVE_TOTAL_TICKETS = "negative_total_tickets"
+NEGATIVE_TOTAL_REVENUE = "negative_total_revenue"
+FUTURE_SALE_DATE = "future_sale_date"
+FUTURE_CREATED_AT = "future_created_at"  # webhook sales only
+
+_REJECTED_ROWS_TABLE = "etl_rejected_rows"
+
+
+def _rejected_rows_table(metadata: MetaData) -> Table:
+    table = Table(
+        _REJECTED_ROWS_TABLE,
+        metadata,
+        Column("id", Integer, primary_key=True, autoincrement=True),
+        Column("run_id", Integer),
+        Column("table_name", String, nullable=False),
+        Column("reason", String, nullable=False),
+        Column("payload", Text, nullable=False),
+        Column("rejected_at", TIMESTAMP(timezone=False)),
+    )
+    Index("ix_etl_rejected_rows_run_id_id", table.c.run_id, table.c.id)
+    return table
+
+
+_db.register_schema(
+    _REJECTED_ROWS_TABLE, lambda engine: _rejected_rows_table(MetaData()).create(engine, checkfirst=True)
+)
+
+
+class RateLimiter:
+    """Token bucket: ``allow()`` succeeds at most *rate* times per second on average."""
+
+    def __init__(self, rate: float, burst: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = burst if burst is not None else max(rate, 1.0)
+        self.clock = clock
+        self._tokens = self.burst
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            now = self.clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+# Shared by every run in the process, so back-to-back runs cannot flood either.
+_log_limiter: Optional[RateLimiter] = None
+
+
+def _shared_limiter() -> RateLimiter:
+    global _log_limiter
+    if _log_limiter is None:
+        _log_limiter = RateLimiter(get_settings().ETL_REJECT_LOG_RATE_PER_SECOND)
+    return _log_limiter
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+class RejectCollector:
+    """Rejected rows of one ETL run: counters, sampled log lines and the quarantine buffer."""
+
+    def __init__(
+        self,
+        log_first: Optional[int] = None,
+        log_every: Optional[int] = None,
+        limiter: Optional[RateLimiter] = None,
+    ):
+        settings = get_settings()
+        self.log_first = settings.ETL_REJECT_LOG_FIRST if log_first is None else log_first
+        self.log_every = settings.ETL_REJECT_LOG_SAMPLE_EVERY if log_every is None else log_every
+        self.limiter = limiter or _shared_limiter()
+        self.counts: Counter = Counter()
+        self.logged = 0
+        self.rows: List[Tuple[str, str, Dict[str, Any]]] = []
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def add(self, table: str, reason: str, row: Dict[str, Any]) -> None:
+        self.counts[(table, reason)] += 1
+        ETL_REJECTED_ROWS_TOTAL.labels(table=table, reason=reason).inc()
+        self.rows.append((table, reason, row))
+        seen = self.counts[(table, reason)]
+        if (seen <= self.log_first or seen % self.log_every == 0) and self.limiter.allow():
+            self.logged += 1
+            log_warning(
+                "ETL validate: rejected row",
+                {"table": table, "reason": reason, "reason_count": seen, "row": row},
+            )
+
+    def by_reason(self) -> Dict[str, int]:
+        """Reject counts keyed ``"<table>:<reason>"``."""
+        return {f"{table}:{reason}": count for (table, reason), count in sorted(self.counts.items())}
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "rejected_count": len(self.rows),
+            "by_reason": self.by_reason(),
+            "logged": self.logged,
+            "suppressed": len(self.rows) - self.logged,
+        }
+
+    def write(self, engine: Engine, run_id: Optional[int], chunk_size: int = 10000) -> int:
+        """Insert the buffered rows into ``etl_rejected_rows``; returns the row count."""
+        if not self.rows:
+            return 0
+        _db.ensure_schema(engine, _REJECTED_ROWS_TABLE)
+        table = _rejected_rows_table(MetaData())
+        now = datetime.utcnow()
+        with engine.begin() as conn:
+            for start in range(0, len(self.rows), chunk_size):
+                conn.execute(
+                    table.insert(),
+                    [
+                        {
+                            "run_id": run_id,
+                            "table_name": name,
+                            "reason": reason,
+                            "payload": json.dumps(row, default=_json_default),
+                            "rejected_at": now,
+                        }
+                        for name, reason, row in self.rows[start:start + chunk_size]
+                    ],
+                )
+        return len(self.rows)
+
+
+def rejected_rows_page(
+    engine: Engine,
+    run_id: int,
+    limit: int = 100,
+    after_id: int = 0,
+    reason: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Page through a run's quarantined rows in insertion order (keyset on ``id``)."""
+    _db.ensure_schema(engine, _REJECTED_ROWS_TABLE)
+    c = _rejected_rows_table(MetaData()).c
+    query = select(c.id, c.table_name, c.reason, c.payload, c.rejected_at).where(c.run_id == run_id, c.id > after_id)
+    if reason is not None:
+        query = query.where(c.reason == reason)
+    with engine.connect() as conn:
+        rows = conn.execute(query.order_by(c.id).limit(limit + 1)).mappings().all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return {
+        "run_id": run_id,
+        "rejects": [
+            {
+                "id": row["id"],
+                "table": row["table_name"],
+                "reason": row["reason"],
+                "payload": json.loads(row["payload"]),
+                "rejected_at": row["rejected_at"].isoformat() if row["rejected_at"] else None,
+            }
+            for row in rows
+        ],
+        "next_after_id": rows[-1]["id"] if has_more else None,
+    }
@@ -0,0 +1,269 @@
+"""Incremental export of scan analytics to the warehouse.
+
+``ticket_scans``, ``ticket_transfers`` and ``invalid_attempts`` are only
+appended to, so each is exported by id watermark. New rows are written in
+chunks of ``ETL_SCAN_EXPORT_CHUNK_SIZE`` to gzip-compressed NDJSON. Each
+chunk is appended to the table of the same name through the warehouse sink
+selected by ``BQ_SINK`` (see :mod:`src.etl.warehouse`).
+
+The watermark is kept in ``etl_export_watermarks``, and each chunk is
+exported exactly once, even across crashes, retries and concurrent
+exporters:
+
+1. The chunk ``(last_id, pending_last_id]`` is claimed by setting
+   ``pending_last_id`` with a compare-and-set on the watermark row.
+2. It is loaded under the load id
+   ``<table>_<last_id>_<pending_last_id>_<attempt>``. The sink skips a load
+   id it has already applied.
+3. ``last_id`` advances to ``pending_last_id``, again compare-and-set.
+
+A run that finds a pending chunk re-exports that exact range first. If the
+sink reports that the chunk's load failed for good
+(:class:`~src.etl.warehouse.LoadJobFailed`, e.g. a BigQuery job with a bad
+row), ``attempt`` is incremented so the next run loads the chunk under a
+new id.
+
+Ids are assigned when a row is inserted but become visible when its
+transaction commits, so a lower id can appear after a higher one. Export
+stops at the newest row inserted before a cutoff, by its database-set
+``recorded_at``. The cutoff is ``ETL_SCAN_EXPORT_SETTLE_SECONDS`` ago and,
+on PostgreSQL, no later than the start of the oldest transaction still
+writing. Caller-supplied scan and transfer times play no part.
+"""
+import json
+import os
+import tempfile
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from sqlalchemy import Column, Integer, MetaData, String, Table, TIMESTAMP, func, or_, select, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Engine
+
+import src.db as _db
+from src.analytics.models import ANALYTICS_SCHEMA, InvalidAttempt, TicketScan, TicketTransfer
+from src.config import get_settings
+from src.logging_config import ETL_EXPORT_ROWS_TOTAL, ETL_EXPORT_WATERMARK, log_error, log_info
+
+from . import _pg_engine, _warehouse_sink
+from .warehouse import LoadJobFailed, Schema, write_ndjson
+
+TICKET_SCANS_SCHEMA: Schema = [
+    ("id", "INTEGER"),
+    ("ticket_id", "STRING"),
+    ("event_id", "STRING"),
+    ("scanner_id", "STRING"),
+    ("scan_timestamp", "TIMESTAMP"),
+    ("is_valid", "BOOLEAN"),
+    ("location", "STRING"),
+    ("device_info", "STRING"),
+    ("additional_metadata", "STRING"),
+]
+TICKET_TRANSFERS_SCHEMA: Schema = [
+    ("id", "INTEGER"),
+    ("ticket_id", "STRING"),
+    ("event_id", "STRING"),
+    ("from_user_id", "STRING"),
+    ("to_user_id", "STRING"),
+    ("transfer_timestamp", "TIMESTAMP"),
+    ("transfer_reason", "STRING"),
+    ("ip_address", "STRING"),
+    ("user_agent", "STRING"),
+    ("is_successful", "BOOLEAN"),
+    ("additional_metadata", "STRING"),
+]
+INVALID_ATTEMPTS_SCHEMA: Schema = [
+    ("id", "INTEGER"),
+    ("attempt_type", "STRING"),
+    ("ticket_id", "STRING"),
+    ("event_id", "STRING"),
+    ("attempt_timestamp", "TIMESTAMP"),
+    ("reason", "STRING"),
+    ("ip_address", "STRING"),
+    ("user_agent", "STRING"),
+    ("additional_metadata", "STRING"),
+]
+
+# (source table, warehouse schema)
+EXPORTS = (
+    (TicketScan.__table__, TICKET_SCANS_SCHEMA),
+    (TicketTransfer.__table__, TICKET_TRANSFERS_SCHEMA),
+    (InvalidAttempt.__table__, INVALID_ATTEMPTS_SCHEMA),
+)
+
+# Oldest start of a transaction that has written and not yet finished.
+# Only sessions of the same role are visible without pg_read_all_stats.
+_SETTLE_CUTOFF_SQL = text(
+    "SELECT LEAST(clock_timestamp() - make_interval(secs => :settle), "
+    "(SELECT min(xact_start) FROM pg_stat_activity WHERE backend_xid IS NOT NULL))"
+)
+
+_WATERMARK_TABLE = "etl_export_watermarks"
+
+
+def _watermark_table(metadata: MetaData) -> Table:
+    return Table(
+        _WATERMARK_TABLE,
+        metadata,
+        Column("table_name", String, primary_key=True),
+        Column("last_id", Integer, nullable=False),
+        Column("pending_last_id", Integer),  # claimed chunk not yet committed
+        Column("attempt", Integer, nullable=False, default=0),  # failed loads of the pending chunk
+        Column("updated_at", TIMESTAMP(timezone=False)),
+    )
+
+
+_db.register_schema(_WATERMARK_TABLE, lambda engine: _watermark_table(MetaData()).create(engine, checkfirst=True))
+
+
+def _read_watermark(engine: Engine, wm: Table, name: str) -> Any:
+    with engine.begin() as conn:
+        insert = pg_insert if conn.dialect.name == "postgresql" else sqlite_insert
+        conn.execute(insert(wm).values(table_name=name, last_id=0).on_conflict_do_nothing())
+        return conn.execute(
+            select(wm.c.last_id, wm.c.pending_last_id, wm.c.attempt).where(wm.c.table_name == name)
+        ).one()
+
+
+def _settled_bound(engine: Engine, source: Table, settle_seconds: float) -> Optional[int]:
+    """Highest id that is safe to export: every id up to it is committed or rolled back.
+
+    ``recorded_at`` is taken in the statement that takes the id, so every id
+    up to the newest row recorded before the cutoff was taken before it, by
+    a transaction that has since finished.
+    """
+    recorded = source.c.recorded_at
+    with engine.connect() as conn:
+        if conn.dialect.name == "postgresql":
+            cutoff = conn.execute(_SETTLE_CUTOFF_SQL, {"settle": settle_seconds}).scalar()
+        else:
+            cutoff = datetime.utcnow() - timedelta(seconds=settle_seconds)
+        return conn.execute(
+            select(func.max(source.c.id)).where(or_(recorded.is_(None), recorded < cutoff))
+        ).scalar()
+
+
+def _chunk_rows(engine: Engine, source: Table, schema: Schema, after_id: int, upto_id: int, limit: int) -> List[Any]:
+    query = (
+        select(*(source.c[name] for name, _ in schema))
+        .where(source.c.id > after_id, source.c.id <= upto_id)
+        .order_by(source.c.id)
+        .limit(limit)
+    )
+    with engine.connect() as conn:
+        return conn.execute(query).mappings().all()
+
+
+def _export_rows(rows: Iterable[Any]) -> Iterator[Dict[str, Any]]:
+    for row in rows:
+        row = dict(row)
+        if row.get("additional_metadata") is not None:
+            row["additional_metadata"] = json.dumps(row["additional_metadata"])
+        yield row
+
+
+def _set_watermark(engine: Engine, wm: Table, name: str, expect: Dict[str, Any], values: Dict[str, Any]) -> bool:
+    """Compare-and-set the watermark row; False if another exporter moved it first."""
+    query = update(wm).where(wm.c.table_name == name)
+    for column, value in expect.items():
+        query = query.where(wm.c[column].is_(None) if value is None else wm.c[column] == value)
+    with engine.begin() as conn:
+        return conn.execute(query.values(updated_at=datetime.utcnow(), **values)).rowcount == 1
+
+
+def export_table(
+    engine: Engine,
+    sink: Any,
+    source: Table,
+    schema: Schema,
+    workdir: str,
+    chunk_size: int = 50000,
+    settle_seconds: float = 60.0,
+) -> Dict[str, int]:
+    """Export *source*'s rows above its watermark to *sink*, one chunk at a time.
+
+    Returns the rows and chunks appended, the rows of chunks the sink had
+    already applied (``already_loaded``), and the final watermark. Raises
+    whatever the sink raises; the chunk is retried by the next export.
+    """
+    _db.ensure_schema(engine, _WATERMARK_TABLE)
+    _db.ensure_schema(engine, ANALYTICS_SCHEMA)  # adds recorded_at to pre-existing tables
+    wm = _watermark_table(MetaData())
+    name = source.name
+    counts = {"rows": 0, "chunks": 0, "already_loaded": 0}
+    bound: Optional[int] = None
+    while True:
+        last_id, pending, attempt = _read_watermark(engine, wm, name)
+        if pending is not None:
+            # A previous attempt claimed this chunk; finish it first.
+            upto = pending
+            rows = _chunk_rows(engine, source, schema, last_id, upto, upto - last_id)
+        else:
+            if bound is None:
+                bound = _settled_bound(engine, source, settle_seconds)
+            if bound is None or bound <= last_id:
+                break
+            rows = _chunk_rows(engine, source, schema, last_id, bound, chunk_size)
+            if not rows:
+                break
+            upto, attempt = rows[-1]["id"], 0
+            if not _set_watermark(engine, wm, name, {"last_id": last_id, "pending_last_id": None},
+                                  {"pending_last_id": upto, "attempt": 0}):
+                continue
+
+        path = os.path.join(workdir, f"{name}-{last_id}-{upto}.ndjson.gz")
+        write_ndjson(path, _export_rows(rows), schema)
+        try:
+            loaded = sink.append_file(name, schema, path, f"{name}_{last_id}_{upto}_{attempt}")
+        except LoadJobFailed:
+            _set_watermark(engine, wm, name, {"last_id": last_id, "pending_last_id": upto, "attempt": attempt},
+                           {"attempt": attempt + 1})
+            raise
+        finally:
+            os.remove(path)
+        _set_watermark(engine, wm, name, {"last_id": last_id, "pending_last_id": upto},
+                       {"last_id": upto, "pending_last_id": None, "attempt": 0})
+        if loaded:
+            counts["rows"] += len(rows)
+            counts["chunks"] += 1
+            ETL_EXPORT_ROWS_TOTAL.labels(table=name).inc(len(rows))
+        else:
+            counts["already_loaded"] += len(rows)
+        ETL_EXPORT_WATERMARK.labels(table=name).set(upto)
+    counts["watermark"] = last_id
+    return counts
+
+
+def run_scan_export(sink: Optional[Any] = None) -> Optional[Dict[str, Dict[str, int]]]:
+    """Export new scan, transfer and invalid-attempt rows; None if there is nothing to export to.
+
+    A table whose export fails is logged and left out of the result.
+    """
+    settings = get_settings()
+    engine = _pg_engine()
+    if engine is None:
+        log_info("DATABASE_URL not set; skipping scan analytics export", {})
+        return None
+    sink = sink or _warehouse_sink(settings)
+    if sink is None:
+        return None
+
+    results: Dict[str, Dict[str, int]] = {}
+    with tempfile.TemporaryDirectory(prefix="veritix-export-") as tmp:
+        for source, schema in EXPORTS:
+            try:
+                results[source.name] = export_table(
+                    engine,
+                    sink,
+                    source,
+                    schema,
+                    tmp,
+                    chunk_size=settings.ETL_SCAN_EXPORT_CHUNK_SIZE,
+                    settle_seconds=settings.ETL_SCAN_EXPORT_SETTLE_SECONDS,
+                )
+            except Exception as exc:
+                # One table's failing chunk must not hold back the others.
+                log_error("Scan analytics export failed", {"table": source.name, "error": str(exc)})
+    log_info("Scan analytics export completed", {"database": sink.name, "tables": results})
+    return results
@@ -0,0 +1,55 @@
+"""Per-stage timings and row counts for one ETL run.
+
+``run_etl_once`` records each stage (extract, transform, validate, load,
+warehouse) into a :class:`StageTimings`; the breakdown is exported to
+Prometheus when the run ends and stored as JSON in ``etl_run_log.stages``.
+"""
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator
+
+from src.logging_config import ETL_LAST_RUN_EXTRACT, ETL_STAGE_DURATION, ETL_STAGE_ROWS
+
+STAGES = ("extract", "transform", "validate", "load", "warehouse")
+
+# Extract counters reported besides rows.
+EXTRACT_MEASURES = ("pages", "bytes", "retries", "not_modified")
+
+
+class StageTimings:
+    """Accumulates seconds and counters per stage, in the order stages ran."""
+
+    def __init__(self) -> None:
+        self.stages: Dict[str, Dict[str, float]] = {}
+
+    def record(self, stage: str, seconds: float = 0.0, **counts: float) -> None:
+        entry = self.stages.setdefault(stage, {"seconds": 0.0})
+        entry["seconds"] += seconds
+        for name, value in counts.items():
+            entry[name] = entry.get(name, 0) + value
+
+    @contextmanager
+    def time(self, stage: str, **counts: float) -> Iterator[Dict[str, float]]:
+        """Time the block as *stage*; counts may be added to the yielded dict."""
+        extra: Dict[str, float] = dict(counts)
+        started = time.perf_counter()
+        try:
+            yield extra
+        finally:
+            self.record(stage, time.perf_counter() - started, **extra)
+
+    def observe(self) -> None:
+        """Export the breakdown to the stage histograms and last-run gauges."""
+        for stage, entry in self.stages.items():
+            ETL_STAGE_DURATION.labels(stage=stage).observe(entry["seconds"])
+            for direction in ("in", "out"):
+                ETL_STAGE_ROWS.labels(stage=stage, direction=direction).set(entry.get(f"rows_{direction}", 0))
+        extract = self.stages.get("extract", {})
+        for measure in EXTRACT_MEASURES:
+            ETL_LAST_RUN_EXTRACT.labels(measure=measure).set(extract.get(measure, 0))
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            stage: {name: round(value, 4) if name == "seconds" else int(value) for name, value in entry.items()}
+            for stage, entry in self.stages.items()
+        }
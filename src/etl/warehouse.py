@@ -0,0 +1,259 @@
+"""Batch loading of the ETL summary tables into a warehouse.
+
+Rows are written to a newline-delimited JSON file, then each table is
+replaced with a single load from that file. A sink is any object with a
+``name`` and a ``load_file(table_name, schema, path)`` method that replaces
+the table's contents with the file's rows:
+
+* :class:`BigQuerySink` submits one BigQuery load job per table with
+  ``WRITE_TRUNCATE``, so a failure fails the whole table instead of
+  individual rows, and a retry is idempotent.
+* :class:`LocalSQLSink` emulates that with a SQLAlchemy database (a SQLite
+  file by default), so the path can be tested and benchmarked offline.
+
+Append-only exports (see :mod:`src.etl.scan_export`) use
+``append_file(table_name, schema, path, load_id)`` instead. It appends the
+file's rows unless a load with the same *load_id* was already applied, and
+returns whether it wrote anything, so retrying a load is harmless. If the
+sink knows the load failed for good under that id, it raises
+:class:`LoadJobFailed`, and the caller must retry under a new *load_id*.
+Files ending in ``.gz`` are gzip-compressed NDJSON.
+"""
+import gzip
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import Boolean, Column, Date, Integer, MetaData, Numeric, String, Table, TIMESTAMP
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Engine
+
+import src.db as _db
+
+try:
+    from google.cloud import bigquery  # type: ignore[import-untyped]
+    from google.api_core.exceptions import Conflict  # type: ignore[import-untyped]
+except Exception:
+    bigquery = None  # Optional dependency
+
+    class Conflict(Exception):  # type: ignore[no-redef]
+        pass
+
+
+class LoadJobFailed(Exception):
+    """Raised when a load job finished with an error; its load id cannot be reused."""
+
+
+# (column, BigQuery type) per summary table.
+Schema = List[Tuple[str, str]]
+
+EVENT_SUMMARY_SCHEMA: Schema = [
+    ("event_id", "STRING"),
+    ("event_name", "STRING"),
+    ("total_tickets", "INTEGER"),
+    ("total_revenue", "NUMERIC"),
+    ("last_updated", "TIMESTAMP"),
+]
+DAILY_SALES_SCHEMA: Schema = [
+    ("event_id", "STRING"),
+    ("sale_date", "DATE"),
+    ("tickets_sold", "INTEGER"),
+    ("revenue", "NUMERIC"),
+]
+
+_LOCAL_TYPES = {
+    "STRING": String,
+    "INTEGER": Integer,
+    "NUMERIC": lambda: Numeric(18, 2),
+    "TIMESTAMP": lambda: TIMESTAMP(timezone=False),
+    "DATE": Date,
+    "BOOLEAN": Boolean,
+}
+
+# Load ids applied by LocalSQLSink.append_file.
+_LOCAL_LOADS_TABLE = "warehouse_loads"
+
+_LOAD_CHUNK_SIZE = 10000
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _open_text(path: str, mode: str) -> Any:
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def write_ndjson(path: str, rows: Iterable[Dict[str, Any]], schema: Schema) -> int:
+    """Write the schema's columns of *rows* to *path*, one JSON object per line.
+
+    The file is gzip-compressed if *path* ends in ``.gz``.
+    """
+    columns = [name for name, _ in schema]
+    count = 0
+    with _open_text(path, "w") as fh:
+        for row in rows:
+            fh.write(json.dumps({name: row.get(name) for name in columns}, default=_json_default))
+            fh.write("\n")
+            count += 1
+    return count
+
+
+class BigQuerySink:
+    """Replaces BigQuery tables with one load job each."""
+
+    name = "BigQuery"
+
+    def __init__(self, client: Any, project_id: str, dataset_id: str, location: Optional[str] = None):
+        self.client = client
+        self.project_id = project_id
+        self.dataset_id = dataset_id
+        self.location = location or "US"
+        self._dataset_ready = False
+
+    def _ensure_dataset(self) -> None:
+        if self._dataset_ready:
+            return
+        dataset = bigquery.Dataset(f"{self.project_id}.{self.dataset_id}")
+        dataset.location = self.location
+        self.client.create_dataset(dataset, exists_ok=True)
+        self._dataset_ready = True
+
+    def load_file(self, table_name: str, schema: Schema, path: str) -> None:
+        """Load *path* into the table with ``WRITE_TRUNCATE`` and wait for the job.
+
+        The job creates the table if needed; ``result()`` raises if it fails.
+        """
+        self._ensure_dataset()
+        job_config = bigquery.LoadJobConfig(
+            source_format=bigquery.SourceFormat.NEWLINE_DELIMITED_JSON,
+            write_disposition=bigquery.WriteDisposition.WRITE_TRUNCATE,
+            schema=[bigquery.SchemaField(name, field_type) for name, field_type in schema],
+        )
+        with open(path, "rb") as fh:
+            job = self.client.load_table_from_file(
+                fh, f"{self.project_id}.{self.dataset_id}.{table_name}", job_config=job_config
+            )
+        job.result()
+
+    def append_file(self, table_name: str, schema: Schema, path: str, load_id: str) -> bool:
+        """Append *path* to the table with a load job whose id is derived from *load_id*.
+
+        BigQuery refuses a second job with the same id, so a retried load
+        waits for the first job instead of appending the rows again. Raises
+        :class:`LoadJobFailed` if that job (or this one) finished with an error.
+        """
+        self._ensure_dataset()
+        job_config = bigquery.LoadJobConfig(
+            source_format=bigquery.SourceFormat.NEWLINE_DELIMITED_JSON,
+            write_disposition=bigquery.WriteDisposition.WRITE_APPEND,
+            schema=[bigquery.SchemaField(name, field_type) for name, field_type in schema],
+        )
+        job_id = f"veritix_{self.dataset_id}_{load_id}"
+        try:
+            with open(path, "rb") as fh:
+                job = self.client.load_table_from_file(
+                    fh,
+                    f"{self.project_id}.{self.dataset_id}.{table_name}",
+                    job_id=job_id,
+                    job_config=job_config,
+                )
+        except Conflict:
+            _wait_for_job(self.client.get_job(job_id, location=self.location), job_id)
+            return False
+        _wait_for_job(job, job_id)
+        return True
+
+
+def _wait_for_job(job: Any, job_id: str) -> None:
+    # A job that finished with an error keeps its id, so resubmitting under
+    # it only hits Conflict again. Errors while polling a job that may still
+    # succeed are re-raised as they are.
+    try:
+        job.result()
+    except Exception as exc:
+        if job.error_result:
+            raise LoadJobFailed(f"Load job {job_id} failed: {job.error_result}") from exc
+        raise
+
+
+class LocalSQLSink:
+    """Replaces tables in a local SQLAlchemy database, one transaction per table."""
+
+    name = "local"
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+
+    def _table(self, table_name: str, schema: Schema) -> Table:
+        table = Table(
+            table_name,
+            MetaData(),
+            *(Column(name, _LOCAL_TYPES[field_type]()) for name, field_type in schema),
+        )
+        _db.ensure_schema(
+            self.engine, f"warehouse:{table_name}", lambda engine: table.create(engine, checkfirst=True)
+        )
+        return table
+
+    def load_file(self, table_name: str, schema: Schema, path: str) -> None:
+        table = self._table(table_name, schema)
+        with self.engine.begin() as conn:
+            conn.execute(table.delete())
+            _insert_file(conn, table, schema, path)
+
+    def append_file(self, table_name: str, schema: Schema, path: str, load_id: str) -> bool:
+        """Append *path*'s rows, recording *load_id* in the same transaction."""
+        table = self._table(table_name, schema)
+        loads = _local_loads_table(MetaData())
+        _db.ensure_schema(self.engine, _LOCAL_LOADS_TABLE, lambda engine: loads.create(engine, checkfirst=True))
+        with self.engine.begin() as conn:
+            insert = pg_insert if conn.dialect.name == "postgresql" else sqlite_insert
+            claimed = conn.execute(
+                insert(loads)
+                .values(load_id=load_id, table_name=table_name, loaded_at=datetime.utcnow())
+                .on_conflict_do_nothing()
+            ).rowcount
+            if not claimed:
+                return False
+            _insert_file(conn, table, schema, path)
+        return True
+
+
+def _local_loads_table(metadata: MetaData) -> Table:
+    return Table(
+        _LOCAL_LOADS_TABLE,
+        metadata,
+        Column("load_id", String, primary_key=True),
+        Column("table_name", String, nullable=False),
+        Column("loaded_at", TIMESTAMP(timezone=False)),
+    )
+
+
+def _insert_file(conn: Any, table: Table, schema: Schema, path: str) -> None:
+    parsers = {
+        name: date.fromisoformat if field_type == "DATE" else datetime.fromisoformat
+        for name, field_type in schema
+        if field_type in ("DATE", "TIMESTAMP")
+    }
+    with _open_text(path, "r") as fh:
+        batch: List[Dict[str, Any]] = []
+        for line in fh:
+            row = json.loads(line)
+            for name, parse in parsers.items():
+                if row[name] is not None:
+                    row[name] = parse(row[name])
+            batch.append(row)
+            if len(batch) >= _LOAD_CHUNK_SIZE:
+                conn.execute(table.insert(), batch)
+                batch = []
+        if batch:
+            conn.execute(table.insert(), batch)
@@ -0,0 +1,359 @@
+"""Push ingestion of ticket sales: ``POST /etl/webhook/sales``.
+
+The Nest API notifies new sales as they happen. Each request is signed with
+``ETL_WEBHOOK_SECRET``::
+
+    X-Webhook-Timestamp: <unix seconds>
+    X-Webhook-Signature: sha256=<hex HMAC-SHA256 of "<timestamp>." + raw body>
+
+and carries one sale object, a list of sales, or ``{"data": [...]}`` in the
+``/ticket-sales`` shape. Every sale needs an ``id``. Accepted sales are
+buffered in memory. A :class:`SalesWebhookBatcher` thread applies them every
+``ETL_WEBHOOK_FLUSH_SECONDS``, or sooner once ``ETL_WEBHOOK_BATCH_SIZE`` are
+waiting, as one additive upsert of ``event_sales_summary`` and
+``daily_ticket_sales``.
+
+Each sale is checked with the rules :func:`~src.etl.validate_rows` applies
+to the pulled rows, plus a ``created_at`` no further ahead than
+``ETL_WEBHOOK_TOLERANCE_SECONDS``. Rejected sales are quarantined in
+``etl_rejected_rows`` (``table_name`` ``etl_webhook_sales``, no run id) and
+never reach the summaries.
+
+The pulled ETL stays authoritative, and the webhook only brings its totals
+forward:
+
+* Every sale is recorded in ``etl_webhook_sales``. Redelivered sale ids are
+  ignored.
+* A sale created before the current load cursor (the ``until`` of the last
+  applied load) is recorded but not applied, because a load has already
+  counted it.
+* A load absorbs the applied sales that its pull counted, matched by sale
+  id (see ``load_postgres``), so the pull never counts them twice. Applied
+  sales the pull did not return (upstream lag, a rejected row) keep the
+  webhook's count until a later pull returns them.
+* The buffer is not durable. Sales lost in a crash, or dropped when
+  applying keeps failing, are still counted by the next pull.
+"""
+import hashlib
+import hmac
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import MetaData
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Engine
+
+import src.db as _db
+from src.config import get_settings
+from src.logging_config import (
+    ETL_WEBHOOK_BUFFER_DEPTH,
+    ETL_WEBHOOK_FLUSH_SECONDS,
+    ETL_WEBHOOK_SALES_TOTAL,
+    log_error,
+    log_info,
+)
+
+from . import (
+    _ETL_WEBHOOK_SALES_TABLE,
+    _LOAD_SCHEMA,
+    SummaryAccumulator,
+    _applied_cursor,
+    _created_at,
+    _daily_row_reject,
+    _delta_rows,
+    _event_row_reject,
+    _load_ledger_table,
+    _lock_summaries,
+    _merge_summaries,
+    _pg_engine,
+    _webhook_sales_table,
+)
+from .extract import _normalize_items
+from .rejects import FUTURE_CREATED_AT, RejectCollector
+
+SIGNATURE_HEADER = "X-Webhook-Signature"
+TIMESTAMP_HEADER = "X-Webhook-Timestamp"
+
+Received = Tuple[Dict[str, Any], datetime]
+
+
+class WebhookSignatureError(Exception):
+    """Raised when a webhook request's signature or timestamp does not verify."""
+
+
+class WebhookBufferFull(Exception):
+    """Raised when accepting a request would exceed ``ETL_WEBHOOK_MAX_BUFFER``."""
+
+
+def sign_payload(secret: str, timestamp: str, body: bytes) -> str:
+    """Value of the ``X-Webhook-Signature`` header for *body* sent at *timestamp*."""
+    digest = hmac.new(secret.encode(), timestamp.encode() + b"." + body, hashlib.sha256).hexdigest()
+    return f"sha256={digest}"
+
+
+def verify_signature(
+    secret: str,
+    timestamp: Optional[str],
+    signature: Optional[str],
+    body: bytes,
+    tolerance_seconds: int,
+    now: Optional[float] = None,
+) -> None:
+    """Raise :class:`WebhookSignatureError` unless *signature* is valid and recent.
+
+    The timestamp is signed together with the body and must be within
+    *tolerance_seconds* of *now*, so a captured request cannot be replayed
+    later.
+    """
+    if not timestamp or not signature:
+        raise WebhookSignatureError("Missing webhook signature headers")
+    try:
+        sent_at = int(timestamp)
+    except ValueError:
+        raise WebhookSignatureError("Invalid webhook timestamp")
+    if abs((time.time() if now is None else now) - sent_at) > tolerance_seconds:
+        raise WebhookSignatureError("Webhook timestamp outside the allowed window")
+    if not hmac.compare_digest(sign_payload(secret, timestamp, body), signature):
+        raise WebhookSignatureError("Invalid webhook signature")
+
+
+def parse_sales(body: bytes) -> Tuple[List[Dict[str, Any]], int]:
+    """Return ``(sales, invalid)``: the sales in *body* that carry an id and
+    an event id, and how many did not.
+
+    Raises ValueError if *body* is not JSON.
+    """
+    payload = json.loads(body)
+    if isinstance(payload, dict) and ("id" in payload or "sale_id" in payload):
+        payload = [payload]
+    items = _normalize_items(payload)
+    sales = [
+        s for s in items
+        if (s.get("id") or s.get("sale_id")) and (s.get("event_id") or s.get("eventId") or s.get("event"))
+    ]
+    return sales, len(items) - len(sales)
+
+
+def _ledger_row(sale: Dict[str, Any], received_at: datetime) -> Dict[str, Any]:
+    # Folded exactly as the pull folds it, so the amounts a load subtracts
+    # are the amounts its own aggregation added for the same sale.
+    acc = SummaryAccumulator()
+    acc.add_sales([sale])
+    [((event_id, sale_date), (tickets, revenue))] = acc.daily.items()
+    return {
+        "sale_id": str(sale.get("id") or sale.get("sale_id")),
+        "event_id": event_id,
+        "sale_date": sale_date,
+        "tickets": tickets,
+        "revenue": revenue,
+        "created_at": _created_at(sale) or received_at,
+        "received_at": received_at,
+    }
+
+
+def _reject_reason(row: Dict[str, Any], now: datetime, tolerance_seconds: int) -> Optional[str]:
+    # The sale's own event and daily rows, checked as validate_rows checks pulled ones.
+    reason = _event_row_reject(
+        {"event_id": row["event_id"], "total_tickets": row["tickets"], "total_revenue": row["revenue"]}
+    ) or _daily_row_reject({"event_id": row["event_id"], "sale_date": row["sale_date"]}, now.date())
+    if reason is None and row["created_at"] > now + timedelta(seconds=tolerance_seconds):
+        reason = FUTURE_CREATED_AT
+    return reason
+
+
+def apply_webhook_sales(
+    engine: Engine,
+    sales: Sequence[Received],
+    chunk_size: int = 10000,
+    rejects: Optional[RejectCollector] = None,
+) -> Dict[str, int]:
+    """Record *sales* in ``etl_webhook_sales`` and add the new ones to the summaries.
+
+    Invalid sales are added to *rejects* (a fresh :class:`RejectCollector`
+    if omitted) and written to ``etl_rejected_rows``.
+
+    Returns counts per outcome: ``applied``, ``covered`` (created before
+    the load cursor), ``duplicate`` (sale id already recorded) and
+    ``rejected``.
+    """
+    settings = get_settings()
+    if rejects is None:
+        rejects = RejectCollector()
+    now = datetime.utcnow()
+    rows: Dict[str, Dict[str, Any]] = {}
+    rejected = 0
+    for sale, received_at in sales:
+        row = _ledger_row(sale, received_at)
+        reason = _reject_reason(row, now, settings.ETL_WEBHOOK_TOLERANCE_SECONDS)
+        if reason is not None:
+            rejects.add(_ETL_WEBHOOK_SALES_TABLE, reason, sale)
+            rejected += 1
+            continue
+        rows.setdefault(row["sale_id"], row)
+
+    _db.ensure_schema(engine, _LOAD_SCHEMA)
+    metadata = MetaData()
+    ledger = _load_ledger_table(metadata)
+    table = _webhook_sales_table(metadata)
+    with engine.begin() as conn:
+        _lock_summaries(conn)
+        cursor = _applied_cursor(conn, ledger)
+        boundary = datetime.fromisoformat(cursor) if cursor else None
+        for row in rows.values():
+            row["applied"] = boundary is None or row["created_at"] >= boundary
+
+        inserted: Set[str] = set()
+        if rows:
+            insert = (pg_insert if conn.dialect.name == "postgresql" else sqlite_insert)(table)
+            stmt = insert.on_conflict_do_nothing(index_elements=["sale_id"]).returning(table.c.sale_id)
+            inserted = set(conn.execute(stmt, list(rows.values())).scalars())
+
+        daily: Dict[Tuple[str, Any], List[float]] = {}
+        for sale_id in inserted:
+            row = rows[sale_id]
+            if row["applied"]:
+                d = daily.setdefault((row["event_id"], row["sale_date"]), [0, 0.0])
+                d[0] += row["tickets"]
+                d[1] += row["revenue"]
+        if daily:
+            _merge_summaries(conn, *_delta_rows(daily), True, chunk_size)
+
+        # Absorbed and covered sales are only kept to recognise late
+        # redeliveries; applied ones wait for the pull that counts them.
+        retention = datetime.utcnow() - timedelta(hours=settings.ETL_WEBHOOK_RETENTION_HOURS)
+        conn.execute(table.delete().where(table.c.applied.is_(False), table.c.received_at < retention))
+
+    if rejected:
+        # Quarantining must not undo the batch that was just applied.
+        try:
+            rejects.write(engine, None, chunk_size)
+        except Exception as exc:
+            log_error("Failed to quarantine rejected webhook sales", {"error": str(exc)})
+
+    applied = sum(1 for sale_id in inserted if rows[sale_id]["applied"])
+    return {
+        "applied": applied,
+        "covered": len(inserted) - applied,
+        "duplicate": len(sales) - rejected - len(inserted),
+        "rejected": rejected,
+    }
+
+
+class SalesWebhookBatcher:
+    """Buffers webhook sales and applies them in micro-batches on a background thread."""
+
+    def __init__(
+        self,
+        apply: Callable[[Sequence[Received]], Dict[str, int]],
+        flush_seconds: float,
+        batch_size: int,
+        max_buffer: int,
+    ):
+        self._apply = apply
+        self.flush_seconds = flush_seconds
+        self.batch_size = batch_size
+        self.max_buffer = max_buffer
+        self._buffer: List[Received] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def submit(self, sales: List[Dict[str, Any]]) -> None:
+        """Buffer *sales*; raises :class:`WebhookBufferFull` if there is no room for all of them."""
+        received_at = datetime.utcnow()
+        with self._lock:
+            if len(self._buffer) + len(sales) > self.max_buffer:
+                raise WebhookBufferFull(f"{len(self._buffer)} webhook sales already buffered")
+            self._buffer.extend((sale, received_at) for sale in sales)
+            ETL_WEBHOOK_BUFFER_DEPTH.set(len(self._buffer))
+            if self._thread is None:
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="etl-webhook-flush", daemon=True)
+                self._thread.start()
+            if len(self._buffer) >= self.batch_size:
+                self._wake.set()
+
+    def flush(self) -> int:
+        """Apply up to ``batch_size`` buffered sales; returns how many were applied.
+
+        On failure the batch goes back to the front of the buffer, as far as
+        ``max_buffer`` allows; the rest is dropped and left to the next pull.
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch = self._buffer[:self.batch_size]
+                del self._buffer[:self.batch_size]
+            if not batch:
+                return 0
+            started = time.perf_counter()
+            try:
+                outcomes = self._apply(batch)
+            except Exception as exc:
+                with self._lock:
+                    room = max(0, self.max_buffer - len(self._buffer))
+                    self._buffer[:0] = batch[:room]
+                    dropped = len(batch) - min(room, len(batch))
+                    ETL_WEBHOOK_BUFFER_DEPTH.set(len(self._buffer))
+                if dropped:
+                    ETL_WEBHOOK_SALES_TOTAL.labels(outcome="dropped").inc(dropped)
+                log_error("ETL webhook batch failed", {"sales": len(batch), "dropped": dropped, "error": str(exc)})
+                return 0
+            ETL_WEBHOOK_FLUSH_SECONDS.observe(time.perf_counter() - started)
+            with self._lock:
+                ETL_WEBHOOK_BUFFER_DEPTH.set(len(self._buffer))
+            for outcome, count in outcomes.items():
+                if count:
+                    ETL_WEBHOOK_SALES_TOTAL.labels(outcome=outcome).inc(count)
+            log_info("ETL webhook batch applied", {"sales": len(batch), **outcomes})
+            return len(batch)
+
+    def drain(self) -> None:
+        """Flush until the buffer is empty or a batch fails."""
+        while self._buffer and self.flush():
+            pass
+
+    def shutdown(self) -> None:
+        """Stop the flush thread and apply whatever is still buffered."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop.set()
+            self._wake.set()
+            thread.join()
+        self.drain()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_seconds)
+            self._wake.clear()
+            if not self._stop.is_set():
+                self.drain()
+
+
+def _apply(sales: Sequence[Received]) -> Dict[str, int]:
+    engine = _pg_engine()
+    if engine is None:
+        raise RuntimeError("DATABASE_URL not set")
+    return apply_webhook_sales(engine, sales, get_settings().ETL_LOAD_CHUNK_SIZE)
+
+
+def _build_batcher() -> SalesWebhookBatcher:
+    settings = get_settings()
+    return SalesWebhookBatcher(
+        apply=_apply,
+        flush_seconds=settings.ETL_WEBHOOK_FLUSH_SECONDS,
+        batch_size=settings.ETL_WEBHOOK_BATCH_SIZE,
+        max_buffer=settings.ETL_WEBHOOK_MAX_BUFFER,
+    )
+
+
+sales_webhook = _build_batcher()
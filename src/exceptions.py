@@ -29,6 +29,7 @@ async def handle_http_exception(_: Request, exc: HTTPException) -> JSONResponse:
             "error": _http_error_message(exc.detail),
             "status_code": exc.status_code,
         },
+        headers=exc.headers,
     )
 
 
@@ -29,11 +29,14 @@ class FraudEvent(Base):
     )
 
 
+_db.register_schema(FraudEvent.__tablename__, lambda engine: Base.metadata.create_all(engine))
+
+
 def get_session():
     engine = _db.get_engine()
     if engine is None:
         raise RuntimeError("Database engine is not initialised")
-    Base.metadata.create_all(engine)
+    _db.ensure_schema(engine, FraudEvent.__tablename__)
     Session = sessionmaker(bind=engine)
     return Session()
 
@@ -165,6 +165,128 @@ ETL_JOBS_TOTAL: Counter = Counter(
     ["status"],
 )
 
+ETL_EXTRACT_PAGES_TOTAL: Counter = Counter(
+    "etl_extract_pages_total",
+    "Upstream pages fetched by the ETL extractor",
+    ["dataset"],
+)
+
+ETL_EXTRACT_RECORDS_TOTAL: Counter = Counter(
+    "etl_extract_records_total",
+    "Upstream records received by the ETL extractor",
+    ["dataset"],
+)
+
+ETL_EXTRACT_BYTES_TOTAL: Counter = Counter(
+    "etl_extract_bytes_total",
+    "Upstream response bytes received by the ETL extractor",
+    ["dataset"],
+)
+
+ETL_EXTRACT_RETRIES_TOTAL: Counter = Counter(
+    "etl_extract_retries_total",
+    "Upstream requests retried by the ETL extractor",
+    ["dataset"],
+)
+
+ETL_EXTRACT_NOT_MODIFIED_TOTAL: Counter = Counter(
+    "etl_extract_not_modified_total",
+    "Upstream pages answered 304 Not Modified and served from the page cache",
+    ["dataset"],
+)
+
+ETL_EXTRACT_PAGE_DURATION: Histogram = Histogram(
+    "etl_extract_page_duration_seconds",
+    "Time to fetch one upstream page, including retries",
+    ["dataset"],
+)
+
+ETL_STAGE_DURATION: Histogram = Histogram(
+    "etl_stage_duration_seconds",
+    "Time spent in each ETL run stage",
+    ["stage"],
+    buckets=(0.1, 0.5, 1, 5, 15, 30, 60, 300, 900, 1800, 3600),
+)
+
+ETL_STAGE_ROWS: Gauge = Gauge(
+    "etl_stage_rows",
+    "Rows entering (in) and leaving (out) each stage in the last ETL run",
+    ["stage", "direction"],
+)
+
+ETL_LAST_RUN_EXTRACT: Gauge = Gauge(
+    "etl_last_run_extract",
+    "Pages, bytes, retries and 304s fetched by the last ETL run",
+    ["measure"],
+)
+
+ETL_LAST_RUN_CACHE_HIT_RATIO: Gauge = Gauge(
+    "etl_last_run_cache_hit_ratio",
+    "Share of the last conditional ETL extract's pages answered 304",
+)
+
+ETL_DIFF_QUEUE_DEPTH: Gauge = Gauge(
+    "etl_diff_jobs_queue_depth",
+    "ETL diff jobs accepted but waiting for a worker",
+)
+
+ETL_DIFF_JOBS_RUNNING: Gauge = Gauge(
+    "etl_diff_jobs_running",
+    "ETL diff jobs currently running",
+)
+
+ETL_REJECTED_ROWS_TOTAL: Counter = Counter(
+    "etl_rejected_rows_total",
+    "Summary rows rejected by ETL validation",
+    ["table", "reason"],
+)
+
+ETL_LOCK_WAIT_SECONDS: Histogram = Histogram(
+    "etl_lock_wait_seconds",
+    "Time spent acquiring the scheduled ETL lock",
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30, 120),
+)
+
+ETL_LOCK_SKIPS_TOTAL: Counter = Counter(
+    "etl_lock_skips_total",
+    "Scheduled ETL runs skipped by this process",
+    ["reason"],  # locked | recent | error
+)
+
+ETL_LOCK_LEASE_LOST_TOTAL: Counter = Counter(
+    "etl_lock_lease_lost_total",
+    "Scheduled ETL runs whose lock connection failed its heartbeat",
+)
+
+ETL_WEBHOOK_SALES_TOTAL: Counter = Counter(
+    "etl_webhook_sales_total",
+    "Sales received on the ETL sales webhook, by outcome",
+    ["outcome"],  # applied | covered | duplicate | invalid | dropped
+)
+
+ETL_WEBHOOK_BUFFER_DEPTH: Gauge = Gauge(
+    "etl_webhook_buffer_depth",
+    "Webhook sales buffered in this process, waiting for the next micro-batch",
+)
+
+ETL_WEBHOOK_FLUSH_SECONDS: Histogram = Histogram(
+    "etl_webhook_flush_seconds",
+    "Time to apply one webhook micro-batch to the summary tables",
+    buckets=(0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+
+ETL_EXPORT_ROWS_TOTAL: Counter = Counter(
+    "etl_export_rows_total",
+    "Scan analytics rows exported to the warehouse",
+    ["table"],
+)
+
+ETL_EXPORT_WATERMARK: Gauge = Gauge(
+    "etl_export_watermark",
+    "Highest source row id exported to the warehouse",
+    ["table"],
+)
+
 TICKET_SCANS_TOTAL: Counter = Counter(
     "ticket_scans_total",
     "Total ticket scans processed",
@@ -177,6 +299,12 @@ FRAUD_DETECTIONS_TOTAL: Counter = Counter(
     ["rules_triggered"],
 )
 
+ANALYTICS_CACHE_REQUESTS: Counter = Counter(
+    "analytics_cache_requests_total",
+    "Analytics read-cache lookups",
+    ["method", "result"],
+)
+
 QR_GENERATIONS_TOTAL: Counter = Counter(
     "qr_generations_total",
     "Total QR codes generated",
@@ -5,6 +5,7 @@ import json
 import logging
 import os
 import re
+from concurrent.futures import CancelledError, TimeoutError as FuturesTimeoutError
 from datetime import date, datetime
 from typing import Annotated, Any, Dict, List, Optional
 
@@ -17,14 +18,29 @@ from slowapi.errors import RateLimitExceeded
 from src.auth.dependencies import require_admin_key, require_service_key
 
 from src.analytics.service import analytics_service
+from src.analytics.summary import summary_refresher
 from src.chat import ChatMessage, EscalationEvent, ReadReceiptEvent, TypingEvent, chat_manager
 from src.config import get_settings
 from src.core.ratelimit import limiter
-from src.etl import diff_etl_output, extract_events_and_sales, run_etl_once, transform_summary
+from src.db import bootstrap_schema, get_engine
+from src.etl import recent_etl_runs, run_rejects
+from src.etl.diff_jobs import DiffQueueFull, diff_jobs
+from src.etl.leader import run_scheduled_etl
+from src.etl.scan_export import run_scan_export
+from src.etl.webhook import (
+    SIGNATURE_HEADER,
+    TIMESTAMP_HEADER,
+    WebhookBufferFull,
+    WebhookSignatureError,
+    parse_sales,
+    sales_webhook,
+    verify_signature,
+)
 from src.exceptions import register_exception_handlers
 from src.fraud import check_fraud_rules
 from src.logging_config import (
     ETL_JOBS_TOTAL,
+    ETL_WEBHOOK_SALES_TOTAL,
     FRAUD_DETECTIONS_TOTAL,
     QR_GENERATIONS_TOTAL,
     QR_VALIDATIONS_TOTAL,
@@ -115,6 +131,7 @@ from src.types_custom import (
     TicketRequest,
 )
 from src.utils import compute_signature, train_logistic_regression_pipeline, validate_qr_signing_key_from_env
+from src.routers.analytics import router as analytics_router
 from src.routers.health import router as health_router
 
 try:
@@ -142,6 +159,7 @@ if os.path.exists(static_dir):
 app.add_middleware(RequestIDMiddleware)
 app.add_middleware(MetricsMiddleware)
 app.include_router(health_router)
+app.include_router(analytics_router)
 
 
 LOG_LEVEL: str = get_settings().LOG_LEVEL
@@ -187,9 +205,8 @@ async def custom_rate_limit_exceeded_handler(
 def on_startup() -> None:
     global model_pipeline, etl_scheduler
     settings = get_settings()
-    create_generated_reports_table()
-    stakeholder_store.create_stakeholders_table()
-    calculation_history_store.create_revenue_calculations_table()
+    # All table DDL runs here, once; request paths only check the registry.
+    bootstrap_schema()
     if not settings.SKIP_MODEL_TRAINING:
         model_pipeline = train_logistic_regression_pipeline()
 
@@ -200,6 +217,9 @@ def on_startup() -> None:
     except Exception as exc:
         logger.warning("Report metadata init failed (non-fatal): %s", exc)
 
+    # Compute the first /analytics/summary snapshot without blocking startup.
+    summary_refresher.trigger_refresh()
+
     if settings.ENABLE_ETL_SCHEDULER and BackgroundScheduler is not None:
         etl_scheduler = BackgroundScheduler(timezone="UTC")
         cron = settings.ETL_CRON
@@ -208,7 +228,24 @@ def on_startup() -> None:
         else:
             minutes = settings.ETL_INTERVAL_MINUTES
             trigger = IntervalTrigger(minutes=minutes)
-        etl_scheduler.add_job(run_etl_once, trigger=trigger, id="etl_job", replace_existing=True)
+        # Every worker/replica schedules the job; run_scheduled_etl lets only
+        # the holder of the ETL lock run each cycle.
+        etl_scheduler.add_job(run_scheduled_etl, trigger=trigger, id="etl_job", replace_existing=True)
+        # trigger_refresh skips the tick while a request-triggered refresh is running.
+        etl_scheduler.add_job(
+            summary_refresher.trigger_refresh,
+            trigger=IntervalTrigger(seconds=settings.ANALYTICS_SUMMARY_TTL_SECONDS),
+            id="analytics_summary_job",
+            replace_existing=True,
+        )
+        if settings.ETL_SCAN_EXPORT_ENABLED:
+            # Safe on every replica: chunks are claimed on the export watermark.
+            etl_scheduler.add_job(
+                run_scan_export,
+                trigger=IntervalTrigger(minutes=settings.ETL_SCAN_EXPORT_INTERVAL_MINUTES),
+                id="scan_export_job",
+                replace_existing=True,
+            )
         etl_scheduler.start()
 
 
@@ -223,6 +260,9 @@ def on_shutdown() -> None:
             log_info("ETL scheduler shut down successfully.")
         except Exception as exc:
             log_error("Error during scheduler shutdown", {"error": str(exc)})
+    diff_jobs.shutdown(wait=False)
+    sales_webhook.shutdown()
+    analytics_service.shutdown()
 
 
 # ---------------------------------------------------------------------------
@@ -363,7 +403,8 @@ def get_recent_scans(query: Annotated[AnalyticsListQuery, Query()]) -> Analytics
         "from_ts": query.from_ts.isoformat() if query.from_ts else None,
         "to_ts": query.to_ts.isoformat() if query.to_ts else None,
         "page": query.page,
-        "limit": query.limit
+        "limit": query.limit,
+        "metadata": query.metadata
     })
     try:
         result = analytics_service.get_recent_scans(
@@ -371,7 +412,8 @@ def get_recent_scans(query: Annotated[AnalyticsListQuery, Query()]) -> Analytics
             from_ts=query.from_ts,
             to_ts=query.to_ts,
             page=query.page,
-            limit=query.limit
+            limit=query.limit,
+            metadata=query.metadata
         )
         log_info("Recent scans retrieved", {
             "event_id": query.event_id,
@@ -403,7 +445,8 @@ def get_recent_transfers(
         "from_ts": query.from_ts.isoformat() if query.from_ts else None,
         "to_ts": query.to_ts.isoformat() if query.to_ts else None,
         "page": query.page,
-        "limit": query.limit
+        "limit": query.limit,
+        "metadata": query.metadata
     })
     try:
         result = analytics_service.get_recent_transfers(
@@ -411,7 +454,8 @@ def get_recent_transfers(
             from_ts=query.from_ts,
             to_ts=query.to_ts,
             page=query.page,
-            limit=query.limit
+            limit=query.limit,
+            metadata=query.metadata
         )
         log_info("Recent transfers retrieved", {
             "event_id": query.event_id,
@@ -443,7 +487,8 @@ def get_invalid_attempts(
         "from_ts": query.from_ts.isoformat() if query.from_ts else None,
         "to_ts": query.to_ts.isoformat() if query.to_ts else None,
         "page": query.page,
-        "limit": query.limit
+        "limit": query.limit,
+        "metadata": query.metadata
     })
     try:
         result = analytics_service.get_invalid_attempts(
@@ -451,7 +496,8 @@ def get_invalid_attempts(
             from_ts=query.from_ts,
             to_ts=query.to_ts,
             page=query.page,
-            limit=query.limit
+            limit=query.limit,
+            metadata=query.metadata
         )
         log_info("Invalid attempts retrieved", {
             "event_id": query.event_id,
@@ -1110,55 +1156,121 @@ def get_trending_events(
 
 
 # ---------------------------------------------------------------------------
-# ETL diff (dry-run) — admin only
+# ETL run history and diff (dry-run) — admin only
 # ---------------------------------------------------------------------------
 
-# In-memory store for async ETL diff jobs
-_etl_diff_jobs: Dict[str, Any] = {}
+def _require_etl_admin(request: Request) -> None:
+    if request.headers.get("X-Admin-Key", "") != get_settings().ADMIN_API_KEY:
+        raise HTTPException(status_code=403, detail="Admin access required")
 
 
-@app.get("/etl/diff")
-def etl_diff(request: Request) -> Any:
-    """Dry-run ETL diff: show what the next ETL run would load without committing.
+@app.get("/etl/runs")
+def etl_runs(request: Request, limit: int = Query(20, ge=1, le=200)) -> Any:
+    """Last *limit* ETL runs, newest first, with per-stage timings and counts.
 
     Requires X-Admin-Key header matching ADMIN_API_KEY.
-    For slow extracts (> 5 s) returns HTTP 202 with a job_id for async polling.
     """
-    import threading
-    import time as _time
+    _require_etl_admin(request)
+    return {"runs": recent_etl_runs(limit)}
 
-    api_key = request.headers.get("X-Admin-Key", "")
-    if api_key != get_settings().ADMIN_API_KEY:
-        raise HTTPException(status_code=403, detail="Admin access required")
 
-    start = _time.monotonic()
-    try:
-        events, sales = extract_events_and_sales()
-        elapsed = _time.monotonic() - start
+@app.get("/etl/runs/{run_id}/rejects")
+def etl_run_rejects(
+    run_id: int,
+    request: Request,
+    limit: int = Query(100, ge=1, le=1000),
+    after_id: int = Query(0, ge=0),
+    reason: Optional[str] = Query(None),
+) -> Any:
+    """Page through the rows an ETL run rejected, oldest first.
 
-        ev_rows, daily_rows = transform_summary(
-            [e.raw for e in events], [s.raw for s in sales]
-        )
+    Requires X-Admin-Key header matching ADMIN_API_KEY. Pass the returned
+    ``next_after_id`` as ``after_id`` to fetch the next page; it is null on
+    the last page. *reason* filters on a reason code such as
+    ``future_sale_date``.
+    """
+    _require_etl_admin(request)
+    page = run_rejects(run_id, limit=limit, after_id=after_id, reason=reason)
+    if page is None:
+        raise HTTPException(status_code=503, detail="Database not configured")
+    return page
 
-        if elapsed > 5.0:
-            job_id = str(uuid.uuid4())
 
-            def _run_diff() -> None:
-                result = diff_etl_output(ev_rows, daily_rows)
-                _etl_diff_jobs[job_id] = {"status": "complete", "result": result}
+@app.get("/etl/diff")
+def etl_diff(
+    request: Request,
+    sample_limit: Optional[int] = Query(None, ge=0, le=1000),
+) -> Any:
+    """Dry-run ETL diff: show what the next ETL run would load without committing.
 
-            _etl_diff_jobs[job_id] = {"status": "pending"}
-            threading.Thread(target=_run_diff, daemon=True).start()
-            return JSONResponse(
-                status_code=202,
-                content={"job_id": job_id, "status": "pending"},
-            )
+    Requires X-Admin-Key header matching ADMIN_API_KEY. Diffs run on a bounded
+    worker pool; identical in-flight requests share one job. When the last
+    diff took longer than ETL_DIFF_SYNC_SECONDS, the pool is busy, or this
+    diff does not finish within ETL_DIFF_SYNC_SECONDS, returns HTTP 202 with
+    a job_id to poll at ``GET /etl/diff/{job_id}``; returns 429 when
+    ETL_DIFF_MAX_PENDING jobs are already queued.
+    """
+    _require_etl_admin(request)
+    try:
+        job, run_async = diff_jobs.submit(sample_limit)
+    except DiffQueueFull as exc:
+        raise HTTPException(status_code=429, detail=str(exc))
 
-        result = diff_etl_output(ev_rows, daily_rows)
-        return result
+    if run_async:
+        return JSONResponse(status_code=202, content={"job_id": job.job_id, "status": job.status})
 
-    except HTTPException:
-        raise
-    except Exception as exc:
-        log_error("ETL diff failed", {"error": str(exc)})
-        raise HTTPException(status_code=500, detail=f"ETL diff failed: {exc}")
\ No newline at end of file
+    try:
+        diff_jobs.wait(job, timeout=diff_jobs.sync_seconds)
+    except (FuturesTimeoutError, CancelledError):
+        # Over the sync budget (or cancelled at shutdown): hand back the job to poll.
+        return JSONResponse(status_code=202, content={"job_id": job.job_id, "status": job.status})
+    if job.status == "failed":
+        raise HTTPException(status_code=500, detail=f"ETL diff failed: {job.error}")
+    return job.result
+
+
+@app.get("/etl/diff/{job_id}")
+def etl_diff_job(job_id: str, request: Request) -> Any:
+    """Status of an async ETL diff job; includes the result once complete."""
+    _require_etl_admin(request)
+    job = diff_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="ETL diff job not found or expired")
+    return job.to_dict()
+
+
+@app.post("/etl/webhook/sales", status_code=202)
+async def etl_webhook_sales(request: Request) -> Any:
+    """Accept sale notifications pushed by the Nest API (see src/etl/webhook.py).
+
+    The body must be signed with ETL_WEBHOOK_SECRET in the X-Webhook-Signature
+    and X-Webhook-Timestamp headers. Sales are buffered and applied to the
+    summary tables in micro-batches every ETL_WEBHOOK_FLUSH_SECONDS. Returns
+    401 for a bad signature, 429 when the buffer is full and 503 when the
+    webhook is not configured.
+    """
+    settings = get_settings()
+    if not settings.ETL_WEBHOOK_SECRET or get_engine() is None:
+        raise HTTPException(status_code=503, detail="Sales webhook not configured")
+    body = await request.body()
+    try:
+        verify_signature(
+            settings.ETL_WEBHOOK_SECRET,
+            request.headers.get(TIMESTAMP_HEADER),
+            request.headers.get(SIGNATURE_HEADER),
+            body,
+            settings.ETL_WEBHOOK_TOLERANCE_SECONDS,
+        )
+    except WebhookSignatureError as exc:
+        raise HTTPException(status_code=401, detail=str(exc))
+    try:
+        sales, invalid = parse_sales(body)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Body must be JSON")
+    if invalid:
+        ETL_WEBHOOK_SALES_TOTAL.labels(outcome="invalid").inc(invalid)
+    try:
+        sales_webhook.submit(sales)
+    except WebhookBufferFull as exc:
+        raise HTTPException(status_code=429, detail=str(exc))
+    return {"accepted": len(sales), "invalid": invalid}
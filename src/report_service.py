@@ -21,26 +21,6 @@ REPORTS_DIR = Path("reports")
 _FILENAME_RE = re.compile(r"^daily_report_(\d{4}-\d{2}-\d{2})_\d{8}_\d{6}\.(csv|json)$")
 
 
-def create_generated_reports_table() -> None:
-    """Create the generated_reports table if it does not yet exist."""
-    engine = _pg_engine()
-    if engine is None:
-        logger.info("Skipping generated_reports table creation — no DB engine")
-        return
-    with engine.begin() as conn:
-        conn.execute(text("""
-            CREATE TABLE IF NOT EXISTS generated_reports (
-                id          SERIAL PRIMARY KEY,
-                filename    TEXT        NOT NULL UNIQUE,
-                report_date DATE        NOT NULL,
-                format      TEXT        NOT NULL,
-                size_bytes  BIGINT      NOT NULL,
-                generated_at TIMESTAMP  NOT NULL
-            )
-        """))
-    logger.info("generated_reports table ready")
-
-
 def insert_report_metadata(
     filename: str,
     report_date: date,
@@ -123,12 +103,7 @@ def scan_and_populate_reports() -> None:
 # generated_reports table helpers
 # ---------------------------------------------------------------------------
 
-def create_generated_reports_table() -> None:
-    """Create the generated_reports table if it does not yet exist."""
-    engine = _pg_engine()
-    if engine is None:
-        logger.info("Skipping generated_reports table creation — no DB engine")
-        return
+def _create_generated_reports_table(engine: Any) -> None:
     with engine.connect() as conn:
         conn.execute(text("""
             CREATE TABLE IF NOT EXISTS generated_reports (
@@ -138,13 +113,25 @@ def create_generated_reports_table() -> None:
                 event_id TEXT,
                 format TEXT NOT NULL,
                 size_bytes INTEGER NOT NULL,
-                generated_at TIMESTAMP NOT NULL DEFAULT NOW()
+                generated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
             )
         """))
         conn.commit()
     logger.info("generated_reports table ready")
 
 
+_db.register_schema("generated_reports", _create_generated_reports_table)
+
+
+def create_generated_reports_table() -> None:
+    """Create the generated_reports table if this process has not already."""
+    engine = _pg_engine()
+    if engine is None:
+        logger.info("Skipping generated_reports table creation — no DB engine")
+        return
+    _db.ensure_schema(engine, "generated_reports")
+
+
 def insert_report_metadata(
     filename: str,
     report_date: date,
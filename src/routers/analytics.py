@@ -1,93 +1,289 @@
-from datetime import datetime, timezone
-from typing import Optional
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Literal, Optional, Tuple
 
-from cachetools import TTLCache  # type: ignore[import-untyped]
-from fastapi import APIRouter, Depends
-from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field
 
-from src.auth.dependencies import require_admin_key
-
-# ---------------------------------------------------------------------------
-# NOTE: get_db / get_current_user / ORM models are mocked here because the
-# analytics router is a thin layer over the actual analytics service in
-# src/analytics/service.py.  Replace these stubs with real imports when wiring
-# up the router to the application database session.
-# ---------------------------------------------------------------------------
-
-def get_db() -> None:  # type: ignore[return]
-    """Stub – replace with real SQLAlchemy session dependency."""
-    pass
-
-
-def get_current_user() -> dict[str, object]:  # type: ignore[return]
-    """Stub – replace with real authentication dependency."""
-    pass
+from src.analytics.ingest import IngestPayloadError, IngestPayloadTooLarge, ingest_ndjson, iter_ndjson_lines
+from src.analytics.service import analytics_service
+from src.analytics.summary import summary_refresher
+from src.auth.dependencies import require_service_key
+from src.config import get_settings
+from src.logging_config import log_error
 
+router = APIRouter(prefix="/analytics", tags=["Analytics"])
 
-class _EventSalesSummaryStub:
-    id: None = None
-    total_tickets_sold: None = None
-    revenue_xlm: None = None
-    revenue_usd: None = None
 
+class TopSalesEvent(BaseModel):
+    event_id: str
+    event_name: Optional[str]
+    tickets_sold: int
+    revenue: str
 
-class _EtlRunLogStub:
-    created_at: None = None
 
+class TopScannedEvent(BaseModel):
+    event_id: str
+    scan_count: int
 
-router = APIRouter(prefix="/analytics", tags=["Analytics"])
 
-# Cache: at most 1 result, TTL = 60 seconds
-summary_cache: TTLCache[str, "AnalyticsSummaryResponse"] = TTLCache(maxsize=1, ttl=60)
+class Last24hDeltas(BaseModel):
+    scans: int
+    valid_scans: int
+    transfers: int
+    invalid_attempts: int
+    tickets_sold: int = Field(description="Tickets from sales dated today or yesterday (sales are recorded per day)")
 
 
 class AnalyticsSummaryResponse(BaseModel):
     total_events: int
     total_tickets_sold: int
-    total_revenue_xlm: str
-    total_revenue_usd: str
+    total_revenue: str
+    total_scans: int
+    total_valid_scans: int
+    total_transfers: int
+    total_invalid_attempts: int
+    last_24h: Last24hDeltas
+    top_events_by_sales: List[TopSalesEvent]
+    top_events_by_scans_24h: List[TopScannedEvent]
     last_etl_at: Optional[datetime]
     generated_at: datetime
 
 
 @router.get("/summary", response_model=AnalyticsSummaryResponse)
 def get_analytics_summary(
-    db: Session = Depends(get_db),
-    current_user: dict[str, object] = Depends(get_current_user),
+    _: str = Depends(require_service_key),
 ) -> AnalyticsSummaryResponse:
-    """Return a platform-wide aggregated analytics summary (cached 60 s)."""
-    from sqlalchemy import func  # noqa: PLC0415
-
-    cached = summary_cache.get("summary_data")
-    if cached:
-        return cached
-
-    EventSalesSummary = _EventSalesSummaryStub  # noqa: N806 – matches ORM model naming
-    EtlRunLog = _EtlRunLogStub  # noqa: N806
-
-    sales_agg = db.query(  # type: ignore[union-attr]
-        func.count(EventSalesSummary.id).label("total_events"),
-        func.sum(EventSalesSummary.total_tickets_sold).label("total_tickets"),
-        func.sum(EventSalesSummary.revenue_xlm).label("total_xlm"),
-        func.sum(EventSalesSummary.revenue_usd).label("total_usd"),
-    ).first()
-
-    last_etl = db.query(func.max(EtlRunLog.created_at)).scalar()  # type: ignore[union-attr]
-
-    total_events: int = sales_agg.total_events or 0 if sales_agg else 0
-    total_tickets_sold: int = sales_agg.total_tickets or 0 if sales_agg else 0
-    total_revenue_xlm: str = str(sales_agg.total_xlm or "0.00") if sales_agg else "0.00"
-    total_revenue_usd: str = str(sales_agg.total_usd or "0.00") if sales_agg else "0.00"
-
-    response = AnalyticsSummaryResponse(
-        total_events=total_events,
-        total_tickets_sold=total_tickets_sold,
-        total_revenue_xlm=total_revenue_xlm,
-        total_revenue_usd=total_revenue_usd,
-        last_etl_at=last_etl,
-        generated_at=datetime.now(timezone.utc),
-    )
-
-    summary_cache["summary_data"] = response
-    return response
\ No newline at end of file
+    """Return the precomputed platform-wide analytics summary (SERVICE).
+
+    Served from the last snapshot without touching the database; a snapshot
+    older than ``ANALYTICS_SUMMARY_TTL_SECONDS`` triggers a background refresh
+    and is still returned. ``generated_at`` tells callers how fresh it is.
+    Returns 503 until the first snapshot has been computed.
+    """
+    snapshot = summary_refresher.get()
+    if snapshot is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Analytics summary is being computed",
+            headers={"Retry-After": "5"},
+        )
+    return AnalyticsSummaryResponse(**snapshot)
+
+
+class DailyScanCount(BaseModel):
+    date: str
+    scans: int
+    valid_scans: int
+
+
+class ScanCountsResponse(BaseModel):
+    event_id: Optional[str]
+    days: int
+    total: int
+    valid: int
+    invalid: int
+    valid_ratio: Optional[float]
+    daily: List[DailyScanCount]
+
+
+@router.get("/scan-counts", response_model=ScanCountsResponse)
+def get_scan_counts(
+    event_id: Optional[str] = Query(None, description="Restrict counts to one event"),
+    days: int = Query(7, ge=1, le=366, description="Calendar days to cover, including today"),
+    _: str = Depends(require_service_key),
+) -> ScanCountsResponse:
+    """Return scan totals, valid ratio and per-day counts for the last N days (SERVICE)."""
+    try:
+        return ScanCountsResponse(**analytics_service.get_scan_counts(event_id=event_id, days=days))
+    except Exception as exc:
+        log_error("Failed to retrieve scan counts", {"event_id": event_id, "error": str(exc)})
+        raise HTTPException(status_code=500, detail=f"Failed to retrieve scan counts: {exc}")
+
+
+class DistinctCountsResponse(BaseModel):
+    event_id: str
+    from_ts: Optional[str]
+    to_ts: Optional[str]
+    scanned_tickets: int
+    transferred_tickets: int
+    transfer_users: int
+    standard_error: float
+
+
+@router.get("/distinct", response_model=DistinctCountsResponse)
+def get_distinct_counts(
+    event_id: str = Query(..., min_length=1),
+    from_ts: Optional[datetime] = Query(None, description="Start of the window (rounded down to the hour)"),
+    to_ts: Optional[datetime] = Query(None, description="End of the window"),
+    _: str = Depends(require_service_key),
+) -> DistinctCountsResponse:
+    """Return estimated distinct tickets scanned/transferred and transfer users (SERVICE).
+
+    Served from HyperLogLog sketches maintained at write time; estimates are
+    within ``standard_error`` (relative) of the exact count about 68% of the
+    time. Without a window the all-time sketch is used.
+    """
+    if from_ts and to_ts and from_ts > to_ts:
+        raise HTTPException(status_code=400, detail="from_ts must be before to_ts")
+    try:
+        return DistinctCountsResponse(**analytics_service.get_distinct_counts(event_id, from_ts, to_ts))
+    except Exception as exc:
+        log_error("Failed to retrieve distinct counts", {"event_id": event_id, "error": str(exc)})
+        raise HTTPException(status_code=500, detail=f"Failed to retrieve distinct counts: {exc}")
+
+
+# Longest window served by the per-scanner time series (one point per minute).
+_MAX_SERIES_MINUTES = 24 * 60
+
+
+def _scanner_window(from_ts: Optional[datetime], to_ts: Optional[datetime]) -> Tuple[datetime, datetime]:
+    """Resolve an optional window to naive UTC bounds, defaulting to the last hour.
+
+    The default end is the end of the current minute, so repeated default
+    requests share a result-cache key until the next minute starts.
+    """
+    def _naive(ts: datetime) -> datetime:
+        return ts.astimezone(timezone.utc).replace(tzinfo=None) if ts.tzinfo else ts
+
+    if to_ts:
+        end = _naive(to_ts)
+    else:
+        end = datetime.utcnow().replace(second=0, microsecond=0) + timedelta(minutes=1)
+    start = _naive(from_ts) if from_ts else end - timedelta(hours=1)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="from_ts must be before to_ts")
+    return start, end
+
+
+class ScannerThroughput(BaseModel):
+    scanner_id: str
+    scans: int
+    invalid: int
+    invalid_ratio: float
+    active_minutes: int
+    scans_per_minute: float
+    peak_scans_per_minute: int
+
+
+class TopScannersResponse(BaseModel):
+    event_id: str
+    from_ts: datetime
+    to_ts: datetime
+    rank_by: str
+    scanners: List[ScannerThroughput]
+
+
+class ScannerMinutePoint(BaseModel):
+    minute: str
+    scans: int
+    invalid: int
+    invalid_ratio: float
+
+
+class ScannerSeriesResponse(BaseModel):
+    event_id: str
+    scanner_id: str
+    from_ts: datetime
+    to_ts: datetime
+    data: List[ScannerMinutePoint]
+
+
+@router.get("/scanners/top", response_model=TopScannersResponse)
+def get_top_scanners(
+    event_id: str = Query(..., min_length=1),
+    rank_by: Literal["hot", "slow", "invalid"] = Query(
+        "hot", description="hot: most scans; slow: lowest scans/min while active; invalid: highest invalid ratio"
+    ),
+    from_ts: Optional[datetime] = Query(None, description="Window start (default: one hour before to_ts)"),
+    to_ts: Optional[datetime] = Query(None, description="Window end (default: now)"),
+    limit: int = Query(10, ge=1, le=100),
+    _: str = Depends(require_service_key),
+) -> TopScannersResponse:
+    """Rank an event's scanners by throughput or invalid ratio (SERVICE).
+
+    Served from per-scanner minute rollups maintained at write time.
+    """
+    start, end = _scanner_window(from_ts, to_ts)
+    try:
+        scanners = analytics_service.get_top_scanners(event_id, start, end, rank_by, limit)
+    except Exception as exc:
+        log_error("Failed to retrieve top scanners", {"event_id": event_id, "error": str(exc)})
+        raise HTTPException(status_code=500, detail=f"Failed to retrieve top scanners: {exc}")
+    return TopScannersResponse(event_id=event_id, from_ts=start, to_ts=end, rank_by=rank_by, scanners=scanners)
+
+
+@router.get("/scanners/{scanner_id}/series", response_model=ScannerSeriesResponse)
+def get_scanner_series(
+    scanner_id: str,
+    event_id: str = Query(..., min_length=1),
+    from_ts: Optional[datetime] = Query(None, description="Window start (default: one hour before to_ts)"),
+    to_ts: Optional[datetime] = Query(None, description="Window end (default: now)"),
+    _: str = Depends(require_service_key),
+) -> ScannerSeriesResponse:
+    """Return per-minute scans and invalid ratio for one scanner (SERVICE).
+
+    Minutes without scans are zero-filled; windows are limited to 24 hours.
+    """
+    start, end = _scanner_window(from_ts, to_ts)
+    if end - start > timedelta(minutes=_MAX_SERIES_MINUTES):
+        raise HTTPException(status_code=400, detail="Window must not exceed 24 hours")
+    try:
+        data = analytics_service.get_scanner_series(event_id, scanner_id, start, end)
+    except Exception as exc:
+        log_error("Failed to retrieve scanner series", {"event_id": event_id, "scanner_id": scanner_id, "error": str(exc)})
+        raise HTTPException(status_code=500, detail=f"Failed to retrieve scanner series: {exc}")
+    return ScannerSeriesResponse(event_id=event_id, scanner_id=scanner_id, from_ts=start, to_ts=end, data=data)
+
+
+class IngestRowError(BaseModel):
+    line: int
+    error: str
+
+
+class AnalyticsIngestResponse(BaseModel):
+    accepted: int
+    rejected: int
+    accepted_by_type: Dict[str, int]
+    batches: int
+    errors: List[IngestRowError]
+    errors_truncated: bool
+
+
+@router.post("/ingest", response_model=AnalyticsIngestResponse)
+async def ingest_analytics_events(
+    request: Request,
+    _: str = Depends(require_service_key),
+) -> AnalyticsIngestResponse:
+    """Bulk-ingest an NDJSON stream of scan/transfer/invalid records (SERVICE).
+
+    The body may be gzip-compressed (``Content-Encoding: gzip`` or detected by
+    magic number). Each line carries ``"type": "scan" | "transfer" | "invalid"``.
+    Rows are written in batches of ``ANALYTICS_INGEST_BATCH_SIZE``, one
+    transaction per batch; rejected rows are reported by 1-based line number.
+    Bodies over ``ANALYTICS_INGEST_MAX_BYTES``, compressed or decompressed,
+    get 413; a body that cannot be decompressed gets 400 and writes nothing.
+    """
+    settings = get_settings()
+    max_bytes = settings.ANALYTICS_INGEST_MAX_BYTES
+    declared = request.headers.get("content-length", "")
+    if declared.isdigit() and int(declared) > max_bytes:
+        raise HTTPException(status_code=413, detail=f"Payload exceeds {max_bytes} bytes")
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > max_bytes:
+            raise HTTPException(status_code=413, detail=f"Payload exceeds {max_bytes} bytes")
+    encoding = request.headers.get("content-encoding", "").lower()
+    try:
+        lines = await run_in_threadpool(
+            iter_ndjson_lines, bytes(body), True if encoding == "gzip" else None, max_bytes
+        )
+        result = await run_in_threadpool(ingest_ndjson, lines, settings.ANALYTICS_INGEST_BATCH_SIZE)
+    except IngestPayloadTooLarge as exc:
+        raise HTTPException(status_code=413, detail=str(exc))
+    except IngestPayloadError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    except RuntimeError as exc:
+        raise HTTPException(status_code=503, detail=str(exc))
+    return AnalyticsIngestResponse(**result)
@@ -1,17 +1,13 @@
 import logging
 from typing import List, Optional
 from sqlalchemy import text
+import src.db as _db
 from src.db import get_engine
 from src.revenue_sharing_models import Stakeholder
 
 logger = logging.getLogger("veritix.stakeholder_store")
 
-def create_stakeholders_table() -> None:
-    """Create the stakeholders table if it does not yet exist."""
-    engine = get_engine()
-    if engine is None:
-        logger.info("Skiaging stakeholder table creation — no DB engine")
-        return
+def _create_stakeholders_table(engine) -> None:
     with engine.connect() as conn:
         conn.execute(text("""
             CREATE TABLE IF NOT EXISTS stakeholders (
@@ -30,6 +26,16 @@ def create_stakeholders_table() -> None:
         conn.commit()
     logger.info("stakeholders table ready")
 
+_db.register_schema("stakeholders", _create_stakeholders_table)
+
+def create_stakeholders_table() -> None:
+    """Create the stakeholders table if this process has not already."""
+    engine = get_engine()
+    if engine is None:
+        logger.info("Skiaging stakeholder table creation — no DB engine")
+        return
+    _db.ensure_schema(engine, "stakeholders")
+
 def get_stakeholders_for_event(event_id: str) -> List[Stakeholder]:
     """Retrieve stakeholders for a specific event from the database."""
     engine = get_engine()
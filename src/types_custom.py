@@ -1,7 +1,7 @@
 from datetime import date as dt_date, datetime
 from typing import Any, Dict, List, Literal, Optional
 
-from pydantic import BaseModel, ConfigDict, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field, Json, field_validator
 
 # --- Fraud Detection Types ---
 class FraudCheckRequest(BaseModel):
@@ -280,6 +280,10 @@ class AnalyticsListQuery(BaseModel):
     to_ts: Optional[datetime] = Field(None, description="End datetime filter (ISO string)")
     page: int = Field(1, ge=1, description="Page number (1-based)")
     limit: int = Field(100, ge=1, le=1000, description="Items per page (max 1000)")
+    metadata: Optional[Json[Dict[str, Any]]] = Field(
+        None,
+        description='JSON object matched by containment against additional_metadata, e.g. {"gate": "A"}',
+    )
 
 
 class AnalyticsScansResponse(BaseModel):
@@ -7,6 +7,9 @@ from src.config import get_settings
 os.environ.setdefault("QR_SIGNING_KEY", "a" * 32)
 # Force model training to skip in test environments
 os.environ.setdefault("SKIP_MODEL_TRAINING", "true")
+# Merge buffered sketch updates on read rather than on a timer thread that
+# would share the tests' single in-memory SQLite connection.
+os.environ.setdefault("ANALYTICS_SKETCH_FLUSH_SECONDS", "3600")
 
 @pytest.fixture(scope="session")
 def db_engine():
@@ -19,7 +22,7 @@ def db_engine():
 @pytest.fixture
 def clean_test_db(db_engine):
     """Truncates all tables before/after integration tests."""
-    tables = ["event_sales_summary", "daily_ticket_sales", "etl_run_log"]
+    tables = ["event_sales_summary", "daily_ticket_sales", "etl_run_log", "etl_load_ledger"]
     with db_engine.begin() as conn:
         for table in tables:
             try:
@@ -103,23 +103,23 @@ def test_full_etl_pipeline_integration(monkeypatch, db_engine, clean_test_db):
 
     # 4. Run again with updated sales data for upsert test
     # E1 gets 2 more sales on 2024-01-01 (adding 2 qty)
-    # Important: In this implementation, transform_summary aggregates everything provided in 'sales'.
-    # If the API returns the same records again, they will be summed again.
-    # The requirement says "updated sales data", so we simulate a second run where more data is returned.
+    # The second run is incremental: it sends ?since= and the API returns only
+    # the sales created since the first run, which are added to the totals.
     new_sale = {"event_id": "E1", "qty": 2, "price": 50.0, "sale_date": "2024-01-01T15:00:00"}
-    updated_sales_data = sales_data + [new_sale]
-    
-    side_effects["/events"].append(_response(200, "/events", {"data": events_data}))
-    side_effects["/ticket-sales"].append(_response(200, "/ticket-sales", {"data": updated_sales_data}))
+
+    side_effects["/events"].append(_response(200, "/events", {"data": []}))
+    side_effects["/ticket-sales"].append(_response(200, "/ticket-sales", {"data": [new_sale]}))
     
     run_etl_once()
     
-    # 5. Assertions for Run 2 (Upsert)
+    # 5. Assertions for Run 2 (additive upsert)
+    assert "since" in dummy_client.calls[-1]["params"]
     with db_engine.connect() as conn:
         # E1: 4 (old) + 2 (new) = 6 tickets, 200 + 100 = 300 rev
-        row_e1 = conn.execute(text("SELECT total_tickets, total_revenue FROM event_sales_summary WHERE event_id='E1'")).fetchone()
-        assert int(row_e1[0]) == 6
-        assert float(row_e1[1]) == 300.0
+        row_e1 = conn.execute(text("SELECT event_name, total_tickets, total_revenue FROM event_sales_summary WHERE event_id='E1'")).fetchone()
+        assert row_e1[0] == "Event 1"
+        assert int(row_e1[1]) == 6
+        assert float(row_e1[2]) == 300.0
         
         # E1 daily on 2024-01-01: 3 (old) + 2 (new) = 5 tickets, 150 + 100 = 250 rev
         row_e1_d1_new = conn.execute(text("SELECT tickets_sold, revenue FROM daily_ticket_sales WHERE event_id='E1' AND sale_date='2024-01-01'")).fetchone()
@@ -0,0 +1,117 @@
+"""Tests for the write-invalidated AnalyticsService result cache."""
+import json
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.analytics.ingest import ingest_ndjson
+from src.analytics.models import Base
+from src.analytics.service import AnalyticsService
+from src.logging_config import ANALYTICS_CACHE_REQUESTS
+
+
+@pytest.fixture
+def engine():
+    eng = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(eng)
+    yield eng
+    eng.dispose()
+
+
+@pytest.fixture
+def factory(engine):
+    return sessionmaker(bind=engine)
+
+
+@pytest.fixture
+def service(factory):
+    with patch("src.analytics.service.get_session", side_effect=factory) as mock_get_session:
+        svc = AnalyticsService()
+        svc.mock_get_session = mock_get_session
+        yield svc
+
+
+def _cache_count(method, result):
+    return ANALYTICS_CACHE_REQUESTS.labels(method=method, result=result)._value.get()
+
+
+def test_repeated_read_served_from_cache(service):
+    service.log_ticket_scan(ticket_id="t1", event_id="e1")
+    hits = _cache_count("get_recent_scans", "hit")
+
+    first = service.get_recent_scans("e1")
+    calls = service.mock_get_session.call_count
+    second = service.get_recent_scans("e1")
+
+    assert second == first
+    assert service.mock_get_session.call_count == calls
+    assert _cache_count("get_recent_scans", "hit") == hits + 1
+
+
+def test_cached_results_are_returned_as_copies(service):
+    service.log_ticket_scan(ticket_id="t1", event_id="e1")
+    first = service.get_recent_scans("e1")
+    first["data"].clear()
+
+    assert len(service.get_recent_scans("e1")["data"]) == 1
+
+
+def test_arguments_are_part_of_the_key(service):
+    service.log_ticket_scan(ticket_id="t1", event_id="e1", additional_metadata={"gate": "A"})
+    service.log_ticket_scan(ticket_id="t2", event_id="e1", additional_metadata={"gate": "B"})
+
+    assert service.get_recent_scans("e1", metadata={"gate": "A"})["total"] == 1
+    assert service.get_recent_scans("e1", metadata={"gate": "B"})["total"] == 1
+    assert service.get_recent_scans("e1")["total"] == 2
+    assert service.get_recent_scans("e1", limit=1)["limit"] == 1
+
+
+def test_write_invalidates_only_its_event(service):
+    service.log_ticket_scan(ticket_id="t1", event_id="e1")
+    service.log_ticket_scan(ticket_id="t2", event_id="e2")
+    assert service.get_stats_for_event("e1")["scan_count"] == 1
+    assert service.get_stats_for_event("e2")["scan_count"] == 1
+
+    service.log_ticket_scan(ticket_id="t3", event_id="e1")
+    calls = service.mock_get_session.call_count
+
+    assert service.get_stats_for_event("e2")["scan_count"] == 1
+    assert service.mock_get_session.call_count == calls
+    assert service.get_stats_for_event("e1")["scan_count"] == 2
+
+
+def test_any_write_invalidates_cross_event_reads(service):
+    service.log_ticket_scan(ticket_id="t1", event_id="e1")
+    assert set(service.get_stats_for_all_events()) == {"e1"}
+
+    service.log_invalid_attempt(attempt_type="scan", reason="invalid_qr", event_id="e2")
+    assert set(service.get_stats_for_all_events()) == {"e1", "e2"}
+
+
+def test_transfer_and_invalid_attempt_writes_invalidate(service):
+    assert service.get_recent_transfers("e1")["total"] == 0
+    assert service.get_invalid_attempts("e1")["total"] == 0
+
+    service.log_ticket_transfer(ticket_id="t1", event_id="e1", from_user_id="u1", to_user_id="u2")
+    service.log_invalid_attempt(attempt_type="scan", reason="expired", event_id="e1")
+
+    assert service.get_recent_transfers("e1")["total"] == 1
+    assert service.get_invalid_attempts("e1")["total"] == 1
+
+
+def test_bulk_ingest_invalidates_shared_service(engine, factory):
+    shared = AnalyticsService()
+    line = json.dumps({"type": "scan", "ticket_id": "t1", "event_id": "e1"}).encode()
+    with patch("src.analytics.service.get_session", side_effect=factory), \
+            patch("src.analytics.ingest.get_engine", return_value=engine), \
+            patch("src.analytics.ingest.analytics_service", shared):
+        assert shared.get_recent_scans("e1")["total"] == 0
+        ingest_ndjson([line])
+        assert shared.get_recent_scans("e1")["total"] == 1
@@ -0,0 +1,202 @@
+"""Tests for the columnar scan snapshot and its use by AnalyticsService."""
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.analytics import service as service_module
+from src.analytics.columnar import ScanSnapshot
+from src.analytics.models import Base, TicketScan
+from src.analytics.service import AnalyticsService
+from src.config import get_settings
+from src.main import app
+
+client = TestClient(app)
+
+SERVICE_HEADERS = {"Authorization": f"Bearer {get_settings().SERVICE_API_KEY}"}
+
+
+@pytest.fixture
+def engine():
+    eng = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(eng)
+    yield eng
+    eng.dispose()
+
+
+@pytest.fixture(autouse=True)
+def clear_trending_cache():
+    service_module._trending_cache = None
+    yield
+    service_module._trending_cache = None
+
+
+def _insert_scans(engine, rows):
+    with engine.begin() as conn:
+        conn.execute(TicketScan.__table__.insert(), [
+            {"ticket_id": f"t{i}", "event_id": event_id, "scan_timestamp": ts, "is_valid": valid}
+            for i, (event_id, ts, valid) in enumerate(rows)
+        ])
+
+
+def _recent_rows(now):
+    today = datetime(now.year, now.month, now.day)
+    return [
+        ("e1", today + timedelta(hours=9, minutes=5), True),
+        ("e1", today + timedelta(hours=9, minutes=40), False),
+        ("e1", today + timedelta(hours=21), True),
+        ("e2", today + timedelta(hours=9), True),
+        ("e2", today - timedelta(days=1, hours=-10), True),
+        ("e1", today - timedelta(days=3, hours=-8), True),
+        ("e1", today - timedelta(days=90), True),
+    ]
+
+
+def test_refresh_is_incremental_and_trims_window(engine):
+    now = datetime(2026, 5, 20, 23, 0)
+    _insert_scans(engine, _recent_rows(now))
+    snapshot = ScanSnapshot(window_days=30)
+
+    assert snapshot.refresh(engine, now=now) == 7
+    # The 90-day-old scan is outside the window.
+    assert len(snapshot) == 6
+    assert snapshot.watermark == 7
+
+    assert snapshot.refresh(engine, now=now) == 0
+    _insert_scans(engine, [("e3", now - timedelta(days=2), True)])
+    assert snapshot.refresh(engine, now=now) == 1
+    assert len(snapshot) == 7
+    # Out-of-order timestamp was merged into the sorted arrays.
+    assert snapshot.counts(now - timedelta(days=3))["total"] == 6
+
+
+def test_settled_ids_follow_the_database_clock(engine):
+    with engine.begin() as conn:
+        conn.execute(TicketScan.__table__.insert().values(
+            id=1, ticket_id="t1", event_id="e1", scan_timestamp=datetime(2026, 5, 20, 9), is_valid=True,
+            recorded_at=datetime.utcnow() - timedelta(seconds=600),
+        ))
+    snapshot = ScanSnapshot(window_days=30, overlap_seconds=60)
+    # The caller's clock is hours behind; recorded_at is compared with the database's.
+    snapshot.refresh(engine, now=datetime(2026, 5, 20, 12))
+    assert snapshot._columns.settled == 1
+
+
+def test_refresh_picks_up_ids_that_commit_late(engine):
+    now = datetime.utcnow()
+    scans = TicketScan.__table__
+    with engine.begin() as conn:
+        conn.execute(scans.insert(), [
+            {"id": i, "ticket_id": f"t{i}", "event_id": "e1", "scan_timestamp": now - timedelta(hours=1),
+             "is_valid": True, "recorded_at": now - timedelta(seconds=age)}
+            for i, age in ((1, 600), (3, 10))
+        ])
+    snapshot = ScanSnapshot(window_days=30, overlap_seconds=60)
+    assert snapshot.refresh(engine, now=now) == 2
+
+    # Id 2 was taken before id 3 but commits after the refresh that saw id 3.
+    with engine.begin() as conn:
+        conn.execute(scans.insert().values(
+            id=2, ticket_id="t2", event_id="e1", scan_timestamp=now - timedelta(hours=1),
+            is_valid=True, recorded_at=now - timedelta(seconds=20),
+        ))
+    assert snapshot.refresh(engine, now=now) == 1
+    assert snapshot.refresh(engine, now=now) == 0
+    assert snapshot.counts(now - timedelta(days=1))["total"] == 3
+
+
+def test_snapshot_queries(engine):
+    now = datetime(2026, 5, 20, 23, 0)
+    _insert_scans(engine, _recent_rows(now))
+    snapshot = ScanSnapshot(window_days=30)
+    snapshot.refresh(engine, now=now)
+
+    hours = snapshot.hourly_counts("e1", now.date())
+    assert hours[9] == 2 and hours[21] == 1 and sum(hours) == 3
+    assert sum(snapshot.hourly_counts("missing", now.date())) == 0
+
+    assert snapshot.top_events(now - timedelta(hours=23), limit=5) == [
+        {"event_id": "e1", "scan_count": 3},
+        {"event_id": "e2", "scan_count": 1},
+    ]
+
+    counts = snapshot.counts(datetime(2026, 5, 18), until=datetime(2026, 5, 21), event_id="e1")
+    assert counts["total"] == 3
+    assert counts["valid"] == 2
+    assert counts["valid_ratio"] == pytest.approx(0.6667)
+    assert [d["scans"] for d in counts["daily"]] == [0, 0, 3, 0]
+
+    assert snapshot.covers(now - timedelta(days=29))
+    assert not snapshot.covers(now - timedelta(days=31))
+
+
+def test_service_columnar_and_sql_paths_agree(engine):
+    now = datetime.utcnow()
+    _insert_scans(engine, _recent_rows(now))
+    factory = sessionmaker(bind=engine)
+    snapshot = ScanSnapshot(window_days=30)
+
+    with patch("src.analytics.service.get_session", side_effect=factory), \
+            patch("src.analytics.service._db.get_engine", return_value=engine):
+        sql = AnalyticsService()
+        sql_results = (
+            sql.get_scan_heatmap("e1", now.date()),
+            sql.get_scan_counts(event_id="e1", days=7),
+            sql.get_scan_counts(days=7),
+            sql.get_trending_events(limit=5, hours=48),
+        )
+        service_module._trending_cache = None
+
+        with patch("src.analytics.service.scan_snapshot", snapshot), \
+                patch("src.analytics.service.get_session", side_effect=AssertionError("SQL path used")):
+            columnar = AnalyticsService()
+            columnar_results = (
+                columnar.get_scan_heatmap("e1", now.date()),
+                columnar.get_scan_counts(event_id="e1", days=7),
+                columnar.get_scan_counts(days=7),
+                columnar.get_trending_events(limit=5, hours=48),
+            )
+
+    assert columnar_results == sql_results
+    assert len(snapshot) == 6
+
+
+def test_service_falls_back_to_sql_outside_window(engine):
+    now = datetime.utcnow()
+    _insert_scans(engine, [("e1", now - timedelta(days=40), True)])
+    factory = sessionmaker(bind=engine)
+
+    with patch("src.analytics.service.get_session", side_effect=factory), \
+            patch("src.analytics.service._db.get_engine", return_value=engine), \
+            patch("src.analytics.service.scan_snapshot", ScanSnapshot(window_days=30)):
+        counts = AnalyticsService().get_scan_counts(event_id="e1", days=60)
+
+    assert counts["total"] == 1
+    assert len(counts["daily"]) == 60
+
+
+def test_scan_counts_endpoint():
+    result = {
+        "event_id": "e1", "days": 2, "total": 3, "valid": 2, "invalid": 1, "valid_ratio": 0.6667,
+        "daily": [{"date": "2026-05-19", "scans": 1, "valid_scans": 1},
+                  {"date": "2026-05-20", "scans": 2, "valid_scans": 1}],
+    }
+    with patch("src.routers.analytics.analytics_service.get_scan_counts", return_value=result) as mock_get:
+        response = client.get("/analytics/scan-counts", params={"event_id": "e1", "days": 2}, headers=SERVICE_HEADERS)
+
+    assert response.status_code == 200
+    assert response.json() == result
+    mock_get.assert_called_once_with(event_id="e1", days=2)
+
+
+def test_scan_counts_endpoint_validates_days():
+    response = client.get("/analytics/scan-counts", params={"days": 0}, headers=SERVICE_HEADERS)
+    assert response.status_code == 422
@@ -0,0 +1,113 @@
+"""Tests for the Core column-projection read paths of AnalyticsService."""
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.analytics.models import Base
+from src.analytics.service import AnalyticsService
+
+
+@pytest.fixture
+def sessions():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    opened = []
+
+    def _session():
+        session = factory()
+        opened.append(session)
+        return session
+
+    yield _session, opened
+    engine.dispose()
+
+
+@pytest.fixture
+def service(sessions):
+    factory, _ = sessions
+    with patch("src.analytics.service.get_session", side_effect=factory):
+        svc = AnalyticsService()
+        for i in range(5):
+            svc.log_ticket_scan(
+                ticket_id=f"t{i}", event_id="e1", scanner_id="s1", location="Gate A",
+                is_valid=i != 2, additional_metadata={"n": i},
+            )
+        svc.log_ticket_transfer(
+            ticket_id="t0", event_id="e1", from_user_id="u1", to_user_id="u2",
+            transfer_reason="gift", ip_address="10.0.0.1",
+        )
+        svc.log_invalid_attempt(
+            attempt_type="scan", reason="invalid_qr", ticket_id="t9", event_id="e1",
+            ip_address="10.0.0.2",
+        )
+        yield svc
+
+
+def test_recent_scans_rows_match_response_schema(service):
+    result = service.get_recent_scans("e1", page=2, limit=2)
+
+    assert result["total"] == 5
+    assert len(result["data"]) == 2
+    row = result["data"][0]
+    assert set(row) == {
+        "id", "ticket_id", "scanner_id", "scan_timestamp", "is_valid", "location", "additional_metadata",
+    }
+    assert isinstance(row["scan_timestamp"], str)
+    datetime.fromisoformat(row["scan_timestamp"])
+    assert row["location"] == "Gate A"
+
+
+def test_recent_scans_time_window_and_order(service):
+    now = datetime.utcnow()
+    result = service.get_recent_scans("e1", from_ts=now - timedelta(hours=1), to_ts=now + timedelta(hours=1))
+
+    timestamps = [row["scan_timestamp"] for row in result["data"]]
+    assert timestamps == sorted(timestamps, reverse=True)
+    assert result["total"] == 5
+    assert service.get_recent_scans("e1", to_ts=now - timedelta(hours=1))["total"] == 0
+
+
+def test_scans_by_ticket_id(service):
+    rows = service.get_scans_by_ticket_id("t2")
+
+    assert len(rows) == 1
+    assert rows[0]["event_id"] == "e1"
+    assert rows[0]["is_valid"] is False
+    assert set(rows[0]) == {"id", "ticket_id", "event_id", "scan_timestamp", "is_valid", "location"}
+
+
+def test_transfers_and_invalid_attempt_rows(service):
+    transfer = service.get_recent_transfers("e1")["data"][0]
+    assert transfer["transfer_reason"] == "gift"
+    assert set(transfer) == {
+        "id", "ticket_id", "from_user_id", "to_user_id", "transfer_timestamp", "is_successful",
+        "transfer_reason", "additional_metadata",
+    }
+
+    attempt = service.get_invalid_attempts("e1")["data"][0]
+    assert attempt["reason"] == "invalid_qr"
+    assert set(attempt) == {
+        "id", "attempt_type", "ticket_id", "attempt_timestamp", "reason", "ip_address", "additional_metadata",
+    }
+
+
+def test_list_reads_do_not_load_orm_instances(service, sessions):
+    _, opened = sessions
+    del opened[:]
+
+    service.get_recent_scans("e1")
+    service.get_recent_transfers("e1")
+    service.get_invalid_attempts("e1")
+    service.get_scans_by_ticket_id("t1")
+
+    assert len(opened) == 4
+    assert all(len(session.identity_map) == 0 for session in opened)
@@ -0,0 +1,170 @@
+"""Tests for POST /analytics/ingest — bulk NDJSON event ingestion."""
+import gzip
+import json
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.pool import StaticPool
+
+from src.analytics.ingest import ingest_ndjson, iter_ndjson_lines
+from src.analytics.models import AnalyticsStats, Base, InvalidAttempt, TicketScan, TicketTransfer
+from src.auth.dependencies import require_service_key
+from src.config import get_settings
+from src.main import app
+
+client = TestClient(app)
+
+SERVICE_HEADERS = {"Authorization": f"Bearer {get_settings().SERVICE_API_KEY}"}
+
+
+@pytest.fixture
+def engine():
+    eng = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(eng)
+    with patch("src.analytics.ingest.get_engine", return_value=eng):
+        yield eng
+    eng.dispose()
+
+
+def _ndjson(records) -> bytes:
+    return b"".join(
+        (r if isinstance(r, str) else json.dumps(r)).encode() + b"\n" for r in records
+    )
+
+
+MIXED = [
+    {"type": "scan", "ticket_id": "t1", "event_id": "e1", "scanner_id": "s1",
+     "additional_metadata": {"gate": "A"}},
+    {"type": "scan", "ticket_id": "t2", "event_id": "e1", "is_valid": False,
+     "scan_timestamp": "2026-01-01T10:00:00Z"},
+    {"type": "transfer", "ticket_id": "t1", "event_id": "e1", "from_user_id": "u1", "to_user_id": "u2"},
+    {"type": "invalid", "attempt_type": "scan", "reason": "invalid_qr", "event_id": "e2"},
+]
+
+
+def _count(engine, model):
+    with engine.connect() as conn:
+        return conn.execute(select(func.count()).select_from(model.__table__)).scalar()
+
+
+def test_ingest_writes_mixed_records(engine):
+    result = ingest_ndjson(iter_ndjson_lines(_ndjson(MIXED)), batch_size=2)
+
+    assert result["accepted"] == 4
+    assert result["rejected"] == 0
+    assert result["accepted_by_type"] == {"scan": 2, "transfer": 1, "invalid": 1}
+    assert result["batches"] == 2
+    assert _count(engine, TicketScan) == 2
+    assert _count(engine, TicketTransfer) == 1
+    assert _count(engine, InvalidAttempt) == 1
+
+
+def test_ingest_updates_stats_across_batches(engine):
+    ingest_ndjson(iter_ndjson_lines(_ndjson(MIXED)), batch_size=1)
+
+    with engine.connect() as conn:
+        rows = conn.execute(select(AnalyticsStats.__table__)).mappings().all()
+    by_event = {row["event_id"]: row for row in rows}
+    assert len(rows) == 2
+    assert by_event["e1"]["scan_count"] == 2
+    assert by_event["e1"]["valid_scan_count"] == 1
+    assert by_event["e1"]["invalid_scan_count"] == 1
+    assert by_event["e1"]["transfer_count"] == 1
+    assert by_event["e1"]["successful_transfer_count"] == 1
+    assert by_event["e2"]["invalid_attempt_count"] == 1
+
+
+def test_ingest_reports_rejected_row_offsets(engine):
+    body = _ndjson([
+        MIXED[0],
+        "{not json",
+        {"type": "scan", "event_id": "e1"},
+        "",
+        {"type": "refund", "ticket_id": "t9"},
+        {"type": "scan", "ticket_id": "t3", "event_id": "e1", "is_valid": "yes"},
+        MIXED[2],
+    ])
+    result = ingest_ndjson(iter_ndjson_lines(body))
+
+    assert result["accepted"] == 2
+    assert result["rejected"] == 4
+    assert [e["line"] for e in result["errors"]] == [2, 3, 5, 6]
+    assert "ticket_id is required" in result["errors"][1]["error"]
+    assert result["errors_truncated"] is False
+
+
+def test_ingest_endpoint_accepts_gzip(engine):
+    response = client.post(
+        "/analytics/ingest",
+        content=gzip.compress(_ndjson(MIXED)),
+        headers={**SERVICE_HEADERS, "Content-Type": "application/x-ndjson", "Content-Encoding": "gzip"},
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["accepted"] == 4
+    assert data["rejected"] == 0
+    assert _count(engine, TicketScan) == 2
+
+
+def test_ingest_endpoint_detects_gzip_by_magic_number(engine):
+    response = client.post(
+        "/analytics/ingest",
+        content=gzip.compress(_ndjson(MIXED[:1])),
+        headers=SERVICE_HEADERS,
+    )
+
+    assert response.status_code == 200
+    assert response.json()["accepted"] == 1
+
+
+def test_ingest_endpoint_rejects_corrupt_gzip(engine):
+    response = client.post(
+        "/analytics/ingest",
+        content=gzip.compress(_ndjson(MIXED))[:20],
+        headers={**SERVICE_HEADERS, "Content-Encoding": "gzip"},
+    )
+    assert response.status_code == 400
+
+
+def test_ingest_endpoint_writes_nothing_when_the_gzip_tail_is_corrupt(engine, monkeypatch):
+    monkeypatch.setenv("ANALYTICS_INGEST_BATCH_SIZE", "1")
+    get_settings.cache_clear()
+    try:
+        response = client.post(
+            "/analytics/ingest",
+            # Drop the CRC/size trailer: every line decompresses, the stream does not.
+            content=gzip.compress(_ndjson(MIXED))[:-8],
+            headers={**SERVICE_HEADERS, "Content-Encoding": "gzip"},
+        )
+    finally:
+        get_settings.cache_clear()
+    assert response.status_code == 400
+    assert _count(engine, TicketScan) == 0
+
+
+def test_ingest_endpoint_rejects_oversized_payloads(engine, monkeypatch):
+    body = _ndjson(MIXED)
+    monkeypatch.setenv("ANALYTICS_INGEST_MAX_BYTES", str(len(body) - 1))
+    get_settings.cache_clear()
+    try:
+        plain = client.post("/analytics/ingest", content=body, headers=SERVICE_HEADERS)
+        # Small on the wire, over the limit once decompressed.
+        packed = client.post("/analytics/ingest", content=gzip.compress(body), headers=SERVICE_HEADERS)
+    finally:
+        get_settings.cache_clear()
+    assert (plain.status_code, packed.status_code) == (413, 413)
+    assert _count(engine, TicketScan) == 0
+
+
+def test_ingest_endpoint_requires_service_key(monkeypatch):
+    # Other modules install a global override for require_service_key.
+    monkeypatch.delitem(app.dependency_overrides, require_service_key, raising=False)
+    response = client.post("/analytics/ingest", content=_ndjson(MIXED))
+    assert response.status_code == 401
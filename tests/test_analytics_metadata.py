@@ -0,0 +1,105 @@
+"""Tests for JSON additional_metadata storage and the metadata containment filter."""
+import json
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.analytics.models import Base, TicketScan
+from src.analytics.service import AnalyticsService
+from src.main import app
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def sqlite_session_factory():
+    """In-memory SQLite database with the analytics tables created."""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    yield factory
+    engine.dispose()
+
+
+@pytest.fixture
+def service(sqlite_session_factory):
+    with patch("src.analytics.service.get_session", side_effect=sqlite_session_factory):
+        yield AnalyticsService()
+
+
+def test_metadata_stored_as_json_object(service, sqlite_session_factory):
+    service.log_ticket_scan(
+        ticket_id="t1",
+        event_id="e1",
+        additional_metadata={"gate": "A", "device_id": 7},
+    )
+
+    session = sqlite_session_factory()
+    try:
+        scan = session.query(TicketScan).one()
+        assert scan.additional_metadata == {"gate": "A", "device_id": 7}
+    finally:
+        session.close()
+
+
+def test_recent_scans_filtered_by_metadata(service):
+    service.log_ticket_scan(ticket_id="t1", event_id="e1", additional_metadata={"gate": "A", "device_id": 7})
+    service.log_ticket_scan(ticket_id="t2", event_id="e1", additional_metadata={"gate": "B", "device_id": 7})
+    service.log_ticket_scan(ticket_id="t3", event_id="e1")
+
+    by_gate = service.get_recent_scans("e1", metadata={"gate": "A"})
+    assert by_gate["total"] == 1
+    assert by_gate["data"][0]["ticket_id"] == "t1"
+    assert by_gate["data"][0]["additional_metadata"] == {"gate": "A", "device_id": 7}
+
+    by_device = service.get_recent_scans("e1", metadata={"device_id": 7})
+    assert {row["ticket_id"] for row in by_device["data"]} == {"t1", "t2"}
+
+    assert service.get_recent_scans("e1")["total"] == 3
+
+
+def test_transfers_and_invalid_attempts_filtered_by_metadata(service):
+    service.log_ticket_transfer(
+        ticket_id="t1", event_id="e1", from_user_id="u1", to_user_id="u2",
+        additional_metadata={"channel": "app"},
+    )
+    service.log_ticket_transfer(
+        ticket_id="t2", event_id="e1", from_user_id="u3", to_user_id="u4",
+        additional_metadata={"channel": "web"},
+    )
+    service.log_invalid_attempt(
+        attempt_type="scan", reason="invalid_qr", event_id="e1",
+        additional_metadata={"gate": "C"},
+    )
+
+    transfers = service.get_recent_transfers("e1", metadata={"channel": "web"})
+    assert [row["ticket_id"] for row in transfers["data"]] == ["t2"]
+
+    attempts = service.get_invalid_attempts("e1", metadata={"gate": "C"})
+    assert attempts["total"] == 1
+    assert service.get_invalid_attempts("e1", metadata={"gate": "D"})["total"] == 0
+
+
+def test_scans_endpoint_forwards_metadata_filter():
+    mock_result = {"data": [], "total": 0, "page": 1, "limit": 100, "from_ts": None, "to_ts": None}
+    with patch("src.main.analytics_service.get_recent_scans", return_value=mock_result) as mock_get:
+        response = client.get(
+            "/stats/scans",
+            params={"event_id": "e1", "metadata": json.dumps({"gate": "A"})},
+        )
+
+    assert response.status_code == 200
+    assert mock_get.call_args.kwargs["metadata"] == {"gate": "A"}
+
+
+def test_scans_endpoint_rejects_malformed_metadata():
+    response = client.get("/stats/scans", params={"event_id": "e1", "metadata": "{not json"})
+    assert response.status_code == 422
@@ -0,0 +1,163 @@
+"""Tests for HyperLogLog distinct-count sketches."""
+import json
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.analytics.ingest import ingest_ndjson
+from src.analytics.models import AnalyticsSketch, Base
+from src.analytics.service import AnalyticsService
+from src.analytics.sketches import STANDARD_ERROR, HyperLogLog, apply_sketch_updates, load_sketch
+from src.config import get_settings
+from src.main import app
+
+client = TestClient(app)
+
+SERVICE_HEADERS = {"Authorization": f"Bearer {get_settings().SERVICE_API_KEY}"}
+
+
+@pytest.fixture
+def engine():
+    eng = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(eng)
+    yield eng
+    eng.dispose()
+
+
+@pytest.fixture
+def service(engine):
+    with patch("src.analytics.service.get_session", side_effect=sessionmaker(bind=engine)):
+        yield AnalyticsService()
+
+
+def test_estimate_within_error_bound():
+    for n in (0, 1, 100, 20_000):
+        sketch = HyperLogLog()
+        sketch.add_many(f"ticket-{i}" for i in range(n))
+        sketch.add_many(f"ticket-{i}" for i in range(n))  # duplicates do not count
+        assert abs(sketch.estimate() - n) <= max(1, 4 * STANDARD_ERROR * n)
+
+
+def test_merge_is_union_and_roundtrips_through_bytes():
+    a, b, union = HyperLogLog(), HyperLogLog(), HyperLogLog()
+    a.add_many(str(i) for i in range(0, 6000))
+    b.add_many(str(i) for i in range(3000, 9000))
+    union.add_many(str(i) for i in range(0, 9000))
+
+    merged = HyperLogLog.from_bytes(a.to_bytes()).merge(HyperLogLog.from_bytes(b.to_bytes()))
+    assert (merged.registers == union.registers).all()
+
+
+def test_hourly_buckets_merge_across_ranges(engine):
+    base = datetime(2026, 6, 1, 10, 15)
+    scans = [
+        {"event_id": "e1", "ticket_id": f"t{i}", "scan_timestamp": base + timedelta(hours=i % 3)}
+        for i in range(30)
+    ]
+    with engine.begin() as conn:
+        apply_sketch_updates(conn, scans[:15], [])
+        apply_sketch_updates(conn, scans[15:], [])
+
+    with engine.connect() as conn:
+        assert load_sketch(conn, "e1", "scanned_tickets").estimate() == 30
+        first_hour = load_sketch(conn, "e1", "scanned_tickets", base, base + timedelta(minutes=30))
+        assert first_hour.estimate() == 10
+        two_hours = load_sketch(conn, "e1", "scanned_tickets", base + timedelta(hours=1), base + timedelta(hours=2))
+        assert two_hours.estimate() == 20
+        rows = conn.execute(select(func.count()).select_from(AnalyticsSketch.__table__)).scalar()
+    # Three hour buckets plus the all-time sketch.
+    assert rows == 4
+
+
+def test_log_calls_update_sketches(service):
+    for _ in range(3):
+        service.log_ticket_scan(ticket_id="t1", event_id="e1")
+    service.log_ticket_scan(ticket_id="t2", event_id="e1")
+    service.log_ticket_transfer(ticket_id="t1", event_id="e1", from_user_id="u1", to_user_id="u2")
+    service.log_ticket_transfer(ticket_id="t1", event_id="e1", from_user_id="u2", to_user_id="u3")
+
+    counts = service.get_distinct_counts("e1")
+    assert counts["scanned_tickets"] == 2
+    assert counts["transferred_tickets"] == 1
+    assert counts["transfer_users"] == 3
+    assert counts["standard_error"] == pytest.approx(0.0163, abs=1e-4)
+
+
+def test_log_calls_merge_sketches_in_batches(engine, service):
+    for i in range(5):
+        service.log_ticket_scan(ticket_id=f"t{i}", event_id="e1")
+    with engine.connect() as conn:
+        assert conn.execute(select(func.count()).select_from(AnalyticsSketch.__table__)).scalar() == 0
+    assert len(service._sketches) == 5
+
+    # One merge for the whole buffer, made before the read.
+    with patch("src.analytics.service.apply_sketch_updates", wraps=apply_sketch_updates) as apply:
+        assert service.get_distinct_counts("e1")["scanned_tickets"] == 5
+    apply.assert_called_once()
+    assert len(service._sketches) == 0
+
+
+def test_sketch_updates_lock_only_the_rows_they_merge(engine):
+    hour = datetime(2026, 6, 1, 10)
+    with engine.begin() as conn:
+        apply_sketch_updates(conn, [
+            {"event_id": "e1", "ticket_id": "a", "scan_timestamp": hour},
+            {"event_id": "e2", "ticket_id": "b", "scan_timestamp": hour + timedelta(hours=1)},
+        ], [])
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("SELECT"):
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        with engine.begin() as conn:
+            apply_sketch_updates(conn, [{"event_id": "e1", "ticket_id": "c", "scan_timestamp": hour}], [])
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    # Matched on whole (event_id, metric, granularity, bucket_start) keys, not event ids x buckets.
+    [query] = statements
+    assert "(analytics_sketches.event_id, analytics_sketches.metric, analytics_sketches.granularity, " \
+        "analytics_sketches.bucket_start) IN" in query
+
+
+def test_ingest_updates_sketches(engine, service):
+    lines = [
+        json.dumps({"type": "scan", "ticket_id": f"t{i % 7}", "event_id": "e2"}).encode()
+        for i in range(40)
+    ]
+    with patch("src.analytics.ingest.get_engine", return_value=engine):
+        ingest_ndjson(lines, batch_size=9)
+
+    assert service.get_distinct_counts("e2")["scanned_tickets"] == 7
+
+
+def test_distinct_endpoint():
+    result = {
+        "event_id": "e1", "from_ts": None, "to_ts": None, "scanned_tickets": 5,
+        "transferred_tickets": 1, "transfer_users": 2, "standard_error": 0.0163,
+    }
+    with patch("src.routers.analytics.analytics_service.get_distinct_counts", return_value=result):
+        response = client.get("/analytics/distinct", params={"event_id": "e1"}, headers=SERVICE_HEADERS)
+
+    assert response.status_code == 200
+    assert response.json() == result
+
+
+def test_distinct_endpoint_rejects_inverted_window():
+    response = client.get(
+        "/analytics/distinct",
+        params={"event_id": "e1", "from_ts": "2026-06-02T00:00:00", "to_ts": "2026-06-01T00:00:00"},
+        headers=SERVICE_HEADERS,
+    )
+    assert response.status_code == 400
@@ -0,0 +1,203 @@
+"""Tests for the precomputed /analytics/summary snapshot."""
+import threading
+from datetime import date, datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from src.analytics.models import Base, InvalidAttempt, TicketScan, TicketTransfer
+from src.analytics.summary import SummaryRefresher, compute_summary
+from src.auth.dependencies import require_service_key
+from src.config import get_settings
+from src.main import app
+
+client = TestClient(app)
+
+SERVICE_HEADERS = {"Authorization": f"Bearer {get_settings().SERVICE_API_KEY}"}
+
+NOW = datetime(2026, 3, 10, 12, 0, 0)
+
+
+@pytest.fixture
+def engine():
+    eng = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(eng)
+    yield eng
+    eng.dispose()
+
+
+def _create_sales_tables(engine):
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE event_sales_summary (event_id TEXT PRIMARY KEY, event_name TEXT, "
+            "total_tickets INTEGER, total_revenue NUMERIC, last_updated TIMESTAMP)"
+        ))
+        conn.execute(text(
+            "CREATE TABLE daily_ticket_sales (event_id TEXT, sale_date DATE, tickets_sold INTEGER, "
+            "revenue NUMERIC, PRIMARY KEY (event_id, sale_date))"
+        ))
+        conn.execute(text(
+            "CREATE TABLE etl_run_log (id INTEGER PRIMARY KEY, started_at TIMESTAMP, finished_at TIMESTAMP, "
+            "status TEXT, last_run_at TIMESTAMP, rejected_count INTEGER)"
+        ))
+        conn.execute(text(
+            "INSERT INTO event_sales_summary VALUES "
+            "('e1', 'Concert', 120, 2400.5, NULL), ('e2', 'Play', 30, 600, NULL)"
+        ))
+        conn.execute(
+            text("INSERT INTO daily_ticket_sales VALUES ('e1', :today, 7, 140), ('e1', :old, 50, 1000)"),
+            {"today": date(2026, 3, 10), "old": date(2026, 3, 1)},
+        )
+        conn.execute(
+            text("INSERT INTO etl_run_log (finished_at, status) VALUES (:ok, 'success'), (:bad, 'failed')"),
+            {"ok": datetime(2026, 3, 10, 6, 0), "bad": datetime(2026, 3, 10, 7, 0)},
+        )
+
+
+def _seed_activity(engine):
+    recent = NOW - timedelta(hours=1)
+    old = NOW - timedelta(days=3)
+    with engine.begin() as conn:
+        conn.execute(TicketScan.__table__.insert(), [
+            {"ticket_id": "t1", "event_id": "e1", "scan_timestamp": recent, "is_valid": True},
+            {"ticket_id": "t2", "event_id": "e1", "scan_timestamp": recent, "is_valid": False},
+            {"ticket_id": "t3", "event_id": "e2", "scan_timestamp": recent, "is_valid": True},
+            {"ticket_id": "t4", "event_id": "e2", "scan_timestamp": old, "is_valid": True},
+            {"ticket_id": "t5", "event_id": "e2", "scan_timestamp": old, "is_valid": True},
+        ])
+        conn.execute(TicketTransfer.__table__.insert(), [
+            {"ticket_id": "t1", "event_id": "e1", "from_user_id": "u1", "to_user_id": "u2",
+             "transfer_timestamp": old, "is_successful": True},
+        ])
+        conn.execute(InvalidAttempt.__table__.insert(), [
+            {"attempt_type": "scan", "reason": "invalid_qr", "event_id": "e1", "attempt_timestamp": recent},
+        ])
+
+
+def test_compute_summary_aggregates_totals_deltas_and_top_lists(engine):
+    _create_sales_tables(engine)
+    _seed_activity(engine)
+
+    summary = compute_summary(engine, top_n=1, now=NOW)
+
+    assert summary["total_events"] == 2
+    assert summary["total_tickets_sold"] == 150
+    assert summary["total_revenue"] == "3000.50"
+    assert summary["total_scans"] == 5
+    assert summary["total_valid_scans"] == 4
+    assert summary["total_transfers"] == 1
+    assert summary["total_invalid_attempts"] == 1
+    assert summary["last_24h"] == {
+        "scans": 3, "valid_scans": 2, "transfers": 0, "invalid_attempts": 1, "tickets_sold": 7,
+    }
+    assert summary["top_events_by_sales"] == [
+        {"event_id": "e1", "event_name": "Concert", "tickets_sold": 120, "revenue": "2400.50"}
+    ]
+    assert summary["top_events_by_scans_24h"] == [{"event_id": "e1", "scan_count": 2}]
+    assert summary["last_etl_at"] == datetime(2026, 3, 10, 6, 0)
+    assert summary["generated_at"] == NOW
+
+
+def test_compute_summary_without_sales_tables(engine):
+    _seed_activity(engine)
+
+    summary = compute_summary(engine, now=NOW)
+
+    assert summary["total_events"] == 0
+    assert summary["total_revenue"] == "0.00"
+    assert summary["last_etl_at"] is None
+    assert summary["total_scans"] == 5
+
+
+def test_compute_summary_without_analytics_tables():
+    eng = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    _create_sales_tables(eng)
+
+    summary = compute_summary(eng, now=NOW)
+
+    assert summary["total_events"] == 2
+    assert summary["total_scans"] == 0
+    assert summary["top_events_by_scans_24h"] == []
+    assert summary["last_24h"] == {
+        "scans": 0, "valid_scans": 0, "transfers": 0, "invalid_attempts": 0, "tickets_sold": 7,
+    }
+    eng.dispose()
+
+
+def test_refresher_serves_stale_snapshot_while_revalidating():
+    release = threading.Event()
+    done = threading.Event()
+    versions = iter([1, 2])
+
+    def compute():
+        version = next(versions)
+        if version == 2:
+            release.wait(5)
+            done.set()
+        return {"version": version}
+
+    refresher = SummaryRefresher(ttl_seconds=0, compute=compute)
+    refresher.refresh()
+
+    # Stale: the old snapshot is returned immediately and one refresh starts.
+    assert refresher.get() == {"version": 1}
+    assert refresher.trigger_refresh() is False
+    assert refresher.get() == {"version": 1}
+
+    release.set()
+    assert done.wait(5)
+    for _ in range(100):
+        if refresher.get() == {"version": 2}:
+            break
+        threading.Event().wait(0.01)
+    assert refresher.get() == {"version": 2}
+
+
+def test_refresher_keeps_last_snapshot_when_refresh_fails():
+    results = iter([{"version": 1}])
+
+    def compute():
+        return next(results)  # StopIteration on the second call
+
+    refresher = SummaryRefresher(ttl_seconds=0, compute=compute)
+    refresher.refresh()
+    refresher._run()
+
+    assert refresher.get() == {"version": 1}
+
+
+def test_summary_endpoint_returns_503_before_first_snapshot():
+    refresher = SummaryRefresher(ttl_seconds=60, compute=lambda: None)
+    with patch("src.routers.analytics.summary_refresher", refresher):
+        response = client.get("/analytics/summary", headers=SERVICE_HEADERS)
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "5"
+
+
+def test_summary_endpoint_serves_snapshot(engine):
+    _create_sales_tables(engine)
+    _seed_activity(engine)
+    refresher = SummaryRefresher(ttl_seconds=60, compute=lambda: compute_summary(engine, now=NOW))
+    refresher.refresh()
+    with patch("src.routers.analytics.summary_refresher", refresher):
+        response = client.get("/analytics/summary", headers=SERVICE_HEADERS)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total_tickets_sold"] == 150
+    assert data["last_24h"]["scans"] == 3
+    assert data["top_events_by_sales"][0]["event_id"] == "e1"
+
+
+def test_summary_endpoint_requires_service_key(monkeypatch):
+    monkeypatch.delitem(app.dependency_overrides, require_service_key, raising=False)
+    response = client.get("/analytics/summary")
+    assert response.status_code == 401
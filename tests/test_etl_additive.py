@@ -0,0 +1,115 @@
+"""Tests for additive incremental loads guarded by the load ledger."""
+from datetime import date, datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+import src.etl as etl_mod
+from src.config import get_settings
+from src.etl import SummaryAccumulator, load_postgres, run_etl_once
+from src.etl.extract import Page
+
+EVENTS = [{"id": "E1", "name": "Concert"}, {"id": "E2", "name": "Play"}]
+
+
+def _sale(event_id, qty, created_at):
+    return {"event_id": event_id, "quantity": qty, "price": 10.0,
+            "sale_date": created_at.date().isoformat(), "created_at": created_at.isoformat()}
+
+
+class Upstream:
+    """Serves every event and the sales created at or after ``since``."""
+
+    def __init__(self):
+        self.sales = []
+        self.since_seen = []
+
+    def __call__(self, since=None, sales_start_page=1, cache=None):
+        self.since_seen.append(since)
+        yield Page("events", 1, EVENTS)
+        cutoff = datetime.fromisoformat(since) if since else datetime.min
+        yield Page("ticket-sales", 1, [s for s in self.sales if datetime.fromisoformat(s["created_at"]) >= cutoff])
+
+
+@pytest.fixture
+def engine():
+    get_settings.cache_clear()
+    eng = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    with patch.object(etl_mod, "_pg_engine", return_value=eng), patch.object(etl_mod, "load_bigquery"):
+        yield eng
+    eng.dispose()
+
+
+def _totals(engine):
+    with engine.connect() as conn:
+        return dict(conn.execute(text("SELECT event_id, total_tickets FROM event_sales_summary")).all())
+
+
+def _run(upstream, **kwargs):
+    with patch.object(etl_mod, "stream_pages", side_effect=upstream):
+        run_etl_once(**kwargs)
+
+
+def test_incremental_runs_add_deltas(engine):
+    upstream = Upstream()
+    old = datetime(2026, 1, 1)
+    upstream.sales = [_sale("E1", 2, old), _sale("E2", 1, old)]
+    _run(upstream)
+    assert _totals(engine) == {"E1": 2, "E2": 1}
+
+    upstream.sales.append(_sale("E1", 3, datetime.utcnow()))
+    _run(upstream)
+    _run(upstream)  # nothing new
+
+    assert upstream.since_seen[0] is None
+    assert upstream.since_seen[1] is not None
+    assert _totals(engine) == {"E1": 5, "E2": 1}
+    with engine.connect() as conn:
+        names = dict(conn.execute(text("SELECT event_id, event_name FROM event_sales_summary")).all())
+        modes = [m for (m,) in conn.execute(text("SELECT mode FROM etl_load_ledger ORDER BY applied_at"))]
+        daily = conn.execute(text(
+            "SELECT tickets_sold FROM daily_ticket_sales WHERE event_id = 'E1' AND sale_date = :d"
+        ), {"d": old.date()}).scalar()
+    assert names == {"E1": "Concert", "E2": "Play"}
+    assert modes == ["full", "incremental", "incremental"]
+    assert daily == 2
+
+
+def test_full_refresh_replaces_totals(engine):
+    upstream = Upstream()
+    upstream.sales = [_sale("E1", 2, datetime(2026, 1, 1))]
+    _run(upstream)
+    _run(upstream, full_refresh=True)
+
+    assert upstream.since_seen == [None, None]
+    assert _totals(engine) == {"E1": 2}
+
+
+def test_same_window_is_applied_once(engine):
+    rows = [{"event_id": "E1", "event_name": "", "total_tickets": 4, "total_revenue": 40.0,
+             "last_updated": datetime(2026, 2, 1)}]
+    daily = [{"event_id": "E1", "sale_date": date(2026, 2, 1), "tickets_sold": 4, "revenue": 40.0}]
+    window = {"since": "2026-01-31T00:00:00", "until": "2026-02-01T00:00:00"}
+
+    assert load_postgres(rows, daily, additive=True, **window) is True
+    assert load_postgres(rows, daily, additive=True, **window) is False
+    assert load_postgres(rows, daily, additive=True, since=window["until"], until="2026-02-02T00:00:00") is True
+
+    assert _totals(engine) == {"E1": 8}
+
+
+def test_sales_created_after_until_are_deferred():
+    until = datetime(2026, 3, 1, 12, 0)
+    acc = SummaryAccumulator(until)
+    acc.add_sales([
+        _sale("E1", 1, until - timedelta(seconds=1)),
+        _sale("E1", 5, until),
+        {"event_id": "E1", "quantity": 2, "created_at": "2026-03-01T13:00:00+02:00"},  # 11:00 UTC
+        {"event_id": "E1", "quantity": 7},  # no creation time: always counted
+    ])
+
+    (row,), _ = acc.rows()
+    assert row["total_tickets"] == 10
+    assert acc.sales_deferred == 1
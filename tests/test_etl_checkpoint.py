@@ -0,0 +1,169 @@
+"""Tests for paginated /ticket-sales extraction with resumable checkpoints."""
+import json
+import threading
+from unittest.mock import patch
+
+import httpx
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.pool import StaticPool
+
+import src.etl as etl_mod
+from src.config import get_settings
+from src.etl import EtlLeaseLost, SummaryAccumulator, _ensure_run_log_table, run_etl_once
+from src.logging_config import ETL_EXTRACT_PAGES_TOTAL, ETL_EXTRACT_RECORDS_TOTAL
+
+EVENTS = {"data": [{"id": "E1", "name": "One"}], "pagination": {"page": 1, "total_pages": 1}}
+
+
+def _sales_page(page, total_pages=4):
+    return {
+        "data": [{"event_id": "E1", "quantity": 1, "price": 10.0, "sale_date": f"2026-01-0{page}"}] * 2,
+        "pagination": {"page": page, "total_pages": total_pages},
+    }
+
+
+class Upstream:
+    """Fake httpx.Client serving /events and 4 pages of /ticket-sales."""
+
+    def __init__(self, fail_on_sales_page=None):
+        self.fail_on_sales_page = fail_on_sales_page
+        self.sales_requests = []
+
+    def __call__(self, timeout):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def get(self, url, headers=None, params=None):
+        request = httpx.Request("GET", url)
+        if url.endswith("/events"):
+            return httpx.Response(200, json=EVENTS, request=request)
+        self.sales_requests.append(dict(params))
+        if params["page"] == self.fail_on_sales_page:
+            return httpx.Response(400, json={}, request=request)
+        return httpx.Response(200, json=_sales_page(params["page"]), request=request)
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    monkeypatch.setenv("NEST_API_BASE_URL", "https://nest.example.test")
+    monkeypatch.setenv("ETL_SALES_PAGE_SIZE", "2")
+    monkeypatch.setenv("ETL_CHECKPOINT_EVERY_PAGES", "1")
+    get_settings.cache_clear()
+    eng = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    with patch.object(etl_mod, "_pg_engine", return_value=eng):
+        yield eng
+    eng.dispose()
+    get_settings.cache_clear()
+
+
+def _run(upstream):
+    with (
+        patch("src.etl.extract.httpx.Client", upstream),
+        patch.object(etl_mod, "load_postgres") as load_postgres,
+        patch.object(etl_mod, "load_bigquery"),
+    ):
+        run_etl_once()
+    return load_postgres
+
+
+def _run_log(engine):
+    table = _ensure_run_log_table(engine)
+    with engine.connect() as conn:
+        return conn.execute(select(table).order_by(table.c.id)).mappings().all()
+
+
+def test_sales_are_requested_in_pages_and_metered(engine):
+    pages_before = ETL_EXTRACT_PAGES_TOTAL.labels(dataset="ticket-sales")._value.get()
+    records_before = ETL_EXTRACT_RECORDS_TOTAL.labels(dataset="ticket-sales")._value.get()
+    upstream = Upstream()
+
+    load_postgres = _run(upstream)
+
+    assert [(p["page"], p["limit"]) for p in upstream.sales_requests] == [(1, 2), (2, 2), (3, 2), (4, 2)]
+    ev_rows, _ = load_postgres.call_args.args
+    assert ev_rows[0]["total_tickets"] == 8
+    assert ETL_EXTRACT_PAGES_TOTAL.labels(dataset="ticket-sales")._value.get() - pages_before == 4
+    assert ETL_EXTRACT_RECORDS_TOTAL.labels(dataset="ticket-sales")._value.get() - records_before == 8
+    (row,) = _run_log(engine)
+    assert row["status"] == "success"
+    assert row["checkpoint"] is None
+
+
+def test_failed_run_resumes_after_last_checkpoint(engine):
+    with pytest.raises(httpx.HTTPStatusError):
+        _run(Upstream(fail_on_sales_page=3))
+
+    failed = _run_log(engine)[-1]
+    assert failed["status"] == "failed"
+    assert failed["sales_page"] == 2
+    assert json.loads(failed["checkpoint"])["sales_seen"] == 4
+
+    upstream = Upstream()
+    load_postgres = _run(upstream)
+
+    assert [p["page"] for p in upstream.sales_requests] == [3, 4]
+    ev_rows, daily_rows = load_postgres.call_args.args
+    assert ev_rows[0]["event_name"] == "One"
+    assert ev_rows[0]["total_tickets"] == 8
+    assert sorted(r["tickets_sold"] for r in daily_rows) == [2, 2, 2, 2]
+    assert [r["status"] for r in _run_log(engine)] == ["failed", "success"]
+
+
+def test_failure_before_first_checkpoint_keeps_previous_checkpoint(engine):
+    with pytest.raises(httpx.HTTPStatusError):
+        _run(Upstream(fail_on_sales_page=3))
+    # Resumes at page 3 and fails again immediately.
+    with pytest.raises(httpx.HTTPStatusError):
+        _run(Upstream(fail_on_sales_page=3))
+
+    upstream = Upstream()
+    _run(upstream)
+    assert [p["page"] for p in upstream.sales_requests] == [3, 4]
+
+
+def test_run_log_gains_checkpoint_columns_in_place(engine):
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "CREATE TABLE etl_run_log (id INTEGER PRIMARY KEY, started_at TIMESTAMP, finished_at TIMESTAMP, "
+            "status VARCHAR, last_run_at TIMESTAMP, rejected_count INTEGER)"
+        )
+    _ensure_run_log_table(engine)
+    with engine.connect() as conn:
+        columns = {row[1] for row in conn.exec_driver_sql("PRAGMA table_info(etl_run_log)")}
+    assert {"since_cursor", "sales_page", "checkpoint"} <= columns
+
+
+def test_accumulator_state_round_trips():
+    acc = SummaryAccumulator()
+    acc.add_sales(_sales_page(1)["data"] + _sales_page(2)["data"])
+    restored = SummaryAccumulator.from_state(json.loads(json.dumps(acc.to_state())))
+    assert restored.rows()[1] == acc.rows()[1]
+    assert restored.sales_seen == 4
+
+
+def test_run_stops_when_the_lease_is_lost(engine):
+    lost = threading.Event()
+    upstream = Upstream()
+    original_get = upstream.get
+
+    def get(url, headers=None, params=None):
+        if params and params.get("page") == 2:
+            lost.set()  # the heartbeat notices mid-extract
+        return original_get(url, headers, params)
+
+    upstream.get = get
+    with patch.object(etl_mod, "load_postgres") as load_postgres, pytest.raises(EtlLeaseLost):
+        with patch("src.etl.extract.httpx.Client", upstream), patch.object(etl_mod, "load_bigquery"):
+            run_etl_once(lease_lost=lost)
+
+    load_postgres.assert_not_called()
+    assert [p["page"] for p in upstream.sales_requests] == [1, 2]
+    (row,) = _run_log(engine)
+    assert row["status"] == "failed"
+    assert row["sales_page"] == 1
@@ -0,0 +1,224 @@
+"""Tests for conditional (ETag / Last-Modified) extraction and the page cache."""
+import asyncio
+import functools
+import hashlib
+import json
+import threading
+from unittest.mock import patch
+
+import httpx
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.pool import StaticPool
+
+import src.etl as etl_mod
+from src.config import get_settings
+from src.etl import recent_etl_runs, run_etl_once
+from src.etl.extract import stream_pages_async
+from src.etl.page_cache import PageCache
+from src.logging_config import ETL_LAST_RUN_CACHE_HIT_RATIO
+
+LAST_MODIFIED = "Mon, 05 Oct 2026 10:00:00 GMT"
+
+
+class MockNest:
+    """Paginated /events and /ticket-sales that honour If-None-Match / If-Modified-Since."""
+
+    def __init__(self, etag=True, last_modified=False):
+        self.pages = {
+            "events": [[{"id": "E1", "name": "One"}, {"id": "E2", "name": "Two"}]],
+            "ticket-sales": [
+                [{"event_id": "E1", "quantity": 2, "price": 10.0, "sale_date": "2026-01-01"}],
+                [{"event_id": "E2", "quantity": 1, "price": 5.0, "sale_date": "2026-01-02"}],
+            ],
+        }
+        self.etag = etag
+        self.last_modified = last_modified
+        self.requests = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        pages = self.pages[request.url.path.strip("/")]
+        number = int(request.url.params["page"])
+        body = json.dumps(
+            {"data": pages[number - 1], "pagination": {"page": number, "total_pages": len(pages)}}
+        ).encode()
+        headers = {}
+        if self.etag:
+            headers["ETag"] = '"%s"' % hashlib.sha1(body).hexdigest()
+            if request.headers.get("If-None-Match") == headers["ETag"]:
+                return httpx.Response(304, headers=headers)
+        if self.last_modified:
+            headers["Last-Modified"] = LAST_MODIFIED
+            if not self.etag and request.headers.get("If-Modified-Since") == LAST_MODIFIED:
+                return httpx.Response(304, headers=headers)
+        return httpx.Response(200, content=body, headers={**headers, "Content-Type": "application/json"})
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    monkeypatch.setenv("NEST_API_BASE_URL", "https://nest.example.test")
+    get_settings.cache_clear()
+    eng = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    with patch.object(etl_mod, "_pg_engine", return_value=eng), patch.object(etl_mod, "load_bigquery"):
+        yield eng
+    eng.dispose()
+    get_settings.cache_clear()
+
+
+def _run(nest, **kwargs):
+    with patch("src.etl.extract.httpx.Client", functools.partial(httpx.Client, transport=httpx.MockTransport(nest))):
+        run_etl_once(full_refresh=True, **kwargs)
+
+
+def _conditional(nest):
+    return [bool(r.headers.get("If-None-Match") or r.headers.get("If-Modified-Since")) for r in nest.requests]
+
+
+def _summary(engine):
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT event_id, total_tickets, total_revenue FROM event_sales_summary ORDER BY 1")).all()
+
+
+def test_unchanged_upstream_skips_transform_and_load(engine):
+    nest = MockNest()
+    _run(nest)
+    assert _conditional(nest) == [False, False, False]
+
+    nest.requests.clear()
+    with patch.object(etl_mod, "load_postgres") as load:
+        _run(nest)
+
+    assert _conditional(nest) == [True, True, True]
+    load.assert_not_called()
+    latest = recent_etl_runs(1)[0]
+    assert latest["status"] == "unchanged"
+    assert list(latest["stages"]) == ["extract"]
+    assert latest["stages"]["extract"]["pages"] == latest["stages"]["extract"]["not_modified"] == 3
+    assert ETL_LAST_RUN_CACHE_HIT_RATIO._value.get() == 1.0
+
+
+def test_changed_page_folds_cached_pages_in_order(engine):
+    nest = MockNest()
+    _run(nest)
+    before = _summary(engine)
+    nest.pages["ticket-sales"][1].append({"event_id": "E2", "quantity": 3, "price": 5.0, "sale_date": "2026-01-02"})
+    _run(nest)
+
+    assert recent_etl_runs(1)[0]["status"] == "success"
+    assert recent_etl_runs(1)[0]["stages"]["extract"]["not_modified"] == 2
+    assert ETL_LAST_RUN_CACHE_HIT_RATIO._value.get() == pytest.approx(2 / 3)
+    after = dict((row[0], row[1:]) for row in _summary(engine))
+    assert dict((row[0], row[1:]) for row in before)["E1"] == after["E1"]
+    assert after["E2"][0] == 4
+
+
+def test_pages_from_a_failed_load_are_not_trusted(engine):
+    nest = MockNest()
+    with patch.object(etl_mod, "load_postgres", side_effect=RuntimeError("db down")), pytest.raises(RuntimeError):
+        _run(nest)
+    nest.requests.clear()
+    _run(nest)
+
+    assert _conditional(nest) == [False, False, False]
+    assert recent_etl_runs(1)[0]["status"] == "success"
+
+
+def test_last_modified_validator(engine):
+    nest = MockNest(etag=False, last_modified=True)
+    _run(nest)
+    nest.requests.clear()
+    _run(nest)
+
+    assert [r.headers.get("If-Modified-Since") for r in nest.requests] == [LAST_MODIFIED] * 3
+    assert recent_etl_runs(1)[0]["status"] == "unchanged"
+
+
+def test_responses_without_validators_are_not_cached(engine):
+    nest = MockNest(etag=False)
+    _run(nest)
+    nest.requests.clear()
+    _run(nest)
+
+    assert _conditional(nest) == [False, False, False]
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM etl_page_cache")).scalar() == 0
+
+
+def test_incremental_runs_do_not_use_the_cache(engine):
+    nest = MockNest()
+    _run(nest)
+    nest.requests.clear()
+    with patch("src.etl.extract.httpx.Client", functools.partial(httpx.Client, transport=httpx.MockTransport(nest))):
+        run_etl_once()
+
+    assert nest.requests[0].url.params.get("since")
+    assert not any(_conditional(nest))
+
+
+def test_commit_forgets_pages_no_longer_requested(engine):
+    nest = MockNest()
+    _run(nest)
+    nest.pages["ticket-sales"].pop()
+    _run(nest)
+
+    with engine.connect() as conn:
+        urls = conn.execute(text("SELECT url FROM etl_page_cache ORDER BY url")).scalars().all()
+    assert len(urls) == 2 and not any("page=2" in url for url in urls)
+
+
+def test_async_stream_serves_304_pages_from_cache(engine):
+    nest = MockNest()
+    _run(nest)
+    cache = PageCache(engine)
+
+    async def collect():
+        return [page async for page in stream_pages_async(concurrency=4, transport=httpx.MockTransport(nest), cache=cache)]
+
+    pages = asyncio.run(collect())
+    assert [(p.dataset, p.number) for p in pages] == [("events", 1), ("ticket-sales", 1), ("ticket-sales", 2)]
+    assert all(p.cache_url for p in pages)
+    assert pages[2].items == nest.pages["ticket-sales"][1]
+    assert cache.unchanged and cache.hit_ratio == 1.0
+
+
+def test_responses_without_validators_skip_the_cache_write(engine):
+    cache = PageCache(engine)
+    statements = []
+
+    def capture(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        cache.miss("https://nest.example.test/events?page=1", None, None, b"{}")
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    assert cache.misses == 1
+    assert statements == []
+
+
+def test_concurrent_misses_do_not_interleave_transactions(engine):
+    # The async extractor records pages from worker threads; StaticPool shares one connection.
+    cache = PageCache(engine)
+    errors = []
+
+    def record(page):
+        url = f"https://nest.example.test/ticket-sales?page={page}"
+        try:
+            for attempt in range(5):
+                cache.validators(url)
+                cache.miss(url, f'"{attempt}"', None, b"{}")
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=record, args=(page,)) for page in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    cache.commit()
+
+    assert errors == []
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM etl_page_cache WHERE confirmed")).scalar() == 8
@@ -3,10 +3,13 @@ import os
 
 os.environ.setdefault("SKIP_MODEL_TRAINING", "true")
 
-from unittest.mock import MagicMock, patch
+from datetime import date
+from unittest.mock import patch
 
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import MetaData, create_engine, inspect, text
+from sqlalchemy.pool import StaticPool
 from src.main import app
 from src.etl import diff_etl_output
 
@@ -36,103 +39,107 @@ def test_diff_etl_output_returns_empty_when_no_engine():
     assert result["daily"]["would_insert"] == 0
 
 
-def test_diff_etl_output_detects_new_rows():
-    """diff_etl_output counts new rows as would_insert when table is empty."""
-    import src.etl as etl_mod
-    import src.db as db_mod
+@pytest.fixture
+def engine():
+    eng = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    yield eng
+    eng.dispose()
 
-    mock_result = MagicMock()
-    mock_result.__iter__ = MagicMock(return_value=iter([]))
 
-    mock_conn = MagicMock()
-    mock_conn.__enter__ = lambda s: s
-    mock_conn.__exit__ = MagicMock(return_value=False)
-    mock_conn.execute.return_value = mock_result
+@pytest.fixture
+def loaded(engine):
+    """Summary tables holding E1 (10 tickets) and E2 (4 tickets)."""
+    import src.etl as etl_mod
 
-    mock_engine = MagicMock()
-    mock_engine.connect.return_value = mock_conn
+    event_table, daily_table = etl_mod._summary_tables(MetaData())
+    event_table.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(event_table.insert(), [
+            {"event_id": "E1", "event_name": "A", "total_tickets": 10, "total_revenue": 100.0},
+            {"event_id": "E2", "event_name": "B", "total_tickets": 4, "total_revenue": 40.0},
+        ])
+        conn.execute(daily_table.insert(), [
+            {"event_id": "E1", "sale_date": date(2026, 1, 1), "tickets_sold": 5, "revenue": 50.0},
+        ])
+    return engine
 
-    with patch.object(etl_mod, "_pg_engine", return_value=mock_engine):
-        result = diff_etl_output(
-            [{"event_id": "E1", "event_name": "A", "total_tickets": 10, "total_revenue": 100.0}],
-            [{"event_id": "E1", "sale_date": "2026-01-01", "tickets_sold": 5, "revenue": 50.0}],
-        )
 
-    assert result["events"]["would_insert"] == 1
-    assert result["daily"]["would_insert"] == 1
-
-
-def test_diff_etl_output_detects_unchanged_rows():
-    """diff_etl_output counts unchanged rows correctly."""
+def _diff(engine, event_rows, daily_rows, **kwargs):
     import src.etl as etl_mod
 
-    event_rows_from_db = [("E1", 10, 100.0)]
-    daily_rows_from_db = [("E1", "2026-01-01", 5, 50.0)]
+    with patch.object(etl_mod, "_pg_engine", return_value=engine):
+        return diff_etl_output(event_rows, daily_rows, **kwargs)
 
-    call_count = [0]
 
-    def make_mock_result(rows):
-        m = MagicMock()
-        m.__iter__ = MagicMock(return_value=iter(rows))
-        return m
+def test_diff_etl_output_detects_new_rows(engine):
+    """diff_etl_output counts new rows as would_insert when the tables do not exist yet."""
+    result = _diff(
+        engine,
+        [{"event_id": "E1", "event_name": "A", "total_tickets": 10, "total_revenue": 100.0}],
+        [{"event_id": "E1", "sale_date": "2026-01-01", "tickets_sold": 5, "revenue": 50.0}],
+    )
 
-    mock_conn = MagicMock()
-    mock_conn.__enter__ = lambda s: s
-    mock_conn.__exit__ = MagicMock(return_value=False)
-
-    results_queue = [make_mock_result(event_rows_from_db), make_mock_result(daily_rows_from_db)]
+    assert result["events"]["would_insert"] == 1
+    assert result["daily"]["would_insert"] == 1
+    assert result["daily"]["sample"] == [{
+        "change": "insert", "event_id": "E1", "sale_date": "2026-01-01",
+        "current": None, "incoming": {"tickets_sold": 5, "revenue": 50.0},
+    }]
+    assert not inspect(engine).has_table("event_sales_summary")
 
-    def execute_side_effect(*args, **kwargs):
-        return results_queue.pop(0)
 
-    mock_conn.execute.side_effect = execute_side_effect
-    mock_engine = MagicMock()
-    mock_engine.connect.return_value = mock_conn
-
-    with patch.object(etl_mod, "_pg_engine", return_value=mock_engine):
-        result = diff_etl_output(
-            [{"event_id": "E1", "event_name": "A", "total_tickets": 10, "total_revenue": 100.0}],
-            [{"event_id": "E1", "sale_date": "2026-01-01", "tickets_sold": 5, "revenue": 50.0}],
-        )
+def test_diff_etl_output_detects_unchanged_rows(loaded):
+    """diff_etl_output counts unchanged rows correctly, within the revenue tolerance."""
+    result = _diff(
+        loaded,
+        [{"event_id": "E1", "event_name": "A", "total_tickets": 10, "total_revenue": 100.004}],
+        [{"event_id": "E1", "sale_date": date(2026, 1, 1), "tickets_sold": 5, "revenue": 50.0}],
+    )
 
     assert result["events"]["unchanged"] == 1
     assert result["daily"]["unchanged"] == 1
+    assert result["daily"]["sample"] == []
 
 
-def test_diff_etl_output_detects_updated_rows():
+def test_diff_etl_output_detects_updated_rows(loaded):
     """diff_etl_output counts modified rows as would_update."""
-    import src.etl as etl_mod
-
     # DB has E1 with 10 tickets; transform produced 15 tickets → update
-    event_rows_from_db = [("E1", 10, 100.0)]
-    daily_rows_from_db = [("E1", "2026-01-01", 5, 50.0)]
-
-    def make_mock_result(rows):
-        m = MagicMock()
-        m.__iter__ = MagicMock(return_value=iter(rows))
-        return m
-
-    mock_conn = MagicMock()
-    mock_conn.__enter__ = lambda s: s
-    mock_conn.__exit__ = MagicMock(return_value=False)
-
-    results_queue = [make_mock_result(event_rows_from_db), make_mock_result(daily_rows_from_db)]
-
-    def execute_side_effect(*args, **kwargs):
-        return results_queue.pop(0)
-
-    mock_conn.execute.side_effect = execute_side_effect
-    mock_engine = MagicMock()
-    mock_engine.connect.return_value = mock_conn
-
-    with patch.object(etl_mod, "_pg_engine", return_value=mock_engine):
-        result = diff_etl_output(
-            [{"event_id": "E1", "event_name": "A", "total_tickets": 15, "total_revenue": 150.0}],
-            [{"event_id": "E1", "sale_date": "2026-01-01", "tickets_sold": 8, "revenue": 80.0}],
-        )
+    result = _diff(
+        loaded,
+        [{"event_id": "E1", "event_name": "A", "total_tickets": 15, "total_revenue": 150.0}],
+        [{"event_id": "E1", "sale_date": "2026-01-01", "tickets_sold": 8, "revenue": 80.0}],
+    )
 
     assert result["events"]["would_update"] == 1
     assert result["daily"]["would_update"] == 1
+    assert result["events"]["only_in_table"] == 1
+    assert result["events"]["sample"] == [
+        {"change": "update", "event_id": "E1",
+         "current": {"total_tickets": 10, "total_revenue": 100.0},
+         "incoming": {"total_tickets": 15, "total_revenue": 150.0}},
+        {"change": "only_in_table", "event_id": "E2",
+         "current": {"total_tickets": 4, "total_revenue": 40.0}, "incoming": None},
+    ]
+
+
+def test_diff_etl_output_bounds_sample_and_leaves_tables_untouched(loaded):
+    """Counts cover every row, the sample is capped, and nothing is written."""
+    event_rows = [
+        {"event_id": f"N{i:03d}", "event_name": "n", "total_tickets": i, "total_revenue": float(i)}
+        for i in range(250)
+    ]
+    result = _diff(loaded, event_rows, [], sample_limit=5)
+
+    assert result["events"]["would_insert"] == 250
+    assert result["events"]["only_in_table"] == 2
+    assert [row["event_id"] for row in result["events"]["sample"]] == ["E1", "E2", "N000", "N001", "N002"]
+    assert result["daily"]["only_in_table"] == 1
+    with loaded.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM event_sales_summary")).scalar() == 2
 
 
 def test_diff_etl_output_empty_inputs():
@@ -167,11 +174,8 @@ def test_etl_diff_sync_path_returns_result():
     """GET /etl/diff returns diff result synchronously for fast extracts."""
     import src.etl as etl_mod
 
-    mock_events = []
-    mock_sales = []
-
     with (
-        patch.object(etl_mod, "extract_events_and_sales", return_value=(mock_events, mock_sales)),
+        patch.object(etl_mod, "_extract_summary", return_value=etl_mod.SummaryAccumulator()),
         patch.object(etl_mod, "_pg_engine", return_value=None),
     ):
         response = client.get("/etl/diff", headers={"X-Admin-Key": ADMIN_KEY})
@@ -0,0 +1,181 @@
+"""Tests for the bounded, expiring ETL diff job manager."""
+import threading
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+import src.main as main_mod
+from src.config import get_settings
+from src.etl.diff_jobs import COMPLETE, FAILED, DiffJobManager, DiffQueueFull
+from src.logging_config import ETL_DIFF_QUEUE_DEPTH
+from src.main import app
+
+client = TestClient(app)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class BlockingRun:
+    """Job function that blocks until released and records its keys."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.started = threading.Semaphore(0)
+        self.keys = []
+
+    def __call__(self, key):
+        self.keys.append(key)
+        self.started.release()
+        assert self.release.wait(5)
+        return {"key": key}
+
+
+def _manager(run, clock=None, **kwargs):
+    options = {"max_workers": 1, "max_pending": 3, "ttl_seconds": 60, "sync_seconds": 5}
+    options.update(kwargs)
+    return DiffJobManager(run, clock=clock or FakeClock(), **options)
+
+
+def test_identical_in_flight_requests_share_one_job():
+    run = BlockingRun()
+    manager = _manager(run)
+    try:
+        first, first_async = manager.submit(20)
+        assert run.started.acquire(timeout=5)
+        second, second_async = manager.submit(20)
+        other, _ = manager.submit(5)
+
+        assert second is first
+        assert not first_async and second_async
+        assert other is not first
+        run.release.set()
+        manager.wait(first, timeout=5)
+        manager.wait(other, timeout=5)
+    finally:
+        run.release.set()
+        manager.shutdown()
+
+    assert run.keys == [20, 5]
+    assert first.to_dict() == {"job_id": first.job_id, "status": COMPLETE, "result": {"key": 20}}
+
+
+def test_backlog_is_bounded_and_queue_depth_exported():
+    run = BlockingRun()
+    manager = _manager(run, max_pending=2)
+    try:
+        manager.submit(1)
+        assert run.started.acquire(timeout=5)
+        _, queued_async = manager.submit(2)
+
+        assert queued_async  # the only worker is busy
+        assert manager.queue_depth() == 1
+        assert ETL_DIFF_QUEUE_DEPTH._value.get() == 1
+        with pytest.raises(DiffQueueFull):
+            manager.submit(3)
+    finally:
+        run.release.set()
+        manager.shutdown()
+
+    assert manager.queue_depth() == 0
+    assert ETL_DIFF_QUEUE_DEPTH._value.get() == 0
+
+
+def test_async_decision_uses_previous_duration():
+    clock = FakeClock()
+
+    def slow(key):
+        clock.now += 30
+        return {}
+
+    manager = _manager(slow, clock=clock)
+    try:
+        job, run_async = manager.submit(None)
+        manager.wait(job, timeout=5)
+        assert not run_async
+        _, run_async = manager.submit(None)
+        assert run_async
+    finally:
+        manager.shutdown()
+
+
+def test_finished_jobs_expire_after_ttl():
+    clock = FakeClock()
+    manager = _manager(lambda key: {}, clock=clock, ttl_seconds=60, max_finished=2)
+    try:
+        jobs = [manager.wait(manager.submit(key)[0], timeout=5) for key in range(3)]
+        # Only the newest max_finished results are retained.
+        assert manager.get(jobs[0].job_id) is None
+        assert manager.get(jobs[2].job_id) is not None
+
+        clock.now += 61
+        assert manager.get(jobs[2].job_id) is None
+    finally:
+        manager.shutdown()
+
+
+def test_failed_job_reports_error():
+    def boom(key):
+        raise RuntimeError("upstream down")
+
+    manager = _manager(boom)
+    try:
+        job = manager.wait(manager.submit(None)[0], timeout=5)
+    finally:
+        manager.shutdown()
+
+    assert job.status == FAILED
+    assert job.to_dict()["error"] == "upstream down"
+
+
+def test_diff_endpoint_returns_202_and_job_can_be_polled():
+    headers = {"X-Admin-Key": get_settings().ADMIN_API_KEY}
+    run = BlockingRun()
+    manager = _manager(run, sync_seconds=0)
+    manager._last_duration = 1.0
+    try:
+        with patch.object(main_mod, "diff_jobs", manager):
+            response = client.get("/etl/diff", params={"sample_limit": 3}, headers=headers)
+            assert response.status_code == 202
+            job_id = response.json()["job_id"]
+
+            assert client.get(f"/etl/diff/{job_id}", headers=headers).json()["status"] in ("pending", "running")
+            run.release.set()
+            manager.wait(manager.get(job_id), timeout=5)
+            polled = client.get(f"/etl/diff/{job_id}", headers=headers).json()
+            missing = client.get("/etl/diff/not-a-job", headers=headers)
+    finally:
+        run.release.set()
+        manager.shutdown()
+
+    assert polled == {"job_id": job_id, "status": "complete", "result": {"key": 3}}
+    assert missing.status_code == 404
+
+
+def test_diff_endpoint_stops_waiting_after_the_sync_budget():
+    headers = {"X-Admin-Key": get_settings().ADMIN_API_KEY}
+    run = BlockingRun()
+    # No previous duration, so the request starts out synchronous.
+    manager = _manager(run, sync_seconds=0.05)
+    try:
+        with patch.object(main_mod, "diff_jobs", manager):
+            response = client.get("/etl/diff", headers=headers)
+    finally:
+        run.release.set()
+        manager.shutdown()
+
+    assert response.status_code == 202
+    assert response.json()["status"] in ("pending", "running")
+
+
+def test_diff_endpoint_returns_429_when_backlog_full():
+    headers = {"X-Admin-Key": get_settings().ADMIN_API_KEY}
+    with patch.object(main_mod.diff_jobs, "submit", side_effect=DiffQueueFull("4 ETL diff jobs already pending")):
+        response = client.get("/etl/diff", headers=headers)
+    assert response.status_code == 429
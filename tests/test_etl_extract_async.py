@@ -0,0 +1,115 @@
+"""Tests for the concurrent async extractor."""
+import asyncio
+
+import httpx
+import pytest
+
+from src.config import get_settings
+from src.etl.extract import extract_events_and_sales_async
+
+
+@pytest.fixture(autouse=True)
+def _settings(monkeypatch):
+    monkeypatch.setenv("QR_SIGNING_KEY", "a" * 32)
+    monkeypatch.setenv("DATABASE_URL", "sqlite:///./extract-test.db")
+    monkeypatch.setenv("NEST_API_BASE_URL", "https://nest.example.test")
+    get_settings.cache_clear()
+    yield
+    get_settings.cache_clear()
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    calls = []
+
+    async def fake_sleep(seconds):
+        calls.append(seconds)
+
+    monkeypatch.setattr("src.etl.extract.asyncio.sleep", fake_sleep)
+    return calls
+
+
+def _events_api(total_pages, delay_for=lambda page: 0.0, failures=None, advertise_total=True):
+    """MockTransport handler serving *total_pages* pages of two events each."""
+    failures = dict(failures or {})
+    state = {"in_flight": 0, "max_in_flight": 0, "requests": []}
+
+    async def handler(request):
+        state["requests"].append(request)
+        if request.url.path == "/ticket-sales":
+            return httpx.Response(200, json={"data": [{"event_id": "E1", "quantity": 1, "price": 5}]})
+        page = int(request.url.params["page"])
+        if failures.get(page):
+            failures[page] -= 1
+            return httpx.Response(503, json={})
+        state["in_flight"] += 1
+        state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+        try:
+            if delay_for(page):
+                await asyncio.sleep(delay_for(page))
+        finally:
+            state["in_flight"] -= 1
+        pagination = {"page": page}
+        if advertise_total:
+            pagination["total_pages"] = total_pages
+        else:
+            pagination["has_more"] = page < total_pages
+        return httpx.Response(200, json={
+            "data": [{"id": f"E{page}-{i}", "name": f"Event {page}-{i}"} for i in range(2)],
+            "pagination": pagination,
+        })
+
+    return httpx.MockTransport(handler), state
+
+
+def test_pages_fetched_concurrently_in_order():
+    # Later pages answer first; output must still follow page order.
+    transport, state = _events_api(6, delay_for=lambda page: 0.01 * (7 - page))
+
+    events, sales = asyncio.run(extract_events_and_sales_async(concurrency=3, transport=transport))
+
+    assert [e.event_id for e in events] == [f"E{p}-{i}" for p in range(1, 7) for i in range(2)]
+    assert len(sales) == 1
+    assert state["max_in_flight"] == 3
+
+
+def test_since_is_forwarded_to_every_request():
+    transport, state = _events_api(3)
+
+    asyncio.run(extract_events_and_sales_async(since="2026-01-01T00:00:00", transport=transport))
+
+    assert len(state["requests"]) == 4
+    assert all(r.url.params["since"] == "2026-01-01T00:00:00" for r in state["requests"])
+
+
+def test_falls_back_to_sequential_without_total_pages():
+    transport, state = _events_api(3, advertise_total=False)
+
+    events, _ = asyncio.run(extract_events_and_sales_async(transport=transport))
+
+    assert [e.event_id for e in events][::2] == ["E1-0", "E2-0", "E3-0"]
+
+
+def test_retries_5xx_with_async_backoff(sleeps):
+    transport, _ = _events_api(3, failures={2: 2})
+
+    events, _ = asyncio.run(extract_events_and_sales_async(transport=transport))
+
+    assert len(events) == 6
+    assert sleeps == [1, 2]
+
+
+def test_gives_up_after_max_retries(sleeps):
+    transport, _ = _events_api(3, failures={3: 5})
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(extract_events_and_sales_async(transport=transport))
+    assert sleeps == [1, 2]
+
+
+def test_aborts_on_401_without_retry(sleeps):
+    transport = httpx.MockTransport(lambda request: httpx.Response(401, json={"message": "Unauthorized"}))
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(extract_events_and_sales_async(transport=transport))
+    assert sleeps == []
@@ -0,0 +1,145 @@
+"""Tests for the single-runner guard around the scheduled ETL job."""
+import threading
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+import src.etl.leader as leader
+from src.config import get_settings
+from src.etl import _ensure_run_log_table
+from src.etl.leader import EtlLease, run_scheduled_etl
+from src.logging_config import ETL_LOCK_LEASE_LOST_TOTAL, ETL_LOCK_SKIPS_TOTAL
+
+
+def _skips(reason):
+    return ETL_LOCK_SKIPS_TOTAL.labels(reason=reason)._value.get()
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    monkeypatch.setenv("ETL_INTERVAL_MINUTES", "15")
+    get_settings.cache_clear()
+    eng = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    with patch.object(leader, "_pg_engine", return_value=eng):
+        yield eng
+    eng.dispose()
+    get_settings.cache_clear()
+
+
+def _log_run(engine, started_at):
+    run_log = _ensure_run_log_table(engine)
+    with engine.begin() as conn:
+        conn.execute(run_log.insert().values(started_at=started_at, status="success"))
+
+
+def _pg_engine_mock(locked=True):
+    engine = MagicMock()
+    engine.dialect.name = "postgresql"
+    conn = engine.connect.return_value.execution_options.return_value
+    conn.execute.return_value.scalar.return_value = locked
+    return engine, conn
+
+
+def test_runs_when_no_recent_run(engine):
+    _log_run(engine, datetime.utcnow() - timedelta(minutes=20))
+    with patch.object(leader, "run_etl_once") as run:
+        assert run_scheduled_etl() is True
+    run.assert_called_once()
+    # The run is handed the lease's lost flag to check between stages.
+    assert isinstance(run.call_args.kwargs["lease_lost"], threading.Event)
+
+
+def test_skips_when_another_replica_ran_this_interval(engine):
+    _log_run(engine, datetime.utcnow() - timedelta(minutes=5))
+    before = _skips("recent")
+    with patch.object(leader, "run_etl_once") as run:
+        assert run_scheduled_etl() is False
+    run.assert_not_called()
+    assert _skips("recent") == before + 1
+
+
+def test_min_gap_setting_overrides_interval(engine, monkeypatch):
+    monkeypatch.setenv("ETL_RUN_MIN_GAP_SECONDS", "60")
+    get_settings.cache_clear()
+    _log_run(engine, datetime.utcnow() - timedelta(minutes=5))
+    with patch.object(leader, "run_etl_once") as run:
+        assert run_scheduled_etl() is True
+    run.assert_called_once()
+
+
+def test_concurrent_trigger_skips_while_a_run_holds_the_lock(engine):
+    entered, release = threading.Event(), threading.Event()
+
+    def slow_run(**kwargs):
+        entered.set()
+        release.wait(5)
+
+    before = _skips("locked")
+    with patch.object(leader, "run_etl_once", side_effect=slow_run):
+        first = threading.Thread(target=run_scheduled_etl)
+        first.start()
+        assert entered.wait(5)
+        assert run_scheduled_etl() is False
+        release.set()
+        first.join(5)
+    assert _skips("locked") == before + 1
+    assert not leader._local_lock.locked()
+
+
+def test_lock_is_released_when_the_run_fails(engine):
+    with patch.object(leader, "run_etl_once", side_effect=RuntimeError("boom")), pytest.raises(RuntimeError):
+        run_scheduled_etl()
+    assert not leader._local_lock.locked()
+
+
+def test_advisory_lock_taken_and_released_on_postgres():
+    engine, conn = _pg_engine_mock(locked=True)
+    lease = EtlLease(engine, heartbeat_seconds=60)
+
+    assert lease.acquire() is True
+    lease.release()
+
+    engine.connect.return_value.execution_options.assert_called_once_with(isolation_level="AUTOCOMMIT")
+    statements = [str(call.args[0]) for call in conn.execute.call_args_list]
+    assert "pg_try_advisory_lock" in statements[0]
+    assert "pg_advisory_unlock" in statements[-1]
+    conn.invalidate.assert_not_called()
+    conn.close.assert_called_once()
+
+
+def test_advisory_lock_held_elsewhere_skips_without_waiting():
+    engine, conn = _pg_engine_mock(locked=False)
+    with patch.object(leader, "_pg_engine", return_value=engine), patch.object(leader, "run_etl_once") as run:
+        assert run_scheduled_etl() is False
+    run.assert_not_called()
+    assert conn.execute.call_count == 1
+    conn.close.assert_called_once()
+
+
+def test_lost_heartbeat_discards_the_lock_connection():
+    engine, conn = _pg_engine_mock(locked=True)
+    lease = EtlLease(engine, heartbeat_seconds=0.01)
+    before = ETL_LOCK_LEASE_LOST_TOTAL._value.get()
+
+    assert lease.acquire() is True
+    conn.execute.side_effect = RuntimeError("server closed the connection")
+    assert lease.lost.wait(5)
+    lease.release()
+
+    assert ETL_LOCK_LEASE_LOST_TOTAL._value.get() == before + 1
+    conn.invalidate.assert_called_once()
+    conn.close.assert_called_once()
+
+
+def test_lock_error_skips_the_run():
+    engine = MagicMock()
+    engine.dialect.name = "postgresql"
+    engine.connect.side_effect = RuntimeError("db down")
+    before = _skips("error")
+    with patch.object(leader, "_pg_engine", return_value=engine), patch.object(leader, "run_etl_once") as run:
+        assert run_scheduled_etl() is False
+    run.assert_not_called()
+    assert _skips("error") == before + 1
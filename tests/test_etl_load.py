@@ -0,0 +1,83 @@
+"""Tests for the staged (COPY + set-based merge) Postgres load."""
+from datetime import date, datetime
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.pool import StaticPool
+
+import src.etl as etl_mod
+from src.config import get_settings
+from src.etl import _copy_rows, _copy_value, _stage_table, load_postgres
+
+NOW = datetime(2026, 3, 1, 12, 0)
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    monkeypatch.setenv("ETL_LOAD_CHUNK_SIZE", "2")
+    get_settings.cache_clear()
+    eng = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    with patch.object(etl_mod, "_pg_engine", return_value=eng):
+        yield eng
+    eng.dispose()
+    get_settings.cache_clear()
+
+
+def _event(eid, tickets, revenue, name="Show"):
+    return {"event_id": eid, "event_name": name, "total_tickets": tickets, "total_revenue": revenue, "last_updated": NOW}
+
+
+def test_load_stages_in_chunks_and_merges(engine):
+    load_postgres(
+        (_event(f"E{i}", i, i * 10.0) for i in range(5)),
+        [{"event_id": "E1", "sale_date": date(2026, 1, 1), "tickets_sold": 1, "revenue": 10.0}],
+    )
+    load_postgres(
+        [_event("E1", 7, 70.0, name="Renamed"), _event("E9", 1, 5.0)],
+        [{"event_id": "E1", "sale_date": date(2026, 1, 1), "tickets_sold": 7, "revenue": 70.0}],
+    )
+
+    with engine.connect() as conn:
+        events = conn.execute(text(
+            "SELECT event_id, event_name, total_tickets FROM event_sales_summary ORDER BY event_id"
+        )).all()
+        daily = conn.execute(text("SELECT event_id, tickets_sold FROM daily_ticket_sales")).all()
+        tables = set(inspect(conn).get_table_names()) | set(inspect(conn).get_temp_table_names())
+
+    assert len(events) == 6
+    assert ("E1", "Renamed", 7) in events
+    assert ("E3", "Show", 3) in events
+    assert daily == [("E1", 7)]
+    assert not {t for t in tables if t.startswith("etl_stage_")}
+
+
+def test_load_with_no_rows_is_noop(engine):
+    load_postgres([], [])
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM event_sales_summary")).scalar() == 0
+
+
+def test_copy_value_escapes_text_format():
+    assert _copy_value(None) == "\\N"
+    assert _copy_value(date(2026, 1, 2)) == "2026-01-02"
+    assert _copy_value(NOW) == "2026-03-01T12:00:00"
+    assert _copy_value("a\tb\\c\nd") == "a\\tb\\\\c\\nd"
+    assert _copy_value(12.5) == "12.5"
+
+
+def test_copy_rows_streams_tab_separated_buffer():
+    stage = _stage_table(etl_mod._summary_tables(etl_mod.MetaData())[0])
+    cursor = MagicMock()
+    conn = MagicMock()
+    conn.connection.cursor.return_value = cursor
+
+    _copy_rows(conn, stage, [_event("E1", 2, 20.0, name=None)])
+
+    sql, buf = cursor.copy_expert.call_args.args
+    assert sql == (
+        "COPY etl_stage_event_sales_summary "
+        "(event_id, event_name, total_tickets, total_revenue, last_updated) FROM STDIN"
+    )
+    assert buf.getvalue() == "E1\t\\N\t2\t20.0\t2026-03-01T12:00:00\n"
+    cursor.close.assert_called_once()
@@ -0,0 +1,152 @@
+"""Tests for the rejected-row quarantine, sampled reject logging and /etl/runs/{id}/rejects."""
+from datetime import date, timedelta
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+import src.etl as etl_mod
+from src.config import get_settings
+from src.etl import recent_etl_runs, run_etl_once, run_rejects, validate_rows
+from src.etl.extract import Page
+from src.etl.rejects import RateLimiter, RejectCollector
+from src.logging_config import ETL_REJECTED_ROWS_TOTAL
+from src.main import app
+
+client = TestClient(app)
+
+FUTURE = (date.today() + timedelta(days=30)).isoformat()
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _unlimited():
+    return RateLimiter(rate=1e9)
+
+
+def test_rate_limiter_refills_over_time():
+    clock = FakeClock()
+    limiter = RateLimiter(rate=2, burst=2, clock=clock)
+
+    assert [limiter.allow() for _ in range(3)] == [True, True, False]
+    clock.now = 0.5
+    assert [limiter.allow() for _ in range(2)] == [True, False]
+
+
+def test_collector_logs_first_rows_then_every_nth_per_reason():
+    rejects = RejectCollector(log_first=2, log_every=10, limiter=_unlimited())
+    with patch("src.etl.rejects.log_warning") as warn:
+        for i in range(25):
+            rejects.add("daily_ticket_sales", "future_sale_date", {"i": i})
+        rejects.add("event_sales_summary", "empty_event_id", {"i": -1})
+
+    logged = [call.args[1]["reason_count"] for call in warn.call_args_list]
+    assert logged == [1, 2, 10, 20, 1]
+    assert rejects.summary() == {
+        "rejected_count": 26,
+        "by_reason": {"daily_ticket_sales:future_sale_date": 25, "event_sales_summary:empty_event_id": 1},
+        "logged": 5,
+        "suppressed": 21,
+    }
+
+
+def test_collector_logging_is_rate_limited():
+    clock = FakeClock()
+    rejects = RejectCollector(log_first=1000, log_every=1, limiter=RateLimiter(rate=1, burst=3, clock=clock))
+    with patch("src.etl.rejects.log_warning") as warn:
+        for i in range(100):
+            rejects.add("daily_ticket_sales", "future_sale_date", {"i": i})
+
+    assert warn.call_count == 3
+    assert len(rejects) == 100
+
+
+def test_validate_rows_records_reason_codes():
+    rejects = RejectCollector(limiter=_unlimited())
+    before = ETL_REJECTED_ROWS_TOTAL.labels(table="event_sales_summary", reason="negative_total_revenue")._value.get()
+    ev_rows = [
+        {"event_id": "", "total_tickets": 1, "total_revenue": 1.0},
+        {"event_id": "E1", "total_tickets": -1, "total_revenue": 1.0},
+        {"event_id": "E2", "total_tickets": 1, "total_revenue": -1.0},
+    ]
+    daily_rows = [{"event_id": "E1", "sale_date": FUTURE}]
+
+    _, _, rejected = validate_rows(ev_rows, daily_rows, rejects)
+
+    assert rejected == 4
+    assert [(table, reason) for table, reason, _ in rejects.rows] == [
+        ("event_sales_summary", "empty_event_id"),
+        ("event_sales_summary", "negative_total_tickets"),
+        ("event_sales_summary", "negative_total_revenue"),
+        ("daily_ticket_sales", "future_sale_date"),
+    ]
+    after = ETL_REJECTED_ROWS_TOTAL.labels(table="event_sales_summary", reason="negative_total_revenue")._value.get()
+    assert after == before + 1
+
+
+@pytest.fixture
+def engine():
+    get_settings.cache_clear()
+    eng = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    with patch.object(etl_mod, "_pg_engine", return_value=eng), patch.object(etl_mod, "load_bigquery"):
+        yield eng
+    eng.dispose()
+    get_settings.cache_clear()
+
+
+def _pages(since=None, sales_start_page=1, cache=None):
+    yield Page("events", 1, [{"id": f"E{i}", "name": f"Event {i}"} for i in range(3)])
+    yield Page(
+        "ticket-sales",
+        1,
+        [{"event_id": f"E{i}", "quantity": 1, "price": 5.0, "sale_date": FUTURE} for i in range(3)]
+        + [{"event_id": "E0", "quantity": 1, "price": 5.0, "sale_date": "2026-01-01"}],
+    )
+
+
+def test_run_quarantines_rejects_and_pages_through_them(engine):
+    with patch.object(etl_mod, "stream_pages", side_effect=_pages):
+        run_etl_once()
+    [run] = recent_etl_runs(1)
+    assert run["status"] == "success" and run["rejected_count"] == 3
+
+    first = run_rejects(run["id"], limit=2)
+    assert [r["reason"] for r in first["rejects"]] == ["future_sale_date", "future_sale_date"]
+    assert first["rejects"][0]["table"] == "daily_ticket_sales"
+    assert first["rejects"][0]["payload"] == {"event_id": "E0", "sale_date": FUTURE, "tickets_sold": 1, "revenue": 5.0}
+    second = run_rejects(run["id"], limit=2, after_id=first["next_after_id"])
+    assert [r["payload"]["event_id"] for r in second["rejects"]] == ["E2"]
+    assert second["next_after_id"] is None
+    assert run_rejects(run["id"] + 1)["rejects"] == []
+    assert run_rejects(run["id"], reason="empty_event_id")["rejects"] == []
+
+
+def test_quarantine_failure_does_not_fail_the_run(engine):
+    with (
+        patch.object(etl_mod, "stream_pages", side_effect=_pages),
+        patch.object(RejectCollector, "write", side_effect=RuntimeError("disk full")),
+    ):
+        run_etl_once()
+    assert recent_etl_runs(1)[0]["status"] == "success"
+
+
+def test_rejects_endpoint():
+    headers = {"X-Admin-Key": get_settings().ADMIN_API_KEY}
+    page = {"run_id": 7, "rejects": [], "next_after_id": None}
+    with patch("src.main.run_rejects", return_value=page) as mock_rejects:
+        response = client.get("/etl/runs/7/rejects", params={"limit": 5, "after_id": 10}, headers=headers)
+
+    assert response.status_code == 200
+    assert response.json() == page
+    mock_rejects.assert_called_once_with(7, limit=5, after_id=10, reason=None)
+    assert client.get("/etl/runs/7/rejects").status_code == 403
+    with patch("src.main.run_rejects", return_value=None):
+        assert client.get("/etl/runs/7/rejects", headers=headers).status_code == 503
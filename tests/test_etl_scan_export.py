@@ -0,0 +1,172 @@
+"""Tests for the incremental scan analytics export."""
+import gzip
+import json
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+import src.etl.scan_export as export_mod
+from src.analytics.models import InvalidAttempt, TicketScan, TicketTransfer
+from src.config import get_settings
+from src.etl.scan_export import TICKET_SCANS_SCHEMA, export_table, run_scan_export
+from src.etl.warehouse import BigQuerySink, Conflict, LoadJobFailed, LocalSQLSink, write_ndjson
+
+SCANS = TicketScan.__table__
+
+
+def _engine():
+    return create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+
+
+@pytest.fixture
+def source():
+    eng = _engine()
+    for model in (TicketScan, TicketTransfer, InvalidAttempt):
+        model.__table__.create(eng)
+    yield eng
+    eng.dispose()
+
+
+def _add_scans(engine, count, recorded_age=timedelta(hours=1)):
+    """Insert *count* scans, recorded *recorded_age* ago (None: now, by the server default)."""
+    recorded = {} if recorded_age is None else {"recorded_at": datetime.utcnow() - recorded_age}
+    with engine.begin() as conn:
+        conn.execute(SCANS.insert(), [
+            {"ticket_id": f"T{i}", "event_id": "E1", "scanner_id": "S1", "scan_timestamp": datetime.utcnow(),
+             "is_valid": i % 2 == 0, "additional_metadata": {"gate": i}, **recorded}
+            for i in range(count)
+        ])
+
+
+def _ids(engine, table="ticket_scans"):
+    with engine.connect() as conn:
+        return [row[0] for row in conn.execute(text(f"SELECT id FROM {table} ORDER BY id"))]
+
+
+def _export(engine, sink, tmp_path, **kwargs):
+    return export_table(engine, sink, SCANS, TICKET_SCANS_SCHEMA, str(tmp_path), **kwargs)
+
+
+def test_exports_in_chunks_and_resumes_from_the_watermark(source, tmp_path):
+    target = _engine()
+    sink = LocalSQLSink(target)
+    _add_scans(source, 5)
+
+    assert _export(source, sink, tmp_path, chunk_size=2) == {
+        "rows": 5, "chunks": 3, "already_loaded": 0, "watermark": 5,
+    }
+    with target.connect() as conn:
+        row = conn.execute(text("SELECT is_valid, additional_metadata FROM ticket_scans WHERE id = 2")).one()
+    assert (bool(row[0]), json.loads(row[1])) == (False, {"gate": 1})
+
+    _add_scans(source, 2)
+    assert _export(source, sink, tmp_path, chunk_size=2)["rows"] == 2
+    assert _export(source, sink, tmp_path, chunk_size=2)["rows"] == 0
+    assert _ids(target) == list(range(1, 8))
+
+
+def test_retry_after_a_crash_loads_each_chunk_once(source, tmp_path):
+    target = _engine()
+    sink = LocalSQLSink(target)
+    _add_scans(source, 3)
+
+    # The chunk lands in the warehouse but the watermark is never advanced.
+    set_watermark = export_mod._set_watermark
+    calls = []
+
+    def claim_then_crash(*args):
+        calls.append(args)
+        if len(calls) > 1:
+            raise RuntimeError("db gone")
+        return set_watermark(*args)
+
+    with patch.object(export_mod, "_set_watermark", side_effect=claim_then_crash):
+        with pytest.raises(RuntimeError):
+            _export(source, sink, tmp_path, chunk_size=2)
+    assert _ids(target) == [1, 2]
+
+    # More rows and a different chunk size: the claimed chunk is replayed as it was.
+    _add_scans(source, 2)
+    assert _export(source, sink, tmp_path, chunk_size=10) == {
+        "rows": 3, "chunks": 1, "already_loaded": 2, "watermark": 5,
+    }
+    assert _ids(target) == [1, 2, 3, 4, 5]
+
+
+def test_settle_window_follows_insert_time_not_scan_time(source, tmp_path):
+    sink = LocalSQLSink(_engine())
+    _add_scans(source, 2)
+    # A caller-supplied scan time far in the future does not hold the export back.
+    with source.begin() as conn:
+        conn.execute(SCANS.update().where(SCANS.c.id == 2).values(scan_timestamp=datetime.utcnow() + timedelta(days=30)))
+    _add_scans(source, 2, recorded_age=None)
+
+    assert _export(source, sink, tmp_path, settle_seconds=60)["watermark"] == 2
+    assert _export(source, sink, tmp_path, settle_seconds=0)["watermark"] == 4
+
+
+def test_bigquery_append_waits_for_an_existing_job(tmp_path):
+    path = str(tmp_path / "chunk.ndjson.gz")
+    write_ndjson(path, [{"id": 1, "scan_timestamp": datetime(2026, 5, 1)}], TICKET_SCANS_SCHEMA)
+    with gzip.open(path, "rt") as fh:
+        assert json.loads(fh.readline())["scan_timestamp"] == "2026-05-01T00:00:00"
+
+    client = MagicMock()
+    sink = BigQuerySink(client, "proj", "veritix")
+    with patch("src.etl.warehouse.bigquery"):
+        assert sink.append_file("ticket_scans", TICKET_SCANS_SCHEMA, path, "ticket_scans_0_1") is True
+        assert client.load_table_from_file.call_args.kwargs["job_id"] == "veritix_veritix_ticket_scans_0_1"
+
+        client.load_table_from_file.side_effect = Conflict("Already Exists")
+        assert sink.append_file("ticket_scans", TICKET_SCANS_SCHEMA, path, "ticket_scans_0_1") is False
+    client.get_job.assert_called_once_with("veritix_veritix_ticket_scans_0_1", location="US")
+    client.get_job.return_value.result.assert_called_once()
+
+
+def test_failed_load_job_is_retried_under_a_new_id(source, tmp_path):
+    _add_scans(source, 2)
+    client = MagicMock()
+    failed = MagicMock(error_result={"reason": "invalid"})
+    failed.result.side_effect = RuntimeError("bad row")
+    client.load_table_from_file.return_value = failed
+    client.get_job.return_value = failed
+    sink = BigQuerySink(client, "proj", "veritix")
+
+    with patch("src.etl.warehouse.bigquery"):
+        with pytest.raises(LoadJobFailed):
+            _export(source, sink, tmp_path)
+        # The failed job's id is taken; retrying under it only finds the failure again.
+        path = str(tmp_path / "chunk.ndjson.gz")
+        write_ndjson(path, [], TICKET_SCANS_SCHEMA)
+        client.load_table_from_file.side_effect = Conflict("Already Exists")
+        with pytest.raises(LoadJobFailed):
+            sink.append_file("ticket_scans", TICKET_SCANS_SCHEMA, path, "ticket_scans_0_2_0")
+
+        client.load_table_from_file.side_effect = None
+        client.load_table_from_file.return_value = MagicMock(error_result=None)
+        assert _export(source, sink, tmp_path)["rows"] == 2
+    job_ids = [c.kwargs["job_id"] for c in client.load_table_from_file.call_args_list]
+    assert job_ids[0] == "veritix_veritix_ticket_scans_0_2_0"
+    assert job_ids[-1] == "veritix_veritix_ticket_scans_0_2_1"
+
+
+def test_run_scan_export_covers_every_table(source, monkeypatch):
+    monkeypatch.setenv("BQ_SINK", "local")
+    monkeypatch.setenv("ETL_SCAN_EXPORT_SETTLE_SECONDS", "0")
+    get_settings.cache_clear()
+    _add_scans(source, 1)
+    with source.begin() as conn:
+        conn.execute(TicketTransfer.__table__.insert().values(
+            ticket_id="T1", event_id="E1", from_user_id="U1", to_user_id="U2",
+            transfer_timestamp=datetime.utcnow() - timedelta(hours=1), is_successful=True,
+        ))
+
+    with patch.object(export_mod, "_pg_engine", return_value=source):
+        results = run_scan_export(sink=LocalSQLSink(_engine()))
+    assert {name: counts["rows"] for name, counts in results.items()} == {
+        "ticket_scans": 1, "ticket_transfers": 1, "invalid_attempts": 0,
+    }
+    get_settings.cache_clear()
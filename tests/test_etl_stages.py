@@ -0,0 +1,132 @@
+"""Tests for per-stage ETL timings, metrics and the /etl/runs endpoint."""
+from unittest.mock import patch
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+import src.etl as etl_mod
+from src.config import get_settings
+from src.etl import recent_etl_runs, run_etl_once
+from src.etl.stages import StageTimings
+from src.logging_config import ETL_LAST_RUN_EXTRACT, ETL_STAGE_ROWS
+from src.main import app
+
+client = TestClient(app)
+
+EVENTS = {"data": [{"id": "E1", "name": "One"}, {"id": "E2", "name": "Two"}]}
+SALES = {
+    "data": [
+        {"event_id": "E1", "quantity": 2, "price": 10.0, "sale_date": "2026-01-01"},
+        {"event_id": "E2", "quantity": 1, "price": 5.0, "sale_date": "2026-01-02"},
+        {"event_id": "E2", "quantity": 1, "price": 5.0, "sale_date": "2026-01-02"},
+    ]
+}
+
+
+class Upstream:
+    """Fake httpx.Client whose first /ticket-sales request fails with a 503."""
+
+    def __init__(self):
+        self.sales_calls = 0
+
+    def __call__(self, timeout):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def get(self, url, headers=None, params=None):
+        request = httpx.Request("GET", url)
+        if url.endswith("/events"):
+            return httpx.Response(200, json=EVENTS, request=request)
+        self.sales_calls += 1
+        if self.sales_calls == 1:
+            return httpx.Response(503, json={}, request=request)
+        return httpx.Response(200, json=SALES, request=request)
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    monkeypatch.setenv("NEST_API_BASE_URL", "https://nest.example.test")
+    get_settings.cache_clear()
+    eng = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    with patch.object(etl_mod, "_pg_engine", return_value=eng), patch.object(etl_mod, "load_bigquery"):
+        yield eng
+    eng.dispose()
+    get_settings.cache_clear()
+
+
+def test_stage_timings_accumulate_and_round():
+    timings = StageTimings()
+    timings.record("extract", 0.123456, rows_out=3, pages=1)
+    timings.record("extract", 1.0, rows_out=2, pages=1)
+    with timings.time("validate", rows_in=5) as counts:
+        counts["rows_out"] = 4
+
+    result = timings.to_dict()
+    assert list(result) == ["extract", "validate"]
+    assert result["extract"] == {"seconds": 1.1235, "rows_out": 5, "pages": 2}
+    assert result["validate"]["rows_in"] == 5 and result["validate"]["rows_out"] == 4
+
+
+def test_run_records_stage_breakdown_in_run_log_and_metrics(engine):
+    with patch("src.etl.extract.httpx.Client", Upstream()), patch("src.etl.extract.time.sleep"):
+        run_etl_once()
+
+    [run] = recent_etl_runs(5)
+    stages = run["stages"]
+    assert run["status"] == "success"
+    assert list(stages) == ["extract", "transform", "validate", "load", "warehouse"]
+    assert stages["extract"]["pages"] == 2
+    assert stages["extract"]["retries"] == 1
+    assert stages["extract"]["rows_out"] == 5
+    assert stages["extract"]["bytes"] > 0
+    assert (stages["transform"]["rows_in"], stages["transform"]["rows_out"]) == (5, 4)
+    assert stages["validate"]["rows_in"] == stages["validate"]["rows_out"] == 4
+    assert stages["load"]["rows_in"] == 4
+    assert all(entry["seconds"] >= 0 for entry in stages.values())
+
+    assert ETL_STAGE_ROWS.labels(stage="transform", direction="out")._value.get() == 4
+    assert ETL_LAST_RUN_EXTRACT.labels(measure="retries")._value.get() == 1
+
+
+def test_failed_run_keeps_stages_reached(engine):
+    with (
+        patch("src.etl.extract.httpx.Client", Upstream()),
+        patch("src.etl.extract.time.sleep"),
+        patch.object(etl_mod, "load_postgres", side_effect=RuntimeError("db down")),
+        pytest.raises(RuntimeError),
+    ):
+        run_etl_once()
+
+    [run] = recent_etl_runs(5)
+    assert run["status"] == "failed"
+    assert "load" in run["stages"] and "warehouse" not in run["stages"]
+
+
+def test_recent_runs_are_newest_first_and_limited(engine):
+    for _ in range(3):
+        with patch("src.etl.extract.httpx.Client", Upstream()), patch("src.etl.extract.time.sleep"):
+            run_etl_once(full_refresh=True)
+
+    runs = recent_etl_runs(2)
+    assert [run["id"] for run in runs] == [3, 2]
+    assert runs[0]["duration_seconds"] is not None
+
+
+def test_etl_runs_endpoint():
+    headers = {"X-Admin-Key": get_settings().ADMIN_API_KEY}
+    runs = [{"id": 7, "status": "success", "stages": {"extract": {"seconds": 1.5}}}]
+    with patch("src.main.recent_etl_runs", return_value=runs) as mock_runs:
+        response = client.get("/etl/runs", params={"limit": 5}, headers=headers)
+
+    assert response.status_code == 200
+    assert response.json() == {"runs": runs}
+    mock_runs.assert_called_once_with(5)
+    assert client.get("/etl/runs").status_code == 403
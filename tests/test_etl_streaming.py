@@ -0,0 +1,95 @@
+"""Tests for the streaming extract → transform → load path."""
+import httpx
+from unittest.mock import patch
+
+import src.etl as etl_mod
+from src.config import get_settings
+from src.etl import SummaryAccumulator, run_etl_once, transform_summary
+from src.etl.extract import Page, stream_pages
+
+EVENTS = [{"id": "E1", "name": "One"}, {"id": "E2", "title": "Two"}, {"name": "no id"}]
+SALES = [
+    {"event_id": "E1", "quantity": 2, "price": 10.0, "sale_date": "2025-10-01T00:00:00"},
+    {"eventId": "E1", "qty": 1, "unit_price": 15.0, "created_at": "2025-10-02T09:00:00"},
+    {"event": "E2", "quantity": 3, "total_amount": 50.0, "sale_date": "2025-10-01"},
+    {"quantity": 4, "price": 1.0},
+    {"event_id": "E3", "price": 7.5, "sale_date": "2025-10-03T00:00:00"},
+]
+
+
+def _strip_timestamps(rows):
+    return sorted(({k: v for k, v in r.items() if k != "last_updated"} for r in rows), key=repr)
+
+
+def test_accumulator_over_pages_matches_transform_summary():
+    acc = SummaryAccumulator()
+    for i in range(0, len(SALES), 2):
+        acc.add_sales(SALES[i:i + 2])
+    acc.add_events(EVENTS)  # names may arrive after the sales that reference them
+
+    expected_ev, expected_daily = transform_summary(EVENTS, SALES)
+    ev_rows, daily_rows = acc.rows()
+
+    assert _strip_timestamps(ev_rows) == _strip_timestamps(expected_ev)
+    assert _strip_timestamps(daily_rows) == _strip_timestamps(expected_daily)
+    assert acc.sales_seen == len(SALES)
+
+
+def test_stream_pages_fetches_lazily(monkeypatch):
+    monkeypatch.setenv("NEST_API_BASE_URL", "https://nest.example.test")
+    get_settings.cache_clear()
+    requested = []
+
+    class Client:
+        def __init__(self, timeout):
+            pass
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def get(self, url, headers=None, params=None):
+            requested.append((url.rsplit("/", 1)[1], (params or {}).get("page")))
+            page = (params or {}).get("page", 1)
+            payload = {"data": [{"id": f"E{page}"}], "pagination": {"page": page, "total_pages": 2}}
+            return httpx.Response(200, json=payload, request=httpx.Request("GET", url))
+
+    monkeypatch.setattr("src.etl.extract.httpx.Client", Client)
+
+    pages = stream_pages()
+    assert next(pages) == Page("events", 1, [{"id": "E1"}])
+    assert requested == [("events", 1)]
+    assert [(page.dataset, page.number) for page in pages] == [
+        ("events", 2), ("ticket-sales", 1), ("ticket-sales", 2),
+    ]
+    get_settings.cache_clear()
+
+
+def test_run_etl_once_folds_pages_without_materialising_records():
+    def fake_pages(since=None, sales_start_page=1, cache=None):
+        yield Page("events", 1, EVENTS[:1])
+        yield Page("events", 2, EVENTS[1:])
+        for number, sale in enumerate(SALES, start=1):
+            yield Page("ticket-sales", number, [sale])
+
+    with (
+        patch.object(etl_mod, "_pg_engine", return_value=None),
+        patch.object(etl_mod, "stream_pages", side_effect=fake_pages),
+        patch.object(etl_mod, "extract_events_and_sales") as materialising_extract,
+        patch.object(etl_mod, "load_postgres") as load_postgres,
+        patch.object(etl_mod, "load_bigquery"),
+    ):
+        run_etl_once()
+
+    materialising_extract.assert_not_called()
+    ev_rows, daily_rows = load_postgres.call_args.args
+    expected_ev, expected_daily = transform_summary(EVENTS, SALES)
+    assert _strip_timestamps(ev_rows) == _strip_timestamps(expected_ev)
+    assert _strip_timestamps(daily_rows) == _strip_timestamps(expected_daily)
+
+
+def test_chunked_splits_rows():
+    chunks = list(etl_mod._chunked(({"i": i} for i in range(7)), 3))
+    assert [len(c) for c in chunks] == [3, 3, 1]
@@ -0,0 +1,83 @@
+"""Property tests: transform_summary_vectorized matches transform_summary."""
+import random
+
+import pytest
+
+from src.etl import transform_summary, transform_summary_vectorized
+
+EVENT_KEYS = ("event_id", "eventId", "event")
+QUANTITIES = [1, 2, 3, 0, -1, None, "2", "x", 2.7, True, float("nan"), float("inf")]
+PRICES = [10.0, 4.5, 0, None, "12.25", "bad", 3, 0.1, 1e-3]
+TOTALS = [None, 0, 25.0, "19.99", "oops", 0.3]
+DATES = [
+    "2026-01-01", "2026-01-02", "2026-01-02T23:59:00", "2026-02-30", "not-a-date",
+    "", None, 20260101, 20260101.0, "20260101",
+]
+
+
+def _random_sale(rng):
+    sale = {}
+    key = rng.choice(EVENT_KEYS)
+    sale[key] = rng.choice(["E1", "E2", "E3", 7, "", None])
+    if rng.random() < 0.8:
+        sale[rng.choice(("quantity", "qty"))] = rng.choice(QUANTITIES)
+    if rng.random() < 0.9:
+        sale[rng.choice(("price", "unit_price", "amount"))] = rng.choice(PRICES)
+    if rng.random() < 0.4:
+        sale["total_amount"] = rng.choice(TOTALS)
+    if rng.random() < 0.9:
+        sale[rng.choice(("sale_date", "created_at", "timestamp"))] = rng.choice(DATES)
+    return sale
+
+
+def _strip(rows):
+    return [{k: v for k, v in row.items() if k != "last_updated"} for row in rows]
+
+
+def _assert_same(events, sales):
+    expected_ev, expected_daily = transform_summary(events, sales)
+    ev_rows, daily_rows = transform_summary_vectorized(events, sales)
+    assert _strip(ev_rows) == _strip(expected_ev)
+    assert daily_rows == expected_daily
+    # Same types, not just equal values (True == 1, 1 == 1.0).
+    for got, want in zip(ev_rows + daily_rows, expected_ev + expected_daily):
+        assert {k: type(v) for k, v in got.items()} == {k: type(v) for k, v in want.items()}
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_matches_transform_summary_on_messy_sales(seed):
+    rng = random.Random(seed)
+    events = [{"id": "E1", "name": "One"}, {"event_id": "E2", "title": "Two"}, {"id": ""}]
+    sales = [_random_sale(rng) for _ in range(rng.randint(0, 300))]
+    _assert_same(events, sales)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_matches_transform_summary_on_clean_sales(seed):
+    rng = random.Random(seed)
+    events = [{"id": f"E{i}", "name": f"Event {i}"} for i in range(20)]
+    sales = [
+        {
+            "event_id": f"E{rng.randrange(25)}",
+            "quantity": rng.randint(1, 6),
+            "price": round(rng.uniform(1, 300), 2),
+            "sale_date": f"2026-03-{rng.randint(1, 31):02d}",
+        }
+        for _ in range(5000)
+    ]
+    _assert_same(events, sales)
+
+
+def test_empty_inputs():
+    assert transform_summary_vectorized([], []) == ([], [])
+    assert transform_summary_vectorized([{"id": "E1"}], [{"event_id": ""}]) == ([], [])
+
+
+def test_falls_back_when_ticket_totals_exceed_float_precision():
+    sales = [
+        {"event_id": "E1", "quantity": 2**62, "price": 1, "sale_date": "2026-01-01"},
+        {"event_id": "E1", "quantity": 2**70, "price": 1, "sale_date": "2026-01-01"},
+    ]
+    ev_rows, daily_rows = transform_summary_vectorized([], sales)
+    assert ev_rows[0]["total_tickets"] == 2**62 + 2**70
+    assert daily_rows == transform_summary([], sales)[1]
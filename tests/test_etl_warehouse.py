@@ -0,0 +1,131 @@
+"""Tests for batch warehouse loads (BigQuery load jobs and the local sink)."""
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy import MetaData, create_engine, text
+from sqlalchemy.pool import StaticPool
+
+import src.etl as etl_mod
+from src.config import get_settings
+from src.etl.warehouse import (
+    DAILY_SALES_SCHEMA,
+    EVENT_SUMMARY_SCHEMA,
+    BigQuerySink,
+    LocalSQLSink,
+    write_ndjson,
+)
+
+EVENT_ROWS = [
+    {"event_id": "E1", "event_name": "Show", "total_tickets": 3, "total_revenue": 30.5,
+     "last_updated": datetime(2026, 5, 1, 12, 0)},
+    {"event_id": "E2", "event_name": "Gig", "total_tickets": 1, "total_revenue": 10.0,
+     "last_updated": datetime(2026, 5, 1, 12, 0)},
+]
+DAILY_ROWS = [
+    {"event_id": "E1", "sale_date": date(2026, 4, 30), "tickets_sold": 3, "revenue": 30.5},
+]
+
+
+def _engine():
+    return create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+
+
+def _rows(engine, table):
+    with engine.connect() as conn:
+        return [tuple(row) for row in conn.execute(text(f"SELECT * FROM {table} ORDER BY 1, 2"))]
+
+
+def test_write_ndjson_encodes_schema_columns(tmp_path):
+    path = tmp_path / "daily.ndjson"
+    rows = [{**DAILY_ROWS[0], "revenue": Decimal("30.50"), "extra": "dropped"}]
+
+    assert write_ndjson(str(path), rows, DAILY_SALES_SCHEMA) == 1
+    assert [json.loads(line) for line in path.read_text().splitlines()] == [
+        {"event_id": "E1", "sale_date": "2026-04-30", "tickets_sold": 3, "revenue": "30.50"}
+    ]
+
+
+def test_local_sink_replaces_table_contents(tmp_path):
+    engine = _engine()
+    sink = LocalSQLSink(engine)
+    path = str(tmp_path / "events.ndjson")
+
+    write_ndjson(path, EVENT_ROWS, EVENT_SUMMARY_SCHEMA)
+    sink.load_file("event_sales_summary", EVENT_SUMMARY_SCHEMA, path)
+    write_ndjson(path, EVENT_ROWS[:1], EVENT_SUMMARY_SCHEMA)
+    sink.load_file("event_sales_summary", EVENT_SUMMARY_SCHEMA, path)
+
+    assert [row[:4] for row in _rows(engine, "event_sales_summary")] == [("E1", "Show", 3, 30.5)]
+
+
+def test_load_bigquery_without_postgres_loads_given_rows():
+    warehouse = _engine()
+    with patch.object(etl_mod, "_pg_engine", return_value=None):
+        etl_mod.load_bigquery(EVENT_ROWS, DAILY_ROWS, sink=LocalSQLSink(warehouse))
+
+    assert [row[0] for row in _rows(warehouse, "event_sales_summary")] == ["E1", "E2"]
+    assert _rows(warehouse, "daily_ticket_sales") == [("E1", "2026-04-30", 3, 30.5)]
+
+
+def test_load_bigquery_publishes_full_postgres_tables_for_incremental_runs():
+    pg, warehouse = _engine(), _engine()
+    event_table, daily_table = etl_mod._summary_tables(MetaData())
+    event_table.metadata.create_all(pg)
+    with pg.begin() as conn:
+        conn.execute(event_table.insert(), EVENT_ROWS)
+        conn.execute(daily_table.insert(), DAILY_ROWS)
+
+    delta = [{**EVENT_ROWS[0], "total_tickets": 1}]
+    with patch.object(etl_mod, "_pg_engine", return_value=pg):
+        etl_mod.load_bigquery(delta, [], sink=LocalSQLSink(warehouse))
+
+    assert [row[:3] for row in _rows(warehouse, "event_sales_summary")] == [("E1", "Show", 3), ("E2", "Gig", 1)]
+    assert len(_rows(warehouse, "daily_ticket_sales")) == 1
+
+
+def test_bigquery_sink_submits_one_truncating_load_job_per_table(tmp_path):
+    client = MagicMock()
+    sink = BigQuerySink(client, "proj", "veritix")
+    path = str(tmp_path / "events.ndjson")
+    write_ndjson(path, EVENT_ROWS, EVENT_SUMMARY_SCHEMA)
+
+    sink.load_file("event_sales_summary", EVENT_SUMMARY_SCHEMA, path)
+    sink.load_file("daily_ticket_sales", DAILY_SALES_SCHEMA, path)
+
+    assert client.create_dataset.call_count == 1
+    assert client.load_table_from_file.call_count == 2
+    _, table_id = client.load_table_from_file.call_args_list[0].args
+    config = client.load_table_from_file.call_args_list[0].kwargs["job_config"]
+    assert table_id == "proj.veritix.event_sales_summary"
+    assert config.write_disposition == "WRITE_TRUNCATE"
+    assert config.source_format == "NEWLINE_DELIMITED_JSON"
+    assert [field.name for field in config.schema] == [name for name, _ in EVENT_SUMMARY_SCHEMA]
+    assert client.load_table_from_file.return_value.result.call_count == 2
+
+
+def test_bigquery_sink_raises_when_load_job_fails(tmp_path):
+    client = MagicMock()
+    client.load_table_from_file.return_value.result.side_effect = RuntimeError("bad row")
+    path = str(tmp_path / "events.ndjson")
+    write_ndjson(path, EVENT_ROWS, EVENT_SUMMARY_SCHEMA)
+
+    with pytest.raises(RuntimeError, match="bad row"):
+        BigQuerySink(client, "proj", "veritix").load_file("event_sales_summary", EVENT_SUMMARY_SCHEMA, path)
+
+
+def test_load_bigquery_uses_configured_local_sink(monkeypatch, tmp_path):
+    url = f"sqlite:///{tmp_path / 'warehouse.db'}"
+    monkeypatch.setenv("BQ_ENABLED", "true")
+    monkeypatch.setenv("BQ_SINK", "local")
+    monkeypatch.setenv("BQ_LOCAL_SINK_URL", url)
+    get_settings.cache_clear()
+    try:
+        with patch.object(etl_mod, "_pg_engine", return_value=None):
+            etl_mod.load_bigquery(EVENT_ROWS, DAILY_ROWS)
+    finally:
+        get_settings.cache_clear()
+
+    assert len(_rows(create_engine(url), "event_sales_summary")) == 2
@@ -0,0 +1,213 @@
+"""Tests for the pushed sales webhook and its reconciliation with pulled loads."""
+import json
+import time
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+import src.etl as etl_mod
+import src.etl.webhook as webhook_mod
+from src.config import get_settings
+from src.etl import run_etl_once
+from src.etl.extract import Page
+from src.etl.webhook import (
+    SalesWebhookBatcher,
+    WebhookBufferFull,
+    WebhookSignatureError,
+    apply_webhook_sales,
+    parse_sales,
+    sign_payload,
+    verify_signature,
+)
+from src.main import app
+
+SECRET = "w" * 32
+EVENTS = [{"id": "E1", "name": "Concert"}]
+
+
+def _sale(sale_id, qty, created_at):
+    return {"id": sale_id, "event_id": "E1", "quantity": qty, "price": 10.0,
+            "sale_date": created_at.date().isoformat(), "created_at": created_at.isoformat()}
+
+
+@pytest.fixture
+def engine():
+    get_settings.cache_clear()
+    eng = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    with (
+        patch.object(etl_mod, "_pg_engine", return_value=eng),
+        patch.object(webhook_mod, "_pg_engine", return_value=eng),
+        patch.object(etl_mod, "load_bigquery"),
+    ):
+        yield eng
+    eng.dispose()
+
+
+def _run(sales, **kwargs):
+    def pages(since=None, sales_start_page=1, cache=None):
+        yield Page("events", 1, EVENTS)
+        cutoff = datetime.fromisoformat(since) if since else datetime.min
+        yield Page("ticket-sales", 1, [s for s in sales if datetime.fromisoformat(s["created_at"]) >= cutoff])
+
+    with patch.object(etl_mod, "stream_pages", side_effect=pages):
+        run_etl_once(**kwargs)
+
+
+def _push(engine, *sales):
+    return apply_webhook_sales(engine, [(sale, datetime.utcnow()) for sale in sales])
+
+
+def _tickets(engine):
+    with engine.connect() as conn:
+        total = conn.execute(text("SELECT total_tickets FROM event_sales_summary WHERE event_id = 'E1'")).scalar()
+        daily = dict(conn.execute(text("SELECT sale_date, tickets_sold FROM daily_ticket_sales")).all())
+    return total, daily
+
+
+def test_signature_round_trip_and_rejections():
+    body = b'{"id": "S1"}'
+    now = time.time()
+    ts = str(int(now))
+    verify_signature(SECRET, ts, sign_payload(SECRET, ts, body), body, 300, now=now)
+
+    with pytest.raises(WebhookSignatureError):
+        verify_signature(SECRET, ts, sign_payload(SECRET, ts, body + b" "), body, 300, now=now)
+    with pytest.raises(WebhookSignatureError):
+        verify_signature(SECRET, ts, sign_payload(SECRET, ts, body), body, 300, now=now + 301)
+    with pytest.raises(WebhookSignatureError):
+        verify_signature(SECRET, None, None, body, 300, now=now)
+
+
+def test_parse_sales_accepts_single_list_and_data_shapes():
+    assert parse_sales(b'{"id": "S1", "event_id": "E1"}') == ([{"id": "S1", "event_id": "E1"}], 0)
+    sales, invalid = parse_sales(json.dumps({"data": [{"id": "S1", "event_id": "E1"}, {"event_id": "E1"}]}).encode())
+    assert [s["id"] for s in sales] == ["S1"] and invalid == 1
+    with pytest.raises(ValueError):
+        parse_sales(b"not json")
+
+
+def test_webhook_sales_apply_once_and_pull_absorbs_them(engine):
+    old = datetime.utcnow() - timedelta(hours=3)
+    pulled = [_sale("S1", 2, old)]
+    _run(pulled)
+    assert _tickets(engine)[0] == 2
+
+    pushed = _sale("S2", 3, datetime.utcnow())
+    assert _push(engine, pushed, pushed) == {"applied": 1, "covered": 0, "duplicate": 1, "rejected": 0}
+    assert _push(engine, pushed)["duplicate"] == 1
+    assert _tickets(engine)[0] == 5
+
+    # The next window pulls S2 as well; the load subtracts the webhook's copy.
+    pulled.append(pushed)
+    _run(pulled)
+    total, daily = _tickets(engine)
+    assert total == 5
+    assert sum(daily.values()) == 5
+
+    # Created before the new cursor: the load already counted it.
+    late = _sale("S3", 4, datetime.utcnow() - timedelta(minutes=1))
+    assert _push(engine, late) == {"applied": 0, "covered": 1, "duplicate": 0, "rejected": 0}
+    assert _tickets(engine)[0] == 5
+
+
+def test_sales_the_pull_missed_keep_the_webhook_count(engine):
+    old = datetime.utcnow() - timedelta(hours=3)
+    _run([_sale("S1", 2, old)])
+    lagging = _sale("S2", 3, datetime.utcnow())
+    _push(engine, lagging)
+
+    # Upstream has not caught up: the window's pull does not return S2.
+    _run([_sale("S1", 2, old)])
+    assert _tickets(engine)[0] == 5
+
+    # A later full pull returns it and absorbs the webhook's copy.
+    _run([_sale("S1", 2, old), lagging], full_refresh=True)
+    assert _tickets(engine)[0] == 5
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT applied FROM etl_webhook_sales WHERE sale_id = 'S2'")).scalar() == 0
+    _run([_sale("S1", 2, old), lagging])
+    assert _tickets(engine)[0] == 5
+
+
+def test_invalid_webhook_sales_are_quarantined(engine):
+    _run([_sale("S1", 2, datetime.utcnow() - timedelta(hours=3))])
+    now = datetime.utcnow()
+    refund = _sale("S2", -1, now)
+    ahead = {**_sale("S3", 1, now), "created_at": (now + timedelta(days=3)).isoformat()}
+    assert _push(engine, refund, ahead, _sale("S4", 1, now)) == {
+        "applied": 1, "covered": 0, "duplicate": 0, "rejected": 2,
+    }
+    assert _tickets(engine)[0] == 3
+    with engine.connect() as conn:
+        rejected = conn.execute(text("SELECT table_name, reason FROM etl_rejected_rows ORDER BY id")).all()
+        recorded = conn.execute(text("SELECT sale_id FROM etl_webhook_sales ORDER BY sale_id")).scalars().all()
+    assert rejected == [("etl_webhook_sales", "negative_total_tickets"), ("etl_webhook_sales", "future_created_at")]
+    assert recorded == ["S4"]
+
+
+def test_full_refresh_keeps_webhook_sales_the_pull_did_not_return(engine):
+    old = _sale("S1", 2, datetime.utcnow() - timedelta(days=2))
+    _run([old])
+    pushed = _sale("S2", 3, datetime.utcnow())
+    _push(engine, pushed)
+
+    _run([old], full_refresh=True)
+    total, daily = _tickets(engine)
+    assert total == 5
+    assert daily[pushed["sale_date"]] == 3
+
+
+def test_batcher_flushes_at_batch_size_and_requeues_failures():
+    applied = []
+
+    def apply(batch):
+        applied.append([sale["id"] for sale, _ in batch])
+        return {"applied": len(batch)}
+
+    batcher = SalesWebhookBatcher(apply, flush_seconds=60, batch_size=2, max_buffer=3)
+    batcher.submit([{"id": "A"}, {"id": "B"}])
+    deadline = time.monotonic() + 5
+    while not applied and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert applied == [["A", "B"]]
+
+    batcher.submit([{"id": "C"}])
+    with pytest.raises(WebhookBufferFull):
+        batcher.submit([{"id": "D"}, {"id": "E"}, {"id": "F"}])
+
+    batcher._apply = lambda batch: (_ for _ in ()).throw(RuntimeError("db down"))
+    assert batcher.flush() == 0
+    assert len(batcher) == 1
+
+    batcher._apply = apply
+    batcher.shutdown()
+    assert applied[-1] == ["C"] and len(batcher) == 0
+
+
+def test_webhook_endpoint(engine, monkeypatch):
+    monkeypatch.setenv("ETL_WEBHOOK_SECRET", SECRET)
+    get_settings.cache_clear()
+    client = TestClient(app)
+    body = json.dumps({"data": [_sale("S1", 1, datetime.utcnow())]}).encode()
+    ts = str(int(time.time()))
+    headers = {"X-Webhook-Timestamp": ts, "X-Webhook-Signature": sign_payload(SECRET, ts, body)}
+
+    with patch("src.main.get_engine", return_value=engine), patch("src.main.sales_webhook") as batcher:
+        response = client.post("/etl/webhook/sales", content=body, headers=headers)
+        assert response.status_code == 202
+        assert response.json() == {"accepted": 1, "invalid": 0}
+        batcher.submit.assert_called_once()
+
+        bad = {**headers, "X-Webhook-Signature": "sha256=00"}
+        assert client.post("/etl/webhook/sales", content=body, headers=bad).status_code == 401
+
+        batcher.submit.side_effect = WebhookBufferFull("full")
+        assert client.post("/etl/webhook/sales", content=body, headers=headers).status_code == 429
+
+    monkeypatch.delenv("ETL_WEBHOOK_SECRET")
+    get_settings.cache_clear()
+    assert client.post("/etl/webhook/sales", content=body, headers=headers).status_code == 503
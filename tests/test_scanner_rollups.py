@@ -0,0 +1,157 @@
+"""Tests for per-scanner minute rollups and the scanner endpoints."""
+import json
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.analytics.ingest import ingest_ndjson
+from src.analytics.models import AnalyticsStats, Base, ScannerMinuteStats, TicketScan
+from src.analytics.scanner_rollups import apply_scanner_rollups, scanner_series, top_scanners
+from src.analytics.service import AnalyticsService
+from src.config import get_settings
+from src.main import app
+
+client = TestClient(app)
+
+SERVICE_HEADERS = {"Authorization": f"Bearer {get_settings().SERVICE_API_KEY}"}
+
+T0 = datetime(2026, 7, 4, 18, 0)
+
+
+@pytest.fixture
+def engine():
+    eng = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(eng)
+    yield eng
+    eng.dispose()
+
+
+def _scan(scanner_id, minute, second=0, is_valid=True, event_id="e1"):
+    return {
+        "event_id": event_id,
+        "scanner_id": scanner_id,
+        "scan_timestamp": T0 + timedelta(minutes=minute, seconds=second),
+        "is_valid": is_valid,
+    }
+
+
+@pytest.fixture
+def seeded(engine):
+    scans = (
+        # gate-a: busy, 6 scans/min for 2 minutes
+        [_scan("gate-a", m, s) for m in (0, 1) for s in range(0, 60, 10)]
+        # gate-b: slow, 2 scans in one minute, one invalid
+        + [_scan("gate-b", 0, 5), _scan("gate-b", 0, 40, is_valid=False)]
+        # gate-c: mostly invalid
+        + [_scan("gate-c", 2, 0, is_valid=False), _scan("gate-c", 2, 30, is_valid=False), _scan("gate-c", 3, 0)]
+        # other event and scans without scanner are ignored here
+        + [_scan("gate-a", 0, event_id="e2"), _scan(None, 0)]
+    )
+    with engine.begin() as conn:
+        apply_scanner_rollups(conn, scans[:7])
+        apply_scanner_rollups(conn, scans[7:])
+    return engine
+
+
+def test_rollups_are_additive_per_minute(seeded):
+    with seeded.connect() as conn:
+        rows = conn.execute(
+            select(ScannerMinuteStats.__table__).where(ScannerMinuteStats.scanner_id == "gate-a",
+                                                        ScannerMinuteStats.event_id == "e1")
+        ).mappings().all()
+    assert sorted((r["minute_start"], r["scan_count"]) for r in rows) == [
+        (T0, 6), (T0 + timedelta(minutes=1), 6),
+    ]
+
+
+def test_top_scanners_rankings(seeded):
+    with seeded.connect() as conn:
+        window = (T0, T0 + timedelta(minutes=10))
+        hot = top_scanners(conn, "e1", *window, rank_by="hot")
+        slow = top_scanners(conn, "e1", *window, rank_by="slow")
+        invalid = top_scanners(conn, "e1", *window, rank_by="invalid", limit=1)
+
+    assert [r["scanner_id"] for r in hot] == ["gate-a", "gate-c", "gate-b"]
+    assert hot[0] == {
+        "scanner_id": "gate-a", "scans": 12, "invalid": 0, "invalid_ratio": 0.0,
+        "active_minutes": 2, "scans_per_minute": 6.0, "peak_scans_per_minute": 6,
+    }
+    assert [r["scanner_id"] for r in slow] == ["gate-c", "gate-b", "gate-a"]
+    assert invalid[0]["scanner_id"] == "gate-c"
+    assert invalid[0]["invalid_ratio"] == pytest.approx(0.6667)
+
+
+def test_scanner_series_zero_fills(seeded):
+    with seeded.connect() as conn:
+        series = scanner_series(conn, "e1", "gate-c", T0 + timedelta(minutes=1), T0 + timedelta(minutes=4))
+
+    assert [(p["scans"], p["invalid"]) for p in series] == [(0, 0), (2, 2), (1, 0)]
+    assert series[1]["invalid_ratio"] == 1.0
+
+
+def test_log_and_ingest_update_rollups(engine):
+    with patch("src.analytics.service.get_session", side_effect=sessionmaker(bind=engine)):
+        service = AnalyticsService()
+        service.log_ticket_scan(ticket_id="t1", event_id="e1", scanner_id="gate-z", is_valid=False)
+        lines = [json.dumps({"type": "scan", "ticket_id": f"t{i}", "event_id": "e1", "scanner_id": "gate-z"}).encode()
+                 for i in range(4)]
+        with patch("src.analytics.ingest.get_engine", return_value=engine):
+            ingest_ndjson(lines)
+
+        now = datetime.utcnow()
+        top = service.get_top_scanners("e1", now - timedelta(minutes=5), now + timedelta(minutes=1))
+
+    assert top[0]["scanner_id"] == "gate-z"
+    assert top[0]["scans"] == 5
+    assert top[0]["invalid"] == 1
+
+
+def test_top_scanners_endpoint_defaults_to_last_hour():
+    with patch("src.routers.analytics.analytics_service.get_top_scanners", return_value=[]) as mock_top:
+        response = client.get("/analytics/scanners/top", params={"event_id": "e1", "rank_by": "slow"},
+                              headers=SERVICE_HEADERS)
+
+    assert response.status_code == 200
+    event_id, start, end, rank_by, limit = mock_top.call_args.args
+    assert (event_id, rank_by, limit) == ("e1", "slow", 10)
+    assert end - start == timedelta(hours=1)
+    # Rounded to the minute so that default requests share a cache key.
+    assert (end.second, end.microsecond) == (0, 0)
+    assert end > datetime.utcnow()
+
+
+def test_scanner_series_endpoint_rejects_long_window():
+    response = client.get(
+        "/analytics/scanners/gate-a/series",
+        params={"event_id": "e1", "from_ts": "2026-07-01T00:00:00", "to_ts": "2026-07-03T00:00:00"},
+        headers=SERVICE_HEADERS,
+    )
+    assert response.status_code == 400
+
+
+def test_top_scanners_endpoint_rejects_unknown_ranking():
+    response = client.get("/analytics/scanners/top", params={"event_id": "e1", "rank_by": "fast"},
+                          headers=SERVICE_HEADERS)
+    assert response.status_code == 422
+
+
+def test_scan_logging_creates_the_rollup_table_on_an_upgraded_database():
+    # A database from before the rollups: the scan tables exist, the rollup table does not.
+    eng = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    TicketScan.__table__.create(eng)
+    AnalyticsStats.__table__.create(eng)
+    with patch("src.analytics.service.get_session", side_effect=sessionmaker(bind=eng)):
+        AnalyticsService().log_ticket_scan(ticket_id="t1", event_id="e1", scanner_id="gate-a")
+
+    with eng.connect() as conn:
+        assert conn.execute(select(ScannerMinuteStats.__table__.c.scan_count)).scalar() == 1
+    eng.dispose()
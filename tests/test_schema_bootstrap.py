@@ -0,0 +1,127 @@
+"""Tests for the one-time schema bootstrap and DDL-free steady state."""
+import re
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.pool import StaticPool
+
+import src.analytics.models as analytics_models
+import src.db as db_mod
+import src.etl as etl_mod
+import src.etl.webhook as webhook_mod
+from src.config import get_settings
+from src.etl import RejectCollector, recent_etl_runs, run_etl_once, run_rejects
+from src.etl.extract import Page
+from src.etl.page_cache import PageCache
+from src.etl.webhook import apply_webhook_sales
+from src.fraud_events_store import get_fraud_events, save_fraud_result
+
+# Catalog statements; the load's session-local etl_stage_* tables are scratch
+# space, not schema.
+_CATALOG = re.compile(r"^\s*(CREATE|ALTER|DROP|PRAGMA)\b", re.IGNORECASE)
+
+
+@pytest.fixture
+def engine():
+    get_settings.cache_clear()
+    eng = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    with (
+        patch.object(etl_mod, "_pg_engine", return_value=eng),
+        patch.object(webhook_mod, "_pg_engine", return_value=eng),
+        patch.object(db_mod, "get_engine", return_value=eng),
+        patch.object(etl_mod, "load_bigquery"),
+    ):
+        yield eng
+    eng.dispose()
+
+
+def _run(**kwargs):
+    sale = {"id": "S1", "event_id": "E1", "quantity": 2, "price": 10.0,
+            "created_at": (datetime.utcnow() - timedelta(hours=1)).isoformat()}
+
+    def pages(since=None, sales_start_page=1, cache=None):
+        yield Page("events", 1, [{"id": "E1", "name": "Concert"}])
+        yield Page("ticket-sales", 1, [sale] if since is None else [])
+
+    with patch.object(etl_mod, "stream_pages", side_effect=pages):
+        run_etl_once(**kwargs)
+
+
+def test_ensure_schema_runs_each_creator_once_per_engine():
+    create = MagicMock()
+    db_mod.register_schema("test_once", create)
+    first, second = MagicMock(), MagicMock()
+
+    db_mod.ensure_schema(first, "test_once")
+    db_mod.ensure_schema(first, "test_once")
+    db_mod.ensure_schema(second, "test_once")
+    assert [c.args for c in create.call_args_list] == [(first,), (second,)]
+
+    db_mod.forget_schema(first)
+    db_mod.ensure_schema(first, "test_once")
+    assert create.call_count == 3
+    del db_mod._schema_creators["test_once"]
+
+
+def test_bootstrap_creates_registered_tables(engine):
+    db_mod.bootstrap_schema(engine)
+
+    tables = set(inspect(engine).get_table_names())
+    assert {
+        "etl_run_log",
+        "etl_load_ledger",
+        "etl_webhook_sales",
+        "event_sales_summary",
+        "daily_ticket_sales",
+        "etl_page_cache",
+        "etl_rejected_rows",
+        "etl_export_watermarks",
+        "fraud_events",
+        "stakeholders",
+        "revenue_calculations",
+        "generated_reports",
+        "ticket_scans",
+        "ticket_transfers",
+        "invalid_attempts",
+        "analytics_stats",
+        "analytics_sketches",
+        "scanner_minute_stats",
+    } <= tables
+
+
+def test_bootstrap_migrates_legacy_analytics_columns(engine):
+    with (
+        patch.object(analytics_models, "migrate_metadata_to_jsonb") as to_jsonb,
+        patch.object(analytics_models, "add_recorded_at_columns") as recorded_at,
+    ):
+        db_mod.bootstrap_schema(engine)
+    to_jsonb.assert_called_once_with(engine)
+    recorded_at.assert_called_once_with(engine)
+
+
+def test_steady_state_issues_no_ddl(engine):
+    db_mod.bootstrap_schema(engine)
+    _run(full_refresh=True)
+
+    statements = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if _CATALOG.match(statement) and "etl_stage_" not in statement:
+            statements.append(statement)
+
+    _run()
+    recent_etl_runs(5)
+    run_rejects(1)
+    rejects = RejectCollector()
+    rejects.add("event_sales_summary", "empty_event_id", {"event_id": ""})
+    rejects.write(engine, 1)
+    PageCache(engine).commit()
+    sale = {"id": "W1", "event_id": "E1", "quantity": 1, "price": 5.0, "created_at": datetime.utcnow().isoformat()}
+    apply_webhook_sales(engine, [(sale, datetime.utcnow())])
+    save_fraud_result(["velocity"], "high", event_id="E1")
+    get_fraud_events(event_id="E1")
+
+    assert statements == []